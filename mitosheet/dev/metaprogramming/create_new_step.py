@@ -205,7 +205,7 @@ def write_code_chunk(original_step_name: str, params: Dict[str, str]) -> None:
     write_python_code_file(path_to_file, step_performer_code)
 
 def write_to_step_performer_init(original_step_name: str) -> None:
-    path_to_init = get_step_performers_folder() / '__init__.py'
+    path_to_init = get_step_performers_folder() / 'all_step_performers.py'
     (step_performer_name, step_performer_import_statement) = get_step_performer_name_and_import_statement(original_step_name) 
 
     with open(path_to_init, 'r') as f:
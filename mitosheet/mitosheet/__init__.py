@@ -24,31 +24,108 @@ NOTE: if you have any issues with installation, please email jake@sagacollab.com
 """
 
 import os
-import pandas as pd
+import sys as _sys
+# NOTE: we import these privately, so they are not exported by `from mitosheet import *`
+from importlib import import_module as _import_module
+from typing import Any, List as _List
 
-# Public interface we want users to rely on
-from mitosheet.mito_backend import sheet
 from mitosheet._version import __version__
 
-# NOTE: We always export v1 sheet functions and types as unqualified exports, as we did
-# this when we started Mito. This allows us to not break existing user analyses. We should
-# never add to these -- see mitosheet/public/README.md for more info
-from mitosheet.public.v1 import register_analysis
-from mitosheet.public.v1.sheet_functions import *
-from mitosheet.public.v1.sheet_functions.types import *
-from mitosheet.public.v1.utils import flatten_column_header
-
-# We export depricated utilities, so that users can still use them if they used to
-from mitosheet.api.get_column_summary_graph import (
-    filter_df_to_safe_size_external as filter_df_to_safe_size,
-)
-from mitosheet.step_performers.bulk_old_rename.deprecated_utils import (
-    make_valid_header_external as make_valid_header,
-)
-
-# Make sure the user is initalized
+# The public interface we want users to rely on is imported lazily (see __getattr__ below),
+# as importing it imports pandas, plotly, the steps and the telemetry, which takes seconds.
+# This makes `import mitosheet` fast for users who only import it, and for the generated
+# code, which only uses the public functions it imports from mitosheet.public
+_LAZY_ATTRIBUTES = {
+    # Public interface we want users to rely on
+    'sheet': ('mitosheet.mito_backend', 'sheet'),
+    'pd': ('pandas', None),
+
+    # NOTE: We always export v1 sheet functions and types as unqualified exports, as we did
+    # this when we started Mito. This allows us to not break existing user analyses. We should
+    # never add to these -- see mitosheet/public/README.md for more info
+    'register_analysis': ('mitosheet.public.v1', 'register_analysis'),
+    'flatten_column_header': ('mitosheet.public.v1.utils', 'flatten_column_header'),
+
+    # We export depricated utilities, so that users can still use them if they used to
+    'filter_df_to_safe_size': ('mitosheet.api.get_column_summary_graph', 'filter_df_to_safe_size_external'),
+    'make_valid_header': ('mitosheet.step_performers.bulk_old_rename.deprecated_utils', 'make_valid_header_external'),
+}
+
+# The modules that we export everything from, as if we had imported * from them
+_LAZY_STAR_IMPORT_MODULES = [
+    'mitosheet.public.v1.sheet_functions',
+    'mitosheet.public.v1.sheet_functions.types',
+]
+
+
+def _get_star_import_names(module: Any) -> _List[str]:
+    if hasattr(module, '__all__'):
+        return list(module.__all__)
+    return [name for name in vars(module) if not name.startswith('_')]
+
+
+def _import_star(module_name: str) -> None:
+    module = _import_module(module_name)
+    for name in _get_star_import_names(module):
+        # Submodules of mitosheet take precedence over the names we export
+        if name not in globals():
+            globals()[name] = getattr(module, name)
+
+
+def _import_lazy_attribute(name: str) -> Any:
+    module_name, attribute_name = _LAZY_ATTRIBUTES[name]
+    module = _import_module(module_name)
+    value = module if attribute_name is None else getattr(module, attribute_name)
+    globals()[name] = value
+    return value
+
+
+def _import_public_interface() -> None:
+    for name in _LAZY_ATTRIBUTES:
+        if name not in globals():
+            _import_lazy_attribute(name)
+    for module_name in _LAZY_STAR_IMPORT_MODULES:
+        _import_star(module_name)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports the public interface of mitosheet the first time it is used, so
+    that `import mitosheet` does not import it. See PEP 562.
+    """
+    if name in _LAZY_ATTRIBUTES:
+        return _import_lazy_attribute(name)
+
+    if name == '__all__':
+        # `from mitosheet import *` exports all of the public interface
+        _import_public_interface()
+        public_names = [global_name for global_name in globals() if not global_name.startswith('_')]
+        globals()['__all__'] = public_names
+        return public_names
+
+    if not name.startswith('__'):
+        for module_name in _LAZY_STAR_IMPORT_MODULES:
+            _import_star(module_name)
+        if name in globals():
+            return globals()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> _List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+# Python 3.6 does not call a module level __getattr__ (see PEP 562), and so we 
+# import the public interface when mitosheet is imported instead
+if _sys.version_info < (3, 7):
+    _import_public_interface()
+
+
+# Make sure the user is initalized. We identify the user when they make their first 
+# sheet rather than here, so that importing mitosheet does not import the telemetry
 from mitosheet.user import initialize_user
-initialize_user()
+initialize_user(call_identify=False)
 
 # This function is only necessary for mitosheet3, as it is used
 # in jlab3 to find the extension. It is not used in jlab2
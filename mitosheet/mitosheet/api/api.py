@@ -6,12 +6,12 @@
 """
 Contains handlers for the Mito API
 """
-from queue import Queue
-from threading import Thread
+import base64
 from time import perf_counter
-from typing import Any, Callable, Dict, NoReturn
+from typing import Any, Callable, Dict, Optional
 
-from mitosheet.types import MitoWidgetType
+from mitosheet.types import API_RESULT_BUFFER_KEY, MitoWidgetType, StepsManagerType
+from mitosheet.api.api_worker_pool import APICallCancelled, APICallMetrics, APIWorkerPool
 from mitosheet.api.get_column_describe import get_column_describe
 from mitosheet.api.get_column_summary_graph import get_column_summary_graph
 from mitosheet.api.get_csv_files_metadata import get_csv_files_metadata
@@ -30,20 +30,17 @@ from mitosheet.api.get_split_text_to_columns_preview import \
     get_split_text_to_columns_preview
 from mitosheet.api.get_test_imports import get_test_imports
 from mitosheet.api.get_unique_value_counts import get_unique_value_counts
-from mitosheet.steps_manager import StepsManager
 from mitosheet.api.get_render_count import get_render_count
 from mitosheet.api.get_code_snippets import get_code_snippets
 from mitosheet.api.get_available_snowflake_options_and_defaults import get_available_snowflake_options_and_defaults
 from mitosheet.api.get_validate_snowflake_credentials import get_validate_snowflake_credentials
 from mitosheet.api.get_ai_completion import get_ai_completion
 from mitosheet.api.get_parameterizable_params import get_parameterizable_params
+from mitosheet.api.get_sheet_window import get_sheet_window
 # AUTOGENERATED LINE: API.PY IMPORT (DO NOT DELETE)
 from mitosheet.telemetry.telemetry_utils import log_event_processed
 from mitosheet.user.location import is_jupyterlite, is_streamlit
 
-# As the column summary statistics tab does three calls, we defaulted to this max
-MAX_QUEUED_API_CALLS = 3
-
 # NOTE: BE CAREFUL WITH THIS. When in development mode, you can set it to False
 # so the API calls are handled in the main thread, to make printing easy.
 # In newer versions of JupyterLab, to see these print statements:
@@ -58,90 +55,73 @@ if is_jupyterlite():
 if is_streamlit():
     THREADED = False
 
+# In streamlit, responses are turned into json, and so any binary buffers in
+# the result of an API call are sent as base64 in the json instead
+SEND_BINARY_BUFFERS = not is_streamlit()
+API_RESULT_BUFFER_BASE64_KEY = 'bufferBase64'
+
 
 class API:
     """
-    The API provides a wrapper around a thread that responds to API calls.
+    The API provides a wrapper around a pool of threads that respond to API calls.
 
     Some notes:
-    -   We allow at most MAX_QUEUED_API_CALLS API calls to be in the queue, which practically
-        Stops a backlog of calls from building up.
+    -   Calls are handled in order of their priority, and calls that a later call
+        supersedes are cancelled, which practically stops a backlog of calls from 
+        building up. See api_worker_pool.py.
     -   All API calls should only be reads. This stops us from having to worry
         about most concurrency issues
     -   Note that printing inside of a thread does not work properly! Use sys.stdout.flush() after the print statement.
         See here: https://stackoverflow.com/questions/18234469/python-multithreaded-print-statements-delayed-until-all-threads-complete-executi
     """
 
-    def __init__(self, steps_manager: StepsManager, mito_backend: MitoWidgetType):
-        self.api_queue: Queue = Queue(MAX_QUEUED_API_CALLS)
-
+    def __init__(self, steps_manager: StepsManagerType, mito_backend: MitoWidgetType):
         # Save some variables for ease
         self.steps_manager = steps_manager
         self.mito_backend = mito_backend
 
-        # Note that we make the thread a daemon thread, which practically means that when
-        # The process that starts this thread terminate, our API will terminate as well.
-        self.thread = Thread(
-            target=handle_api_event_thread,
-            args=(self.api_queue, steps_manager, mito_backend),
-            daemon=True,
-        )
-
+        # Note that the workers are daemon threads, which practically means that when
+        # the process that starts them terminates, our API will terminate as well.
+        self.api_call_metrics = APICallMetrics()
+        self.worker_pool: Optional[APIWorkerPool] = None
         if THREADED:
-            self.thread.start()
-
+            self.worker_pool = APIWorkerPool(
+                self._handle_api_event_in_worker, self._handle_dropped_api_event, metrics=self.api_call_metrics
+            )
 
     def process_new_api_call(self, event: Dict[str, Any]) -> None:
         """
-        We privilege new API calls over old calls, and evict the old ones
-        if the API queue is full.
-
-        Because we are using a queue, only events that have not been started
-        being processed will get removed.
+        Queues the API call to be handled by the worker pool, which cancels any 
+        earlier call that this call supersedes.
 
         If the key 'priority' is in the event, then we handle it in the main
         thread, as we don't want to drop the event. For example, lazy loading
-        data has priority!
+        data has priority! When we are not THREADED, we handle every call in 
+        the main thread.
         """
-        if THREADED and "priority" not in event:
-            if self.api_queue.full():
-                # If the queue is full, we drop the first event, and just return a None
-                lost_event = self.api_queue.get()
-
-                self.mito_backend.mito_send({"event": "api_response", "id": lost_event["id"], "data": None})
-
-            self.api_queue.put(event)
+        if self.worker_pool is not None and "priority" not in event:
+            self.worker_pool.submit(event)
         else:
+            start_time = perf_counter()
             handle_api_event(self.mito_backend.mito_send, event, self.steps_manager)
+            self.api_call_metrics.record_call(event['type'], 0, perf_counter() - start_time)
 
-
-def handle_api_event_thread(
-    queue: Queue, steps_manager: StepsManager, mito_backend: MitoWidgetType
-) -> NoReturn:
-    """
-    This is the worker thread function, that actually is
-    responsible for handling at the API call events.
-
-    It lives forever, and just handles events as it
-    receives them from the queue
-    """
-    while True:
-        # Note that this blocks when there is nothing in the queue,
-        # and waits till there is something there - so no infinite
-        # loop as it is waiting!
-        event = queue.get()
-        # We place the API handling inside of a try catch,
-        # because otherwise if an error is thrown, then the entire thread crashes,
-        # and then the API never works again
+    def _handle_api_event_in_worker(self, event: Dict[str, Any]) -> None:
+        # We place the API handling inside of a try catch, so that if an error 
+        # is thrown, we still log it
         try:
-            handle_api_event(mito_backend.mito_send, event, steps_manager)
+            handle_api_event(self.mito_backend.mito_send, event, self.steps_manager)
         except:
             # Log in error if it occurs
-            log_event_processed(event, steps_manager, failed=True)
+            log_event_processed(event, self.steps_manager, failed=True)
+
+    def _handle_dropped_api_event(self, event: Dict[str, Any]) -> None:
+        # We answer calls we never handle with None, so the frontend is not left waiting
+        self.mito_backend.mito_send({"event": "api_response", "id": event["id"], "data": None})
 
 
 def handle_api_event(
-    send: Callable, event: Dict[str, Any], steps_manager: StepsManager
+    send: Callable, event: Dict[str, Any], steps_manager: StepsManagerType
 ) -> None:
     """
     Handler for all API calls. Note that any response to the
@@ -152,6 +132,7 @@ def handle_api_event(
     params = event['params']
     start_time = perf_counter()
     failed = False
+    cancelled = False
 
     try:
         if event["type"] == "get_path_contents":
@@ -196,14 +177,33 @@ def handle_api_event(
             result = get_ai_completion(params, steps_manager)
         elif event["type"] == "get_parameterizable_params":
             result = get_parameterizable_params(params, steps_manager)
+        elif event["type"] == "get_sheet_window":
+            result = get_sheet_window(params, steps_manager)
         # AUTOGENERATED LINE: API.PY CALL (DO NOT DELETE)
         else:
             raise Exception(f"Event: {event} is not a valid API call")
 
+    except APICallCancelled:
+        # A later call superseded this one, so its result is no longer needed
+        cancelled = True
     except:
         failed = True
+
+    if cancelled:
+        send({"event": "api_response", "id": event["id"], "data": None})
+        return
     
     # Log processing this event (with potential failure)
     log_event_processed(event, steps_manager, failed=failed, start_time=start_time)
 
-    send({"event": "api_response", "id": event["id"], "data": result})
+    response = {"event": "api_response", "id": event["id"], "data": result}
+    if isinstance(result, dict) and isinstance(result.get(API_RESULT_BUFFER_KEY), bytes):
+        buffer = result.pop(API_RESULT_BUFFER_KEY)
+        if SEND_BINARY_BUFFERS:
+            # The comm sends these buffers without encoding them
+            send(response, buffers=[buffer])
+            return
+        else:
+            result[API_RESULT_BUFFER_BASE64_KEY] = base64.b64encode(buffer).decode('ascii')
+
+    send(response)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+A pool of worker threads that handles API calls in order of their priority.
+
+Calls that the user is waiting on to interact with the sheet (e.g. the contents
+of a folder, or the unique values in a column) have a higher priority than calls
+that can take a long time (e.g. exporting a dataframe to Excel), and so they
+are handled first. Moreover, one worker only ever handles these high priority
+calls, so a slow export never blocks them.
+
+When the frontend makes a call that supersedes an earlier call (e.g. searching
+the unique values of a column again), the earlier call is cancelled. If it has
+not started, it is answered with None straight away. If it is running, it
+is cancelled cooperatively: long running API functions call
+raise_if_api_call_cancelled between their expensive parts, and a call that
+is cancelled is also answered with None.
+
+We also record how long calls of each type wait in the queue, and how long
+they take to execute, in the APICallMetrics.
+"""
+from threading import Condition, Lock, Thread, local
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Calls the user is waiting on to interact with the sheet
+API_CALL_PRIORITY_INTERACTIVE = 0
+# Calls that make something for the user to look at, which may take a little while
+API_CALL_PRIORITY_DEFAULT = 1
+# Calls that export or import entire dataframes, which can take a long time
+API_CALL_PRIORITY_EXPORT = 2
+
+API_CALL_PRIORITIES: Dict[str, int] = {
+    'get_path_contents': API_CALL_PRIORITY_INTERACTIVE,
+    'get_path_join': API_CALL_PRIORITY_INTERACTIVE,
+    'get_params': API_CALL_PRIORITY_INTERACTIVE,
+    'get_defined_df_names': API_CALL_PRIORITY_INTERACTIVE,
+    'get_render_count': API_CALL_PRIORITY_INTERACTIVE,
+    'get_unique_value_counts': API_CALL_PRIORITY_INTERACTIVE,
+    'get_column_describe': API_CALL_PRIORITY_INTERACTIVE,
+    'get_sheet_window': API_CALL_PRIORITY_INTERACTIVE,
+    'get_split_text_to_columns_preview': API_CALL_PRIORITY_INTERACTIVE,
+    'get_code_snippets': API_CALL_PRIORITY_INTERACTIVE,
+    'get_parameterizable_params': API_CALL_PRIORITY_INTERACTIVE,
+    'get_column_summary_graph': API_CALL_PRIORITY_DEFAULT,
+    'get_csv_files_metadata': API_CALL_PRIORITY_DEFAULT,
+    'get_excel_file_metadata': API_CALL_PRIORITY_DEFAULT,
+    'get_imported_files_and_dataframes_from_current_steps': API_CALL_PRIORITY_DEFAULT,
+    'get_imported_files_and_dataframes_from_analysis_name': API_CALL_PRIORITY_DEFAULT,
+    'get_test_imports': API_CALL_PRIORITY_DEFAULT,
+    'get_available_snowflake_options_and_defaults': API_CALL_PRIORITY_DEFAULT,
+    'get_validate_snowflake_credentials': API_CALL_PRIORITY_DEFAULT,
+    'get_ai_completion': API_CALL_PRIORITY_DEFAULT,
+    'get_dataframe_as_csv': API_CALL_PRIORITY_EXPORT,
+    'get_dataframe_as_excel': API_CALL_PRIORITY_EXPORT,
+}
+
+# For the calls that a later call of the same type supersedes, the params
+# that must be the same for the later call to supersede the earlier one
+SUPERSEDED_API_CALL_PARAMS: Dict[str, List[str]] = {
+    'get_unique_value_counts': ['sheet_index', 'column_id'],
+    'get_column_describe': ['sheet_index', 'column_id'],
+    'get_column_summary_graph': ['sheet_index', 'column_id'],
+    # A new download supersedes writing an earlier one, but never reading its chunks
+    'get_dataframe_as_csv': ['download_id', 'chunk_index'],
+    'get_dataframe_as_excel': ['download_id', 'chunk_index'],
+}
+
+# The number of worker threads. One of them only handles interactive calls
+NUM_API_WORKERS = 3
+
+# The number of calls we queue before we drop the lowest priority call
+MAX_QUEUED_API_CALLS = 20
+
+
+class APICallCancelled(Exception):
+    """
+    Raised inside an API call that was cancelled, as a later call superseded it.
+    """
+    pass
+
+
+class APICall():
+    """
+    An API call that is queued or running in the pool.
+    """
+
+    def __init__(self, event: Dict[str, Any], sequence_number: int):
+        self.event = event
+        self.type: str = event['type']
+        self.priority = API_CALL_PRIORITIES.get(self.type, API_CALL_PRIORITY_DEFAULT)
+        self.sequence_number = sequence_number
+        self.supersede_key = get_supersede_key(event)
+        self.queued_time = perf_counter()
+        self.cancelled = False
+
+    def __lt__(self, other: "APICall") -> bool:
+        return (self.priority, self.sequence_number) < (other.priority, other.sequence_number)
+
+
+def get_supersede_key(event: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """
+    Returns a key that is the same for calls that supersede each other, or None
+    if later calls do not supersede this call.
+    """
+    superseded_params = SUPERSEDED_API_CALL_PARAMS.get(event['type'])
+    if superseded_params is None:
+        return None
+    params = event.get('params', {})
+    return (event['type'],) + tuple(repr(params.get(param)) for param in superseded_params)
+
+
+_running_api_call = local()
+
+
+def raise_if_api_call_cancelled() -> None:
+    """
+    Raises an APICallCancelled if the API call that this thread is running was
+    cancelled. API functions call this between their expensive parts, so that
+    we do not finish a call whose result is no longer needed.
+    """
+    api_call: Optional[APICall] = getattr(_running_api_call, 'api_call', None)
+    if api_call is not None and api_call.cancelled:
+        raise APICallCancelled()
+
+
+class APICallMetrics():
+    """
+    How long the API calls of each type waited in the queue, and took to execute.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Dict[str, float]] = dict()
+        self._lock = Lock()
+
+    def _get_call_type_metrics(self, call_type: str) -> Dict[str, float]:
+        return self._metrics.setdefault(call_type, {
+            'num_calls': 0,
+            'num_cancelled': 0,
+            'total_queue_wait_time': 0,
+            'max_queue_wait_time': 0,
+            'total_execution_time': 0,
+            'max_execution_time': 0,
+        })
+
+    def record_call(self, call_type: str, queue_wait_time: float, execution_time: float) -> None:
+        with self._lock:
+            metrics = self._get_call_type_metrics(call_type)
+            metrics['num_calls'] += 1
+            metrics['total_queue_wait_time'] += queue_wait_time
+            metrics['max_queue_wait_time'] = max(metrics['max_queue_wait_time'], queue_wait_time)
+            metrics['total_execution_time'] += execution_time
+            metrics['max_execution_time'] = max(metrics['max_execution_time'], execution_time)
+
+    def record_cancelled_call(self, call_type: str) -> None:
+        with self._lock:
+            self._get_call_type_metrics(call_type)['num_cancelled'] += 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the metrics for each call type, including the mean time that the
+        calls that were handled waited and executed for.
+        """
+        with self._lock:
+            all_metrics = {}
+            for call_type, metrics in self._metrics.items():
+                all_metrics[call_type] = dict(metrics)
+                num_calls = metrics['num_calls']
+                all_metrics[call_type]['mean_queue_wait_time'] = metrics['total_queue_wait_time'] / num_calls if num_calls > 0 else 0
+                all_metrics[call_type]['mean_execution_time'] = metrics['total_execution_time'] / num_calls if num_calls > 0 else 0
+            return all_metrics
+
+
+class APIWorkerPool():
+    """
+    Handles API calls on a pool of daemon worker threads, in order of their priority.
+
+    handle_event is called with the event of each call on a worker thread, and
+    handle_dropped_event is called with the event of each call that is cancelled
+    or dropped before it is started, so it can be answered.
+    """
+
+    def __init__(
+            self,
+            handle_event: Callable[[Dict[str, Any]], None],
+            handle_dropped_event: Callable[[Dict[str, Any]], None],
+            metrics: Optional[APICallMetrics]=None,
+            num_workers: int=NUM_API_WORKERS,
+            max_queued_calls: int=MAX_QUEUED_API_CALLS,
+        ):
+        self.handle_event = handle_event
+        self.handle_dropped_event = handle_dropped_event
+        self.metrics = metrics if metrics is not None else APICallMetrics()
+        self.num_workers = num_workers
+        self.max_queued_calls = max_queued_calls
+
+        self._queue: List[APICall] = []
+        self._condition = Condition()
+        self._sequence_number = 0
+        # The latest call for each supersede key, which may be queued or running
+        self._latest_calls: Dict[Tuple[Any, ...], APICall] = dict()
+        # The supersede keys of the running calls, as we only run one call for a key at once
+        self._running_supersede_keys: Set[Tuple[Any, ...]] = set()
+        self._num_running_non_interactive_calls = 0
+
+        # We only start the workers when the first call is submitted, as many 
+        # sheets never make an API call from a worker
+        self.workers: List[Thread] = []
+
+    @property
+    def num_queued_calls(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def submit(self, event: Dict[str, Any]) -> APICall:
+        """
+        Queues the event to be handled, cancelling any earlier call that it supersedes.
+        """
+        dropped_calls: List[APICall] = []
+
+        with self._condition:
+            if len(self.workers) == 0:
+                self.workers = [Thread(target=self._work, daemon=True) for _ in range(self.num_workers)]
+                for worker in self.workers:
+                    worker.start()
+
+            api_call = APICall(event, self._sequence_number)
+            self._sequence_number += 1
+
+            if api_call.supersede_key is not None:
+                superseded_call = self._latest_calls.get(api_call.supersede_key)
+                if superseded_call is not None:
+                    superseded_call.cancelled = True
+                    if superseded_call in self._queue:
+                        self._remove_queued_call(superseded_call)
+                        dropped_calls.append(superseded_call)
+                self._latest_calls[api_call.supersede_key] = api_call
+
+            self._queue.append(api_call)
+
+            # If there are too many calls queued, we drop the oldest call with the lowest priority
+            if len(self._queue) > self.max_queued_calls:
+                lowest_priority_call = min(self._queue, key=lambda call: (-call.priority, call.sequence_number))
+                lowest_priority_call.cancelled = True
+                self._remove_queued_call(lowest_priority_call)
+                dropped_calls.append(lowest_priority_call)
+
+            self._condition.notify_all()
+
+        for dropped_call in dropped_calls:
+            self.metrics.record_cancelled_call(dropped_call.type)
+            self.handle_dropped_event(dropped_call.event)
+
+        return api_call
+
+    def _remove_queued_call(self, api_call: APICall) -> None:
+        self._queue.remove(api_call)
+        self._forget_call(api_call)
+
+    def _forget_call(self, api_call: APICall) -> None:
+        if api_call.supersede_key is not None and self._latest_calls.get(api_call.supersede_key) is api_call:
+            del self._latest_calls[api_call.supersede_key]
+
+    def _get_next_call(self) -> Optional[APICall]:
+        """
+        Returns the highest priority call that can be started, or None if there is none.
+
+        Only num_workers - 1 calls that are not interactive run at once (if there is more
+        than one worker), and only one
+        call with each supersede key runs at once, so that a call that is cancelled
+        while running is answered before the call that superseded it.
+        """
+        for api_call in sorted(self._queue):
+            if api_call.supersede_key is not None and api_call.supersede_key in self._running_supersede_keys:
+                continue
+            if api_call.priority != API_CALL_PRIORITY_INTERACTIVE and self._num_running_non_interactive_calls >= max(self.num_workers - 1, 1):
+                continue
+            return api_call
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                api_call = self._get_next_call()
+                while api_call is None:
+                    # Note that this blocks until another call is submitted or finishes
+                    self._condition.wait()
+                    api_call = self._get_next_call()
+
+                self._queue.remove(api_call)
+                if api_call.supersede_key is not None:
+                    self._running_supersede_keys.add(api_call.supersede_key)
+                if api_call.priority != API_CALL_PRIORITY_INTERACTIVE:
+                    self._num_running_non_interactive_calls += 1
+
+            queue_wait_time = perf_counter() - api_call.queued_time
+            start_time = perf_counter()
+            _running_api_call.api_call = api_call
+            try:
+                self.handle_event(api_call.event)
+            except:
+                # We never let an error stop the worker, as then the API never works again
+                pass
+            finally:
+                _running_api_call.api_call = None
+
+            if api_call.cancelled:
+                self.metrics.record_cancelled_call(api_call.type)
+            else:
+                self.metrics.record_call(api_call.type, queue_wait_time, perf_counter() - start_time)
+
+            with self._condition:
+                if api_call.supersede_key is not None:
+                    self._running_supersede_keys.discard(api_call.supersede_key)
+                if api_call.priority != API_CALL_PRIORITY_INTERACTIVE:
+                    self._num_running_non_interactive_calls -= 1
+                self._forget_call(api_call)
+                self._condition.notify_all()
@@ -22,6 +22,13 @@ def get_column_describe(params: Dict[str, Any], steps_manager: StepsManagerType)
     column_header = steps_manager.curr_step.get_column_header_by_id(sheet_index, column_id)
     
     series: pd.Series = steps_manager.dfs[sheet_index][column_header]
+
+    # We only describe the column again once a step changes it
+    column_statistics = steps_manager.column_statistics_cache.get(sheet_index, column_id, series)
+    return column_statistics.get_describe(_get_column_describe)
+
+
+def _get_column_describe(series: pd.Series) -> Dict[str, Any]:
     column_dtype = str(series.dtype)
     describe = series.describe()
 
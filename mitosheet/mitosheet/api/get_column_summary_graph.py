@@ -9,13 +9,13 @@ import pandas as pd
 from typing import Any, Dict, List, Optional
 import plotly.express as px
 import plotly.graph_objects as go
+from mitosheet.api.api_worker_pool import raise_if_api_call_cancelled
 from mitosheet.step_performers.graph_steps.graph_utils import (
-    get_html_and_script_from_figure,
+    get_figure_json, get_plotly_js
 )
 from mitosheet.is_type_utils import is_number_dtype
-from mitosheet.types import ColumnHeader, ColumnID
+from mitosheet.types import ColumnHeader, ColumnID, StepsManagerType
 from mitosheet.telemetry.telemetry_utils import log
-from mitosheet.steps_manager import StepsManager
 from mitosheet.step_performers.bulk_old_rename.deprecated_utils import deprecated
 from mitosheet.step_performers.graph_steps.graph_utils import BAR, BOX, SCATTER
 
@@ -24,10 +24,10 @@ from mitosheet.step_performers.graph_steps.graph_utils import BAR, BOX, SCATTER
 MAX_UNIQUE_NON_NUMBER_VALUES = 10_000
 
 
-def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManager) -> Dict[str, Any]:
+def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManagerType) -> Dict[str, Any]:
     """
-    Creates a column summary graph and sends it back as a PNG
-    string to the frontend for display.
+    Creates a column summary graph and sends it back as plotly json
+    to the frontend for display.
     """
     sheet_index = params['sheet_index']
     column_id: ColumnID = params['column_id']
@@ -36,11 +36,28 @@ def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManager
     include_plotlyjs = params['include_plotlyjs']
 
 
-    # Create a copy of the dataframe, just for safety.
-    df: pd.DataFrame = steps_manager.dfs[sheet_index].copy()
-
     column_header = steps_manager.curr_step.final_defined_state.column_ids.get_column_header_by_id(sheet_index, column_id)
-    fig = _get_column_summary_graph(df, column_header)
+    series: pd.Series = steps_manager.dfs[sheet_index][column_header]
+
+    # We only make the graph again once a step changes the column. Thus, reopening a 
+    # column menu is instant. The frontend sizes the graph, so it is the same at any size
+    column_statistics = steps_manager.column_statistics_cache.get(sheet_index, column_id, series)
+    summary_graph = column_statistics.get_summary_graph(
+        (), 
+        lambda: _get_column_summary_graph_figure(series)
+    )
+    return {
+        'figure': summary_graph,
+        'plotly_js': get_plotly_js() if include_plotlyjs else None,
+        'height': height,
+        'width': width,
+    }
+
+def _get_column_summary_graph_figure(series: pd.Series) -> Dict[str, Any]:
+    # The graph only uses this column, and so we do not copy (or filter) the rest of the dataframe
+    fig = _get_column_summary_graph(series.to_frame(), series.name)
+    # If the column menu was opened again, we do not need to finish this graph
+    raise_if_api_call_cancelled()
         
     # Get rid of some of the default white space
     fig.update_layout(
@@ -52,9 +69,7 @@ def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManager
         )
     )
 
-    return_object = get_html_and_script_from_figure(fig, height, width, include_plotlyjs)
-
-    return return_object
+    return get_figure_json(fig)
 
 def filter_df_to_top_unique_values_in_series(
     df: pd.DataFrame,
@@ -7,9 +7,8 @@ import json
 import os
 from typing import Any, Dict
 
-import pandas as pd
 from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk import DEFAULT_DECIMAL, DEFAULT_DELIMETER, DEFAULT_ENCODING, DEFAULT_SKIPROWS
-from mitosheet.step_performers.import_steps.simple_import import read_csv_get_delimiter_and_encoding
+from mitosheet.step_performers.import_steps.csv_utils import guess_delimeter_and_encoding
 from mitosheet.types import StepsManagerType
 
 
@@ -18,7 +17,10 @@ def get_csv_files_metadata(params: Dict[str, Any], steps_manager: StepsManagerTy
     Given a list of 'file_names' that should be CSV files,
     this returns our guesses for delimeters and encodings
     for these files, as well as other default parameters that we 
-    don't try to guess
+    don't try to guess.
+
+    We only read a sample at the start of each file, so that
+    this is quick even for very large files.
     """
     file_names = params['file_names']
 
@@ -28,7 +30,7 @@ def get_csv_files_metadata(params: Dict[str, Any], steps_manager: StepsManagerTy
     skiprows = []
     for file_name in file_names:
         try:
-            _, delimiter, encoding = read_csv_get_delimiter_and_encoding(file_name)
+            delimiter, encoding = guess_delimeter_and_encoding(file_name)
             delimeters.append(delimiter)
             encodings.append(encoding)
         except:
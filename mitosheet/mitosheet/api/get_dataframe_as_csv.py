@@ -4,14 +4,21 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 from typing import Any, Dict
+
+from mitosheet.export_downloads import (get_export_download_chunk,
+                                        write_dataframe_to_csv)
 from mitosheet.types import StepsManagerType
 
 
-def get_dataframe_as_csv(params: Dict[str, Any], steps_manager: StepsManagerType) -> str:
+def get_dataframe_as_csv(params: Dict[str, Any], steps_manager: StepsManagerType) -> Dict[str, Any]:
     """
-    Sends a dataframe as a CSV string
+    Sends a dataframe as a CSV file, one chunk at a time. See export_downloads.py
     """
     sheet_index = params['sheet_index']
     df = steps_manager.dfs[sheet_index]
 
-    return df.to_csv(index=False)
+    return get_export_download_chunk(
+        params, 
+        lambda file_name: write_dataframe_to_csv(file_name, df),
+        'csv'
+    )
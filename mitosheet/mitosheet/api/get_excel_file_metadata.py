@@ -7,7 +7,7 @@ import json
 import os
 from typing import Any, Dict
 
-import pandas as pd
+from mitosheet.excel_workbook_cache import get_excel_sheet_names
 from mitosheet.types import StepsManagerType
 
 
@@ -18,12 +18,14 @@ def get_excel_file_metadata(params: Dict[str, Any], steps_manager: StepsManagerT
 
     For now, this is just the sheets this file contains, 
     but in the future we may be able to request more about 
-    the workbook
+    the workbook.
+
+    We read the sheet names from the workbook XML, rather than
+    loading the entire workbook.
     """
     file_path = params['file_path']
 
-    file = pd.ExcelFile(file_path, engine='openpyxl')
-    sheet_names = file.sheet_names
+    sheet_names = get_excel_sheet_names(file_path)
 
     return {
         'sheet_names': sheet_names,
@@ -22,7 +22,7 @@ def get_parameterizable_params(params: Dict[str, Any], steps_manager: StepsManag
                         all_parameterizable_params.append((arg, 'df_name', "Dataframe"))
     
         # Get optimized code chunk, and get their parameterizable params
-        code_chunks = get_code_chunks(steps_manager.steps_including_skipped[:steps_manager.curr_step_idx + 1], optimize=True)
+        code_chunks = get_code_chunks(steps_manager.steps_including_skipped[:steps_manager.curr_step_idx + 1], optimize=True, code_chunk_cache=steps_manager.code_chunk_cache)
 
         for code_chunk in code_chunks:
                 parameterizable_params = code_chunk.get_parameterizable_params()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+from typing import Any, Dict
+
+from mitosheet.column_headers import get_column_header_display
+from mitosheet.types import StepsManagerType
+from mitosheet.utils import (MAX_COLUMNS, MAX_ROWS, _get_column_id_from_header_safe,
+                             convert_df_to_parsed_json)
+
+
+def get_sheet_window(params: Dict[str, Any], steps_manager: StepsManagerType) -> Dict[str, Any]:
+    """
+    Sends back the data in the rows [row_start, row_end) and the columns
+    [column_start, column_end) of the df at sheet_index, so that the frontend
+    can display any part of a dataframe, and not just the first rows and
+    columns that are in the sheet data.
+
+    The data is in the same format as the data in the sheet data, and the
+    window is never more than MAX_ROWS rows by MAX_COLUMNS columns.
+    """
+    sheet_index: int = params['sheet_index']
+    row_start: int = params['row_start']
+    row_end: int = params['row_end']
+    column_start: int = params['column_start']
+    column_end: int = params['column_end']
+
+    state = steps_manager.curr_step.final_defined_state
+    df = state.dfs[sheet_index]
+    (num_rows, num_columns) = df.shape
+
+    row_start = max(0, min(row_start, num_rows))
+    row_end = max(row_start, min(row_end, num_rows, row_start + MAX_ROWS))
+    column_start = max(0, min(column_start, num_columns))
+    column_end = max(column_start, min(column_end, num_columns, column_start + MAX_COLUMNS))
+
+    window_df = df.iloc[row_start:row_end, column_start:column_end]
+    json_obj = convert_df_to_parsed_json(window_df, max_rows=None)
+
+    column_headers_to_column_ids = state.column_ids.column_header_to_column_id[sheet_index]
+    data = []
+    for column_index, column_header in enumerate(window_df.columns):
+        column_dtype = str(window_df.iloc[:, column_index].dtype)
+        data.append({
+            'columnID': _get_column_id_from_header_safe(column_header, column_headers_to_column_ids),
+            'columnHeader': get_column_header_display(column_header),
+            'columnDtype': column_dtype,
+            'columnData': [row[column_index] for row in json_obj['data']],
+        })
+
+    # Import just before we use it to avoid circular imports
+    from mitosheet.pro.conditional_formatting_utils import get_conditonal_formatting_result
+
+    return {
+        'sheetIndex': sheet_index,
+        'numRows': num_rows,
+        'numColumns': num_columns,
+        'rowStart': row_start,
+        'rowEnd': row_end,
+        'columnStart': column_start,
+        'columnEnd': column_end,
+        'data': data,
+        'index': json_obj['index'],
+        'conditionalFormattingResult': get_conditonal_formatting_result(
+            state,
+            sheet_index,
+            df,
+            state.df_formats[sheet_index]['conditional_formats'],
+            max_rows=row_end - row_start,
+            row_start=row_start
+        )
+    }
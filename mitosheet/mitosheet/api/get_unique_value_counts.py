@@ -7,6 +7,8 @@ import json
 from typing import Any, Dict
 
 import pandas as pd
+from mitosheet.api.api_worker_pool import raise_if_api_call_cancelled
+from mitosheet.column_statistics import ColumnStatistics
 from mitosheet.types import StepsManagerType
 from mitosheet.utils import get_row_data_array
 
@@ -37,42 +39,29 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
     
     series: pd.Series = steps_manager.dfs[sheet_index][column_header]
 
-    unique_value_counts_percents_series = series.value_counts(normalize=True, dropna=False)
-    unique_value_counts_series = series.value_counts(dropna=False)
-    
-    unique_value_counts_df = pd.DataFrame({
-        'values': unique_value_counts_percents_series.index,
-        'percents': unique_value_counts_percents_series, 
-        'counts': unique_value_counts_series
-    })
+    # We count the values in the column once, and then answer each search and sort 
+    # from these counts, until a step changes the column
+    column_statistics = steps_manager.column_statistics_cache.get(sheet_index, column_id, series)
+    return column_statistics.get_unique_value_counts_result(
+        sort, search_string, lambda: _get_unique_value_counts(column_statistics, search_string, sort)
+    )
 
-    if len(unique_value_counts_df) > MAX_UNIQUE_VALUES:
-        # First, we turn the series into a string series, so that we can
-        # easily filter on it without issues (and sort in some cases)
-        new_unique_value_counts_df = unique_value_counts_df.copy(deep=True)
-        new_unique_value_counts_df['values_strings'] = new_unique_value_counts_df['values'].astype('str')
 
-        # First, we sort in the order they want
-        try:
-            if sort == 'Ascending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=True, na_position='first')
-            elif sort == 'Descending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=False, na_position='first')
-            elif sort == 'Ascending Occurence':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=True, na_position='first')
-            elif sort == 'Descending Occurence':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=False, na_position='first')
-        except:
-            # If the sort values throws an exception, then this must be because we have a mixed value type, and so we instead
-            # sort on the string representation of the values (as this will always work)
-            if sort == 'Ascending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=True, na_position='first')
-            elif sort == 'Descending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=False, na_position='first')
+def _get_unique_value_counts(column_statistics: ColumnStatistics, search_string: str, sort: str) -> Dict[str, Any]:
+    unique_value_counts_df = column_statistics.get_unique_value_counts_df()
+    # If the user has searched again, we do not need to finish this search
+    raise_if_api_call_cancelled()
+
+    if len(unique_value_counts_df) > MAX_UNIQUE_VALUES:
+        # First, we sort in the order they want. The sorted values also have their
+        # string representation, so that we can easily filter on them
+        new_unique_value_counts_df = column_statistics.get_sorted_unique_value_counts_df(sort)
+        raise_if_api_call_cancelled()
 
         # Then, we filter with the string. Note that we always filter on the string representation
-        # because the front-end sends a string
-        new_unique_value_counts_df = new_unique_value_counts_df[new_unique_value_counts_df['values_strings'].str.contains(search_string, na=False, case=False)]
+        # because the front-end sends a string. An empty string is in every value
+        if search_string != '':
+            new_unique_value_counts_df = new_unique_value_counts_df[new_unique_value_counts_df['values_strings'].str.contains(search_string, na=False, case=False)]
 
         # Finially, we only take the first MAX_UNIQUE_VALUES
         if len(new_unique_value_counts_df) > MAX_UNIQUE_VALUES:
@@ -83,7 +72,6 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
 
         # And then we filter the unique values down to these specific values
         unique_value_counts_df = unique_value_counts_df.loc[new_unique_value_counts_df.index]
-        unique_value_counts_df.reset_index(drop=True)
 
     else:
         is_all_data = True
@@ -92,4 +80,3 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
         'uniqueValueRowDataArray': get_row_data_array(unique_value_counts_df),
         'isAllData': is_all_data
     }
-
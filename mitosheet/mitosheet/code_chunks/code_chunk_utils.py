@@ -5,8 +5,11 @@
 # Distributed under the terms of the GPL License.
 
 
+from collections import OrderedDict
 from copy import copy
-from typing import TYPE_CHECKING, List, Optional, Any, Type
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional, Any, Tuple, Type
+from weakref import WeakKeyDictionary
 
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.step_performers.column_steps.delete_column_code_chunk import DeleteColumnsCodeChunk
@@ -20,13 +23,19 @@ else:
     Step = Any
     
 
-def get_code_chunks(all_steps: List[Step], optimize: bool=True) -> List[CodeChunk]:
+# The number of lists of code chunks we keep the optimized code chunks for
+MAX_CACHED_OPTIMIZED_CODE_CHUNKS = 10
+
+
+def get_code_chunks(all_steps: List[Step], optimize: bool=True, code_chunk_cache: Optional['CodeChunkCache']=None) -> List[CodeChunk]:
     """
     A utility for taking all the steps in the steps manager, and returning a list
     of CodeChunks that correspond to these steps. 
 
     optimize is by default True, which results in these CodeChunks being optimized
     down to the smallest possible list of CodeChunks that implements the same ops.
+    If a code_chunk_cache is passed, we only optimize the code chunks that changed 
+    since it last optimized these steps.
     """
     from mitosheet.steps_manager import get_step_indexes_to_skip
     step_indexes_to_skip = get_step_indexes_to_skip(all_steps)
@@ -37,14 +46,11 @@ def get_code_chunks(all_steps: List[Step], optimize: bool=True) -> List[CodeChun
         if step.step_type == 'initialize' or step_index in step_indexes_to_skip:
             continue
 
-        all_code_chunks.extend(step.step_performer.transpile(
-            step.prev_state, # type: ignore
-            step.post_state, # type: ignore
-            step.params,
-            step.execution_data,
-        ))
+        all_code_chunks.extend(step.get_code_chunks())
 
-    if optimize:
+    if optimize and code_chunk_cache is not None:
+        code_chunks_list = code_chunk_cache.get_optimized_code_chunks(all_code_chunks)
+    elif optimize:
         code_chunks_list = optimize_code_chunks(all_code_chunks)
     else:
         code_chunks_list = all_code_chunks
@@ -52,6 +58,103 @@ def get_code_chunks(all_steps: List[Step], optimize: bool=True) -> List[CodeChun
     return code_chunks_list
 
 
+def optimize_code_chunks_after_optimized_code_chunks(optimized_code_chunks: List[CodeChunk], code_chunks: List[CodeChunk]) -> List[CodeChunk]:
+    """
+    Returns the optimized_code_chunks followed by the code_chunks, optimized down to the 
+    smallest list of code chunks we can.
+
+    No two code chunks next to each other in the optimized_code_chunks combine, and so the 
+    only new combinations start at the last of them. Thus, we only optimize the last of the 
+    optimized_code_chunks with the code_chunks. If the last of them was combined into another 
+    code chunk, that code chunk might combine with the one before it, and so we optimize 
+    more of the optimized_code_chunks, until the first one we optimize is not combined, or 
+    there is no code chunk left for the one before it to combine with.
+    """
+    num_optimized_code_chunks_to_optimize = 1
+    while True:
+        boundary_index = max(len(optimized_code_chunks) - num_optimized_code_chunks_to_optimize, 0)
+        code_chunks_list = optimize_code_chunks(optimized_code_chunks[boundary_index:] + code_chunks)
+        if boundary_index == 0 or len(code_chunks_list) == 0 or code_chunks_list[0] is optimized_code_chunks[boundary_index]:
+            return optimized_code_chunks[:boundary_index] + code_chunks_list
+
+        num_optimized_code_chunks_to_optimize *= 2
+
+
+class CodeChunkCache():
+    """
+    A cache of the work we do to turn the code chunks of the steps into code, so that
+    transpiling again after an edit only does this work for the steps that changed.
+
+    As steps are only transpiled again when they change, the code chunks of the steps
+    that did not change are the same objects as the last time we transpiled them. We 
+    keep the optimized code chunks for each list of code chunks we recently optimized, 
+    and the description comment, code and imports of each code chunk.
+
+    The API threads transpile the steps while the StepsManager does, and so all access
+    to the cache is behind a lock.
+    """
+
+    def __init__(self, max_cached_optimized_code_chunks: int=MAX_CACHED_OPTIMIZED_CODE_CHUNKS):
+        self.max_cached_optimized_code_chunks = max_cached_optimized_code_chunks
+        self._optimized_code_chunks_cache: 'OrderedDict[Tuple[int, ...], Tuple[List[CodeChunk], List[CodeChunk]]]' = OrderedDict()
+        self._code_chunk_code_cache: 'WeakKeyDictionary[CodeChunk, Tuple[str, List[str], List[str]]]' = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._optimized_code_chunks_cache.clear()
+            self._code_chunk_code_cache.clear()
+
+    def get_optimized_code_chunks(self, all_code_chunks: List[CodeChunk]) -> List[CodeChunk]:
+        """
+        Returns the code chunks optimized down to the smallest list of code chunks we can.
+
+        We find the longest list of code chunks we already optimized that starts these code 
+        chunks, and only optimize the end of its optimized code chunks with the code chunks 
+        after it, so that adding or editing the last step does not optimize all the steps again.
+        """
+        longest_optimized_prefix_length = 0
+        optimized_prefix: List[CodeChunk] = []
+        with self._lock:
+            for prefix_code_chunks, optimized_code_chunks in self._optimized_code_chunks_cache.values():
+                if len(prefix_code_chunks) > len(all_code_chunks) or len(prefix_code_chunks) <= longest_optimized_prefix_length:
+                    continue
+                if all(prefix_code_chunk is code_chunk for prefix_code_chunk, code_chunk in zip(prefix_code_chunks, all_code_chunks)):
+                    longest_optimized_prefix_length = len(prefix_code_chunks)
+                    optimized_prefix = optimized_code_chunks
+
+        if longest_optimized_prefix_length == len(all_code_chunks) and len(all_code_chunks) > 0:
+            code_chunks_list = copy(optimized_prefix)
+        else:
+            code_chunks_list = optimize_code_chunks_after_optimized_code_chunks(optimized_prefix, all_code_chunks[longest_optimized_prefix_length:])
+
+        key = tuple(id(code_chunk) for code_chunk in all_code_chunks)
+        with self._lock:
+            self._optimized_code_chunks_cache[key] = (copy(all_code_chunks), copy(code_chunks_list))
+            self._optimized_code_chunks_cache.move_to_end(key)
+            if len(self._optimized_code_chunks_cache) > self.max_cached_optimized_code_chunks:
+                self._optimized_code_chunks_cache.popitem(last=False)
+
+        return code_chunks_list
+
+    def get_code_chunk_code(self, code_chunk: CodeChunk) -> Tuple[str, List[str], List[str]]:
+        """
+        Returns the description comment, code and imports of the code chunk, only 
+        generating them if we have not already for this code chunk.
+        """
+        with self._lock:
+            code_chunk_code = self._code_chunk_code_cache.get(code_chunk)
+        if code_chunk_code is None:
+            code, imports = code_chunk.get_code()
+            code_chunk_code = (code_chunk.get_description_comment(), code, imports)
+            with self._lock:
+                self._code_chunk_code_cache[code_chunk] = code_chunk_code
+
+        description_comment, code, imports = code_chunk_code
+        # We return copies, as the code is added to when it is transpiled
+        return description_comment, copy(code), copy(imports)
+
+
 # NOTE: we cannot use get_right_combine_with_column_delete_code_chunk on sort/filter, 
 # as sort potentially changes the indexes of the dataframe, which is a lasting change
 # that occurs even after this column is deleted. Hence, we throw errors in this util 
@@ -49,14 +49,18 @@ def generate_read_csv_code(
         decimal: Optional[str], 
         skiprows: Optional[int], 
         error_bad_lines: Optional[bool],
-        file_name_is_variable: bool = False
+        file_name_is_variable: bool = False,
+        engine: Optional[str] = None
     ) -> str:
     """
     Helper function for generating minimal read_csv code 
-    depending on the delimeter and the encoding of a file
+    depending on the delimeter and the encoding of a file, 
+    and the engine it was read with if it was not the default
     """
 
     params = get_read_csv_params(delimeter, encoding, decimal=decimal, skiprows=skiprows, error_bad_lines=error_bad_lines)
+    if engine is not None:
+        params['engine'] = engine
     params_string = ', '.join(f'{key}={column_header_to_transpiled_code(value)}' for key, value in params.items())
 
     transpiled_file_path = 'r' + column_header_to_transpiled_code(file_name) if not file_name_is_variable else file_name
@@ -67,7 +71,7 @@ def generate_read_csv_code(
 class SimpleImportCodeChunk(CodeChunk):
 
     
-    def __init__(self, prev_state: State, post_state: State, file_names: List[str], file_delimeters: List[str], file_encodings: List[str], file_decimals: List[str], file_skiprows: List[int], file_error_bad_lines: List[bool]):
+    def __init__(self, prev_state: State, post_state: State, file_names: List[str], file_delimeters: List[str], file_encodings: List[str], file_decimals: List[str], file_skiprows: List[int], file_error_bad_lines: List[bool], file_engines: List[Optional[str]]):
         super().__init__(prev_state, post_state)
         self.file_names = file_names
         self.file_delimeters = file_delimeters
@@ -75,6 +79,7 @@ class SimpleImportCodeChunk(CodeChunk):
         self.file_decimals = file_decimals
         self.file_skiprows = file_skiprows
         self.file_error_bad_lines = file_error_bad_lines
+        self.file_engines = file_engines
 
     def get_display_name(self) -> str:
         return 'Imported'
@@ -95,9 +100,10 @@ class SimpleImportCodeChunk(CodeChunk):
             decimal = self.file_decimals[index]
             skiprows = self.file_skiprows[index]
             error_bad_lines = self.file_error_bad_lines[index]
+            engine = self.file_engines[index]
 
             code.append(
-                generate_read_csv_code(file_name, df_name, delimeter, encoding, decimal, skiprows, error_bad_lines)
+                generate_read_csv_code(file_name, df_name, delimeter, encoding, decimal, skiprows, error_bad_lines, engine=engine)
             )
             
             index += 1
@@ -115,6 +121,7 @@ class SimpleImportCodeChunk(CodeChunk):
         new_file_decimals = self.file_decimals + other_code_chunk.file_decimals
         new_file_skiprows = self.file_skiprows + other_code_chunk.file_skiprows
         new_error_bad_lines = self.file_error_bad_lines + other_code_chunk.file_error_bad_lines
+        new_file_engines = self.file_engines + other_code_chunk.file_engines
 
         return SimpleImportCodeChunk(
             self.prev_state,
@@ -124,7 +131,8 @@ class SimpleImportCodeChunk(CodeChunk):
             new_file_encodings,
             new_file_decimals,
             new_file_skiprows,
-            new_error_bad_lines
+            new_error_bad_lines,
+            new_file_engines
         )
 
     def combine_right(self, other_code_chunk: "CodeChunk") -> Optional["CodeChunk"]:
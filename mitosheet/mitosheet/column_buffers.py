@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Turns the numeric columns of a dataframe into a single binary buffer, so that
+we can send them to the frontend without formatting every value as json.
+
+Each column is stored as its raw little endian values, which the frontend
+reads back with the JavaScript typed array of the same type. A number then costs
+at most 8 bytes, rather than the characters needed to write it out. Floats are
+rounded as they are in the json of the sheet data, so that the sheet shows the
+same values however they are sent.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.json_utils import get_rounded_float_values
+
+# The key that the bytes of the buffer of a sheet are stored under in its sheet data.
+# These bytes are sent to the frontend alongside the json of the sheet data, rather
+# than in it
+SHEET_DATA_BUFFER_KEY = 'buffer'
+
+# The typed array the frontend reads each numpy dtype into
+TYPED_ARRAY_TYPES: Dict[str, str] = {
+    'bool': 'Uint8Array',
+    'int8': 'Int8Array',
+    'int16': 'Int16Array',
+    'int32': 'Int32Array',
+    'uint8': 'Uint8Array',
+    'uint16': 'Uint16Array',
+    'uint32': 'Uint32Array',
+}
+
+# JavaScript numbers can store every integer up to this exactly, and so we
+# send 64 bit integer columns as floats if all their values are within it
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+
+def get_column_buffer(column: pd.Series) -> Optional[Tuple[str, np.ndarray]]:
+    """
+    Returns the typed array the frontend should read the column into, and the
+    little endian values to send for it, or None if the column cannot be sent
+    as raw bytes.
+    """
+    dtype = column.dtype
+    if not isinstance(dtype, np.dtype):
+        return None
+
+    values = column.to_numpy()
+    if dtype.kind == 'f':
+        return 'Float64Array', get_rounded_float_values(values).astype('<f8', copy=False)
+    if dtype.kind in 'iu' and dtype.itemsize == 8:
+        if len(values) > 0 and (values.min() < -MAX_SAFE_INTEGER or values.max() > MAX_SAFE_INTEGER):
+            return None
+        return 'Float64Array', values.astype('<f8')
+
+    typed_array_type = TYPED_ARRAY_TYPES.get(dtype.name)
+    if typed_array_type is None:
+        return None
+    if dtype.kind == 'b':
+        return typed_array_type, values.astype(np.uint8)
+    return typed_array_type, values.astype(dtype.newbyteorder('<'), copy=False)
+
+
+def get_columns_buffer(columns: List[pd.Series]) -> Tuple[List[Optional[Dict[str, Any]]], bytes]:
+    """
+    Returns a single buffer with the values of all the columns that can be sent
+    as raw bytes, and for each column, where its values are in this buffer, or
+    None if the column is not in the buffer.
+    """
+    column_buffers: List[Optional[Dict[str, Any]]] = []
+    buffer_parts: List[bytes] = []
+    offset = 0
+
+    for column in columns:
+        column_buffer = get_column_buffer(column)
+        if column_buffer is None:
+            column_buffers.append(None)
+            continue
+
+        typed_array_type, values = column_buffer
+        values_bytes = values.tobytes()
+        column_buffers.append({
+            'type': typed_array_type,
+            'offset': offset,
+            'length': len(values),
+        })
+        buffer_parts.append(values_bytes)
+        offset += len(values_bytes)
+
+    return column_buffers, b''.join(buffer_parts)
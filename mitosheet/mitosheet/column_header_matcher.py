@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Finds where the column headers of a dataframe are written in a formula.
+
+We used to search for each column header in the formula separately, which
+is slow on dataframes with thousands of columns. Instead, we build an
+Aho-Corasick automaton over the display strings of all the column headers,
+which finds every occurrence of every column header in a single pass over
+the formula.
+
+As users write many formulas on the same dataframe, we keep the automatons
+for the most recent sets of column headers, so that we only build a new one
+when the column headers change.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Tuple
+
+from mitosheet.column_headers import get_column_header_display
+from mitosheet.types import ColumnHeader, ParserMatchSubstringRange
+
+# The number of sets of column headers we keep automatons for
+MAX_CACHED_COLUMN_HEADER_MATCHERS = 10
+
+
+class ColumnHeaderMatcher():
+    """
+    An Aho-Corasick automaton over the display strings of a list of column headers.
+
+    The column headers are ranked from longest to shortest, so that a column header
+    that is a substring of another column header can be matched after it.
+    """
+
+    def __init__(self, column_headers: List[ColumnHeader]):
+        # We look for column headers from longest to shortest, to avoid
+        # issues if one column header is a substring of another
+        # column header
+        self.column_headers_sorted = sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
+
+        # Each state has the transitions out of it, the state to fall back to when
+        # there is no transition, and the ranks of the column headers that end in it
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._fail_states: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        # The next state with outputs on the chain of fail states, or -1 if there is none
+        self._output_links: List[int] = [-1]
+
+        # A column header with an empty display matches at every position
+        self._empty_display_ranks: List[int] = []
+        self._display_lengths: List[int] = []
+
+        for rank, column_header in enumerate(self.column_headers_sorted):
+            display = get_column_header_display(column_header)
+            self._display_lengths.append(len(display))
+            if display == '':
+                self._empty_display_ranks.append(rank)
+                continue
+
+            state = 0
+            for char in display:
+                next_state = self._transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self._transitions)
+                    self._transitions.append({})
+                    self._fail_states.append(0)
+                    self._outputs.append([])
+                    self._output_links.append(-1)
+                    self._transitions[state][char] = next_state
+                state = next_state
+            self._outputs[state].append(rank)
+
+        # Then, we set the fail states breadth first, so the fail state of each
+        # state is set before the states after it
+        states_to_visit = list(self._transitions[0].values())
+        for state in states_to_visit:
+            for char, next_state in self._transitions[state].items():
+                fail_state = self._fail_states[state]
+                while fail_state != 0 and char not in self._transitions[fail_state]:
+                    fail_state = self._fail_states[fail_state]
+                self._fail_states[next_state] = self._transitions[fail_state].get(char, 0)
+
+                next_fail_state = self._fail_states[next_state]
+                self._output_links[next_state] = next_fail_state if len(self._outputs[next_fail_state]) > 0 else self._output_links[next_fail_state]
+                states_to_visit.append(next_state)
+
+    def get_matches(self, formula: str) -> List[Tuple[ColumnHeader, List[ParserMatchSubstringRange]]]:
+        """
+        Returns each column header that is in the formula, from longest to shortest, with
+        the ranges it is found at in the formula.
+
+        For each column header, these are the same ranges that re.finditer would find with
+        the display of the column header: they are in order, and they do not overlap.
+        """
+        found_ranges_by_rank: Dict[int, List[ParserMatchSubstringRange]] = {}
+
+        state = 0
+        for position, char in enumerate(formula):
+            while state != 0 and char not in self._transitions[state]:
+                state = self._fail_states[state]
+            state = self._transitions[state].get(char, 0)
+
+            output_state = state if len(self._outputs[state]) > 0 else self._output_links[state]
+            while output_state != -1:
+                for rank in self._outputs[output_state]:
+                    start = position + 1 - self._display_lengths[rank]
+                    found_ranges = found_ranges_by_rank.setdefault(rank, [])
+                    # Like re.finditer, we skip matches that overlap the previous match
+                    if len(found_ranges) == 0 or found_ranges[-1][1] <= start:
+                        found_ranges.append((start, position + 1))
+                output_state = self._output_links[output_state]
+
+        for rank in self._empty_display_ranks:
+            found_ranges_by_rank[rank] = [(position, position) for position in range(len(formula) + 1)]
+
+        return [
+            (self.column_headers_sorted[rank], found_ranges_by_rank[rank])
+            for rank in sorted(found_ranges_by_rank.keys())
+        ]
+
+
+_column_header_matchers: 'OrderedDict[Tuple[str, ...], ColumnHeaderMatcher]' = OrderedDict()
+# The API worker threads find column headers in formulas while the main thread does, so we lock the cache
+_column_header_matchers_lock = Lock()
+
+
+def get_column_header_matcher(column_headers: List[ColumnHeader]) -> ColumnHeaderMatcher:
+    """
+    Returns a ColumnHeaderMatcher for the column headers, only building a new one
+    if we have not built one for these column headers recently.
+    """
+    # We use the repr of the column headers, as 1, 1.0 and True are equal but displayed differently
+    key = tuple(repr(column_header) for column_header in column_headers)
+
+    with _column_header_matchers_lock:
+        column_header_matcher = _column_header_matchers.get(key)
+        if column_header_matcher is not None:
+            _column_header_matchers.move_to_end(key)
+            return column_header_matcher
+
+    # We build the matcher outside of the lock, so that other threads do not wait for us
+    column_header_matcher = ColumnHeaderMatcher(column_headers)
+    with _column_header_matchers_lock:
+        # If another thread built this matcher while we did, we use theirs
+        column_header_matcher = _column_header_matchers.setdefault(key, column_header_matcher)
+        _column_header_matchers.move_to_end(key)
+        if len(_column_header_matchers) > MAX_CACHED_COLUMN_HEADER_MATCHERS:
+            _column_header_matchers.popitem(last=False)
+
+    return column_header_matcher
@@ -111,6 +111,26 @@ class ColumnIDMap():
                 self.column_id_to_column_header[sheet_index][column_id] = column_header
                 self.column_header_to_column_id[sheet_index][column_header] = column_id
 
+    def copy(self, copied_sheet_indexes: Collection[int]) -> "ColumnIDMap":
+        """
+        Returns a copy of this map that shares the per-sheet mappings with
+        this map, except for the sheets in copied_sheet_indexes, which get
+        their own mappings so that they can be modified freely.
+
+        Sheets can still be added or removed from the copy without effecting
+        this map.
+        """
+        new_column_id_map = ColumnIDMap([])
+        new_column_id_map.column_id_to_column_header = [
+            dict(mapping) if sheet_index in copied_sheet_indexes else mapping
+            for sheet_index, mapping in enumerate(self.column_id_to_column_header)
+        ]
+        new_column_id_map.column_header_to_column_id = [
+            dict(mapping) if sheet_index in copied_sheet_indexes else mapping
+            for sheet_index, mapping in enumerate(self.column_header_to_column_id)
+        ]
+        return new_column_id_map
+
     def set_column_header(self, sheet_index: int, column_id: ColumnID, column_header: ColumnHeader) -> None:
         """
         Sets a column id and column header to match to eachother. 
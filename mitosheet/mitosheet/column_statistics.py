@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Caches the statistics of columns that the column menus in the frontend display,
+namely the unique value counts, the description and the summary graph of a column.
+
+These are expensive to compute on large columns, and the frontend asks for them
+over and over again: every time a column menu is opened, and on every keystroke
+when searching the unique values in the filter menu. So we compute each of them
+once for a column, and keep them until a step changes the column.
+
+A step never writes into the data of a column that a previous state shares (see
+State.copy), and so a column that is stored in the same memory has not changed.
+We identify the data of each column by where it is stored, and keep the column 
+itself in the cache, so that this memory is never reused while the statistics 
+of the column are cached. When a step moves a column it did not change to new 
+memory, the locations the step writes tell us we can keep its statistics (see
+dependency_graph.py).
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.dependency_graph import ChangedLocations, is_location_changed
+from mitosheet.state import State
+from mitosheet.types import ColumnID
+
+# The number of columns we keep the statistics of
+MAX_CACHED_COLUMN_STATISTICS = 50
+
+# The number of searches of the unique values we keep the results of for each column,
+# so that deleting a character of a search string does not search again
+MAX_CACHED_UNIQUE_VALUE_COUNTS_RESULTS = 10
+
+ColumnVersion = Tuple[Any, ...]
+
+
+def get_column_version(column: pd.Series) -> ColumnVersion:
+    """
+    Returns a key that identifies the memory the data in the column is stored in.
+    """
+    if isinstance(column.dtype, np.dtype):
+        values = column.values
+        return (values.__array_interface__['data'][0], values.shape, values.strides, values.dtype.str)
+
+    # Extension arrays are replaced, rather than written into, when a column is set
+    return ('extension', id(column.array), len(column), str(column.dtype))
+
+
+class ColumnStatistics():
+    """
+    The statistics of a single column, each of which is computed the first time it
+    is needed.
+    """
+
+    def __init__(self, column: pd.Series):
+        self.column = column
+        self._unique_value_counts_df: Optional[pd.DataFrame] = None
+        self._unique_value_counts_strings_df: Optional[pd.DataFrame] = None
+        self._sorted_unique_value_counts_dfs: Dict[str, pd.DataFrame] = dict()
+        self._unique_value_counts_results: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
+        self._describe: Optional[Dict[str, Any]] = None
+        self._summary_graphs: Dict[Tuple[Any, ...], Dict[str, Any]] = dict()
+
+    def get_unique_value_counts_df(self) -> pd.DataFrame:
+        """
+        Returns a dataframe with the unique values in the column, what percent of the
+        column each of them is, and how many times each of them occurs - from the most
+        to least common.
+        """
+        if self._unique_value_counts_df is None:
+            # We count the values once, and get the percents from these counts, which
+            # is what value_counts does when it is asked to normalize
+            unique_value_counts_series = self.column.value_counts(dropna=False)
+            unique_value_counts_percents_series = unique_value_counts_series / unique_value_counts_series.sum()
+
+            self._unique_value_counts_df = pd.DataFrame({
+                'values': unique_value_counts_series.index,
+                'percents': unique_value_counts_percents_series,
+                'counts': unique_value_counts_series
+            })
+        return self._unique_value_counts_df
+
+    def get_sorted_unique_value_counts_df(self, sort: str) -> pd.DataFrame:
+        """
+        Returns the unique value counts, sorted in the sort order the frontend uses, along
+        with the string representation of each value in values_strings.
+        """
+        if self._unique_value_counts_strings_df is None:
+            # We turn the values into strings, so that we can easily filter on
+            # them without issues (and sort on them in some cases)
+            unique_value_counts_strings_df = self.get_unique_value_counts_df().copy(deep=True)
+            unique_value_counts_strings_df['values_strings'] = unique_value_counts_strings_df['values'].astype('str')
+            self._unique_value_counts_strings_df = unique_value_counts_strings_df
+
+        sorted_unique_value_counts_df = self._sorted_unique_value_counts_dfs.get(sort)
+        if sorted_unique_value_counts_df is None:
+            sorted_unique_value_counts_df = _sort_unique_value_counts_df(self._unique_value_counts_strings_df, sort)
+            self._sorted_unique_value_counts_dfs[sort] = sorted_unique_value_counts_df
+        return sorted_unique_value_counts_df
+
+    def get_unique_value_counts_result(self, sort: str, search_string: str, get_result: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the unique value counts that the frontend gets for this sort and search
+        string, only calling get_result if we have not done this search recently.
+        """
+        key = (sort, search_string)
+        result = self._unique_value_counts_results.get(key)
+        if result is None:
+            result = get_result()
+            self._unique_value_counts_results[key] = result
+            if len(self._unique_value_counts_results) > MAX_CACHED_UNIQUE_VALUE_COUNTS_RESULTS:
+                self._unique_value_counts_results.popitem(last=False)
+        else:
+            self._unique_value_counts_results.move_to_end(key)
+        return result
+
+    def get_describe(self, get_describe: Callable[[pd.Series], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the description of the column, calling get_describe on the column the
+        first time it is needed.
+        """
+        if self._describe is None:
+            self._describe = get_describe(self.column)
+        return self._describe
+
+    def get_summary_graph(self, graph_params: Tuple[Any, ...], get_summary_graph: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the summary graph of the column with these graph_params (e.g. its height
+        and width), calling get_summary_graph the first time it is needed.
+        """
+        summary_graph = self._summary_graphs.get(graph_params)
+        if summary_graph is None:
+            summary_graph = get_summary_graph()
+            self._summary_graphs[graph_params] = summary_graph
+        return summary_graph
+
+
+def _sort_unique_value_counts_df(unique_value_counts_strings_df: pd.DataFrame, sort: str) -> pd.DataFrame:
+    try:
+        if sort == 'Ascending Value':
+            return unique_value_counts_strings_df.sort_values(by='values', ascending=True, na_position='first')
+        elif sort == 'Descending Value':
+            return unique_value_counts_strings_df.sort_values(by='values', ascending=False, na_position='first')
+        elif sort == 'Ascending Occurence':
+            return unique_value_counts_strings_df.sort_values(by='counts', ascending=True, na_position='first')
+        elif sort == 'Descending Occurence':
+            return unique_value_counts_strings_df.sort_values(by='counts', ascending=False, na_position='first')
+    except:
+        # If the sort values throws an exception, then this must be because we have a mixed value type, and so we instead
+        # sort on the string representation of the values (as this will always work)
+        if sort == 'Ascending Value':
+            return unique_value_counts_strings_df.sort_values(by='values_strings', ascending=True, na_position='first')
+        elif sort == 'Descending Value':
+            return unique_value_counts_strings_df.sort_values(by='values_strings', ascending=False, na_position='first')
+    return unique_value_counts_strings_df
+
+
+class ColumnStatisticsCache():
+    """
+    A least recently used cache of the statistics of columns, keyed by the sheet index
+    and column id of the column, as well as the version of the data in it.
+
+    When the current step changes, the StepsManager calls update_column_statistics with
+    the locations that might have changed. The statistics of all other columns are kept, 
+    even if the step moved them to new memory (e.g. pandas copies the other columns of 
+    the same dtype when a column is deleted).
+
+    The API thread reads from this cache while the StepsManager updates it, and so all 
+    access to the cache is behind a lock.
+    """
+
+    def __init__(self, max_cached_columns: int=MAX_CACHED_COLUMN_STATISTICS):
+        self.max_cached_columns = max_cached_columns
+        self._cache: 'OrderedDict[Tuple[int, ColumnID], Tuple[ColumnVersion, ColumnStatistics]]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, sheet_index: int, column_id: ColumnID, column: pd.Series) -> ColumnStatistics:
+        """
+        Returns the statistics of the column with column_id in the sheet at sheet_index,
+        which are only reused if the data in the column has not changed.
+        """
+        key = (sheet_index, column_id)
+        version = get_column_version(column)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == version:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+            column_statistics = ColumnStatistics(column)
+            self._cache[key] = (version, column_statistics)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_cached_columns:
+                self._cache.popitem(last=False)
+
+            return column_statistics
+
+    def update_column_statistics(self, state: State, changed_locations: ChangedLocations) -> None:
+        """
+        Updates the cache for the new current state, given the locations in which it
+        might differ from the previous current state. 
+        
+        The statistics of the columns that might have changed (or are no longer in 
+        the state) are removed, so that the cache does not keep the data of old 
+        columns in memory. The statistics of all other columns are moved to the
+        column in the new state.
+        """
+        with self._lock:
+            for key, (version, column_statistics) in list(self._cache.items()):
+                sheet_index, column_id = key
+                column = _get_state_column(state, sheet_index, column_id)
+                if column is None:
+                    del self._cache[key]
+                    continue
+
+                new_version = get_column_version(column)
+                if new_version == version:
+                    continue
+
+                if is_location_changed(key, changed_locations):
+                    del self._cache[key]
+                else:
+                    column_statistics.column = column
+                    self._cache[key] = (new_version, column_statistics)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def _get_state_column(state: State, sheet_index: int, column_id: ColumnID) -> Optional[pd.Series]:
+    if not state.does_sheet_index_exist_within_state(sheet_index):
+        return None
+
+    column_header = state.column_ids.get_column_ids_map(sheet_index).get(column_id)
+    if column_header is None:
+        return None
+
+    df = state.dfs[sheet_index]
+    if column_header not in df.columns:
+        return None
+    return df[column_header]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+When a step early in an analysis is changed (e.g. a formula is overwritten),
+every step after it needs to be run again. However, most of these steps
+do not read any of the data that actually changed - and so running them
+again would just give us back the same data we already have.
+
+To avoid this, each StepPerformer can report the (sheet_index, column_id)
+locations it reads and writes (see get_read_and_written_locations). While
+replaying the steps, we track which locations differ from the state that each
+step was previously executed on. A step that does not read any of these
+changed locations does not need to be executed again; instead, we reuse
+its previous post_state by copying the locations it wrote into the new state.
+"""
+from typing import Optional, Set, Tuple
+
+from mitosheet.state import State
+from mitosheet.types import ColumnLocation, StepType
+
+# The locations in which two states differ. None means that they might
+# differ anywhere
+ChangedLocations = Optional[Set[ColumnLocation]]
+
+
+def get_read_and_written_locations(step: StepType, prev_state: State) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+    """
+    Returns the locations this step reads and writes when executed on the
+    prev_state, or None if the step might read and write anything.
+    """
+    return step.step_performer.get_read_and_written_locations(prev_state, step.params)
+
+
+def get_written_locations(step: StepType, prev_state: State) -> ChangedLocations:
+    """
+    Returns the locations this step writes when executed on the prev_state, 
+    or None if the step might write anything.
+    """
+    read_and_written_locations = get_read_and_written_locations(step, prev_state)
+    if read_and_written_locations is None:
+        return None
+    return read_and_written_locations[1]
+
+
+def add_changed_locations(changed_locations: ChangedLocations, new_changed_locations: ChangedLocations) -> ChangedLocations:
+    if changed_locations is None or new_changed_locations is None:
+        return None
+    return changed_locations | new_changed_locations
+
+
+def is_location_changed(location: ColumnLocation, changed_locations: ChangedLocations) -> bool:
+    """
+    Returns True if the data at location might be different given the changed
+    locations. A column changes if it or its sheet changes, and a sheet changes
+    if anything in it changes.
+    """
+    if changed_locations is None:
+        return True
+
+    sheet_index, column_id = location
+    if column_id is None:
+        return any(changed_sheet_index == sheet_index for changed_sheet_index, _ in changed_locations)
+    return location in changed_locations or (sheet_index, None) in changed_locations
+
+
+def is_step_affected_by_changed_locations(
+        read_locations: Set[ColumnLocation],
+        written_locations: Set[ColumnLocation],
+        changed_locations: ChangedLocations
+    ) -> bool:
+    """
+    Returns True if a step with these read and written locations would
+    produce a different result given the changed locations.
+
+    Since reusing a step copies the written locations from its previous
+    post state, a step is also affected if the sheets it writes to have
+    changed in a way that these locations no longer line up with: any change
+    for an entire sheet, and a change to the index or columns for a column.
+    """
+    if any(is_location_changed(location, changed_locations) for location in read_locations):
+        return True
+
+    for sheet_index, column_id in written_locations:
+        if column_id is None and is_location_changed((sheet_index, None), changed_locations):
+            return True
+        if changed_locations is None or (sheet_index, None) in changed_locations:
+            return True
+    
+    return False
+
+
+def get_reused_post_state(old_step: StepType, new_prev_state: State, written_locations: Set[ColumnLocation]) -> State:
+    """
+    Given a step that was executed on a previous state, and a new prev state
+    that only differs from it in locations the step does not read, returns
+    the post state of executing the step on the new prev state, without
+    actually executing the step.
+
+    This copies the written locations from the old post state of the step
+    onto a copy of the new prev state.
+    """
+    old_post_state = old_step.final_defined_state
+    new_post_state = new_prev_state.copy(
+        copy_on_write_sheet_indexes=[sheet_index for sheet_index, _ in written_locations]
+    )
+
+    for sheet_index, column_id in written_locations:
+        if column_id is None:
+            new_post_state.dfs[sheet_index] = old_post_state.dfs[sheet_index]
+            new_post_state.column_ids.column_id_to_column_header[sheet_index] = old_post_state.column_ids.column_id_to_column_header[sheet_index]
+            new_post_state.column_ids.column_header_to_column_id[sheet_index] = old_post_state.column_ids.column_header_to_column_id[sheet_index]
+            new_post_state.column_formulas[sheet_index] = old_post_state.column_formulas[sheet_index]
+            new_post_state.column_filters[sheet_index] = old_post_state.column_filters[sheet_index]
+            new_post_state.df_formats[sheet_index] = old_post_state.df_formats[sheet_index]
+        else:
+            column_header = old_post_state.column_ids.get_column_header_by_id(sheet_index, column_id)
+            new_post_state.set_column(sheet_index, column_header, old_post_state.dfs[sheet_index][column_header])
+            new_post_state.column_formulas[sheet_index][column_id] = old_post_state.column_formulas[sheet_index][column_id]
+            new_post_state.column_filters[sheet_index][column_id] = old_post_state.column_filters[sheet_index][column_id]
+
+    return new_post_state
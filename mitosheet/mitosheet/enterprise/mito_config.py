@@ -27,6 +27,8 @@ MITO_CONFIG_FEATURE_TELEMETRY = 'MITO_CONFIG_FEATURE_TELEMETRY'
 MITO_CONFIG_PRO = 'MITO_CONFIG_PRO'
 MITO_CONFIG_LLM_URL = 'MITO_CONFIG_LLM_URL'
 MITO_CONFIG_ANALYTICS_URL = 'MITO_CONFIG_ANALYTICS_URL'
+MITO_CONFIG_CSV_IMPORT_ENGINE = 'MITO_CONFIG_CSV_IMPORT_ENGINE'
+MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB = 'MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB'
 
 # Note: The below keys can change since they are not set by the user.
 MITO_CONFIG_CODE_SNIPPETS = 'MITO_CONFIG_CODE_SNIPPETS'
@@ -69,7 +71,8 @@ def upgrade_mec_1_to_2(mec: Dict[str, Any]) -> Dict[str, Any]:
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: None,
         MITO_CONFIG_PRO: None,
-
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None,
     }
 
 """
@@ -120,7 +123,9 @@ MEC_VERSION_KEYS = {
         MITO_CONFIG_LLM_URL,
         MITO_CONFIG_ANALYTICS_URL,
         MITO_CONFIG_FEATURE_TELEMETRY,
-        MITO_CONFIG_PRO
+        MITO_CONFIG_PRO,
+        MITO_CONFIG_CSV_IMPORT_ENGINE,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB
     ]
 }
 
@@ -285,6 +290,28 @@ class MitoConfig:
         pro = is_env_variable_set_to_true(self.mec[MITO_CONFIG_PRO])
         return pro
 
+    def get_csv_import_engine(self) -> Optional[str]:
+        """
+        The engine pandas reads CSV files with, e.g. pyarrow. If it is not set, we 
+        use the default engine of pd.read_csv.
+        """
+        if self.mec is None or self.mec[MITO_CONFIG_CSV_IMPORT_ENGINE] is None:
+            return None
+        return self.mec[MITO_CONFIG_CSV_IMPORT_ENGINE].lower()
+
+    def get_state_history_max_memory_mb(self) -> Optional[float]:
+        """
+        The memory, in MB, that the dataframes of the states of an analysis can use 
+        before we spill them to disk (see mitosheet/state_history.py). If it is not set, 
+        or is not a number, we keep all states in memory.
+        """
+        if self.mec is None or self.mec[MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB] is None:
+            return None
+        try:
+            return float(self.mec[MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB])
+        except ValueError:
+            return None
+
     # Add new mito configuration options here ...
 
     def get_mito_config(self) -> Dict[str, Any]:
@@ -299,6 +326,8 @@ class MitoConfig:
             MITO_CONFIG_LLM_URL: self.get_llm_url(),
             MITO_CONFIG_ANALYTICS_URL: self.get_analytics_url(),
             MITO_CONFIG_FEATURE_TELEMETRY: self.get_feature_telemetry(),
-            MITO_CONFIG_PRO: self.get_pro()
+            MITO_CONFIG_PRO: self.get_pro(),
+            MITO_CONFIG_CSV_IMPORT_ENGINE: self.get_csv_import_engine(),
+            MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: self.get_state_history_max_memory_mb()
         }
 
@@ -0,0 +1,581 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Writes dataframes to Excel workbooks, along with their formatting.
+
+We used to write a dataframe with pandas and then style its cells one at a
+time with openpyxl, which keeps the entire workbook in memory and touches every
+cell twice. Instead, we stream the rows of each dataframe with xlsxwriter, and
+write the formatting as Excel does:
+1. Number formats are set on each column, rather than on each cell.
+2. Row colors and conditional formats are conditional formatting rules that
+   Excel applies to the whole range, rather than styles on each cell.
+
+The values are written the same way that pd.DataFrame.to_excel writes them.
+"""
+import datetime
+import re
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils.datetime import WINDOWS_EPOCH, to_excel
+from xlsxwriter import Workbook
+from xlsxwriter.format import Format
+from xlsxwriter.worksheet import Worksheet
+
+from mitosheet.excel_utils import get_column_from_column_index
+from mitosheet.is_type_utils import (is_bool_dtype, is_datetime_dtype,
+                                     is_float_dtype, is_int_dtype,
+                                     is_number_dtype, is_timedelta_dtype)
+from mitosheet.state import (NUMBER_FORMAT_ACCOUNTING, NUMBER_FORMAT_CURRENCY,
+                             NUMBER_FORMAT_PERCENTAGE,
+                             NUMBER_FORMAT_PLAIN_TEXT,
+                             NUMBER_FORMAT_SCIENTIFIC_NOTATION, State)
+from mitosheet.types import ColumnFormat, ColumnHeader
+
+# The formats that pandas writes dates and times with
+EXCEL_DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+EXCEL_DATE_FORMAT = 'YYYY-MM-DD'
+EXCEL_TIMEDELTA_FORMAT = '0'
+
+# Excel does not allow longer formulas, or longer strings inside of them
+MAX_EXCEL_FORMULA_LENGTH = 8192
+MAX_EXCEL_FORMULA_STRING_LENGTH = 255
+
+# Excel's dates are the number of days since this date. We convert dates the same
+# way openpyxl does, which pandas used to write them with
+EXCEL_EPOCH = pd.Timestamp(WINDOWS_EPOCH)
+# Excel thinks 1900 was a leap year, so the first 60 days after the epoch are one
+# day earlier than they should be
+EXCEL_NUM_DAYS_BEFORE_LEAP_DAY = 60
+
+EXCEL_BORDER_STYLES = {
+    'solid': 1,
+    'dashed': 3,
+    'dotted': 4,
+}
+
+# The number of rows we convert to Excel values at once
+EXPORT_CHUNK_NUM_ROWS = 10_000
+
+COLOR_REGEX = re.compile('^#[0-9a-fA-F]{6}$')
+
+ColumnWriter = Callable[[int, int, Any], Any]
+
+
+class ExcelConditionalFormat:
+    """
+    A conditional formatting rule for a column, where the formula is written
+    for the first cell of the column.
+    """
+
+    def __init__(self, column_index: int, formula: str, font_color: Optional[str], background_color: Optional[str]):
+        self.column_index = column_index
+        self.formula = formula
+        self.font_color = font_color
+        self.background_color = background_color
+
+
+class ExcelSheetFormat:
+    """
+    The formatting of an exported sheet. Colors are hex strings, like #000000.
+    """
+
+    def __init__(
+            self,
+            header_background_color: Optional[str]=None,
+            header_font_color: Optional[str]=None,
+            even_background_color: Optional[str]=None,
+            even_font_color: Optional[str]=None,
+            odd_background_color: Optional[str]=None,
+            odd_font_color: Optional[str]=None,
+            border_style: Optional[str]=None,
+            border_color: Optional[str]=None,
+            column_number_formats: Optional[Dict[int, str]]=None,
+            conditional_formats: Optional[List[ExcelConditionalFormat]]=None,
+        ):
+        self.header_background_color = header_background_color
+        self.header_font_color = header_font_color
+        self.even_background_color = even_background_color
+        self.even_font_color = even_font_color
+        self.odd_background_color = odd_background_color
+        self.odd_font_color = odd_font_color
+        self.border_style = border_style
+        self.border_color = border_color
+        self.column_number_formats = column_number_formats if column_number_formats is not None else {}
+        self.conditional_formats = conditional_formats if conditional_formats is not None else []
+
+
+ExcelExportSheet = Tuple[pd.DataFrame, str, Optional[ExcelSheetFormat]]
+
+
+def _check_colors(sheet_format: ExcelSheetFormat) -> None:
+    colors = [
+        sheet_format.header_background_color,
+        sheet_format.header_font_color,
+        sheet_format.even_background_color,
+        sheet_format.even_font_color,
+        sheet_format.odd_background_color,
+        sheet_format.odd_font_color,
+    ]
+    for conditional_format in sheet_format.conditional_formats:
+        colors += [conditional_format.font_color, conditional_format.background_color]
+
+    for color in colors:
+        if color is not None and not COLOR_REGEX.match(color):
+            raise ValueError(f'Colors must be hex strings like #000000, not {color}')
+
+
+def _get_decimals(precision: Optional[int], dtype: str) -> str:
+    # Like the formatting in the sheet, floats have 2 decimals by default
+    if precision is None:
+        precision = 2 if is_float_dtype(dtype) else 0
+    return '.' + '0' * precision if precision > 0 else ''
+
+
+def get_excel_number_format(column_format: Optional[ColumnFormat], dtype: str) -> Optional[str]:
+    """
+    Returns the Excel number format for the format of a column in the sheet,
+    or None if the column has the default format.
+    """
+    if column_format is None:
+        return None
+
+    _type = column_format.get('type', None)
+    precision = column_format.get('precision', None)
+    decimals = _get_decimals(precision, dtype)
+
+    if _type == NUMBER_FORMAT_PLAIN_TEXT:
+        return f'0{decimals}'
+    elif _type == NUMBER_FORMAT_CURRENCY:
+        return f'"$"0{decimals}'
+    elif _type == NUMBER_FORMAT_ACCOUNTING:
+        return f'"$"#,##0{decimals};"$"(#,##0{decimals})'
+    elif _type == NUMBER_FORMAT_PERCENTAGE:
+        return f'#,##0{decimals}%'
+    elif _type == NUMBER_FORMAT_SCIENTIFIC_NOTATION:
+        # Python shows 6 decimals in scientific notation by default
+        if precision is None and not is_float_dtype(dtype):
+            decimals = '.000000'
+        return f'0{decimals}E+00'
+
+    if precision is not None:
+        return f'0{decimals}'
+    return None
+
+
+def _get_string_literal(value: str) -> Optional[str]:
+    if len(value) > MAX_EXCEL_FORMULA_STRING_LENGTH:
+        return None
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _get_number_literal(value: Any) -> Optional[str]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+        return None
+    return repr(value)
+
+
+def _get_excel_datetimes(series: pd.Series) -> pd.Series:
+    """
+    Returns the Excel serial numbers of the datetimes in the series, like openpyxl 
+    converts each datetime, but for the entire series at once.
+    """
+    days = (series - EXCEL_EPOCH).dt.days
+    days = days.where(~((days > 0) & (days <= EXCEL_NUM_DAYS_BEFORE_LEAP_DAY)), days - 1)
+    seconds = series.dt.hour * 3600 + series.dt.minute * 60 + series.dt.second + series.dt.microsecond / 10**6
+    return days + seconds / (60 * 60 * 24)
+
+
+def _get_filter_formula(series: pd.Series, cell: str, column_range: str, filter_: Dict[str, Any]) -> Optional[str]:
+    """
+    Returns an Excel formula for the cell that is true when the filter is, or None
+    if we cannot write the filter as a formula.
+    """
+    from mitosheet.step_performers.filter import (
+        FC_BOOLEAN_IS_FALSE, FC_BOOLEAN_IS_TRUE, FC_DATETIME_EXACTLY,
+        FC_DATETIME_GREATER, FC_DATETIME_GREATER_THAN_OR_EQUAL,
+        FC_DATETIME_LESS, FC_DATETIME_LESS_THAN_OR_EQUAL,
+        FC_DATETIME_NOT_EXACTLY, FC_EMPTY, FC_LEAST_FREQUENT,
+        FC_MOST_FREQUENT, FC_NOT_EMPTY, FC_NUMBER_EXACTLY,
+        FC_NUMBER_GREATER, FC_NUMBER_GREATER_THAN_OR_EQUAL, FC_NUMBER_HIGHEST,
+        FC_NUMBER_LESS, FC_NUMBER_LESS_THAN_OR_EQUAL, FC_NUMBER_LOWEST,
+        FC_NUMBER_NOT_EXACTLY, FC_STRING_CONTAINS,
+        FC_STRING_CONTAINS_CASE_INSENSITIVE, FC_STRING_DOES_NOT_CONTAIN,
+        FC_STRING_ENDS_WITH, FC_STRING_EXACTLY, FC_STRING_NOT_EXACTLY,
+        FC_STRING_STARTS_WITH)
+
+    condition = filter_['condition']
+    value = filter_['value']
+
+    if condition == FC_EMPTY:
+        return f'ISBLANK({cell})'
+    elif condition == FC_NOT_EMPTY:
+        return f'NOT(ISBLANK({cell}))'
+    elif condition in (FC_MOST_FREQUENT, FC_LEAST_FREQUENT):
+        # Which values are the most frequent depends on how pandas breaks ties, so
+        # we find them with pandas, and check if the cell is any of them
+        if not isinstance(value, int):
+            return None
+        value_counts = series.value_counts().index.tolist()
+        frequent_values = value_counts[:value] if condition == FC_MOST_FREQUENT else value_counts[-value:]
+        value_formulas = [_get_equal_formula(cell, frequent_value) for frequent_value in frequent_values]
+        if len(value_formulas) == 0:
+            return 'FALSE'
+        if any(value_formula is None for value_formula in value_formulas):
+            return None
+        return f'OR({",".join(value_formulas)})' # type: ignore
+
+    elif condition == FC_BOOLEAN_IS_TRUE:
+        return f'{cell}=TRUE'
+    elif condition == FC_BOOLEAN_IS_FALSE:
+        return f'{cell}=FALSE'
+
+    if condition in (FC_STRING_CONTAINS, FC_STRING_DOES_NOT_CONTAIN, FC_STRING_CONTAINS_CASE_INSENSITIVE, FC_STRING_STARTS_WITH, FC_STRING_ENDS_WITH, FC_STRING_EXACTLY, FC_STRING_NOT_EXACTLY):
+        if not isinstance(value, str):
+            return None
+        if condition == FC_STRING_CONTAINS_CASE_INSENSITIVE:
+            # SEARCH is case insensitive, but it treats these characters as wildcards
+            value = re.sub(r'([~*?])', r'~\1', value)
+        string_literal = _get_string_literal(value)
+        if string_literal is None:
+            return None
+
+        if condition == FC_STRING_CONTAINS:
+            return f'AND(ISTEXT({cell}),ISNUMBER(FIND({string_literal},{cell})))'
+        elif condition == FC_STRING_DOES_NOT_CONTAIN:
+            return f'NOT(AND(ISTEXT({cell}),ISNUMBER(FIND({string_literal},{cell}))))'
+        elif condition == FC_STRING_CONTAINS_CASE_INSENSITIVE:
+            return f'AND(ISTEXT({cell}),ISNUMBER(SEARCH({string_literal},{cell})))'
+        elif condition == FC_STRING_STARTS_WITH:
+            return f'AND(ISTEXT({cell}),EXACT(LEFT({cell},{len(value)}),{string_literal}))'
+        elif condition == FC_STRING_ENDS_WITH:
+            return f'AND(ISTEXT({cell}),EXACT(RIGHT({cell},{len(value)}),{string_literal}))'
+        elif condition == FC_STRING_EXACTLY:
+            return f'AND(ISTEXT({cell}),EXACT({cell},{string_literal}))'
+        else:
+            return f'NOT(AND(ISTEXT({cell}),EXACT({cell},{string_literal})))'
+
+    if condition in (FC_NUMBER_LOWEST, FC_NUMBER_HIGHEST):
+        # Like pandas, we include all of the values that are tied with the last one
+        if not isinstance(value, int) or value <= 0:
+            return None
+        if condition == FC_NUMBER_LOWEST:
+            return f'AND(ISNUMBER({cell}),{cell}<=SMALL({column_range},MIN({value},COUNT({column_range}))))'
+        return f'AND(ISNUMBER({cell}),{cell}>=LARGE({column_range},MIN({value},COUNT({column_range}))))'
+
+    number_comparisons = {
+        FC_NUMBER_EXACTLY: '=',
+        FC_NUMBER_GREATER: '>',
+        FC_NUMBER_GREATER_THAN_OR_EQUAL: '>=',
+        FC_NUMBER_LESS: '<',
+        FC_NUMBER_LESS_THAN_OR_EQUAL: '<=',
+    }
+    datetime_comparisons = {
+        FC_DATETIME_EXACTLY: '=',
+        FC_DATETIME_GREATER: '>',
+        FC_DATETIME_GREATER_THAN_OR_EQUAL: '>=',
+        FC_DATETIME_LESS: '<',
+        FC_DATETIME_LESS_THAN_OR_EQUAL: '<=',
+    }
+
+    if condition in (FC_NUMBER_NOT_EXACTLY, FC_DATETIME_NOT_EXACTLY):
+        exactly_formula = _get_filter_formula(series, cell, column_range, {'condition': FC_NUMBER_EXACTLY if condition == FC_NUMBER_NOT_EXACTLY else FC_DATETIME_EXACTLY, 'value': value})
+        return f'NOT({exactly_formula})' if exactly_formula is not None else None
+    elif condition in number_comparisons:
+        number_literal = _get_number_literal(value)
+        if number_literal is None:
+            return None
+        return f'AND(ISNUMBER({cell}),{cell}{number_comparisons[condition]}{number_literal})'
+    elif condition in datetime_comparisons:
+        # Datetimes are written as numbers, so we compare them to the number for this datetime
+        try:
+            timestamp = pd.to_datetime(value)
+        except:
+            return None
+        return f'AND(ISNUMBER({cell}),{cell}{datetime_comparisons[condition]}{repr(to_excel(timestamp))})'
+
+    return None
+
+
+def _get_equal_formula(cell: str, value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        string_literal = _get_string_literal(value)
+        return f'AND(ISTEXT({cell}),EXACT({cell},{string_literal}))' if string_literal is not None else None
+    if isinstance(value, (bool, np.bool_)):
+        return f'{cell}={str(bool(value)).upper()}'
+    number_literal = _get_number_literal(value.item() if isinstance(value, np.generic) else value)
+    return f'AND(ISNUMBER({cell}),{cell}={number_literal})' if number_literal is not None else None
+
+
+def get_excel_conditional_format_formula(
+        df: pd.DataFrame,
+        column_header: ColumnHeader,
+        column_index: int,
+        operator: str,
+        filters: List[Dict[str, Any]]
+    ) -> Optional[str]:
+    """
+    Returns an Excel formula for the first cell of the column, that is true for the
+    cells that the filters apply to. Returns None if we cannot write the filters
+    as a formula.
+    """
+    column = get_column_from_column_index(column_index)
+    cell = f'{column}2'
+    column_range = f'${column}$2:${column}${len(df) + 1}'
+
+    filter_formulas = []
+    for filter_or_group in filters:
+        if 'filters' in filter_or_group:
+            filter_formula = get_excel_conditional_format_formula(df, column_header, column_index, filter_or_group['operator'], filter_or_group['filters'])
+        else:
+            filter_formula = _get_filter_formula(df[column_header], cell, column_range, filter_or_group)
+        if filter_formula is None:
+            return None
+        filter_formulas.append(filter_formula)
+
+    if len(filter_formulas) == 0:
+        formula = 'TRUE'
+    elif len(filter_formulas) == 1:
+        formula = filter_formulas[0]
+    else:
+        formula = f'{"OR" if operator == "Or" else "AND"}({",".join(filter_formulas)})'
+
+    if len(formula) > MAX_EXCEL_FORMULA_LENGTH:
+        return None
+    return formula
+
+
+def get_excel_sheet_format(state: State, sheet_index: int) -> ExcelSheetFormat:
+    """
+    Returns the formatting of the sheet in the state, as the formats and rules
+    we write to the exported Excel sheet.
+    """
+    from mitosheet.pro.conditional_formatting_utils import \
+        get_conditonal_formatting_result
+
+    df = state.dfs[sheet_index]
+    df_format = state.df_formats[sheet_index]
+    column_ids = state.column_ids
+
+    column_number_formats = {}
+    for column_id, column_format in df_format.get('columns', {}).items():
+        column_header = column_ids.get_column_header_by_id(sheet_index, column_id)
+        column_index = df.columns.tolist().index(column_header)
+        dtype = str(df[column_header].dtype)
+        number_format = get_excel_number_format(column_format, dtype)
+        if number_format is not None and is_number_dtype(dtype):
+            column_number_formats[column_index] = number_format
+
+    # We skip the conditional formats that are invalid for a column, like the sheet does
+    conditional_formats = df_format.get('conditional_formats', [])
+    invalid_conditional_formats = get_conditonal_formatting_result(state, sheet_index, df, conditional_formats)['invalid_conditional_formats']
+
+    excel_conditional_formats = []
+    for conditional_format in conditional_formats:
+        font_color = conditional_format.get('color', None)
+        background_color = conditional_format.get('backgroundColor', None)
+        if font_color is None and background_color is None:
+            continue
+
+        for column_id in conditional_format['columnIDs']:
+            if column_id in invalid_conditional_formats.get(conditional_format['format_uuid'], []):
+                continue
+            column_header = column_ids.get_column_header_by_id(sheet_index, column_id)
+            column_index = df.columns.tolist().index(column_header)
+            formula = get_excel_conditional_format_formula(df, column_header, column_index, 'And', conditional_format['filters'])
+            if formula is not None:
+                excel_conditional_formats.append(ExcelConditionalFormat(column_index, formula, font_color, background_color))
+
+    headers = df_format.get('headers', {})
+    rows = df_format.get('rows', {})
+    border = df_format.get('border', {})
+    return ExcelSheetFormat(
+        header_background_color=headers.get('backgroundColor'),
+        header_font_color=headers.get('color'),
+        even_background_color=rows.get('even', {}).get('backgroundColor'),
+        even_font_color=rows.get('even', {}).get('color'),
+        odd_background_color=rows.get('odd', {}).get('backgroundColor'),
+        odd_font_color=rows.get('odd', {}).get('color'),
+        border_style=border.get('borderStyle'),
+        border_color=border.get('borderColor'),
+        column_number_formats=column_number_formats,
+        conditional_formats=excel_conditional_formats,
+    )
+
+
+def _get_value_writer(worksheet: Worksheet, cell_format: Optional[Format], datetime_format: Format, date_format: Format, timedelta_format: Format) -> ColumnWriter:
+    """
+    Returns a function that writes a value to a cell the same way that pandas does.
+    """
+    def write_value(row: int, column: int, value: Any) -> Any:
+        if pd.api.types.is_scalar(value) and pd.isna(value):
+            return
+        if getattr(value, 'tzinfo', None) is not None:
+            raise ValueError('Excel does not support datetimes with timezones. Please ensure that datetimes are timezone unaware before writing to Excel.')
+
+        if pd.api.types.is_integer(value) or pd.api.types.is_float(value):
+            if np.isinf(value):
+                return worksheet.write_string(row, column, 'inf' if value > 0 else '-inf', cell_format)
+            return worksheet.write_number(row, column, value, cell_format)
+        elif pd.api.types.is_bool(value):
+            return worksheet.write_boolean(row, column, bool(value), cell_format)
+        elif isinstance(value, datetime.datetime):
+            return worksheet.write_number(row, column, to_excel(value), datetime_format)
+        elif isinstance(value, datetime.date):
+            return worksheet.write_number(row, column, to_excel(value), date_format)
+        elif isinstance(value, datetime.timedelta):
+            return worksheet.write_number(row, column, value.total_seconds() / 86400, timedelta_format)
+
+        value = str(value)
+        if value == '':
+            return
+        # Like openpyxl, we write strings that start with = as formulas, which have no 
+        # value until Excel calculates them
+        if len(value) > 1 and value[0] == '=':
+            return worksheet.write_formula(row, column, value, cell_format, '')
+        return worksheet.write_string(row, column, value, cell_format)
+
+    return write_value
+
+
+def _get_number_writer(worksheet: Worksheet) -> ColumnWriter:
+    def write_number(row: int, column: int, value: float) -> Any:
+        # NaN is not equal to itself, and is written as an empty cell
+        if value != value:
+            return
+        if value in (np.inf, -np.inf):
+            return worksheet.write_string(row, column, 'inf' if value > 0 else '-inf')
+        return worksheet.write_number(row, column, value)
+
+    return write_number
+
+
+def _get_column_number_format(series: pd.Series) -> Optional[str]:
+    dtype = str(series.dtype)
+    if is_datetime_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        return EXCEL_DATETIME_FORMAT
+    elif is_timedelta_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        return EXCEL_TIMEDELTA_FORMAT
+    return None
+
+
+def _get_column_values(worksheet: Worksheet, series: pd.Series, write_value: ColumnWriter) -> Tuple[ColumnWriter, List[Any]]:
+    """
+    Returns the values to write for this part of a column, and a function that writes 
+    each of them. For numpy dtypes, we convert all of the values at once.
+    """
+    dtype = str(series.dtype)
+    if is_bool_dtype(dtype) and series.dtype == np.bool_:
+        return worksheet.write_boolean, series.tolist()
+    elif is_int_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        return worksheet.write_number, series.tolist()
+    elif is_float_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        if np.isfinite(values).all():
+            return worksheet.write_number, values.tolist()
+        return _get_number_writer(worksheet), values.tolist()
+    elif is_datetime_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        return _get_number_writer(worksheet), _get_excel_datetimes(series).tolist()
+    elif is_timedelta_dtype(dtype) and isinstance(series.dtype, np.dtype):
+        return _get_number_writer(worksheet), (series.dt.total_seconds() / 86400).tolist()
+
+    return write_value, series.tolist()
+
+
+def _add_row_conditional_format(worksheet: Worksheet, workbook: Workbook, cell_range: str, formula: str, font_color: Optional[str], background_color: Optional[str]) -> None:
+    properties = {}
+    if font_color is not None:
+        properties['font_color'] = font_color
+    if background_color is not None:
+        properties['bg_color'] = background_color
+    if len(properties) == 0:
+        return
+    worksheet.conditional_format(cell_range, {'type': 'formula', 'criteria': f'={formula}', 'format': workbook.add_format(properties)})
+
+
+def _write_sheet(workbook: Workbook, df: pd.DataFrame, sheet_name: str, sheet_format: Optional[ExcelSheetFormat]) -> None:
+    sheet_format = sheet_format if sheet_format is not None else ExcelSheetFormat()
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    # Like pandas, the header is bold with a border, and centered
+    header_properties: Dict[str, Any] = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+    if sheet_format.header_background_color is not None:
+        header_properties['bg_color'] = sheet_format.header_background_color
+    if sheet_format.header_font_color is not None:
+        header_properties['font_color'] = sheet_format.header_font_color
+    header_format = workbook.add_format(header_properties)
+
+    datetime_format = workbook.add_format({'num_format': EXCEL_DATETIME_FORMAT})
+    date_format = workbook.add_format({'num_format': EXCEL_DATE_FORMAT})
+    timedelta_format = workbook.add_format({'num_format': EXCEL_TIMEDELTA_FORMAT})
+    write_header_value = _get_value_writer(worksheet, header_format, datetime_format, date_format, timedelta_format)
+    write_value = _get_value_writer(worksheet, None, datetime_format, date_format, timedelta_format)
+
+    for column_index, column_header in enumerate(df.columns):
+        number_format = sheet_format.column_number_formats.get(column_index, _get_column_number_format(df.iloc[:, column_index]))
+
+        # Cells without a format use the format of their column, so we don't need to
+        # format each of them
+        if number_format is not None:
+            worksheet.set_column(column_index, column_index, None, workbook.add_format({'num_format': number_format}))
+        write_header_value(0, column_index, column_header)
+
+    # In constant memory mode, each row is written to the file once we move onto the
+    # next one. We convert the values in chunks, so we don't keep all of them in memory
+    for chunk_start in range(0, len(df), EXPORT_CHUNK_NUM_ROWS):
+        chunk_df = df.iloc[chunk_start:chunk_start + EXPORT_CHUNK_NUM_ROWS]
+        column_writers = [
+            (column_index, *_get_column_values(worksheet, chunk_df.iloc[:, column_index], write_value))
+            for column_index in range(len(df.columns))
+        ]
+        for chunk_row_index in range(len(chunk_df)):
+            row = chunk_start + chunk_row_index + 1
+            for column_index, write_column_value, values in column_writers:
+                write_column_value(row, column_index, values[chunk_row_index])
+
+    if len(df.columns) == 0:
+        return
+
+    last_column = get_column_from_column_index(len(df.columns) - 1)
+    if len(df) > 0:
+        # Excel applies the rules that are added first, so that the later conditional formats
+        # take precedence like they do in the sheet, and then the row colors
+        for conditional_format in reversed(sheet_format.conditional_formats):
+            column = get_column_from_column_index(conditional_format.column_index)
+            _add_row_conditional_format(worksheet, workbook, f'{column}2:{column}{len(df) + 1}', conditional_format.formula, conditional_format.font_color, conditional_format.background_color)
+
+        # The first row of data is an even row, as it is the second row of the sheet
+        data_range = f'A2:{last_column}{len(df) + 1}'
+        _add_row_conditional_format(worksheet, workbook, data_range, 'MOD(ROW(),2)=0', sheet_format.even_font_color, sheet_format.even_background_color)
+        _add_row_conditional_format(worksheet, workbook, data_range, 'MOD(ROW(),2)=1', sheet_format.odd_font_color, sheet_format.odd_background_color)
+
+    if sheet_format.border_style is not None and sheet_format.border_style in EXCEL_BORDER_STYLES:
+        border_properties: Dict[str, Any] = {'border': EXCEL_BORDER_STYLES[sheet_format.border_style]}
+        if sheet_format.border_color is not None and COLOR_REGEX.match(sheet_format.border_color):
+            border_properties['border_color'] = sheet_format.border_color
+        worksheet.conditional_format(f'A1:{last_column}{len(df) + 1}', {'type': 'formula', 'criteria': '=TRUE', 'format': workbook.add_format(border_properties)})
+
+
+def write_dataframes_to_excel(file: Union[str, IO[bytes]], sheets: List[ExcelExportSheet]) -> None:
+    """
+    Writes each of the dataframes to a sheet with the given name in the Excel file,
+    along with the formatting of the sheet if it has any. The rows are streamed to
+    the file, so writing a large dataframe does not build the sheet in memory.
+    """
+    # We check the colors before we start writing the file
+    for _, _, sheet_format in sheets:
+        if sheet_format is not None:
+            _check_colors(sheet_format)
+
+    workbook = Workbook(file, {'constant_memory': True})
+    try:
+        for df, sheet_name, sheet_format in sheets:
+            _write_sheet(workbook, df, sheet_name, sheet_format)
+    finally:
+        workbook.close()
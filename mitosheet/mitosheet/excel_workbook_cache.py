@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Reads Excel workbooks for the import dialog and for range imports, without
+loading the entire workbook every time we need something from it.
+
+We used to load a workbook for each thing we needed from it: the import dialog
+loaded it to list its sheet names, and a range import loaded all of it to find
+each range, and then loaded it again to read each range. Instead:
+1. We read the sheet names from the workbook XML directly.
+2. We stream the cells of a sheet once in read-only mode to find ranges in it.
+3. We stream the values of a sheet once to read all of the ranges from it.
+
+Each of these is cached by the path, size, and modified time of the file, so
+importing many ranges from the same workbook only reads it once.
+"""
+import os
+import posixpath
+import re
+import zipfile
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.cell.read_only import EmptyCell
+from openpyxl.utils import range_boundaries
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from mitosheet.excel_utils import get_index_from_column
+
+# The number of files we keep the sheet names of
+MAX_CACHED_EXCEL_SHEET_NAMES = 20
+
+# The number of sheets we keep the cells of. As these can be large, we only
+# keep the sheets we are most likely to find more ranges in
+MAX_CACHED_EXCEL_SHEET_CELLS = 3
+
+# The number of sheets we keep the values of, as pandas reads them
+MAX_CACHED_EXCEL_SHEET_DATA = 3
+
+# We search the worksheet XML for merged cells in chunks of this size
+MERGED_CELLS_CHUNK_BYTES = 1024 * 1024
+MAX_MERGED_CELL_ELEMENT_BYTES = 1024
+MERGED_CELL_REGEX = re.compile(rb'<(?:[\w.-]+:)?mergeCell\s[^>]*?\bref="([^"]+)"')
+
+RELATIONSHIP_TYPE_OFFICE_DOCUMENT = 'officeDocument'
+RELATIONSHIP_TYPE_WORKSHEET = 'worksheet'
+
+ExcelFileKey = Tuple[str, int, int]
+
+_excel_sheet_names: 'OrderedDict[ExcelFileKey, List[str]]' = OrderedDict()
+_excel_sheet_cells: 'OrderedDict[Tuple[ExcelFileKey, Optional[str], Optional[int]], ExcelSheetCells]' = OrderedDict()
+_excel_sheet_data: 'OrderedDict[Tuple[ExcelFileKey, Union[str, int]], List[List[Any]]]' = OrderedDict()
+_excel_workbook_cache_lock = Lock()
+
+
+class ExcelSheetCells():
+    """
+    The values of the cells in a sheet, along with the rows and columns that the
+    cells in the sheet are defined in.
+
+    These are the same as openpyxl gives for a sheet in a workbook loaded in the
+    default mode, where a cell can be defined and empty (e.g. if it has a style),
+    and the cells in a merged range other than the first are empty. Rows and
+    columns are indexed from 1.
+    """
+
+    def __init__(self, rows: List[List[Any]], min_row: int, min_column: int, max_row: int, max_column: int):
+        self.rows = rows
+        self.min_row = min_row
+        self.min_column = min_column
+        self.max_row = max_row
+        self.max_column = max_column
+
+    def get_value(self, row: int, column: int) -> Any:
+        if row < 1 or row > len(self.rows):
+            return None
+        row_values = self.rows[row - 1]
+        if column < 1 or column > len(row_values):
+            return None
+        return row_values[column - 1]
+
+
+def get_excel_file_key(file_path: str) -> ExcelFileKey:
+    """
+    Returns a key that changes when the file at file_path is changed.
+    """
+    stat_result = os.stat(file_path)
+    return (os.path.abspath(file_path), stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def _get_from_cache(cache: 'OrderedDict[Any, Any]', key: Any) -> Any:
+    with _excel_workbook_cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _add_to_cache(cache: 'OrderedDict[Any, Any]', key: Any, value: Any, max_cached: int) -> Any:
+    with _excel_workbook_cache_lock:
+        # If another thread read this while we did, we use theirs
+        value = cache.setdefault(key, value)
+        cache.move_to_end(key)
+        if len(cache) > max_cached:
+            cache.popitem(last=False)
+        return value
+
+
+def clear_excel_workbook_cache() -> None:
+    with _excel_workbook_cache_lock:
+        _excel_sheet_names.clear()
+        _excel_sheet_cells.clear()
+        _excel_sheet_data.clear()
+
+
+def _get_tag_name(element: ElementTree.Element) -> str:
+    # We ignore namespaces, as workbooks saved in strict mode use different ones
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def _get_attribute(element: ElementTree.Element, name: str) -> Optional[str]:
+    for attribute_name, value in element.attrib.items():
+        if attribute_name.rsplit('}', 1)[-1] == name:
+            return value
+    return None
+
+
+def _get_relationship_targets(archive: zipfile.ZipFile, part_path: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns the id, type and path of each relationship of the part at part_path.
+    """
+    part_directory, part_name = posixpath.split(part_path)
+    relationships_path = posixpath.join(part_directory, '_rels', part_name + '.rels')
+
+    relationship_targets = {}
+    root = ElementTree.fromstring(archive.read(relationships_path))
+    for relationship in root:
+        if _get_tag_name(relationship) != 'Relationship':
+            continue
+        target = relationship.attrib['Target']
+        if target.startswith('/'):
+            target_path = target[1:]
+        else:
+            target_path = posixpath.normpath(posixpath.join(part_directory, target))
+        relationship_type = relationship.attrib['Type'].rsplit('/', 1)[-1]
+        relationship_targets[relationship.attrib['Id']] = (relationship_type, target_path)
+
+    return relationship_targets
+
+
+def _get_worksheet_paths(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """
+    Returns the name and path in the archive of each worksheet in the workbook, in the
+    order that they are in the workbook. Like pandas, we skip chartsheets.
+    """
+    workbook_path = None
+    for relationship_type, target_path in _get_relationship_targets(archive, '').values():
+        if relationship_type == RELATIONSHIP_TYPE_OFFICE_DOCUMENT:
+            workbook_path = target_path
+    if workbook_path is None:
+        raise ValueError('The file is not an Excel workbook')
+
+    relationship_targets = _get_relationship_targets(archive, workbook_path)
+    file_names = set(archive.namelist())
+
+    worksheet_paths = []
+    root = ElementTree.fromstring(archive.read(workbook_path))
+    for element in root.iter():
+        if _get_tag_name(element) != 'sheet':
+            continue
+
+        relationship_id = _get_attribute(element, 'id')
+        relationship_type, target_path = relationship_targets.get(relationship_id or '', ('', ''))
+        if relationship_type == RELATIONSHIP_TYPE_WORKSHEET and target_path in file_names:
+            worksheet_paths.append((element.attrib['name'], target_path))
+
+    return worksheet_paths
+
+
+def get_excel_sheet_names(file_path: str) -> List[str]:
+    """
+    Returns the names of the worksheets in the Excel file at file_path, reading
+    only the XML that lists them rather than loading the workbook.
+    """
+    key = get_excel_file_key(file_path)
+    sheet_names = _get_from_cache(_excel_sheet_names, key)
+    if sheet_names is not None:
+        return sheet_names
+
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            sheet_names = [sheet_name for sheet_name, _ in _get_worksheet_paths(archive)]
+    except (zipfile.BadZipFile, KeyError, ValueError, ElementTree.ParseError):
+        # If we cannot read the XML, we let pandas read it, so that we get the same
+        # errors for invalid files
+        sheet_names = pd.ExcelFile(file_path, engine='openpyxl').sheet_names
+
+    return _add_to_cache(_excel_sheet_names, key, sheet_names, MAX_CACHED_EXCEL_SHEET_NAMES)
+
+
+def _get_merged_cell_ranges(file_path: str, worksheet_name: str) -> Iterator[str]:
+    with zipfile.ZipFile(file_path) as archive:
+        worksheet_path = dict(_get_worksheet_paths(archive)).get(worksheet_name)
+        if worksheet_path is None:
+            return
+
+        # Parsing the entire worksheet XML to find the merged cells is as slow as
+        # streaming the sheet again, so we just search the bytes for them. We keep
+        # the end of each chunk, in case a merged cell is split between chunks
+        with archive.open(worksheet_path) as worksheet_file:
+            remaining = b''
+            while True:
+                chunk = worksheet_file.read(MERGED_CELLS_CHUNK_BYTES)
+                if not chunk:
+                    break
+                remaining += chunk
+                end = 0
+                for match in MERGED_CELL_REGEX.finditer(remaining):
+                    yield match.group(1).decode('utf-8')
+                    end = match.end()
+                remaining = remaining[max(end, len(remaining) - MAX_MERGED_CELL_ELEMENT_BYTES):]
+
+
+def _read_excel_sheet_cells(file_path: str, sheet_name: Optional[str], sheet_index: Optional[int]) -> ExcelSheetCells:
+    workbook = load_workbook(file_path, read_only=True, keep_links=False)
+    try:
+        if sheet_name is not None:
+            sheet = workbook[sheet_name]
+        else:
+            sheet = workbook.worksheets[sheet_index] # type: ignore
+
+        # We read all of the rows, rather than trusting the dimensions saved in the file
+        sheet.reset_dimensions()
+
+        rows: List[List[Any]] = []
+        defined_rows: List[int] = []
+        defined_columns: List[int] = []
+        for row_index, row in enumerate(sheet.iter_rows(), start=1):
+            row_values = [cell.value for cell in row]
+            defined_column_indexes = [column_index for column_index, cell in enumerate(row, start=1) if not isinstance(cell, EmptyCell)]
+            if len(defined_column_indexes) > 0:
+                defined_rows.append(row_index)
+                defined_columns.append(defined_column_indexes[0])
+                defined_columns.append(defined_column_indexes[-1])
+            rows.append(row_values)
+        worksheet_name = sheet.title
+    finally:
+        workbook.close()
+
+    # All of the cells in a merged range are defined, but only the first one has a value
+    for merged_cell_range in _get_merged_cell_ranges(file_path, worksheet_name):
+        min_column, min_row, max_column, max_row = range_boundaries(merged_cell_range)
+        defined_rows.extend([min_row, max_row])
+        defined_columns.extend([min_column, max_column])
+        for row_index in range(min_row, max_row + 1):
+            while len(rows) < row_index:
+                rows.append([])
+            row_values = rows[row_index - 1]
+            if len(row_values) < max_column:
+                row_values.extend([None] * (max_column - len(row_values)))
+            for column_index in range(min_column, max_column + 1):
+                if row_index != min_row or column_index != min_column:
+                    row_values[column_index - 1] = None
+
+    if len(defined_rows) == 0:
+        # Like openpyxl, we treat a sheet without cells as having a single empty cell
+        return ExcelSheetCells(rows, 1, 1, 1, 1)
+
+    return ExcelSheetCells(rows, min(defined_rows), min(defined_columns), max(defined_rows), max(defined_columns))
+
+
+def get_excel_sheet_cells(file_path: str, sheet_name: Optional[str]=None, sheet_index: Optional[int]=None) -> ExcelSheetCells:
+    """
+    Returns the cells in the sheet with sheet_name, or at sheet_index, in the Excel file
+    at file_path, streaming the sheet only if we have not done so since it changed.
+    """
+    key = (get_excel_file_key(file_path), sheet_name, sheet_index)
+    sheet_cells = _get_from_cache(_excel_sheet_cells, key)
+    if sheet_cells is not None:
+        return sheet_cells
+
+    sheet_cells = _read_excel_sheet_cells(file_path, sheet_name, sheet_index)
+    return _add_to_cache(_excel_sheet_cells, key, sheet_cells, MAX_CACHED_EXCEL_SHEET_CELLS)
+
+
+def _convert_cell(cell: Any) -> Any:
+    # We convert each cell the same way pandas does when it reads an Excel file
+    if cell.value is None:
+        return ''
+    elif cell.data_type == TYPE_ERROR:
+        return np.nan
+    elif cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        if value == cell.value:
+            return value
+        return float(cell.value)
+    return cell.value
+
+
+def _read_excel_sheet_data(file_path: str, sheet: Union[str, int]) -> List[List[Any]]:
+    # We load the workbook the same way that pandas does, so that we read the same values
+    workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        if isinstance(sheet, str):
+            if sheet not in workbook.sheetnames:
+                raise ValueError(f"Worksheet named '{sheet}' not found")
+            worksheet = workbook[sheet]
+        else:
+            if sheet >= len(workbook.worksheets):
+                raise ValueError(f"Worksheet index {sheet} is invalid, {len(workbook.worksheets)} worksheets found")
+            worksheet = workbook.worksheets[sheet]
+
+        worksheet.reset_dimensions()
+
+        data = []
+        for row in worksheet.rows:
+            converted_row = [_convert_cell(cell) for cell in row]
+            while converted_row and converted_row[-1] == '':
+                # trim trailing empty elements
+                converted_row.pop()
+            data.append(converted_row)
+        return data
+    finally:
+        workbook.close()
+
+
+def get_excel_sheet_data(file_path: str, sheet: Union[str, int]) -> List[List[Any]]:
+    """
+    Returns the values of each row in the sheet with this name or index in the Excel
+    file at file_path, as pandas reads them, streaming the sheet only if we have not
+    done so since it changed. Empty cells at the end of each row are not included.
+    """
+    key = (get_excel_file_key(file_path), sheet)
+    sheet_data = _get_from_cache(_excel_sheet_data, key)
+    if sheet_data is not None:
+        return sheet_data
+
+    sheet_data = _read_excel_sheet_data(file_path, sheet)
+    return _add_to_cache(_excel_sheet_data, key, sheet_data, MAX_CACHED_EXCEL_SHEET_DATA)
+
+
+def _is_xlsx_file(file_path: str) -> bool:
+    # This is how pandas decides to read a file with openpyxl
+    if not zipfile.is_zipfile(file_path):
+        return False
+    with zipfile.ZipFile(file_path) as archive:
+        return 'xl/workbook.xml' in archive.namelist()
+
+
+def read_excel_range(file_path: str, sheet: Union[str, int], skiprows: int, nrows: int, usecols: str) -> pd.DataFrame:
+    """
+    Reads the range with the given skiprows, nrows and usecols (e.g. 'A:C') from the 
+    sheet in the Excel file at file_path, returning the same dataframe as pd.read_excel. 
+
+    pd.read_excel streams the sheet up to the end of the range each time it is called, 
+    and so reading many ranges from a large sheet streams it many times. Instead, we 
+    stream the sheet once, and then parse each range from these rows like pandas does.
+    """
+    if not _is_xlsx_file(file_path):
+        return pd.read_excel(file_path, sheet_name=sheet, skiprows=skiprows, nrows=nrows, usecols=usecols)
+
+    sheet_data = get_excel_sheet_data(file_path, sheet)
+
+    # Like pandas, we only take the header and the rows we need, without the empty
+    # rows at the end, and make all of the rows the same width
+    data = sheet_data[:skiprows + nrows + 1]
+    last_row_with_data = max((row_index for row_index, row in enumerate(data) if len(row) > 0), default=-1)
+    data = data[:last_row_with_data + 1]
+    if len(data) == 0:
+        return pd.DataFrame()
+    max_width = max(len(row) for row in data)
+    # We skip the rows before the range ourselves, so we don't copy them
+    data = [row + [''] * (max_width - len(row)) for row in data[skiprows:]]
+    if len(data) == 0:
+        return pd.DataFrame()
+
+    start_column, end_column = usecols.split(':')
+    try:
+        parser = TextParser(
+            data,
+            header=0,
+            nrows=nrows,
+            usecols=list(range(get_index_from_column(start_column), get_index_from_column(end_column) + 1)),
+            skip_blank_lines=False
+        )
+        return parser.read(nrows=nrows)
+    except EmptyDataError:
+        return pd.DataFrame()
@@ -17,11 +17,10 @@ That's it! We can continue to optimize this over time, but that is fine for now.
 """
 
 
-import json
 import random
 from typing import Dict, Optional
 
-from mitosheet.user.db import USER_JSON_PATH, get_user_field
+from mitosheet.user.db import get_user_field, set_user_field
 
 def get_random_variant() -> str:
     """Returns "A" or "B" with 50% probability
@@ -55,10 +54,7 @@ def set_experiment(experiment_id: str, variant: str) -> None:
     """
     from mitosheet.user.schemas import UJ_EXPERIMENT
 
-    with open(USER_JSON_PATH, 'r') as user_file_old:
-        old_user_json = json.load(user_file_old)
-        old_user_json[UJ_EXPERIMENT]['experiment_id'] = experiment_id
-        old_user_json[UJ_EXPERIMENT]['variant'] = variant
-
-        with open(USER_JSON_PATH, 'w+') as f:
-            f.write(json.dumps(old_user_json))
+    experiment: Dict[str, str] = get_user_field(UJ_EXPERIMENT) # type: ignore
+    experiment['experiment_id'] = experiment_id
+    experiment['variant'] = variant
+    set_user_field(UJ_EXPERIMENT, experiment)
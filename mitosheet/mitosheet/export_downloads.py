@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+When the user downloads a dataframe as a CSV or Excel file, we used to build
+the entire file in memory, and send it back in a single API response. For large
+dataframes, this used several times the memory of the dataframe, and made
+responses larger than the frontend can receive.
+
+Instead, we write the file to a temporary folder, a chunk of rows at a time,
+and send it to the frontend in chunks of DOWNLOAD_CHUNK_NUM_BYTES bytes over
+multiple API calls:
+1. The first call writes the file, and responds with its first chunk and the
+   number of chunks in the file, so the frontend can show its progress.
+2. Each later call passes the download_id and the chunk_index it wants, and
+   responds with that chunk. Once the last chunk is read, we remove the file.
+
+API calls run on many threads, so a download may be removed while another
+thread is reading one of its chunks. We count the threads reading each download,
+and only remove its file once none of them are.
+
+Each chunk is sent as a binary buffer, so it is not encoded in the json.
+"""
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from mitosheet.types import API_RESULT_BUFFER_KEY
+from mitosheet.utils import get_new_id, remove_file_if_exists
+
+# The number of bytes of the file we send in each API response
+DOWNLOAD_CHUNK_NUM_BYTES = 4 * 1024 * 1024
+
+# The number of rows of a dataframe we write to a CSV at once
+CSV_CHUNK_NUM_ROWS = 10_000
+
+# The number of downloads we keep on disk that the frontend has not finished
+# reading. When there are more, we remove the oldest, as the frontend has moved on
+MAX_CACHED_DOWNLOADS = 5
+
+
+def write_dataframe_to_csv(file_name: str, df: pd.DataFrame) -> None:
+    """
+    Writes the dataframe to a CSV file a chunk of rows at a time, which is the
+    same as df.to_csv(file_name, index=False), without the whole CSV in memory.
+    """
+    # NOTE: we import this here, as importing the api imports this file
+    from mitosheet.api.api_worker_pool import raise_if_api_call_cancelled
+
+    with open(file_name, 'w', newline='', encoding='utf-8') as f:
+        if len(df) == 0:
+            df.to_csv(f, index=False)
+        for start in range(0, len(df), CSV_CHUNK_NUM_ROWS):
+            raise_if_api_call_cancelled()
+            df.iloc[start:start + CSV_CHUNK_NUM_ROWS].to_csv(f, index=False, header=start == 0)
+
+
+class ExportDownload():
+    """
+    A file that is written for the frontend to download.
+    """
+
+    def __init__(self, download_id: str, file_name: str):
+        self.download_id = download_id
+        self.file_name = file_name
+        self.num_bytes = os.path.getsize(file_name)
+        # We always send one chunk, even if the file is empty
+        self.num_chunks = max(1, -(-self.num_bytes // DOWNLOAD_CHUNK_NUM_BYTES))
+        # The number of threads reading a chunk of the file, and if the download has been 
+        # removed, in which case the file is removed once there are no threads reading it
+        self.num_readers = 0
+        self.is_removed = False
+
+
+class ExportDownloads():
+    """
+    The files that are written for the frontend to download, which it has
+    not finished reading yet.
+    """
+
+    def __init__(self) -> None:
+        self._downloads: 'OrderedDict[str, ExportDownload]' = OrderedDict()
+        self._lock = Lock()
+        self._download_folder: Optional[str] = None
+
+    def get_download_folder(self) -> str:
+        if self._download_folder is None:
+            self._download_folder = tempfile.mkdtemp(prefix='mito-downloads-')
+            # Clean up any files the frontend did not finish downloading
+            weakref.finalize(self, shutil.rmtree, self._download_folder, True)
+        return self._download_folder
+
+    def create_download(self, write: Callable[[str], None], file_extension: str) -> ExportDownload:
+        """
+        Writes a new file to download by calling write with its path.
+        """
+        download_id = get_new_id()
+        file_name = os.path.join(self.get_download_folder(), f'{download_id}.{file_extension}')
+        try:
+            write(file_name)
+            download = ExportDownload(download_id, file_name)
+        except:
+            remove_file_if_exists(file_name)
+            raise
+
+        with self._lock:
+            self._downloads[download_id] = download
+            while len(self._downloads) > MAX_CACHED_DOWNLOADS:
+                _, oldest_download = self._downloads.popitem(last=False)
+                self._remove_download(oldest_download)
+        return download
+
+    def _remove_download(self, download: ExportDownload) -> None:
+        """
+        Removes the file of a download that is no longer in the downloads, unless a thread
+        is reading it, in which case the thread removes it once it is done. Must be called
+        while holding the lock.
+        """
+        download.is_removed = True
+        if download.num_readers == 0:
+            remove_file_if_exists(download.file_name)
+
+    def read_chunk(self, download_id: str, chunk_index: int) -> Dict[str, Any]:
+        """
+        Returns the chunk at chunk_index of the download as an API result. Once
+        the last chunk is read, the file is removed.
+        """
+        with self._lock:
+            download = self._downloads.get(download_id)
+            if download is None:
+                raise ValueError(f'There is no download with the id {download_id}')
+            if chunk_index < 0 or chunk_index >= download.num_chunks:
+                raise ValueError(f'The download {download_id} has no chunk {chunk_index}')
+            if chunk_index == download.num_chunks - 1:
+                del self._downloads[download_id]
+                download.is_removed = True
+            download.num_readers += 1
+
+        try:
+            with open(download.file_name, 'rb') as f:
+                f.seek(chunk_index * DOWNLOAD_CHUNK_NUM_BYTES)
+                chunk = f.read(DOWNLOAD_CHUNK_NUM_BYTES)
+        finally:
+            with self._lock:
+                download.num_readers -= 1
+                if download.is_removed:
+                    self._remove_download(download)
+
+        return {
+            'download_id': download.download_id,
+            'chunk_index': chunk_index,
+            'num_chunks': download.num_chunks,
+            'num_bytes': download.num_bytes,
+            API_RESULT_BUFFER_KEY: chunk
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            for download in self._downloads.values():
+                self._remove_download(download)
+            self._downloads.clear()
+
+
+export_downloads = ExportDownloads()
+
+
+def get_export_download_chunk(params: Dict[str, Any], write: Callable[[str], None], file_extension: str) -> Dict[str, Any]:
+    """
+    If the params have a download_id, returns the chunk at their chunk_index. Otherwise,
+    writes a new file to download by calling write, and returns its first chunk.
+    """
+    download_id = params.get('download_id')
+    if download_id is not None:
+        return export_downloads.read_chunk(download_id, params.get('chunk_index', 0))
+
+    download = export_downloads.create_download(write, file_extension)
+    return export_downloads.read_chunk(download.download_id, 0)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Turns the columns of a dataframe into lists of values that can be passed
+to json.dumps, so that we can send them to the frontend.
+
+We used to do this by calling df.to_json, parsing the result back with
+json.loads, and then walking every value to replace the nulls - before the
+sheet data was dumped a final time. Instead, we encode each column once,
+formatting the dates and nulls in the entire column at once, and give the
+same values as this round trip did.
+
+As most steps only change a few columns, we also cache the values of each
+column by the data in it, so that columns a step did not change are not 
+encoded again.
+
+NOTE: this relies on the objects in object columns never being modified in
+place, which Mito never does.
+"""
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_datetime_dtype, is_timedelta_dtype
+
+# pandas writes floats with 10 decimal places, and writes floats outside of
+# these values in scientific notation with 10 significant digits
+PANDAS_JSON_DOUBLE_PRECISION = 10
+PANDAS_JSON_MAX_DECIMAL_NOTATION_VALUE = 1e16 - 1
+PANDAS_JSON_MIN_DECIMAL_NOTATION_VALUE = 1e-15
+
+# Below this, a float with 10 decimal places times 10^10 is an integer that a 
+# float can store exactly
+MAX_EXACTLY_SCALED_FLOAT_VALUE = 2 ** 53 / 10 ** PANDAS_JSON_DOUBLE_PRECISION
+
+# The number of values we keep in the cache. This is enough to cache every
+# value in the sheet data of a few large dataframes
+MAX_CACHED_COLUMN_JSON_VALUES = 5_000_000
+
+ColumnKey = Tuple[Any, ...]
+
+
+def get_rounded_float_values(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds the floats in values the same way that pandas does when it writes
+    them to json, and returns them as float64. Nan and inf are left as they are.
+    """
+    values = values.astype(np.float64, copy=False)
+    is_finite = np.isfinite(values)
+    finite_values = np.where(is_finite, values, 0.0)
+
+    # pandas rounds the fractional part of the absolute value, rounding
+    # ties to the even number
+    absolute_values = np.abs(finite_values)
+    whole_values = np.trunc(absolute_values)
+    scaled_fractions = (absolute_values - whole_values) * 10 ** PANDAS_JSON_DOUBLE_PRECISION
+    fractions = np.floor(scaled_fractions)
+    remainders = scaled_fractions - fractions
+    round_up = (remainders > 0.5) | ((remainders == 0.5) & ((fractions == 0) | (fractions % 2 == 1)))
+    fractions = fractions + round_up
+    is_carried = fractions >= 10 ** PANDAS_JSON_DOUBLE_PRECISION
+    whole_values = np.where(is_carried, whole_values + 1, whole_values)
+    fractions = np.where(is_carried, 0, fractions)
+
+    # Dividing the scaled integer gives the closest float to the written value, as json.loads 
+    # does. For larger values, we parse the written value, unless it is a whole number
+    rounded_values = np.where(
+        fractions == 0,
+        whole_values,
+        (whole_values * 10 ** PANDAS_JSON_DOUBLE_PRECISION + fractions) / 10 ** PANDAS_JSON_DOUBLE_PRECISION
+    )
+    rounded_values = np.where(finite_values < 0, -rounded_values, rounded_values)
+
+    is_large_with_fraction = (absolute_values >= MAX_EXACTLY_SCALED_FLOAT_VALUE) & (fractions != 0)
+    for index in np.flatnonzero(is_large_with_fraction):
+        sign = '-' if finite_values[index] < 0 else ''
+        rounded_values[index] = float(f'{sign}{int(whole_values[index])}.{int(fractions[index]):0{PANDAS_JSON_DOUBLE_PRECISION}d}')
+
+    is_scientific_notation = (absolute_values > PANDAS_JSON_MAX_DECIMAL_NOTATION_VALUE) | (
+        (absolute_values != 0) & (absolute_values < PANDAS_JSON_MIN_DECIMAL_NOTATION_VALUE)
+    )
+    for index in np.flatnonzero(is_scientific_notation):
+        rounded_values[index] = float(f'{finite_values[index]:.{PANDAS_JSON_DOUBLE_PRECISION}g}')
+
+    return np.where(is_finite, rounded_values, values)
+
+
+def _get_float_json_values(values: np.ndarray, null_value: Any) -> List[Any]:
+    """
+    Rounds the floats in values the same way that pandas does when it writes
+    them to json. Nan and inf, which pandas writes as null, become null_value.
+    """
+    rounded_values = get_rounded_float_values(values)
+    json_values = rounded_values.tolist()
+    return _set_null_values(json_values, ~np.isfinite(rounded_values), null_value)
+
+
+def _set_null_values(json_values: List[Any], is_null: np.ndarray, null_value: Any) -> List[Any]:
+    for index in np.flatnonzero(is_null):
+        json_values[index] = null_value
+    return json_values
+
+
+def _get_column_json_values(column: pd.Series, null_value: Any) -> List[Any]:
+    dtype = column.dtype
+    dtype_str = str(dtype)
+
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biu':
+        return column.to_numpy().tolist()
+    elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return _get_float_json_values(column.to_numpy(), null_value)
+    elif is_datetime_dtype(dtype_str):
+        # NOTE: we don't use the iso format pandas writes dates in, as it appends seconds
+        # to the object, see here: https://stackoverflow.com/questions/52730953/pandas-to-json-output-date-format-in-specific-form
+        json_values = column.dt.strftime('%Y-%m-%d %X').tolist()
+        return _set_null_values(json_values, column.isna().to_numpy(), null_value)
+    elif is_timedelta_dtype(dtype_str):
+        # We format the timedeltas as strings to make them readable, including NaT. NOTE: we
+        # don't use astype(str), as it leaves out the time if every timedelta is a whole day
+        return [str(value) for value in column]
+    elif dtype_str == 'object' and pd.api.types.infer_dtype(column, skipna=True) in ('string', 'empty'):
+        json_values = column.tolist()
+        return _set_null_values(json_values, column.isna().to_numpy(), null_value)
+
+    # For all other columns (e.g. mixed types, categories or nullable dtypes), we let pandas
+    # write the values, so that any objects are turned into json in the same way
+    json_values = json.loads(column.to_json(orient='values'))
+    return [null_value if value is None else value for value in json_values]
+
+
+def _get_column_key(column: pd.Series, null_value: Any) -> Optional[Tuple[ColumnKey, np.ndarray]]:
+    """
+    Returns a key that identifies the data in this column, as well as the values
+    of the column, or None if the column is not stored in a numpy array. 
+    
+    The key includes the bytes of the values, and so it identifies the values 
+    themselves, rather than the memory they are stored in. For object columns, 
+    these bytes are the addresses of the objects, and so the key only identifies 
+    the values while these objects are alive.
+    """
+    if not isinstance(column.dtype, np.dtype):
+        return None
+
+    values = column.to_numpy()
+    key = (values.dtype.str, values.shape, values.tobytes(), repr(null_value))
+    return key, values
+
+
+class ColumnJsonValuesCache():
+    """
+    A least recently used cache of the json values of columns, keyed by the data
+    in the column. 
+    
+    Steps often move columns they do not change to new memory (e.g. pandas copies
+    the other columns of the same dtype when a column is deleted), and so we key
+    by the data in the column, rather than by the memory it is stored in.
+
+    For object columns, we keep a copy of the values in the cache, so that the 
+    objects they point to are not freed while their addresses are used in a key.
+
+    We also cache the result of dumping the json values, so that a column that
+    is in the sheet data after many steps is only dumped once.
+    """
+
+    def __init__(self, max_cached_values: int):
+        self.max_cached_values = max_cached_values
+        self.num_cached_values = 0
+        # Each entry is [objects, json_values, dumped json_values or None]
+        self._cache: 'OrderedDict[ColumnKey, List[Any]]' = OrderedDict()
+        self._keys_by_json_values_id: Dict[int, ColumnKey] = dict()
+        # The sheet data is encoded in the main thread, while the API encodes sheet windows
+        # in its worker threads, so the cache is only changed behind this lock
+        self._lock = Lock()
+
+    def get(self, column: pd.Series, null_value: Any, get_json_values: Callable[[pd.Series, Any], List[Any]]) -> List[Any]:
+        key_and_values = _get_column_key(column, null_value)
+        if key_and_values is None:
+            return get_json_values(column, null_value)
+
+        key, values = key_and_values
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+        json_values = get_json_values(column, null_value)
+        objects = values.copy() if values.dtype == object else None
+
+        with self._lock:
+            # Another thread may have encoded the same column in the meantime
+            entry = self._cache.get(key)
+            if entry is not None:
+                return entry[1]
+
+            self._cache[key] = [objects, json_values, None]
+            self._keys_by_json_values_id[id(json_values)] = key
+            self.num_cached_values += len(json_values)
+
+            while self.num_cached_values > self.max_cached_values and len(self._cache) > 1:
+                _, (_, evicted_json_values, _) = self._cache.popitem(last=False)
+                del self._keys_by_json_values_id[id(evicted_json_values)]
+                self.num_cached_values -= len(evicted_json_values)
+
+        return json_values
+
+    def dumps(self, json_values: List[Any]) -> str:
+        """
+        Returns json.dumps(json_values), reusing the result if these json values
+        are in the cache and have been dumped before.
+        """
+        with self._lock:
+            key = self._keys_by_json_values_id.get(id(json_values))
+            entry = self._cache.get(key) if key is not None else None
+        # The cache holds the json values, so if they are in the cache, their id is not reused
+        if entry is None or entry[1] is not json_values:
+            return json.dumps(json_values)
+
+        if entry[2] is None:
+            entry[2] = json.dumps(json_values)
+        return entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._keys_by_json_values_id.clear()
+            self.num_cached_values = 0
+
+
+column_json_values_cache = ColumnJsonValuesCache(MAX_CACHED_COLUMN_JSON_VALUES)
+
+
+def get_column_json_values(column: pd.Series, null_value: Any='NaN') -> List[Any]:
+    """
+    Returns the values in the column in a form that can be passed to json.dumps,
+    with dates and timedeltas as strings, and nulls (nan, inf and NaT) as the
+    null_value.
+
+    NOTE: the returned list may be cached, and so must not be modified.
+    """
+    return column_json_values_cache.get(column, null_value, _get_column_json_values)
+
+
+def dumps_column_json_values(json_values: List[Any]) -> str:
+    """
+    Returns json.dumps(json_values) for json values returned from get_column_json_values,
+    without dumping the values of the same column more than once.
+    """
+    return column_json_values_cache.dumps(json_values)
+
+
+def get_index_json_values(index: pd.Index) -> List[Any]:
+    """
+    Returns the labels in the index in a form that can be passed to json.dumps. Unlike
+    the values in columns, null labels are left as None.
+    """
+    if isinstance(index, pd.RangeIndex):
+        return list(index)
+    return get_column_json_values(index.to_series(index=pd.RangeIndex(len(index))), null_value=None)
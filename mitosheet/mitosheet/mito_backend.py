@@ -7,14 +7,15 @@
 """
 Main file containing the mito widget.
 """
+import base64
 import json
 import os
 import re
 import time
+from functools import lru_cache
 from sysconfig import get_python_version
 from typing import Any, Dict, List, Optional, Union, Callable
 
-import numpy as np
 import pandas as pd
 from IPython import get_ipython
 from IPython.display import HTML, display
@@ -27,7 +28,8 @@ from mitosheet.errors import (MitoError, get_recent_traceback,
                               make_execution_error)
 from mitosheet.saved_analyses import write_analysis
 from mitosheet.steps_manager import StepsManager
-from mitosheet.telemetry.telemetry_utils import (log, log_event_processed,
+from mitosheet.telemetry.telemetry_utils import (identify_once, log,
+                                                 log_event_processed,
                                                  telemetry_turned_on)
 from mitosheet.updates.replay_analysis import REPLAY_ANALYSIS_UPDATE
 from mitosheet.user import is_local_deployment, should_upgrade_mitosheet
@@ -55,10 +57,14 @@ class MitoBackend():
             import_folder: Optional[str]=None,
             user_defined_functions: Optional[List[Callable]]=None,
             user_defined_importers: Optional[List[Callable]]=None,
+            send_column_buffers: bool=False,
         ):
         """
         Takes a list of dataframes and strings that are paths to CSV files
         passed through *args.
+
+        If send_column_buffers is True, the numeric columns of the sheet data are sent
+        to the frontend as binary buffers, which mito_send must take as buffers.
         """
         # Call the DOMWidget constructor to set up the widget properly
         super(MitoBackend, self).__init__()
@@ -73,7 +79,8 @@ class MitoBackend():
             analysis_to_replay=analysis_to_replay, 
             import_folder=import_folder,
             user_defined_functions=user_defined_functions,
-            user_defined_importers=user_defined_importers
+            user_defined_importers=user_defined_importers,
+            send_column_buffers=send_column_buffers
         )
 
         # And the api
@@ -88,7 +95,10 @@ class MitoBackend():
         self.should_upgrade_mitosheet = should_upgrade_mitosheet()
         self.received_tours = get_user_field(UJ_RECEIVED_TOURS)
 
-        self.mito_send: Callable = lambda x: None # type: ignore
+        self.mito_send: Callable = lambda *args, **kwargs: None # type: ignore
+
+        # Reidentify the user, just in case things have changed since they last used Mito
+        identify_once()
 
     @property
     def analysis_name(self):
@@ -105,6 +115,21 @@ class MitoBackend():
             'user_profile_json': self.get_user_profile_json()
         }
 
+    def send_shared_state_variables(self, event_id: str) -> None:
+        """
+        Sends the response to the event with event_id, with the shared state variables.
+        """
+        response = {
+            'event': 'response',
+            'id': event_id,
+            'shared_variables': self.get_shared_state_variables()
+        }
+        if self.steps_manager.send_column_buffers:
+            # The buffer of each sheet is sent alongside the sheet data json
+            self.mito_send(response, buffers=self.steps_manager.sheet_data_buffers)
+        else:
+            self.mito_send(response)
+
     def get_user_profile_json(self) -> str:
         return json.dumps({
             # Dynamic, update each time
@@ -146,11 +171,7 @@ class MitoBackend():
         # Tell the front-end to render the new sheet and new code with an empty
         # response. NOTE: in the future, we can actually send back some data
         # with the response (like an error), to get this response in-place!        
-        self.mito_send({
-            'event': 'response',
-            'id': event['id'],
-            'shared_variables': self.get_shared_state_variables()
-        })
+        self.send_shared_state_variables(event['id'])
 
 
     def handle_update_event(self, event: Dict[str, Any]) -> None:
@@ -184,11 +205,7 @@ class MitoBackend():
 
         # Tell the front-end to render the new sheet and new code with an empty
         # response. 
-        self.mito_send({
-            'event': 'response',
-            'id': event['id'],
-            'shared_variables': self.get_shared_state_variables()
-        })
+        self.send_shared_state_variables(event['id'])
 
     def receive_message(self, content: Dict[str, Any]) -> bool:
         """
@@ -265,10 +282,15 @@ class MitoBackend():
 
         return False
 
-with open(os.path.normpath(os.path.join(__file__, '..', 'mito_frontend.js'))) as f:
-    js_code_from_file = f.read()
-with open(os.path.normpath(os.path.join(__file__, '..', 'mito_frontend.css'))) as f:
-    css_code_from_file = f.read()
+@lru_cache(maxsize=None)
+def get_mito_frontend_bundle(file_name: str) -> str:
+    """
+    Returns the contents of the bundled frontend file with the file_name. We read
+    the bundles the first time we render a sheet, rather than when we import
+    mitosheet, as they are large.
+    """
+    with open(os.path.normpath(os.path.join(__file__, '..', file_name))) as f:
+        return f.read()
 
 
 def get_mito_backend(
@@ -280,7 +302,7 @@ def get_mito_backend(
     ) -> MitoBackend:
 
     # We pass in the dataframes directly to the widget
-    mito_backend = MitoBackend(*args, analysis_to_replay=analysis_to_replay, user_defined_functions=user_defined_functions, user_defined_importers=user_defined_importers) 
+    mito_backend = MitoBackend(*args, analysis_to_replay=analysis_to_replay, user_defined_functions=user_defined_functions, user_defined_importers=user_defined_importers, send_column_buffers=True) 
 
     # We create a callback that runs when the comm is actually created on the frontend
     def on_comm_creation(comm: Comm, open_msg: Dict[str, Any]) -> None:
@@ -306,6 +328,9 @@ def get_mito_backend(
 
 def get_mito_frontend_code(kernel_id: str, comm_target_id: str, div_id: str, mito_backend: MitoBackend) -> str:
 
+    js_code_from_file = get_mito_frontend_bundle('mito_frontend.js')
+    css_code_from_file = get_mito_frontend_bundle('mito_frontend.css')
+
     js_code = js_code_from_file.replace('REPLACE_THIS_WITH_DIV_ID', div_id)
     js_code = js_code.replace('REPLACE_THIS_WITH_KERNEL_ID', kernel_id)
     js_code = js_code.replace('REPLACE_THIS_WITH_COMM_TARGET_ID', comm_target_id)
@@ -313,14 +338,18 @@ def get_mito_frontend_code(kernel_id: str, comm_target_id: str, div_id: str, mit
     # with ` quotes, which properly contain the CSS string
     js_code = js_code.replace('"REPLACE_THIS_WITH_CSS"', "`" + css_code_from_file + "`")
     js_code = js_code.replace('`REPLACE_THIS_WITH_CSS`', "`" + css_code_from_file + "`")
-    # NOTE: we encode these as utf8 encoded byte arrays, so that we can avoid having to do complicated things with 
-    # replacing \t, etc, which is required because JSON.parse limits what characters are valid in strings (bah humbug)
-    def to_uint8_arr(string: str) -> List[int]:
-        return np.frombuffer(string.encode("utf8"), dtype=np.uint8).tolist()
-
-    js_code = js_code.replace('["REPLACE_THIS_WITH_SHEET_DATA_BYTES"]', f'{to_uint8_arr(mito_backend.steps_manager.sheet_data_json)}')
-    js_code = js_code.replace('["REPLACE_THIS_WITH_ANALYSIS_DATA_BYTES"]', f'{to_uint8_arr(mito_backend.steps_manager.analysis_data_json)}')
-    js_code = js_code.replace('["REPLACE_THIS_WITH_USER_PROFILE_BYTES"]', f'{to_uint8_arr(mito_backend.get_user_profile_json())}')
+    # NOTE: we encode these as base64 encoded utf8, so that we can avoid having to do complicated things with 
+    # replacing \t, etc, which is required because JSON.parse limits what characters are valid in strings (bah humbug).
+    # Base64 only uses characters that are valid in a JavaScript string, and is much smaller than writing out each byte
+    def to_base64(string: str) -> str:
+        return base64.b64encode(string.encode("utf8")).decode('ascii')
+
+    js_code = js_code.replace('REPLACE_THIS_WITH_SHEET_DATA_BASE64', to_base64(mito_backend.steps_manager.sheet_data_json))
+    js_code = js_code.replace('["REPLACE_THIS_WITH_SHEET_DATA_BUFFERS_BASE64"]', json.dumps([
+        base64.b64encode(buffer).decode('ascii') for buffer in mito_backend.steps_manager.sheet_data_buffers
+    ]))
+    js_code = js_code.replace('REPLACE_THIS_WITH_ANALYSIS_DATA_BASE64', to_base64(mito_backend.steps_manager.analysis_data_json))
+    js_code = js_code.replace('REPLACE_THIS_WITH_USER_PROFILE_BASE64', to_base64(mito_backend.get_user_profile_json()))
 
     return js_code
 
@@ -9,13 +9,20 @@ as well as the original dataframe, and returns the current state
 of the sheet as a dataframe
 """
 import datetime
-from distutils.version import LooseVersion
+import hashlib
 import re
 import warnings
-from typing import Any, Callable, List, Optional, Set, Tuple, Union
+import weakref
+from collections import OrderedDict
+from distutils.version import LooseVersion
+from functools import lru_cache
+from threading import Lock
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import pandas as pd
 
+from mitosheet.column_header_matcher import get_column_header_matcher
 from mitosheet.column_headers import get_column_header_display
 from mitosheet.errors import make_invalid_formula_error
 from mitosheet.is_type_utils import (is_datetime_dtype,
@@ -455,18 +462,16 @@ def get_raw_parser_matches(
 
     raw_parser_matches: List[RawParserMatch] = []
 
-    # We look for column headers from longest to shortest, to enable us
-    # to issues if one column header is a substring of another
-    # column header
-    column_headers_sorted = sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
+    # First, we find all of the column headers in the formula in a single pass. NOTE: for booleans, 
+    # and for multi-index headers, we match the same transformation that we make on the frontend
+    column_header_matcher = get_column_header_matcher(column_headers)
 
-    # First, we go through and replace all the column headers
-    for column_header in column_headers_sorted:
-        def find_column_headers(match: Any) -> Any:
-            found_column_header: str = match.group() # type:ignore
-            start = match.start()
-            end = match.end()
-            match_range = (start, end)
+    # Then, we go through the column headers from longest to shortest, and find the ones that
+    # are real matches
+    for column_header, match_ranges in column_header_matcher.get_matches(formula):
+        for match_range in match_ranges:
+            start, end = match_range
+            found_column_header = formula[start:end]
 
             # Do not replace the column header if it is in a string
             if match_covered_by_matches(string_matches, match_range):
@@ -475,13 +480,13 @@ def get_raw_parser_matches(
                 ends_with_quote = is_quote(str(column_header)[-1])
 
                 if is_string and not (starts_with_quote and ends_with_quote):
-                    return found_column_header
+                    continue
 
             # If this column header was already covered by another column header
             # that has been found, then this column header is just a substring
             # of another column header, so we avoid matching it
             if match_covered_by_matches([match['substring_range'] for match in raw_parser_matches], match_range):
-                return found_column_header
+                continue
 
             # First, we check if it's an unqualified column header with no index
             if is_no_index_after_column_header_match(formula, index, start, end):
@@ -492,7 +497,7 @@ def get_raw_parser_matches(
                     'unparsed': found_column_header,
                     'row_offset': 0
                 })
-                return
+                continue
 
             # Second, check if column header is follwed by an index of any variety
             number_index_label_match = get_index_match_from_number_index(formula, formula_label, index, end)
@@ -501,6 +506,9 @@ def get_raw_parser_matches(
 
             index_label_match = number_index_label_match or datetime_index_label_match or string_index_label_match or None
             if index_label_match is not None:
+                # NOTE: we add the column_header, not the found column header
+                # as the found column header is a string, and the column_header 
+                # may not be
                 raw_parser_matches.append({
                     'type': '{HEADER}',
                     'substring_range': match_range,
@@ -509,17 +517,6 @@ def get_raw_parser_matches(
                     'row_offset': index_label_match['row_offset']
                 })
                 raw_parser_matches.append(index_label_match)
-                return 
-            
-            # NOTE: we add the column_header, not the found column header
-            # as the found column header is a string, and the column_header 
-            # may not be
-            return found_column_header
-
-        # First, just find all of the matches, without changing the string, as this shifts indexes
-        # NOTE: for booleans, and for multi-index headers, we need to make the same transformation 
-        # that we make on the frontend
-        re.sub(re.escape(get_column_header_display(column_header)), find_column_headers, formula)
 
     # Sort the matches from start to end
     raw_parser_matches = sorted(raw_parser_matches, key=lambda x: x['substring_range'][0])
@@ -861,7 +858,7 @@ def replace_functions(
     return formula_with_functions, functions
 
 
-def parse_formula(
+def _parse_formula(
         formula: Optional[str], 
         column_header: ColumnHeader, 
         formula_label: Union[str, bool, int, float],
@@ -871,14 +868,6 @@ def parse_formula(
         throw_errors: bool=True,
         include_df_set: bool=True,
     ) -> Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]:
-    """
-    Returns a representation of the formula that is easy to handle, specifically
-    by returning (python_code, functions, column_header_dependencies), where column_headers
-    is a list of dependencies that the formula references.
-
-    If include_df_set, then will return {df_name}[{column_header}] = {parsed formula}, and if
-    not then will just return {parsed formula}
-    """
     # If the column doesn't have a formula, then there are no dependencies, duh!
     if formula is None or formula == '':
         return '', set(), set(), set()
@@ -935,6 +924,122 @@ def parse_formula(
     return final_code, functions, column_header_dependencies, index_label_dependencies
 
 
+# The number of parsed formulas we keep. Formulas are parsed many times when a
+# step is created, replayed and transpiled, so this is many more than we need
+MAX_CACHED_PARSED_FORMULAS = 1000
+
+ParsedFormula = Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]
+
+_parsed_formula_cache: 'OrderedDict[Tuple[Any, ...], ParsedFormula]' = OrderedDict()
+# The API worker threads parse formulas while the main thread does, so we lock the cache
+_parsed_formula_cache_lock = Lock()
+_index_fingerprints: Dict[int, Tuple['weakref.ref[pd.Index]', Optional[Tuple[Any, ...]]]] = dict()
+
+
+def _get_index_fingerprint(index: pd.Index) -> Optional[Tuple[Any, ...]]:
+    """
+    Returns a fingerprint of the labels in the index, as the row offsets of a parsed
+    formula depend on where its labels are in the index, or None if we cannot fingerprint
+    the index. 
+    
+    Hashing the labels is slow for large indexes, so we remember the fingerprint of each
+    index object, which steps share if they do not change the index.
+    """
+    if isinstance(index, pd.RangeIndex):
+        return ('range', index.start, index.stop, index.step)
+
+    index_id = id(index)
+    index_ref_and_fingerprint = _index_fingerprints.get(index_id)
+    if index_ref_and_fingerprint is not None and index_ref_and_fingerprint[0]() is index:
+        return index_ref_and_fingerprint[1]
+
+    fingerprint: Optional[Tuple[Any, ...]]
+    # Objects are hashed by their string, so we cannot tell apart 1 and '1' in a mixed index
+    inferred_type = pd.api.types.infer_dtype(index, skipna=False) if str(index.dtype) == 'object' else None
+    if inferred_type is not None and inferred_type.startswith('mixed'):
+        fingerprint = None
+    else:
+        try:
+            hashed_labels = pd.util.hash_pandas_object(index, index=False).to_numpy()
+            fingerprint = (type(index).__name__, str(index.dtype), inferred_type, len(index), hashlib.sha1(hashed_labels.tobytes()).hexdigest())
+        except TypeError:
+            # If the labels cannot be hashed (e.g. they are lists)
+            fingerprint = None
+
+    _index_fingerprints[index_id] = (weakref.ref(index, lambda _: _index_fingerprints.pop(index_id, None)), fingerprint)
+    return fingerprint
+
+
+def parse_formula(
+        formula: Optional[str], 
+        column_header: ColumnHeader, 
+        formula_label: Union[str, bool, int, float],
+        index_labels_formula_is_applied_to: FormulaAppliedToType,
+        df: pd.DataFrame,
+        df_name: str='df',
+        throw_errors: bool=True,
+        include_df_set: bool=True,
+    ) -> ParsedFormula:
+    """
+    Returns a representation of the formula that is easy to handle, specifically
+    by returning (python_code, functions, column_header_dependencies), where column_headers
+    is a list of dependencies that the formula references.
+
+    If include_df_set, then will return {df_name}[{column_header}] = {parsed formula}, and if
+    not then will just return {parsed formula}
+
+    As the same formula is parsed many times, we cache the parsed formula by the arguments, 
+    as well as the column headers, dtypes and index of the df, which are all that parsing uses.
+    """
+    if formula is None or formula == '':
+        return '', set(), set(), set()
+
+    index_fingerprint = _get_index_fingerprint(df.index)
+    if index_fingerprint is None:
+        return _parse_formula(formula, column_header, formula_label, index_labels_formula_is_applied_to, df, df_name=df_name, throw_errors=throw_errors, include_df_set=include_df_set)
+
+    # We use the repr of labels and headers, as 1, 1.0 and True are equal keys but give different code
+    key = (
+        formula, 
+        repr(column_header), 
+        repr(formula_label), 
+        repr(index_labels_formula_is_applied_to), 
+        df_name, 
+        throw_errors, 
+        include_df_set,
+        repr(list(zip(df.columns.tolist(), df.dtypes.tolist()))),
+        index_fingerprint
+    )
+
+    with _parsed_formula_cache_lock:
+        parsed_formula = _parsed_formula_cache.get(key)
+        if parsed_formula is not None:
+            _parsed_formula_cache.move_to_end(key)
+
+    if parsed_formula is None:
+        # NOTE: we do not cache formulas that fail to parse, so they throw the error every time.
+        # We parse outside of the lock, so that other threads do not wait for us to parse
+        parsed_formula = _parse_formula(formula, column_header, formula_label, index_labels_formula_is_applied_to, df, df_name=df_name, throw_errors=throw_errors, include_df_set=include_df_set)
+        with _parsed_formula_cache_lock:
+            _parsed_formula_cache[key] = parsed_formula
+            _parsed_formula_cache.move_to_end(key)
+            if len(_parsed_formula_cache) > MAX_CACHED_PARSED_FORMULAS:
+                _parsed_formula_cache.popitem(last=False)
+
+    # Return copies of the sets, so that callers cannot change what is cached
+    python_code, functions, column_header_dependencies, index_label_dependencies = parsed_formula
+    return python_code, set(functions), set(column_header_dependencies), set(index_label_dependencies)
+
+
+@lru_cache(maxsize=MAX_CACHED_PARSED_FORMULAS)
+def compile_formula_code(python_code: str) -> CodeType:
+    """
+    Returns the compiled python code of a parsed formula, so that formulas that
+    are executed again (e.g. when they are replayed) are not compiled again.
+    """
+    return compile(python_code, '<string>', 'exec')
+
+
 def get_frontend_formula_header_index_reference(
         column_header: ColumnHeader,
         row_offset: int,
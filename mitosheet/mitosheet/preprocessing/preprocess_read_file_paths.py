@@ -13,7 +13,7 @@ from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk
     generate_read_csv_code
 from mitosheet.preprocessing.preprocess_step_performer import \
     PreprocessStepPerformer
-from mitosheet.step_performers.import_steps.simple_import import \
+from mitosheet.step_performers.import_steps.csv_utils import \
     read_csv_get_delimiter_and_encoding
 from mitosheet.telemetry.telemetry_utils import log
 from mitosheet.transpiler.transpile_utils import get_str_param_name
@@ -11,6 +11,7 @@ def get_conditonal_formatting_result(
         df: pd.DataFrame,
         conditional_formatting_rules: List[Dict[str, Any]],
         max_rows: Optional[int]=MAX_ROWS,
+        row_start: int=0, # The first row to return results for, when getting a window of the sheet
     ) -> ConditionalFormattingResult: 
     from mitosheet.step_performers.filter import check_filters_contain_condition_that_needs_full_df
 
@@ -45,7 +46,12 @@ def get_conditonal_formatting_result(
                 full_applied_filter, _ = get_full_applied_filter(_df, column_header, 'And', filters)
 
                 # We can only take the first max_rows here, as this is all we need
-                applied_indexes = _df[full_applied_filter].head(max_rows).index.tolist()
+                if row_start > 0:
+                    # For a window of the sheet, we only need the results for the rows in the window
+                    row_end = row_start + max_rows if max_rows is not None else None
+                    applied_indexes = _df.iloc[row_start:row_end][full_applied_filter.iloc[row_start:row_end].to_numpy()].index.tolist()
+                else:
+                    applied_indexes = _df[full_applied_filter].head(max_rows).index.tolist()
 
                 for index in applied_indexes:
                     # We need to make this index valid json, and do so in a way that is consistent with how indexes
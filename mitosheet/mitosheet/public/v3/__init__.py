@@ -4,6 +4,7 @@ from mitosheet.public.v2 import (
 
 from mitosheet.public.v3.rolling_range import RollingRange
 from mitosheet.public.v3.formatting import add_formatting_to_excel_sheet
+from mitosheet.public.v3.graphs import downsample_graph_data, get_histogram_bins
 from mitosheet.public.v3.sheet_functions import FUNCTIONS
 from mitosheet.public.v3.sheet_functions import *
 
@@ -84,16 +84,20 @@ def get_type_args(tp: Any) -> Tuple[Any, ...]:
 
 def handle_sheet_function_errors(sheet_function: Callable) -> Callable:
 
+    # We get the types each parameter can have once, rather than every time the sheet function is called
+    parameters_and_type_args = [
+        (parameter, get_type_args(parameter.annotation) if parameter.annotation != inspect.Parameter.empty else None)
+        for parameter in inspect.signature(sheet_function).parameters.values()
+    ]
+
     @wraps(sheet_function)
     def wrapped_sheet_function(*args):   
 
-        parameters = inspect.signature(sheet_function).parameters
-
         # We ensure that all of the paramters match the type that is given to them
-        for index, (parameter, arg) in enumerate(zip(parameters.values(), args)):
-            if parameter.annotation == inspect.Parameter.empty:
+        for index, ((parameter, type_args), arg) in enumerate(zip(parameters_and_type_args, args)):
+            if type_args is None:
                 continue
-            if not any(isinstance(arg, t) for t in get_type_args(parameter.annotation)):
+            if not any(isinstance(arg, t) for t in type_args):
                 raise make_invalid_arg_error(sheet_function.__name__, parameter.name, index, type(arg).__name__)
         
         try:
@@ -1,7 +1,9 @@
 from typing import Optional
 
+from openpyxl.formatting.rule import FormulaRule
 from openpyxl.styles import Font, PatternFill
 from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
 from pandas import ExcelWriter
 
 def add_formatting_to_excel_sheet(
@@ -43,31 +45,19 @@ def add_formatting_to_excel_sheet(
             for col in range(1, sheet.max_column + 1):
                 sheet.cell(row=1, column=col).style = header_name
 
-        # Add formatting to the rows
-        even_name = f"{sheet_name}_Even"
-        odd_name = f"{sheet_name}_Odd"
-        even_format = NamedStyle(name=even_name)
-        odd_format = NamedStyle(name=odd_name)
-
-        # Remove the # from the colors and define the formatting objects
-        if even_background_color:
-            even_format.fill = PatternFill(start_color=even_background_color[1:], end_color=even_background_color[1:], fill_type="solid")
-        if even_font_color:
-            even_format.font = Font(color=even_font_color[1:])
-        if odd_background_color:
-            odd_format.fill = PatternFill(start_color=odd_background_color[1:], end_color=odd_background_color[1:], fill_type="solid")
-        if odd_font_color:
-            odd_format.font = Font(color=odd_font_color[1:])
-        
-        # Only add format if there is a background color or font color
+        # Add formatting to the rows. Rather than styling each cell, we add a conditional 
+        # format for the even and odd rows, which Excel applies to the entire range
         has_row_formatting = even_background_color or even_font_color or odd_background_color or odd_font_color
-        if has_row_formatting:
-            workbook.add_named_style(even_format)
-            workbook.add_named_style(odd_format)
-
-            for row in range(2, sheet.max_row + 1):
-                for col in range(1, sheet.max_column + 1):
-                    if row % 2 == 0:
-                        sheet.cell(row=row, column=col).style = even_name
-                    else:
-                        sheet.cell(row=row, column=col).style = odd_name
\ No newline at end of file
+        if has_row_formatting and sheet.max_row > 1:
+            data_range = f'A2:{get_column_letter(sheet.max_column)}{sheet.max_row}'
+            for formula, background_color, font_color in [
+                ('MOD(ROW(),2)=0', even_background_color, even_font_color),
+                ('MOD(ROW(),2)=1', odd_background_color, odd_font_color)
+            ]:
+                if not background_color and not font_color:
+                    continue
+                
+                # Remove the # from the colors and define the formatting objects
+                fill = PatternFill(start_color=background_color[1:], end_color=background_color[1:], fill_type="solid") if background_color else None
+                font = Font(color=font_color[1:]) if font_color else None
+                sheet.conditional_formatting.add(data_range, FormulaRule(formula=[formula], fill=fill, font=font))
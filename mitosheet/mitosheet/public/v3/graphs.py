@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Reduces the data in a graph of a large dataframe, so that the graph stays small
+enough for the browser, while it still looks like a graph of all of the data.
+
+Each type of graph is reduced in the way that keeps it looking the same:
+- Line graphs keep the points of each line that Largest-Triangle-Three-Buckets
+  (LTTB) picks, which keeps the peaks and troughs of the line.
+- Scatter plots keep one point in each cell of a grid over each trace that has
+  a point in it, which keeps the shape of the points and their outliers.
+- Bar charts sum the rows that plotly stacks into one bar, keeping positive
+  and negative values apart, as plotly stacks them in opposite directions.
+- Histograms are binned with numpy, and just the bins are graphed.
+- The other graphs keep evenly spaced rows, which keep the distribution of the data.
+
+These are used for the graphs in the sheet, and in the code that is generated for them.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.types import ColumnHeader
+
+# The most points that we graph
+MAX_GRAPHED_POINTS = 10_000
+
+# The most bins that we bin a histogram into, if the number of bins is not given
+MAX_HISTOGRAM_BINS = 500
+
+GraphColumns = Union[ColumnHeader, List[ColumnHeader], None]
+
+
+def _get_column_headers(column_headers: GraphColumns) -> List[ColumnHeader]:
+    if column_headers is None:
+        return []
+    if isinstance(column_headers, list):
+        return cast(List[ColumnHeader], column_headers)
+    return [column_headers]
+
+
+def _get_unique_column_headers(column_headers: Sequence[Optional[ColumnHeader]]) -> List[ColumnHeader]:
+    unique_column_headers: List[ColumnHeader] = []
+    for column_header in column_headers:
+        if column_header is not None and column_header not in unique_column_headers:
+            unique_column_headers.append(column_header)
+    return unique_column_headers
+
+
+def _get_axes(x: GraphColumns, y: GraphColumns) -> Optional[Tuple[Optional[ColumnHeader], List[ColumnHeader]]]:
+    """
+    Returns the column that the values are graphed against (or None if they are graphed against
+    the index) and the columns with the values, or None if both axes have multiple columns.
+    """
+    x_column_headers = _get_column_headers(x)
+    y_column_headers = _get_column_headers(y)
+    if len(x_column_headers) <= 1 and len(y_column_headers) >= 1:
+        return (x_column_headers[0] if len(x_column_headers) == 1 else None), y_column_headers
+    if len(y_column_headers) <= 1 and len(x_column_headers) >= 1:
+        return (y_column_headers[0] if len(y_column_headers) == 1 else None), x_column_headers
+    return None
+
+
+def _is_number_series(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _get_float_values(series: pd.Series) -> np.ndarray:
+    """
+    Returns the values of a number series as floats, with nulls as NaN.
+
+    NOTE: we fill the nulls before converting the values, as nullable integers with
+    nulls cannot be converted to floats, and to_numpy only takes an na_value in pandas 1.0
+    """
+    is_null = series.isna().to_numpy()
+    float_values = np.asarray(series.fillna(0) if is_null.any() else series, dtype='float64').copy()
+    float_values[is_null] = np.nan
+    return float_values
+
+
+def _get_group_numbers(keys: List[pd.Series]) -> np.ndarray:
+    """
+    Returns the number of the group that each row is in, where the rows with the same
+    values in all of the keys are in the same group, and the groups are numbered in the 
+    order of their first row. Rows with null keys are grouped too, as plotly graphs them.
+
+    NOTE: we group by the codes of the values in the keys, where nulls are -1, as grouping
+    by the values themselves drops the nulls before pandas 1.1 (which adds dropna=False)
+    """
+    codes = [pd.factorize(key)[0] for key in keys]
+    return pd.Series(np.arange(len(codes[0]))).groupby(codes, sort=False).ngroup().to_numpy()
+
+
+def _get_group_first_positions(group_numbers: np.ndarray) -> np.ndarray:
+    """
+    Returns the position of the first row in each group, in the order of the group numbers.
+    """
+    _, first_positions = np.unique(group_numbers, return_index=True)
+    return first_positions
+
+
+def _get_positions_values(series: pd.Series, positions: np.ndarray) -> np.ndarray:
+    """
+    Returns the values of the series at the positions as floats, where values that
+    are not numbers or datetimes are placed at the index of their unique value.
+    """
+    values = series.iloc[positions]
+    if _is_number_series(values):
+        return _get_float_values(values)
+    if pd.api.types.is_datetime64_any_dtype(values) or pd.api.types.is_timedelta64_dtype(values):
+        float_values = values.array.asi8.astype('float64')
+        float_values[values.isna().to_numpy()] = np.nan
+        return float_values
+    codes, _ = pd.factorize(values)
+    float_values = codes.astype('float64')
+    float_values[codes == -1] = np.nan
+    return float_values
+
+
+def _get_trace_positions(df: pd.DataFrame, group_column_headers: List[ColumnHeader]) -> List[np.ndarray]:
+    """
+    Returns the positions of the rows in each of the traces that plotly splits
+    the graph into by the group columns.
+    """
+    if len(group_column_headers) == 0:
+        return [np.arange(len(df))]
+    group_numbers = _get_group_numbers([df[column_header] for column_header in group_column_headers])
+    group_sizes = np.bincount(group_numbers)
+    return np.split(np.argsort(group_numbers, kind='stable'), np.cumsum(group_sizes)[:-1])
+
+
+def get_evenly_spaced_positions(num_rows: int, num_points: int) -> np.ndarray:
+    """
+    Returns the positions of num_points rows spaced evenly through num_rows rows.
+    """
+    if num_rows <= num_points:
+        return np.arange(num_rows)
+    return np.unique(np.linspace(0, num_rows - 1, max(num_points, 2)).astype('int64'))
+
+
+def get_lttb_positions(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Returns the positions of the num_points points that Largest-Triangle-Three-Buckets
+    picks to draw the line through the points x, y.
+
+    The first and last points are always picked. The other points are split into
+    num_points - 2 buckets, and from each bucket we pick the point that makes the largest
+    triangle with the point picked from the previous bucket and the average of the next bucket.
+    """
+    num_rows = len(x)
+    if num_points >= num_rows or num_points < 3:
+        return np.arange(num_rows)
+
+    bucket_starts = np.linspace(1, num_rows - 1, num_points - 1).astype('int64')
+    positions = np.empty(num_points, dtype='int64')
+    positions[0] = 0
+    positions[-1] = num_rows - 1
+
+    picked = 0
+    for bucket_index in range(num_points - 2):
+        start, end = bucket_starts[bucket_index], bucket_starts[bucket_index + 1]
+        next_start = end
+        next_end = bucket_starts[bucket_index + 2] if bucket_index + 2 < len(bucket_starts) else num_rows
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        picked_x, picked_y = x[picked], y[picked]
+        areas = np.abs((picked_x - next_x) * (y[start:end] - picked_y) - (picked_x - x[start:end]) * (next_y - picked_y))
+        picked = start + int(np.argmax(areas))
+        positions[bucket_index + 1] = picked
+
+    return positions
+
+
+def _get_line_positions(
+        df: pd.DataFrame,
+        trace_positions: List[np.ndarray],
+        against_column_header: Optional[ColumnHeader],
+        value_column_headers: List[ColumnHeader],
+        max_points: int
+    ) -> np.ndarray:
+    num_points = max(3, max_points // (len(trace_positions) * len(value_column_headers)))
+
+    picked_positions = []
+    for positions in trace_positions:
+        x = _get_positions_values(df[against_column_header], positions) if against_column_header is not None else positions.astype('float64')
+        for value_column_header in value_column_headers:
+            if not _is_number_series(df[value_column_header]):
+                picked_positions.append(positions[get_evenly_spaced_positions(len(positions), num_points)])
+                continue
+
+            y = _get_positions_values(df[value_column_header], positions)
+            # Points without a value are not drawn, so we pick from the points that are
+            is_drawn = np.isfinite(x) & np.isfinite(y)
+            drawn_positions = np.flatnonzero(is_drawn)
+            picked = get_lttb_positions(x[drawn_positions], y[drawn_positions], num_points)
+            picked_positions.append(positions[drawn_positions[picked]])
+
+    return np.unique(np.concatenate(picked_positions))
+
+
+def _get_scatter_positions(
+        df: pd.DataFrame,
+        trace_positions: List[np.ndarray],
+        against_column_header: Optional[ColumnHeader],
+        value_column_headers: List[ColumnHeader],
+        max_points: int
+    ) -> np.ndarray:
+    # The number of cells along each side of the grid over each trace
+    grid_size = max(1, int(np.sqrt(max_points / (len(trace_positions) * len(value_column_headers)))))
+
+    def get_cells(values: np.ndarray) -> np.ndarray:
+        min_value, max_value = np.nanmin(values), np.nanmax(values)
+        if max_value == min_value:
+            return np.zeros(len(values), dtype='int64')
+        return np.clip(((values - min_value) / (max_value - min_value) * grid_size).astype('int64'), 0, grid_size - 1)
+
+    picked_positions = []
+    for positions in trace_positions:
+        x = _get_positions_values(df[against_column_header], positions) if against_column_header is not None else positions.astype('float64')
+        for value_column_header in value_column_headers:
+            y = _get_positions_values(df[value_column_header], positions)
+            # Points without a value are not drawn, so we pick from the points that are
+            drawn_positions = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+            if len(drawn_positions) == 0:
+                continue
+            cells = get_cells(x[drawn_positions]) * grid_size + get_cells(y[drawn_positions])
+            _, first_in_cell = np.unique(cells, return_index=True)
+            picked_positions.append(positions[drawn_positions[first_in_cell]])
+
+    if len(picked_positions) == 0:
+        return np.arange(0)
+    return np.unique(np.concatenate(picked_positions))
+
+
+def _get_bar_sums(
+        df: pd.DataFrame,
+        against_column_header: Optional[ColumnHeader],
+        value_column_headers: List[ColumnHeader],
+        group_column_headers: List[ColumnHeader],
+    ) -> Optional[pd.DataFrame]:
+    """
+    Returns one row for each bar that plotly draws for each of the value columns, with the sum
+    of the positive and the sum of the negative values in it, or None if they cannot be summed.
+    """
+    if against_column_header is None:
+        return None
+    key_column_headers = _get_unique_column_headers([against_column_header, *group_column_headers])
+    if any(value_column_header in key_column_headers or not _is_number_series(df[value_column_header]) for value_column_header in value_column_headers):
+        return None
+
+    sums = []
+    for value_column_header in value_column_headers:
+        values = df[value_column_header]
+        for is_negative in [False, True]:
+            rows = df[values < 0] if is_negative else df[values >= 0]
+            if len(rows) == 0:
+                continue
+            group_numbers = _get_group_numbers([rows[column_header] for column_header in key_column_headers])
+            bar_sums = rows.iloc[_get_group_first_positions(group_numbers)][key_column_headers].reset_index(drop=True)
+            bar_sums[value_column_header] = rows[value_column_header].groupby(group_numbers).sum().to_numpy()
+            sums.append(bar_sums)
+
+    if len(sums) == 0:
+        return None
+
+    # If a row has a value in one column but not the others, plotly draws nothing for the others
+    bar_sums = pd.concat(sums, ignore_index=True)
+    return bar_sums[[column_header for column_header in df.columns if column_header in bar_sums.columns]]
+
+
+def downsample_graph_data(
+        df: pd.DataFrame,
+        graph_type: str,
+        x: GraphColumns=None,
+        y: GraphColumns=None,
+        color: Optional[ColumnHeader]=None,
+        facet_col: Optional[ColumnHeader]=None,
+        facet_row: Optional[ColumnHeader]=None,
+        barmode: Optional[str]=None,
+        max_points: int=MAX_GRAPHED_POINTS
+    ) -> pd.DataFrame:
+    """
+    Returns the data to graph in a graph of the graph_type, so that it has about
+    max_points points, and looks like a graph of all of the data in df.
+    """
+    if len(df) <= max_points:
+        return df
+
+    axes = _get_axes(x, y)
+    group_column_headers = _get_unique_column_headers([color, facet_col, facet_row])
+
+    if axes is not None:
+        against_column_header, value_column_headers = axes
+        if graph_type == 'line':
+            trace_positions = _get_trace_positions(df, group_column_headers)
+            return df.iloc[_get_line_positions(df, trace_positions, against_column_header, value_column_headers, max_points)]
+        elif graph_type == 'scatter':
+            trace_positions = _get_trace_positions(df, group_column_headers)
+            return df.iloc[_get_scatter_positions(df, trace_positions, against_column_header, value_column_headers, max_points)]
+        elif graph_type == 'bar' and barmode in [None, 'relative', 'stack']:
+            bar_sums = _get_bar_sums(df, against_column_header, value_column_headers, group_column_headers)
+            if bar_sums is not None:
+                return bar_sums.iloc[get_evenly_spaced_positions(len(bar_sums), max_points)]
+
+    return df.iloc[get_evenly_spaced_positions(len(df), max_points)]
+
+
+def get_histogram_bin_axes(
+        df: pd.DataFrame,
+        x: GraphColumns,
+        y: GraphColumns,
+        color: Optional[ColumnHeader]=None,
+        facet_col: Optional[ColumnHeader]=None,
+        facet_row: Optional[ColumnHeader]=None,
+    ) -> Optional[Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader]]:
+    """
+    Returns the column that a histogram bins, the column that it aggregates (if any), and
+    the column that the binned histogram graphs, or None if we cannot bin the histogram.
+    """
+    x_column_headers = _get_column_headers(x)
+    y_column_headers = _get_column_headers(y)
+    if len(x_column_headers) > 1 or len(y_column_headers) > 1 or len(x_column_headers) + len(y_column_headers) == 0:
+        return None
+
+    binned_column_header = x_column_headers[0] if len(x_column_headers) == 1 else y_column_headers[0]
+    aggregated_column_header = y_column_headers[0] if len(x_column_headers) == 1 and len(y_column_headers) == 1 else None
+
+    binned_series = df[binned_column_header]
+    if pd.api.types.is_datetime64_any_dtype(binned_series) or pd.api.types.is_timedelta64_dtype(binned_series):
+        return None
+    if _is_number_series(binned_series):
+        if binned_column_header in [color, facet_col, facet_row]:
+            return None
+        if not np.isfinite(_get_float_values(binned_series)).any():
+            return None
+    if aggregated_column_header is not None:
+        if not _is_number_series(df[aggregated_column_header]) or aggregated_column_header in [binned_column_header, color, facet_col, facet_row]:
+            return None
+        return binned_column_header, aggregated_column_header, aggregated_column_header
+
+    # Without a column to aggregate, we graph the number of rows in each bin
+    count_column_header = 'count'
+    while count_column_header in df.columns:
+        count_column_header = f'{count_column_header}_'
+    return binned_column_header, None, count_column_header
+
+
+def get_binned_histogram_histfunc(histfunc: Optional[str], aggregated_column_header: Optional[ColumnHeader]) -> str:
+    """
+    Returns the histfunc to graph the binned histogram with. As there is one row for each
+    bin, any histfunc other than count gives the value in that row.
+    """
+    if aggregated_column_header is None or histfunc in [None, 'count', 'sum']:
+        return 'sum'
+    return histfunc
+
+
+def get_histogram_bins(
+        df: pd.DataFrame,
+        x: GraphColumns=None,
+        y: GraphColumns=None,
+        color: Optional[ColumnHeader]=None,
+        facet_col: Optional[ColumnHeader]=None,
+        facet_row: Optional[ColumnHeader]=None,
+        histfunc: Optional[str]=None,
+        nbins: Optional[int]=None,
+        max_bins: int=MAX_HISTOGRAM_BINS
+    ) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    """
+    Bins the data in a histogram, and returns a dataframe with one row for each bar of the
+    histogram, and the bins to graph it with. The bins are None if the binned column is
+    not numbers, in which case there is a bar for each of its values.
+
+    Graph the dataframe with px.histogram, using the bins for xbins (or ybins if the histogram
+    is horizontal), and using get_binned_histogram_histfunc as the histfunc. Raises a ValueError
+    if the histogram cannot be binned.
+    """
+    bin_axes = get_histogram_bin_axes(df, x, y, color, facet_col, facet_row)
+    if bin_axes is None:
+        raise ValueError('This histogram cannot be binned')
+    binned_column_header, aggregated_column_header, graphed_column_header = bin_axes
+    group_column_headers = _get_unique_column_headers([color, facet_col, facet_row])
+    group_column_headers = [column_header for column_header in group_column_headers if column_header != binned_column_header]
+
+    binned_series = df[binned_column_header]
+    bins = None
+    if _is_number_series(binned_series):
+        values = _get_float_values(binned_series)
+        is_finite = np.isfinite(values)
+        finite_values = values[is_finite]
+
+        bin_edges = np.histogram_bin_edges(finite_values, bins=nbins if nbins is not None else 'auto')
+        if nbins is None and len(bin_edges) - 1 > max_bins:
+            bin_edges = np.histogram_bin_edges(finite_values, bins=max_bins)
+        start, size, num_bins = bin_edges[0], bin_edges[1] - bin_edges[0], len(bin_edges) - 1
+        bin_indexes = np.clip(((finite_values - start) / size).astype('int64'), 0, num_bins - 1)
+
+        df = df[is_finite]
+        # We put each row in the middle of its bin, so it is always in that bin in plotly
+        keys = [pd.Series(bin_indexes, name=binned_column_header, index=df.index)] + [df[column_header] for column_header in group_column_headers]
+        bins = {'start': float(start), 'end': float(bin_edges[-1]), 'size': float(size)}
+    else:
+        keys = [df[column_header] for column_header in [binned_column_header] + group_column_headers]
+
+    group_numbers = _get_group_numbers(keys)
+    groups = df.groupby(group_numbers)
+    if aggregated_column_header is None:
+        aggregated = groups.size()
+    elif histfunc == 'count':
+        aggregated = groups[aggregated_column_header].count()
+    elif histfunc in [None, 'sum']:
+        aggregated = groups[aggregated_column_header].sum(min_count=1)
+    else:
+        aggregated = groups[aggregated_column_header].agg('mean' if histfunc == 'avg' else histfunc)
+
+    # Each bar has the keys of the first row in it
+    binned_df = pd.concat([key.reset_index(drop=True) for key in keys], axis=1).iloc[_get_group_first_positions(group_numbers)].reset_index(drop=True)
+    binned_df[graphed_column_header] = aggregated.to_numpy()
+    if bins is not None:
+        binned_df[binned_column_header] = bins['start'] + (binned_df[binned_column_header] + 0.5) * bins['size']
+    return binned_df, bins
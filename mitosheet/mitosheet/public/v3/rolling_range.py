@@ -1,9 +1,18 @@
 
 from datetime import datetime, timedelta
-from typing import Callable, Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+# The aggregations that a rolling range can compute for all windows at once, rather
+# than by calling a function with each window. Each is the aggregation of all the
+# non-null values in the window, e.g. 'sum' is df.sum().sum() for each window df
+ROLLING_RANGE_AGGREGATIONS = ['sum', 'count', 'min', 'max', 'std', 'var']
+
+# Rolling windows compute in floats, which store every integer up to this exactly
+MAX_SAFE_INTEGER = 2 ** 53
+
 
 class RollingRange():
     """
@@ -28,6 +37,10 @@ class RollingRange():
 
     Thus, we need to attach both the window size and the offset in a single expression, and
     thus this is exactly what we capture in this new object.
+
+    Sheet functions that aggregate the values in each window (e.g. SUM or MIN) should use
+    .aggregate, which computes the aggregation for all the windows at once, with pandas rolling
+    windows. Otherwise, they can call .apply with any function, which is called once per window.
     """
 
     def __init__(self, obj: pd.DataFrame, window: int, offset: int):
@@ -47,7 +60,7 @@ class RollingRange():
         end = start + self.window
 
         while (start - self.offset) < len(self.obj): 
-            df_subset = self.obj[max(0, start):end] # avoid negative start, as this wraps around to the end
+            df_subset = self.obj[max(0, start):max(0, end)] # avoid negative start or end, as these wrap around to the end
 
             # We manually detect the default value case, as it messes up types otherwise (e.g. .sum().sum() returns a float with an empty df)
             if len(df_subset) == 0:
@@ -67,4 +80,110 @@ class RollingRange():
             else:
                 result = result + default_values
 
-        return pd.Series(result, index=self.obj.index)
\ No newline at end of file
+        return pd.Series(result, index=self.obj.index)
+
+    def aggregate(self, aggregation: str, default_value: Union[str, float, int, bool, datetime, timedelta]=0) -> pd.Series:
+        """
+        Returns the aggregation (one of ROLLING_RANGE_AGGREGATIONS) of the values in 
+        each window, with the same result as calling .apply with a function that does 
+        this aggregation on each window. 
+
+        For numeric dataframes, we compute this for all windows at once. For all other
+        dataframes (e.g. datetimes), we fall back to calling the function with each window.
+        """
+        result = self._get_vectorized_aggregation(aggregation, default_value)
+        if result is not None:
+            return result
+
+        def aggregate_window(df: pd.DataFrame) -> Union[str, float, int, bool, datetime, timedelta]:
+            if aggregation == 'sum':
+                return df.sum().sum()
+            elif aggregation == 'count':
+                return df.count().sum()
+            elif aggregation == 'min':
+                return df.min().min()
+            elif aggregation == 'max':
+                return df.max().max()
+            elif aggregation == 'std':
+                return df.stack().std()
+            elif aggregation == 'var':
+                return df.stack().var()
+            raise ValueError(f'{aggregation} is not a rolling range aggregation')
+
+        return self.apply(aggregate_window, default_value=default_value)
+
+    def _get_window_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the start and end (exclusive) row of the window for each row, clipped to 
+        the rows in the dataframe.
+        """
+        num_rows = len(self.obj)
+        window_starts = np.arange(num_rows) + self.offset
+        return np.clip(window_starts, 0, num_rows), np.clip(window_starts + self.window, 0, num_rows)
+
+    def _get_rolling_windows(self, values: np.ndarray, num_values_per_row: int) -> Tuple['pd.core.window.rolling.Rolling', np.ndarray]:
+        """
+        Returns rolling windows over the values, which has num_values_per_row values for
+        each row, as well as the position in these rolling windows of the window for each row.
+
+        Pandas rolling windows end at each position, so we pad the values with nans (which
+        are not counted in any aggregation) on both sides, and then shift each window to the
+        position where it ends.
+        """
+        window_size = self.window * num_values_per_row
+        padding = np.full(window_size, np.nan)
+        padded_values = pd.Series(np.concatenate([padding, values.astype(np.float64), padding]))
+
+        # Windows that do not overlap the dataframe are clipped, as they are replaced by the default value
+        window_ends = (np.arange(len(self.obj)) + self.offset + 2 * self.window) * num_values_per_row - 1
+        return padded_values.rolling(window_size, min_periods=1), np.clip(window_ends, 0, len(padded_values) - 1)
+
+    def _get_vectorized_aggregation(self, aggregation: str, default_value: Union[str, float, int, bool, datetime, timedelta]) -> Optional[pd.Series]:
+        """
+        Returns the aggregation for each window, computed with rolling windows, or None 
+        if the values in the dataframe are not numbers.
+        """
+        if aggregation not in ROLLING_RANGE_AGGREGATIONS or len(self.obj) == 0 or self.window < 1:
+            return None
+        if not all(isinstance(dtype, np.dtype) and dtype.kind in 'iuf' for dtype in self.obj.dtypes):
+            return None
+
+        is_int = all(dtype.kind in 'iu' for dtype in self.obj.dtypes)
+        window_starts, window_ends = self._get_window_bounds()
+        is_empty_window = window_starts >= window_ends
+        if is_empty_window.all():
+            return pd.Series([default_value] * len(self.obj), index=self.obj.index)
+
+        values: np.ndarray
+        if aggregation == 'count' or (aggregation == 'sum' and is_int):
+            # We sum integers exactly, by taking the difference of the running sum 
+            # at the end and the start of each window
+            row_values = self.obj.count(axis=1) if aggregation == 'count' else self.obj.sum(axis=1)
+            running_sums = np.concatenate([[0], np.cumsum(row_values.to_numpy(dtype=np.int64))])
+            values = running_sums[window_ends] - running_sums[window_starts]
+
+        elif aggregation in ('sum', 'min', 'max'):
+            # The sum, min or max of a window is the sum, min or max of its rows
+            row_values = getattr(self.obj, aggregation)(axis=1).to_numpy()
+            if is_int and np.abs(row_values).max() > MAX_SAFE_INTEGER:
+                return None
+
+            rolling_windows, rolling_window_ends = self._get_rolling_windows(row_values, 1)
+            values = getattr(rolling_windows, aggregation)().to_numpy()[rolling_window_ends]
+            if is_int:
+                values = np.where(is_empty_window, 0, values).astype(np.int64)
+
+        else:
+            # The variance of a window is not the variance of its rows, and so we roll 
+            # over all of the values in the dataframe, row by row
+            rolling_windows, rolling_window_ends = self._get_rolling_windows(
+                self.obj.to_numpy(dtype=np.float64).reshape(-1), len(self.obj.columns)
+            )
+            values = getattr(rolling_windows, aggregation)().to_numpy()[rolling_window_ends]
+
+        # Windows that do not overlap the dataframe are the default value, as in .apply
+        if is_empty_window.any():
+            values = np.where(is_empty_window, default_value, values) # type: ignore
+
+        return pd.Series(values, index=self.obj.index)
+
@@ -1,7 +1,7 @@
 
 
 
-from typing import Callable, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, Union
 import numpy as np
 from datetime import datetime, timedelta
 
@@ -9,6 +9,9 @@ import pandas as pd
 
 from mitosheet.public.v3.rolling_range import RollingRange
 
+MIN_INT64 = np.iinfo(np.int64).min
+MAX_INT64 = np.iinfo(np.int64).max
+
 
 PrimitiveType = TypeVar('PrimitiveType', bound=Union[str, float, int, bool, datetime, timedelta])
 
@@ -22,6 +25,71 @@ def __get_default_value_if_value_is_none_or_nan(value: PrimitiveType, default_va
     return value
 
 
+def __is_int(value: Any) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_))
+
+
+def __is_float(value: Any) -> bool:
+    return isinstance(value, (float, np.floating))
+
+
+def __combines_ints_and_floats_into_floats(get_new_result_from_primitive_values: Callable[[Any, Any], Any]) -> bool:
+    """
+    Returns True if combining an int and a float always gives a float, like for + and *, 
+    but not for max and min, which give back whichever value is bigger or smaller.
+    """
+    try:
+        return all(
+            __is_float(get_new_result_from_primitive_values(value_one, value_two))
+            for value_one, value_two in [(1, 2.0), (2.0, 1), (2, 1.0), (1.0, 2)]
+        )
+    except Exception:
+        return False
+
+
+def __can_broadcast_primitive_values(
+        series: pd.Series, 
+        primitive_values: Tuple[Any, ...],
+        get_new_result_from_primitive_values: Callable[[Any, Any], Any],
+    ) -> bool:
+    """
+    Returns True if combining the series with the primitive values as series gives the
+    same result as combining each value in the series with the primitive values. 
+
+    This is the case for series of booleans with primitive booleans, series of int64s and 
+    float64s with primitive numbers, and series of strings with primitive strings, as the 
+    values in these series have the same types as their dtype, and as the NaN values in
+    them are all filled by fillna. 
+    
+    When we combine ints with floats, we also need each combined value to be a float, as 
+    it is in a series.
+    """
+    if len(series) == 0:
+        # Combining each value in an empty series keeps its dtype, which is fast anyways
+        return False
+    elif series.dtype == np.bool_:
+        return all(isinstance(value, (bool, np.bool_)) for value in primitive_values)
+    elif series.dtype in (np.int64, np.float64):
+        # NOTE: ints outside of the int64 range are not turned into int64s
+        if not all(__is_float(value) or (__is_int(value) and MIN_INT64 <= value <= MAX_INT64) for value in primitive_values):
+            return False
+
+        values_are_ints = [series.dtype == np.int64] + [__is_int(value) for value in primitive_values]
+        if all(values_are_ints) or not any(values_are_ints):
+            return True
+        return __combines_ints_and_floats_into_floats(get_new_result_from_primitive_values)
+    elif series.dtype == object and all(isinstance(value, str) for value in primitive_values):
+        if pd.api.types.infer_dtype(series, skipna=False) == 'string':
+            return True
+        if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+            return False
+        # fillna also fills NaT and NA, which are not filled when combining each value
+        null_values = series[series.isna()]
+        return all(value is None or isinstance(value, float) for value in null_values)
+    
+    return False
+
+
 def __get_new_result_series_or_primitive_helper(
         default_value: PrimitiveType,
         previous_result: ResultType, 
@@ -36,20 +104,42 @@ def __get_new_result_series_or_primitive_helper(
     It does so by:
     1. Filling NaN values with the default value.
     2. Delegating to the get_new_result_from_primitive_values and get_new_result_from_series functions
+
+    When combining a series with a primitive value, we turn the primitive value into a series and 
+    use get_new_result_from_series when we can, as it is much faster than using get_new_result_from_primitive_values
+    on each value in the series.
     """
     if isinstance(previous_result, pd.Series):
         if isinstance(new_value, pd.Series):
             result =  get_new_result_from_series(previous_result.fillna(default_value), new_value.fillna(default_value))
             return result
         else:
+            new_value = __get_default_value_if_value_is_none_or_nan(new_value, default_value)
+            if __can_broadcast_primitive_values(previous_result, (default_value, new_value), get_new_result_from_primitive_values):
+                result = get_new_result_from_series(
+                    previous_result.fillna(default_value), 
+                    pd.Series(new_value, index=previous_result.index)
+                )
+                result.name = previous_result.name
+                return result
+
             return previous_result.apply(lambda v: get_new_result_from_primitive_values(
                 __get_default_value_if_value_is_none_or_nan(v, default_value), 
-                __get_default_value_if_value_is_none_or_nan(new_value, default_value)
+                new_value
             ))
     else:
         if isinstance(new_value, pd.Series):
+            previous_result = __get_default_value_if_value_is_none_or_nan(previous_result, default_value)
+            if __can_broadcast_primitive_values(new_value, (default_value, previous_result), get_new_result_from_primitive_values):
+                result = get_new_result_from_series(
+                    pd.Series(previous_result, index=new_value.index),
+                    new_value.fillna(default_value)
+                )
+                result.name = new_value.name
+                return result
+
             return new_value.apply(lambda v: get_new_result_from_primitive_values(
-                __get_default_value_if_value_is_none_or_nan(previous_result, default_value), 
+                previous_result, 
                 __get_default_value_if_value_is_none_or_nan(v, default_value)
             ))
         else:
@@ -65,7 +155,8 @@ def __get_new_result_series_or_primitive(
         arg: Union[PrimitiveType, None, pd.Series, RollingRange, pd.DataFrame], 
         get_primitive_value_from_dataframe: Callable[[pd.DataFrame], PrimitiveType],
         get_new_result_from_primitive_values: Callable[[PrimitiveType, PrimitiveType], PrimitiveType],
-        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series]
+        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series],
+        rolling_range_aggregation: Optional[str]
     ) -> ResultType:
     """
     This helper function does the preprocessing for a single arg, and then combines it
@@ -86,7 +177,10 @@ def __get_new_result_series_or_primitive(
         return get_new_result(previous_result, reduced_df)
 
     elif isinstance(arg, RollingRange):
-        new_series = arg.apply(lambda df: get_primitive_value_from_dataframe(df))
+        if rolling_range_aggregation is not None:
+            new_series = arg.aggregate(rolling_range_aggregation)
+        else:
+            new_series = arg.apply(lambda df: get_primitive_value_from_dataframe(df))
         return get_new_result(previous_result, new_series)
         
     elif isinstance(arg, pd.Series):
@@ -104,7 +198,8 @@ def get_final_result_series_or_primitive(
         argv: Tuple[Union[PrimitiveType, None, pd.Series, RollingRange, pd.DataFrame], ...], 
         get_primitive_value_from_dataframe: Callable[[pd.DataFrame], PrimitiveType],
         get_new_result_from_primitive_values: Callable[[PrimitiveType, PrimitiveType], PrimitiveType],
-        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series]
+        get_new_result_from_series: Callable[[pd.Series, pd.Series], pd.Series],
+        rolling_range_aggregation: Optional[str]=None
     ) -> ResultType:
     """
     This function is the main workhorse of many sheet functions that fit a common pattern:
@@ -113,10 +208,14 @@ def get_final_result_series_or_primitive(
     2. They update the result with each arg in two steps, preprocessing the arg and then combining that with the result
     3. Preprocessing the arg:
         - For dataframe values, they turned into primitive values with get_primitive_value_from_dataframe
-        - For rolling ranges, they are turned into series using repeated application of get_primitive_value_from_dataframe
+        - For rolling ranges, they are turned into series using repeated application of get_primitive_value_from_dataframe. If 
+          get_primitive_value_from_dataframe is one of the ROLLING_RANGE_AGGREGATIONS, pass its name as rolling_range_aggregation
+          so that it is computed for all windows at once
     4. Combining with the previous result. We are either combining two primtiive values, a primitive value and a series, or two series
         - If combining two primitive values, we combine with get_new_result_from_primitive_values
-        - If combining a primitive value and a series, we use a .apply on the series with get_new_result_from_primitive_values
+        - If combining a primitive value and a series, we turn the primitive value into a series and combine with 
+          get_new_result_from_series if this gives the same result, and otherwise use a .apply on the series with 
+          get_new_result_from_primitive_values
         - If combining two series, then we use get_new_result_from_series
 
     This makes it much easier to specify many functions like AND, SUM, OR, etc. 
@@ -135,7 +234,8 @@ def get_final_result_series_or_primitive(
             arg,
             get_primitive_value_from_dataframe,
             get_new_result_from_primitive_values,
-            get_new_result_from_series
+            get_new_result_from_series,
+            rolling_range_aggregation
         )
 
     return result 
@@ -2,46 +2,49 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_string_dtype
+
+STRING_TO_BOOL_CONVERSION_DICT = {
+    '1': True,
+    '1.0': True,
+    1: True,
+    1.0: True,
+    'TRUE': True,
+    'True': True, 
+    'true': True,
+    'T': True,
+    't': True,
+    'Y': True,
+    'y': True,
+    'Yes': True,
+    'yes': True,
+    #########################
+    '0': False,
+    '0.0': False,
+    0: False,
+    0.0: False,
+    'FALSE': False,
+    'False': False,
+    'false': False,
+    'F': False,
+    'f': False,
+    'N': False,
+    'n': False,
+    'No': False,
+    'no': False, 
+    'none': False,
+    'None': False
+}
 
 
 def cast_string_to_bool(
         s: str,
     ) -> Optional[bool]:
 
-    string_to_bool_conversion_dict = {
-        '1': True,
-        '1.0': True,
-        1: True,
-        1.0: True,
-        'TRUE': True,
-        'True': True, 
-        'true': True,
-        'T': True,
-        't': True,
-        'Y': True,
-        'y': True,
-        'Yes': True,
-        'yes': True,
-        #########################
-        '0': False,
-        '0.0': False,
-        0: False,
-        0.0: False,
-        'FALSE': False,
-        'False': False,
-        'false': False,
-        'F': False,
-        'f': False,
-        'N': False,
-        'n': False,
-        'No': False,
-        'no': False, 
-        'none': False,
-        'None': False
-    }
-
-    if s in string_to_bool_conversion_dict:
-        return string_to_bool_conversion_dict[s]
+    if s in STRING_TO_BOOL_CONVERSION_DICT:
+        return STRING_TO_BOOL_CONVERSION_DICT[s]
     else:
         return None # TODO: maybe we should default to False
 
@@ -60,4 +63,28 @@ def cast_to_bool(unknown: Union[str, int, float, bool, datetime, timedelta]) ->
     elif isinstance(unknown, bool):
         return unknown
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_bool(series: pd.Series) -> pd.Series:
+    """
+    Casts series of numbers, booleans and strings to booleans all at once, and only
+    casts each value for series of other types, or for series of strings that have
+    values we cannot cast.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        if dtype.kind == 'b':
+            return series.copy()
+        elif dtype.kind in 'iu':
+            return series != 0
+        elif dtype.kind == 'f':
+            # We cast NaN's to false
+            return (series != 0) & series.notna()
+
+    if is_string_dtype(str(dtype)) and pd.api.types.infer_dtype(series, skipna=False) == 'string':
+        bool_series = series.map(STRING_TO_BOOL_CONVERSION_DICT)
+        if bool_series.notna().all():
+            return bool_series.astype(bool)
+
+    return series.apply(cast_to_bool)
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import pandas as pd
-from mitosheet.is_type_utils import is_string_dtype
+from mitosheet.is_type_utils import is_datetime_dtype, is_string_dtype
 
 from mitosheet.public.v1.sheet_functions.types.utils import get_to_datetime_params
 
@@ -51,7 +51,9 @@ def cast_series_to_datetime(series: pd.Series) -> pd.Series:
             errors='coerce',
             **get_to_datetime_params(series)
         ) 
+    elif is_datetime_dtype(dtype):
+        return series.copy()
     
-    # Otherwise, we just cast it element-wise
+    # Otherwise, we just cast it element-wise, as numbers are read as local times
     return series.apply(cast_to_datetime)
 
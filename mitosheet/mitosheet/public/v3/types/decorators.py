@@ -8,7 +8,7 @@ import inspect
 from functools import wraps
 from typing import Callable, List
 
-from mitosheet.public.v3.types.utils import get_arg_cast_to_type
+from mitosheet.public.v3.types.utils import get_arg_cast_function
 from mitosheet.types import PrimitiveTypeName
 
 
@@ -18,14 +18,13 @@ def cast_values_in_all_args_to_type(
 ) -> Callable:
 
     def wrap(sheet_function):
+        arg_cast_function = get_arg_cast_function(target_primitive_type_name, tuple(primitive_types_to_ignore))
+
         @wraps(sheet_function)
         def wrapped_sheet_function(*args):   
 
             # For every arguement, go through and cast them to the correct type
-            final_args = [
-                get_arg_cast_to_type(target_primitive_type_name, arg, primitive_types_to_ignore=primitive_types_to_ignore)
-                for arg in args
-            ]
+            final_args = [arg_cast_function(arg) for arg in args]
 
             return sheet_function(*final_args)        
         return wrapped_sheet_function
@@ -37,18 +36,19 @@ def cast_values_in_arg_to_type(
     target_primitive_type_name: PrimitiveTypeName,
 ) -> Callable:
     def wrap(sheet_function):
+        # We find the index of the arg once, rather than every time the sheet function is called
+        arg_names = list(inspect.signature(sheet_function).parameters.keys())
+        arg_index = arg_names.index(arg_name)
+        arg_cast_function = get_arg_cast_function(target_primitive_type_name)
 
         @wraps(sheet_function)
         def wrapped_sheet_function(*args):   
+            if arg_index >= len(args):
+                return sheet_function(*args)
 
-            arg_names = list(inspect.signature(sheet_function).parameters.keys())
-            arg_index = arg_names.index(arg_name)
-
-            final_args = [
-                get_arg_cast_to_type(target_primitive_type_name, arg) if index == arg_index else arg
-                for index, arg in enumerate(args)
-            ]
+            final_args = list(args)
+            final_args[arg_index] = arg_cast_function(args[arg_index])
 
             return sheet_function(*final_args)        
         return wrapped_sheet_function
-    return wrap
\ No newline at end of file
+    return wrap
@@ -2,6 +2,11 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
+import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_string_dtype
+
 
 def get_million_identifier_in_string(string: str) -> Union[str, None]:
     """
@@ -116,4 +121,35 @@ def cast_to_float(unknown: Union[str, int, float, bool, datetime, timedelta]) ->
     elif isinstance(unknown, bool):
         return float(unknown)
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_of_strings_to_float(series: pd.Series) -> Optional[pd.Series]:
+    """
+    Casts the series to floats all at once if every value is a string that float
+    can read, which is what cast_string_to_float tries first. Otherwise, returns
+    None, and the values need to be cast one by one.
+    """
+    if not is_string_dtype(str(series.dtype)) or pd.api.types.infer_dtype(series, skipna=False) != 'string':
+        return None
+
+    try:
+        return series.astype(np.float64)
+    except (ValueError, TypeError):
+        return None
+
+
+def cast_series_to_float(series: pd.Series) -> pd.Series:
+    """
+    Casts series of numbers, booleans and strings to floats all at once, and only 
+    casts each value for series of other types.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iufb':
+        return series.astype(np.float64)
+
+    float_series = cast_series_of_strings_to_float(series)
+    if float_series is not None:
+        return float_series
+
+    return series.apply(cast_to_float)
@@ -3,10 +3,14 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import numpy as np
+import pandas as pd
 
 from mitosheet.public.v3.errors import make_invalid_param_type_conversion_error
 from mitosheet.public.v3.types.float import cast_string_to_float
 
+# Floats at least this big do not fit in an int64, and so are cast one by one
+MIN_FLOAT_OUT_OF_INT64_RANGE = 2.0 ** 63
+
 
 def cast_str_to_int(s: str) -> Optional[int]:
     f = cast_string_to_float(s)
@@ -28,4 +32,28 @@ def cast_to_int(unknown: Union[str, int, float, bool, datetime, timedelta]) -> O
         except:
             raise make_invalid_param_type_conversion_error(unknown, 'int')
 
-    return None
\ No newline at end of file
+    return None
+
+
+def is_int64_castable_dtype(dtype: np.dtype) -> bool:
+    """
+    Returns True if every value of this dtype can be cast to an int64, without 
+    going out of range.
+    """
+    return dtype.kind in 'ib' or (dtype.kind == 'u' and dtype.itemsize < 8)
+
+
+def cast_series_to_int(series: pd.Series) -> pd.Series:
+    """
+    Casts series of ints, booleans and floats to ints all at once, and only casts
+    each value for series of other types, or for series of floats that cannot be
+    cast, so that we raise the same errors.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        if is_int64_castable_dtype(dtype):
+            return series.astype(np.int64)
+        elif dtype.kind == 'f' and np.isfinite(series).all() and (series.abs() < MIN_FLOAT_OUT_OF_INT64_RANGE).all():
+            return series.astype(np.int64)
+
+    return series.apply(cast_to_int)
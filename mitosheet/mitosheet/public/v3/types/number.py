@@ -2,7 +2,11 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
-from mitosheet.public.v3.types.float import cast_string_to_float
+import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.types.float import cast_series_of_strings_to_float, cast_string_to_float
+from mitosheet.public.v3.types.int import is_int64_castable_dtype
 
 
 def cast_to_number(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[Union[int, float]]:
@@ -20,4 +24,23 @@ def cast_to_number(unknown: Union[str, int, float, bool, datetime, timedelta]) -
         return unknown
     
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_number(series: pd.Series) -> pd.Series:
+    """
+    Casts series of ints, booleans, floats and strings to numbers all at once, and
+    only casts each value for series of other types.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        if is_int64_castable_dtype(dtype):
+            return series.astype(np.int64)
+        elif dtype.kind == 'f':
+            return series.astype(np.float64)
+
+    float_series = cast_series_of_strings_to_float(series)
+    if float_series is not None:
+        return float_series
+
+    return series.apply(cast_to_number)
@@ -4,9 +4,30 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import numpy as np
+import pandas as pd
+
+from mitosheet.is_type_utils import is_string_dtype
 
 def cast_to_string(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[str]:
     if isinstance(unknown, float) and np.isnan(unknown):
         return None
 
-    return str(unknown)
\ No newline at end of file
+    return str(unknown)
+
+
+def cast_series_to_string(series: pd.Series) -> pd.Series:
+    """
+    Casting each value to a string is slow on big series, so we cast series
+    of numbers and booleans all at once, and only cast each value for series
+    of other types. 
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and (dtype.kind in 'iub' or dtype == np.float64):
+        string_series = series.astype(str)
+        if dtype.kind == 'f':
+            string_series[series.isna()] = None
+        return string_series
+    elif is_string_dtype(str(dtype)) and pd.api.types.infer_dtype(series, skipna=False) == 'string':
+        return series.copy()
+
+    return series.apply(cast_to_string)
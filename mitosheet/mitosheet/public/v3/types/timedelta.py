@@ -2,8 +2,12 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 
+from mitosheet.is_type_utils import is_string_dtype
+from mitosheet.public.v3.types.int import is_int64_castable_dtype
+
 def cast_to_timedelta(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[timedelta]:
     if isinstance(unknown, str):
         return pd.to_timedelta(unknown)
@@ -14,4 +18,26 @@ def cast_to_timedelta(unknown: Union[str, int, float, bool, datetime, timedelta]
     elif isinstance(unknown, timedelta):
         return unknown
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_timedelta(series: pd.Series) -> pd.Series:
+    """
+    Casts series of timedeltas, ints and strings to timedeltas all at once, and only
+    casts each value for series of other types, or for series of strings that have 
+    values we cannot cast, so that we raise the same errors.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        if dtype.kind == 'm':
+            return series.copy()
+        elif dtype.kind in 'iu' and is_int64_castable_dtype(dtype):
+            return pd.to_timedelta(series)
+
+    if is_string_dtype(str(dtype)) and pd.api.types.infer_dtype(series, skipna=False) == 'string':
+        try:
+            return pd.to_timedelta(series)
+        except ValueError:
+            pass
+
+    return series.apply(cast_to_timedelta)
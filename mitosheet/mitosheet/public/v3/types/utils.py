@@ -1,29 +1,33 @@
 
 
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from mitosheet.is_type_utils import is_bool_dtype, is_datetime_dtype, is_float_dtype, is_int_dtype, is_string_dtype, is_timedelta_dtype
 
 from mitosheet.public.v3.rolling_range import RollingRange
-from mitosheet.public.v3.types.bool import cast_to_bool
+from mitosheet.public.v3.types.bool import cast_series_to_bool, cast_to_bool
 from mitosheet.public.v3.types.datetime import cast_series_to_datetime, cast_to_datetime
-from mitosheet.public.v3.types.float import cast_to_float
-from mitosheet.public.v3.types.int import cast_to_int
-from mitosheet.public.v3.types.number import cast_to_number
-from mitosheet.public.v3.types.str import cast_to_string
-from mitosheet.public.v3.types.timedelta import cast_to_timedelta
+from mitosheet.public.v3.types.float import cast_series_to_float, cast_to_float
+from mitosheet.public.v3.types.int import cast_series_to_int, cast_to_int
+from mitosheet.public.v3.types.number import cast_series_to_number, cast_to_number
+from mitosheet.public.v3.types.str import cast_series_to_string, cast_to_string
+from mitosheet.public.v3.types.timedelta import cast_series_to_timedelta, cast_to_timedelta
 from mitosheet.types import PrimitiveTypeName
 
-SERIES_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Optional[Callable[[pd.Series], pd.Series]]] = {
-    'str': None,
-    'int': None,
-    'float': None,
-    'number': None,
-    'bool': None,
+# Casting each value in a series is slow, so these cast the series all at once
+# when they can, and only cast each value when they cannot
+SERIES_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Callable[[pd.Series], pd.Series]] = {
+    'str': cast_series_to_string,
+    'int': cast_series_to_int,
+    'float': cast_series_to_float,
+    'number': cast_series_to_number,
+    'bool': cast_series_to_bool,
     'datetime': cast_series_to_datetime,
-    'timedelta': None,
+    'timedelta': cast_series_to_timedelta,
 }
 
 ELEMENT_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Callable[[Any], Optional[Any]]] = {
@@ -36,6 +40,26 @@ ELEMENT_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Callable[[Any], Optional[A
     'timedelta': cast_to_timedelta,
 }
 
+# The dtypes of series that already have the type, and so do not need to be cast
+CAST_DTYPES: Dict[PrimitiveTypeName, List[str]] = {
+    'str': [],
+    'int': ['int64'],
+    'float': ['float64'],
+    'number': ['int64', 'float64'],
+    'bool': ['bool'],
+    'datetime': ['datetime64[ns]'],
+    'timedelta': ['timedelta64[ns]'],
+}
+
+# The type of each value in series of numbers and booleans, by the kind of their dtype.
+# NOTE: booleans are ints, as we check if a value is an int before if it's a bool
+VALUE_TYPE_NAMES_OF_DTYPE_KINDS: Dict[str, PrimitiveTypeName] = {
+    'i': 'int',
+    'u': 'int',
+    'b': 'int',
+    'f': 'float',
+}
+
 def is_primitive_value(value: Any) -> bool:
     return isinstance(value, str) or \
         isinstance(value, int) or \
@@ -61,8 +85,8 @@ def get_primitive_type_name_from_primitive_value(primitive_value: Any) -> Primit
     else:
         return 'str'
     
-def get_primitive_type_name_from_series(series: pd.Series) -> PrimitiveTypeName:
-    dtype = str(series.dtype)
+def get_primitive_type_name_from_dtype(dtype: Any) -> PrimitiveTypeName:
+    dtype = str(dtype)
     if is_string_dtype(dtype):
         return 'str'
     elif is_int_dtype(dtype):
@@ -78,59 +102,140 @@ def get_primitive_type_name_from_series(series: pd.Series) -> PrimitiveTypeName:
     else:
         return 'str'
 
+def get_primitive_type_name_from_series(series: pd.Series) -> PrimitiveTypeName:
+    return get_primitive_type_name_from_dtype(series.dtype)
 
-def get_arg_cast_to_type(
-        target_primitive_type_name: PrimitiveTypeName, 
-        arg: Any,
-        primitive_types_to_ignore: Optional[List[PrimitiveTypeName]]=None
-    ) -> Any:
-
-    if primitive_types_to_ignore is None:
-        primitive_types_to_ignore = []
 
-    series_conversion_function_without_skip = SERIES_CONVERSION_FUNCTIONS[target_primitive_type_name]
+def get_element_conversion_function(
+        target_primitive_type_name: PrimitiveTypeName, 
+        primitive_types_to_ignore: Tuple[PrimitiveTypeName, ...]
+    ) -> Callable[[Any], Any]:
+    """
+    Returns a function that casts a value to the target type, skipping any values of the 
+    primitive types we want to ignore.
+    """
     element_conversion_function_without_skip = ELEMENT_CONVERSION_FUNCTIONS[target_primitive_type_name]
+    if len(primitive_types_to_ignore) == 0:
+        return element_conversion_function_without_skip
 
-    # Wrapper that make sure we skip any primitive types we want to ignore
     def element_conversion_function(arg: Any) -> Any:
         arg_type_name = get_primitive_type_name_from_primitive_value(arg)
-        if arg_type_name in primitive_types_to_ignore: # type: ignore
+        if arg_type_name in primitive_types_to_ignore:
             return arg
 
         return element_conversion_function_without_skip(arg)
 
-    if series_conversion_function_without_skip is not None:
-        def series_conversion_function(arg: Any) -> Any:
-            arg_type_name = get_primitive_type_name_from_series(arg)
-            if arg_type_name in primitive_types_to_ignore: # type: ignore
-                return arg
+    return element_conversion_function
 
-            return series_conversion_function_without_skip(arg) # type: ignore
-    else:
-        series_conversion_function = None # type: ignore
 
-    if is_primitive_value(arg):
-        return element_conversion_function(arg)
+def _get_series_unchanged(series: pd.Series) -> pd.Series:
+    return series
+
+
+def get_series_conversion_function(
+        target_primitive_type_name: PrimitiveTypeName, 
+        dtype: Any,
+        primitive_types_to_ignore: Tuple[PrimitiveTypeName, ...]
+    ) -> Callable[[pd.Series], pd.Series]:
+    """
+    Returns a function that casts series with the given dtype to the target type. As this 
+    only depends on the dtype of the series, we work it out once for each dtype.
+    """
+    element_conversion_function = get_element_conversion_function(target_primitive_type_name, primitive_types_to_ignore)
+    series_conversion_function_without_skip = SERIES_CONVERSION_FUNCTIONS[target_primitive_type_name]
+
+    def cast_each_value(series: pd.Series) -> pd.Series:
+        return series.apply(element_conversion_function)
+
+    # Series that already have the dtype of the target type do not need to be cast
+    if str(dtype) in CAST_DTYPES[target_primitive_type_name] and len(primitive_types_to_ignore) == 0:
+        return _get_series_unchanged
+
+    # We always cast series to datetimes all at once, skipping them if their dtype is ignored
+    if target_primitive_type_name == 'datetime':
+        if get_primitive_type_name_from_dtype(dtype) in primitive_types_to_ignore:
+            return _get_series_unchanged
+        return series_conversion_function_without_skip
+
+    # Otherwise, we cast the series all at once only when this gives the same result 
+    # as casting each value in it, skipping the values with types we want to ignore
+    if len(primitive_types_to_ignore) > 0:
+        if not isinstance(dtype, np.dtype):
+            return cast_each_value
+        if dtype.kind == 'M' and 'datetime' in primitive_types_to_ignore:
+            return _get_series_unchanged
+
+        value_type_name = VALUE_TYPE_NAMES_OF_DTYPE_KINDS.get(dtype.kind)
+        if value_type_name is None or value_type_name in primitive_types_to_ignore:
+            return cast_each_value
+
+    if str(dtype) in CAST_DTYPES[target_primitive_type_name]:
+        return _get_series_unchanged
+
+    def series_conversion_function(series: pd.Series) -> pd.Series:
+        # Casting each value in an empty series keeps its dtype, so we do the same
+        if len(series) == 0:
+            return cast_each_value(series)
+
+        return series_conversion_function_without_skip(series)
+
+    return series_conversion_function
+
+
+@lru_cache(maxsize=None)
+def get_arg_cast_function(
+        target_primitive_type_name: PrimitiveTypeName,
+        primitive_types_to_ignore: Tuple[PrimitiveTypeName, ...]=()
+    ) -> Callable[[Any], Any]:
+    """
+    Returns a function that casts args to the target type. 
     
-    elif isinstance(arg, pd.Series):
-        if series_conversion_function is not None:
+    Sheet functions cast their args every time they are called, including once for each
+    window of a rolling range, so we keep the function that casts series of each dtype, 
+    rather than working out how to cast the series each time.
+    """
+    element_conversion_function = get_element_conversion_function(target_primitive_type_name, primitive_types_to_ignore)
+    series_conversion_functions: Dict[np.dtype, Callable[[pd.Series], pd.Series]] = {}
+
+    def series_conversion_function(series: pd.Series) -> pd.Series:
+        dtype = series.dtype
+        # We only keep the functions for numpy dtypes, as there can be any number of 
+        # other dtypes, e.g. one for each set of categories
+        if not isinstance(dtype, np.dtype):
+            return get_series_conversion_function(target_primitive_type_name, dtype, primitive_types_to_ignore)(series)
+
+        dtype_series_conversion_function = series_conversion_functions.get(dtype)
+        if dtype_series_conversion_function is None:
+            dtype_series_conversion_function = get_series_conversion_function(target_primitive_type_name, dtype, primitive_types_to_ignore)
+            series_conversion_functions[dtype] = dtype_series_conversion_function
+        return dtype_series_conversion_function(series)
+
+    def arg_cast_function(arg: Any) -> Any:
+        if is_primitive_value(arg):
+            return element_conversion_function(arg)
+        
+        elif isinstance(arg, pd.Series):
             return series_conversion_function(arg)
 
-        return arg.apply(element_conversion_function)
+        elif isinstance(arg, pd.DataFrame):
+            return arg.apply(lambda c: series_conversion_function(c))
 
-    elif isinstance(arg, pd.DataFrame):
+        elif isinstance(arg, RollingRange):
+            new_obj = arg.obj.apply(lambda c: series_conversion_function(c))
+            return RollingRange(new_obj, arg.window, arg.offset)
+
+        return None
+
+    return arg_cast_function
 
-        if series_conversion_function is not None:
-            return arg.apply(lambda c: series_conversion_function(c))
 
-        return arg.apply(lambda c: c.apply(element_conversion_function))
+def get_arg_cast_to_type(
+        target_primitive_type_name: PrimitiveTypeName, 
+        arg: Any,
+        primitive_types_to_ignore: Optional[List[PrimitiveTypeName]]=None
+    ) -> Any:
 
-    elif isinstance(arg, RollingRange):
-        obj = arg.obj
+    if primitive_types_to_ignore is None:
+        primitive_types_to_ignore = []
 
-        if series_conversion_function is not None:
-            new_obj = obj.apply(lambda c: series_conversion_function(c))
-        else:
-            new_obj = obj.apply(lambda c: c.apply(element_conversion_function))
-            
-        return RollingRange(new_obj, arg.window, arg.offset)
\ No newline at end of file
+    return get_arg_cast_function(target_primitive_type_name, tuple(primitive_types_to_ignore))(arg)
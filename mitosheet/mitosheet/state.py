@@ -3,16 +3,18 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
+import pickle
 from collections import OrderedDict
-from copy import deepcopy
+from copy import copy, deepcopy
+from threading import Lock
 from typing import Any, Callable, Collection, List, Dict, Optional
 import pandas as pd
 
 from mitosheet.column_headers import ColumnIDMap
 from mitosheet.types import FrontendFormulaAndLocation
 from mitosheet.types import ColumnHeader, ColumnID, DataframeFormat
-from mitosheet.user.utils import is_enterprise, is_running_test
-from mitosheet.utils import check_valid_sheet_functions, get_first_unused_dataframe_name
+from mitosheet.user.utils import get_pandas_version, is_enterprise, is_running_test
+from mitosheet.utils import check_valid_sheet_functions, get_first_unused_dataframe_name, is_prev_version, remove_file_if_exists
 
 # Constants for where the dataframe in the state came from
 DATAFRAME_SOURCE_PASSED = "passed"  # passed in mitosheet.sheet
@@ -69,9 +71,17 @@ class State:
         graph_data_dict: "Optional[OrderedDict[str, Dict[str, Any]]]"=None,
         user_defined_functions: Optional[List[Callable]]=None,
         user_defined_importers: Optional[List[Callable]]=None,
+        csv_import_engine: Optional[str]=None,
     ):
 
-        # The dataframes that are in the state
+        # The dataframes that are in the state. To save memory, these can be spilled to
+        # disk, in which case they are read back in when they are next accessed. See 
+        # mitosheet/state_history.py for when this happens. API calls run on many threads,
+        # so the dataframes are spilled and read back while holding the _dfs_lock
+        self._dfs_lock = Lock()
+        self._dfs: Optional[List[pd.DataFrame]] = None
+        self._spilled_dfs_path: Optional[str] = None
+        self._on_spilled_dfs_read: Optional[Callable[["State"], None]] = None
         self.dfs = list(dfs)
 
         # The df_names are composed of two parts:
@@ -146,28 +156,167 @@ class State:
 
         self.user_defined_importers = user_defined_importers if user_defined_importers is not None else []
 
-    def copy(self, deep_sheet_indexes: Optional[List[int]]=None) -> "State":
+        # The engine that the user configured pandas to read CSV files with (see MitoConfig), 
+        # or None if we use the default engine
+        self.csv_import_engine = csv_import_engine
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be copied or pickled, so each copy of a state gets its own
+        state = self.__dict__.copy()
+        del state['_dfs_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._dfs_lock = Lock()
+
+    @property
+    def dfs(self) -> List[pd.DataFrame]:
+        dfs = self._dfs
+        if dfs is not None:
+            return dfs
+
+        with self._dfs_lock:
+            # Another thread may have read the dataframes back while we waited for the lock
+            was_read_back = self._dfs is None
+            if was_read_back:
+                with open(self._spilled_dfs_path, 'rb') as f: # type: ignore
+                    self._dfs = pickle.load(f)
+                # The dataframes can be changed once they are read back, so we remove
+                # the file, and write them again if they are spilled again
+                remove_file_if_exists(self._spilled_dfs_path) # type: ignore
+                self._spilled_dfs_path = None
+            dfs = self._dfs
+
+        # This may spill other states, so we call it without holding the lock
+        if was_read_back and self._on_spilled_dfs_read is not None:
+            self._on_spilled_dfs_read(self)
+        return dfs # type: ignore
+
+    @dfs.setter
+    def dfs(self, dfs: List[pd.DataFrame]) -> None:
+        with self._dfs_lock:
+            if self._spilled_dfs_path is not None:
+                remove_file_if_exists(self._spilled_dfs_path)
+            self._dfs = dfs
+            self._spilled_dfs_path = None
+
+    @property
+    def are_dfs_in_memory(self) -> bool:
+        return self._dfs is not None
+
+    def spill_dfs(self, path: str, on_spilled_dfs_read: Optional[Callable[["State"], None]]=None) -> None:
         """
-        Returns a copy of the state, while only making deep copies of
-        those dataframes in the deep_sheet_indexes. Ideally, we'd copy
-        even less than that deeply.
+        Writes the dataframes of this state to the file at path, and then drops 
+        them from memory. They are read back in the next time they are accessed, 
+        at which point the file is removed and on_spilled_dfs_read is called with 
+        this state.
+        """
+        with self._dfs_lock:
+            if self._dfs is None:
+                return
+
+            with open(path, 'wb') as f:
+                pickle.dump(self._dfs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spilled_dfs_path = path
+            self._on_spilled_dfs_read = on_spilled_dfs_read
+            self._dfs = None
+
+    @property
+    def spilled_dfs_path(self) -> Optional[str]:
+        """
+        The file the dataframes of this state are spilled to, or None if they are in memory.
+        """
+        return self._spilled_dfs_path
+
+    def copy(
+        self, 
+        deep_sheet_indexes: Optional[List[int]]=None, 
+        copy_on_write_sheet_indexes: Optional[List[int]]=None
+    ) -> "State":
+        """
+        Returns a copy of the state, which shares as much as it can with this 
+        state, so that taking a step does not copy data the step does not touch.
+
+        For the dataframes:
+        1. Those in deep_sheet_indexes are deep copied, so they can be modified
+           in place. 
+        2. Those in copy_on_write_sheet_indexes are shallow copied, and so share
+           their columns with this state. A step must never write into one of 
+           these dataframes directly; it should replace the dataframe entirely, 
+           or replace the columns it changes with set_column, or call 
+           materialize_column before modifying a column in place.
+        3. All others are shallow copied, and must not be modified.
+
+        The per-sheet metadata (column ids, formulas, filters, formats) for the sheets
+        in either of these lists is copied, and so can be modified. The metadata of 
+        all other sheets is shared with this state, and so must not be modified in place. 
+        NOTE: the metadata is copied a single level deep. To change the formulas or filters 
+        of a column, replace the value for that column id, rather than mutating it.
         """
         if deep_sheet_indexes is None:
             deep_sheet_indexes = []
+        if copy_on_write_sheet_indexes is None:
+            copy_on_write_sheet_indexes = []
+
+        copied_sheet_indexes = set(deep_sheet_indexes).union(copy_on_write_sheet_indexes)
         
         return State(
             [df.copy(deep=index in deep_sheet_indexes) for index, df in enumerate(self.dfs)],
-            df_names=deepcopy(self.df_names),
-            df_sources=deepcopy(self.df_sources),
-            column_ids=deepcopy(self.column_ids),
-            column_formulas=deepcopy(self.column_formulas),
-            column_filters=deepcopy(self.column_filters),
-            df_formats=deepcopy(self.df_formats),
-            graph_data_dict=deepcopy(self.graph_data_dict),
-            user_defined_functions=deepcopy(self.user_defined_functions),
-            user_defined_importers=deepcopy(self.user_defined_importers),
+            df_names=copy(self.df_names),
+            df_sources=copy(self.df_sources),
+            column_ids=self.column_ids.copy(copied_sheet_indexes),
+            column_formulas=[
+                copy(column_formulas) if sheet_index in copied_sheet_indexes else column_formulas 
+                for sheet_index, column_formulas in enumerate(self.column_formulas)
+            ],
+            column_filters=[
+                copy(column_filters) if sheet_index in copied_sheet_indexes else column_filters
+                for sheet_index, column_filters in enumerate(self.column_filters)
+            ],
+            df_formats=[
+                deepcopy(df_format) if sheet_index in copied_sheet_indexes else df_format
+                for sheet_index, df_format in enumerate(self.df_formats)
+            ],
+            # Graphs are small, and so we copy each of them a level deep, so graph steps 
+            # can edit any of them
+            graph_data_dict=OrderedDict(
+                (graph_id, copy(graph_data)) for graph_id, graph_data in self.graph_data_dict.items()
+            ),
+            user_defined_functions=copy(self.user_defined_functions),
+            user_defined_importers=copy(self.user_defined_importers),
+            csv_import_engine=self.csv_import_engine,
         )
 
+    def set_column(self, sheet_index: int, column_header: ColumnHeader, new_column: pd.Series) -> None:
+        """
+        Replaces the column with column_header in the dataframe at sheet_index
+        with the new_column, without writing into the memory that stores the 
+        old column. 
+        
+        Thus, this is safe to call on a dataframe that is shared with another 
+        state - as it is for the sheets in copy_on_write_sheet_indexes.
+        """
+        df = self.dfs[sheet_index]
+        column_index = df.columns.get_loc(column_header)
+
+        if not is_prev_version(get_pandas_version(), '1.5.0'):
+            # isetitem always sets a new array, rather than writing into the existing one
+            df.isetitem(column_index, new_column)
+        else:
+            # On earlier versions, setting a column may write into the existing array, 
+            # so we remove the column entirely and then add it back in the same place
+            del df[column_header]
+            df.insert(column_index, column_header, new_column)
+
+    def materialize_column(self, sheet_index: int, column_header: ColumnHeader) -> None:
+        """
+        Gives the dataframe at sheet_index its own copy of the column with column_header, 
+        so that the column can be modified in place without effecting any other state 
+        that the dataframe shares its data with.
+        """
+        self.set_column(sheet_index, column_header, self.dfs[sheet_index][column_header].copy(deep=True))
+
     def add_df_to_state(
         self,
         new_df: pd.DataFrame,
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Every step in an analysis keeps its prev_state and post_state around, so that
+we can undo, redo and check out any step. On long analyses with large
+dataframes, this means the memory Mito uses grows until the kernel runs out.
+
+To bound this, users can set MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB in the
+Mito config (see mitosheet/enterprise/mito_config.py). After each edit or update, we keep the states closest
+to the current step in memory until they reach this budget, and spill the
+dataframes of all other states to disk. If a spilled state is accessed again
+(e.g. on undo, or when transpiling), its dataframes are read back from disk,
+and its file is removed, so if it is spilled again it is written again.
+
+NOTE: we spill states to disk, rather than rebuilding them by rerunning steps
+from an earlier state, as some steps (e.g. imports) do not give the same result
+if they are rerun.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+import pandas as pd
+
+from mitosheet.state import State
+from mitosheet.step import Step
+from mitosheet.utils import get_new_id, remove_file_if_exists
+
+# The number of spilled states that we keep in memory after they are read
+# back from disk, until the next time the budget is enforced. Transpiling
+# reads every state, and so this bounds the memory it uses
+MAX_READ_SPILLED_STATES = 4
+
+# The number of values in an object column we look at to estimate its size
+OBJECT_COLUMN_SAMPLE_SIZE = 1000
+
+
+def get_estimated_df_memory_usage(df: pd.DataFrame) -> int:
+    """
+    Returns an estimate of the bytes the dataframe uses. For object columns,
+    we estimate the size of the values from a sample of them, as measuring
+    every value is slow.
+    """
+    memory_usage = int(df.memory_usage(index=True, deep=False).sum())
+    for _, series in df.items():
+        if series.dtype == object and len(series) > 0:
+            sample = series.iloc[:OBJECT_COLUMN_SAMPLE_SIZE]
+            average_value_size = sum(sys.getsizeof(value) for value in sample) / len(sample)
+            memory_usage += int(average_value_size * len(series))
+    return memory_usage
+
+
+class StateHistory():
+    """
+    Decides which states of the steps in an analysis are kept in memory, and
+    spills the dataframes of the rest to disk.
+    """
+
+    def __init__(self, max_memory_mb: Optional[float]):
+        self.max_memory_mb = max_memory_mb
+        self._spill_folder: Optional[str] = None
+        self._read_spilled_states: Deque[State] = deque()
+
+    def get_spill_folder(self) -> str:
+        if self._spill_folder is None:
+            self._spill_folder = tempfile.mkdtemp(prefix='mito-state-history-')
+            # Clean up any spilled states when the analysis is garbage collected
+            weakref.finalize(self, shutil.rmtree, self._spill_folder, True)
+        return self._spill_folder
+
+    def spill_state(self, state: State) -> None:
+        if not state.are_dfs_in_memory:
+            return
+        path = os.path.join(self.get_spill_folder(), f'{get_new_id()}.pickle')
+        state.spill_dfs(path, self._on_spilled_state_read)
+        # Once no step has this state anymore, we no longer need its file
+        weakref.finalize(state, remove_file_if_exists, path)
+
+    def _on_spilled_state_read(self, state: State) -> None:
+        self._read_spilled_states.append(state)
+        if len(self._read_spilled_states) > MAX_READ_SPILLED_STATES:
+            self.spill_state(self._read_spilled_states.popleft())
+
+    def enforce_max_memory(self, steps: List[Step], curr_step_idx: int, undone_steps: List[Step]) -> None:
+        """
+        Keeps the states closest to the step at curr_step_idx in memory, until they reach
+        the memory budget, and spills all other states. The states of the current step, and
+        the final state of the analysis, are always kept in memory.
+        """
+        if self.max_memory_mb is None:
+            return
+
+        self._read_spilled_states.clear()
+
+        pinned_states = [
+            steps[curr_step_idx].prev_state,
+            steps[curr_step_idx].post_state,
+            steps[-1].post_state
+        ]
+        pinned_state_ids = {id(state) for state in pinned_states}
+
+        steps_by_distance = sorted(enumerate(steps), key=lambda index_and_step: abs(index_and_step[0] - curr_step_idx))
+        states_by_priority = pinned_states + [
+            state
+            for _, step in steps_by_distance + list(enumerate(undone_steps))
+            for state in [step.prev_state, step.post_state]
+        ]
+
+        max_memory = self.max_memory_mb * 1_000_000
+        memory_used = 0
+        counted_df_ids: Set[int] = set()
+        seen_state_ids: Set[int] = set()
+        df_memory_usage: Dict[int, int] = dict()
+
+        for state in states_by_priority:
+            if state is None or id(state) in seen_state_ids:
+                continue
+            seen_state_ids.add(id(state))
+
+            if not state.are_dfs_in_memory:
+                continue
+
+            # States share dataframes with eachother, so we only count each dataframe once
+            new_dfs = [df for df in state.dfs if id(df) not in counted_df_ids]
+            for df in new_dfs:
+                if id(df) not in df_memory_usage:
+                    df_memory_usage[id(df)] = get_estimated_df_memory_usage(df)
+            new_memory = sum(df_memory_usage[id(df)] for df in new_dfs)
+
+            # If spilling this state would not free any memory, we keep it
+            if id(state) in pinned_state_ids or new_memory == 0 or memory_used + new_memory <= max_memory:
+                memory_used += new_memory
+                counted_df_ids.update(id(df) for df in new_dfs)
+            else:
+                self.spill_state(state)
@@ -4,13 +4,14 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
-from typing import Any, Dict, List, Optional, Set, Type
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
 import json
+from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.column_steps.set_column_formula import SetColumnFormulaStepPerformer
 from mitosheet.step_performers.filter import FilterStepPerformer
 from mitosheet.state import State
-from mitosheet.step_performers import STEP_TYPE_TO_STEP_PERFORMER
+from mitosheet.step_performers.all_step_performers import STEP_TYPE_TO_STEP_PERFORMER
 from mitosheet.types import FORMULA_SPECIFIC_INDEX_LABELS_TYPE, ColumnHeader, ColumnID, FORMULA_ENTIRE_COLUMN_TYPE
 
 
@@ -63,6 +64,10 @@ class Step:
         # work if it has already been done. See simple_import for an example
         self.execution_data = execution_data if execution_data is not None else {}
 
+        # The code chunks this step was last transpiled to, along with what they were 
+        # transpiled from, so we only transpile this step again if it changes
+        self._code_chunks: Optional[Tuple[Tuple[Any, ...], List[CodeChunk]]] = None
+
     @property
     def dfs(self):
         return self.post_state.dfs
@@ -164,8 +169,29 @@ class Step:
         self.post_state = new_post_state
         self.execution_data = execution_data if execution_data is not None else {}
         self.params = params
+        self._code_chunks = None
 
         return post_state_and_execution_data is not None
+
+    def get_code_chunks(self) -> List[CodeChunk]:
+        """
+        Returns the code chunks that this step transpiles to. As we transpile 
+        all the steps after every edit, we only transpile this step again if 
+        its id, params or states changed since it was last transpiled.
+
+        NOTE: the returned code chunks are shared, so do not modify them.
+        """
+        code_chunks_key = (self.step_id, repr(self.params), id(self.prev_state), id(self.post_state), id(self.execution_data))
+        if self._code_chunks is None or self._code_chunks[0] != code_chunks_key:
+            code_chunks = self.step_performer.transpile(
+                self.prev_state, # type: ignore
+                self.post_state, # type: ignore
+                self.params,
+                self.execution_data,
+            )
+            self._code_chunks = (code_chunks_key, code_chunks)
+
+        return self._code_chunks[1]
     
 
     def step_indexes_to_skip(self, all_steps_before_this_step: List['Step']) -> Set[int]:
@@ -13,6 +13,7 @@ from mitosheet.errors import make_column_exists_error, make_no_sheet_error
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
+from mitosheet.types import ColumnLocation
 
 
 class AddColumnStepPerformer(StepPerformer):
@@ -82,4 +83,9 @@ class AddColumnStepPerformer(StepPerformer):
 
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
-        return {get_param(params, 'sheet_index')}
\ No newline at end of file
+        return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        return {(sheet_index, None)}, {(sheet_index, None)}
\ No newline at end of file
@@ -16,11 +16,11 @@ from mitosheet.errors import (MitoError, get_recent_traceback, make_execution_er
                               make_operator_type_error,
                               make_unsupported_function_error,
                               raise_error_if_column_ids_do_not_exist)
-from mitosheet.parser import get_frontend_formula, parse_formula
+from mitosheet.parser import compile_formula_code, get_frontend_formula, parse_formula
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, ColumnHeader, ColumnID, FormulaAppliedToType
+from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, ColumnHeader, ColumnID, ColumnLocation, FormulaAppliedToType
 
 
 class SetColumnFormulaStepPerformer(StepPerformer):
@@ -106,8 +106,10 @@ class SetColumnFormulaStepPerformer(StepPerformer):
         if any(missing_functions):
             raise make_unsupported_function_error(missing_functions, error_modal=False)
 
-        # We check out a new step
-        post_state = prev_state.copy(deep_sheet_indexes=[sheet_index])
+        # We check out a new step. The formula only writes to the column it is set 
+        # on, so this is the only column we need to copy
+        post_state = prev_state.copy(copy_on_write_sheet_indexes=[sheet_index])
+        post_state.materialize_column(sheet_index, column_header)
 
         # Update the column formula, and then execute the new formula graph
         try:
@@ -153,6 +155,36 @@ class SetColumnFormulaStepPerformer(StepPerformer):
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
 
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        column_id: ColumnID = get_param(params, 'column_id')
+        formula_label: Union[str, bool, int, float] = get_param(params, 'formula_label')
+        index_labels_formula_is_applied_to: FormulaAppliedToType = get_param(params, 'index_labels_formula_is_applied_to')
+        new_formula: str = get_param(params, 'new_formula')
+
+        try:
+            column_header = prev_state.column_ids.get_column_header_by_id(sheet_index, column_id)
+            _, _, column_header_dependencies, _ = parse_formula(
+                new_formula, 
+                column_header,
+                formula_label,
+                index_labels_formula_is_applied_to,
+                prev_state.dfs[sheet_index],
+                throw_errors=False
+            )
+            read_column_ids = prev_state.column_ids.get_column_ids_by_headers(sheet_index, list(column_header_dependencies))
+        except:
+            # If we can't figure out what the formula reads, it might read anything
+            return None
+
+        read_locations: Set[ColumnLocation] = {(sheet_index, read_column_id) for read_column_id in read_column_ids}
+        # A formula that is only applied to some indexes keeps the rest of the column
+        if index_labels_formula_is_applied_to['type'] != FORMULA_ENTIRE_COLUMN_TYPE:
+            read_locations.add((sheet_index, column_id))
+
+        return read_locations, {(sheet_index, column_id)}
+
 
 def _get_fixed_invalid_formula(
         new_formula: str, 
@@ -292,7 +324,7 @@ def exec_column_formula(
         # See explination here: https://www.tutorialspoint.com/exec-in-python
 
         exec(
-            python_code,
+            compile_formula_code(python_code),
             {'df': df, 'pd': pd}, 
             locals_for_exec
         )
@@ -309,7 +341,7 @@ def exec_column_formula(
         if index_labels_formula_is_applied_to['type'] == FORMULA_ENTIRE_COLUMN_TYPE:
             post_state.column_formulas[sheet_index][column_id] = [{'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': df.index.to_list()}]
         else:
-            post_state.column_formulas[sheet_index][column_id].append({'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': df.index.to_list()})
+            post_state.column_formulas[sheet_index][column_id] = post_state.column_formulas[sheet_index][column_id] + [{'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': df.index.to_list()}]
 
     except TypeError as e:
         # We catch TypeErrors specificially, so that we can case on operator errors, to 
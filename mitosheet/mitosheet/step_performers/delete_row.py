@@ -13,7 +13,7 @@ from mitosheet.code_chunks.delete_row_code_chunk import DeleteRowCodeChunk
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import ColumnID
+from mitosheet.types import ColumnID, ColumnLocation
 
 class DeleteRowStepPerformer(StepPerformer):
     """
@@ -67,4 +67,9 @@ class DeleteRowStepPerformer(StepPerformer):
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        return {(sheet_index, None)}, {(sheet_index, None)}
     
\ No newline at end of file
@@ -12,7 +12,7 @@ from mitosheet.code_chunks.step_performers.drop_duplicates_code_chunk import Dro
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import ColumnID
+from mitosheet.types import ColumnID, ColumnLocation
 
 class DropDuplicatesStepPerformer(StepPerformer):
     """
@@ -87,3 +87,8 @@ class DropDuplicatesStepPerformer(StepPerformer):
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        return {(sheet_index, None)}, {(sheet_index, None)}
@@ -9,11 +9,13 @@ from time import perf_counter
 from typing import Any, Dict, List, Optional, Set, Tuple
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.export_to_file_code_chunk import ExportToFileCodeChunk
+from mitosheet.excel_export import write_dataframes_to_excel
 from mitosheet.excel_utils import get_df_name_as_valid_sheet_name
-import pandas as pd
 import os
 
 from mitosheet.state import State
+from mitosheet.step_performers.file_export_writer import (
+    file_export_writer, get_export_fingerprint)
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
 
@@ -75,24 +77,46 @@ class ExportToFileStepPerformer(StepPerformer):
 
         pandas_start_time = perf_counter()
 
+        # NOTE: we capture the dataframes now, as the files may be written on a background thread
         if _type == 'csv':
             sheet_index_to_export_location = get_export_to_csv_sheet_index_to_file_name(file_name, sheet_indexes)
-            for sheet_index, file_name in sheet_index_to_export_location.items():
-                post_state.dfs[sheet_index].to_csv(file_name, index=False)
+            export_file_names = list(sheet_index_to_export_location.values())
+            csv_dfs_and_file_names = [(post_state.dfs[sheet_index], export_file_name) for sheet_index, export_file_name in sheet_index_to_export_location.items()]
+            def write() -> None:
+                for df, export_file_name in csv_dfs_and_file_names:
+                    df.to_csv(export_file_name, index=False)
         elif _type == 'excel':
             sheet_index_to_export_location = get_export_to_excel_sheet_index_to_sheet_name(post_state, file_name, sheet_indexes)
-            with pd.ExcelWriter(file_name) as writer:
-                for sheet_index, sheet_name in sheet_index_to_export_location.items():
-                    post_state.dfs[sheet_index].to_excel(writer, sheet_name=sheet_name, index=False)
+            export_file_names = [file_name]
+            excel_dfs_and_sheet_names = [(post_state.dfs[sheet_index], sheet_name) for sheet_index, sheet_name in sheet_index_to_export_location.items()]
+            def write() -> None:
+                write_dataframes_to_excel(file_name, [(df, sheet_name, None) for df, sheet_name in excel_dfs_and_sheet_names])
         else:
             raise ValueError(f"Invalid file type: {_type}")
 
+        # As the files may be written in the background, we check we can write them here, 
+        # so the user sees the error that pandas would raise
+        for export_file_name in export_file_names:
+            directory = os.path.dirname(os.path.abspath(export_file_name))
+            if not os.path.isdir(directory):
+                raise OSError(f"Cannot save file into a non-existent directory: '{directory}'")
+
+        # If the steps are replayed and nothing has changed, the files are already written
+        fingerprint = get_export_fingerprint(
+            _type,
+            list(sheet_index_to_export_location.values()),
+            [post_state.dfs[sheet_index] for sheet_index in sheet_index_to_export_location.keys()],
+            [post_state.df_formats[sheet_index] for sheet_index in sheet_index_to_export_location.keys()],
+        )
+        file_written = file_export_writer.export(export_file_names, fingerprint, write)
+
         pandas_processing_time = perf_counter() - pandas_start_time
 
         return post_state, {
             'pandas_processing_time': pandas_processing_time,
             'sheet_index_to_export_location': sheet_index_to_export_location,
             'file_name': file_name,
+            'file_written': file_written,
         }
 
     @classmethod
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Writes the files that the export to file step exports.
+
+The export to file step writes its files every time it is executed, which is
+not just when the user exports, but also every time the steps are replayed: on
+undo, redo, replaying an analysis, or changing the imports of an analysis. As
+these files can be very large, we:
+1. Fingerprint the dataframes and params of each export, and record the
+   fingerprint of the files we write. If the files on disk are the ones we
+   wrote for the same fingerprint, we don't write them again.
+2. Write the files on a background thread when the steps are replayed, so that
+   undo, redo and replaying an analysis do not wait on the disk. Where we can't
+   use threads, we write them straight away.
+
+When the user exports the files, we write them straight away, so that if writing
+them fails, the export step fails and the user sees the error. We also write
+them straight away if a file we are going to write is locked (e.g. as it is open
+in Excel), or if writing the same files in the background last failed, so that
+the step that writes them fails rather than the error being lost.
+"""
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from queue import Queue
+from threading import Lock, Thread, local
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from mitosheet.user.location import is_jupyterlite, is_streamlit
+
+# JupyterLite does not support multiple threads, and in streamlit the script
+# may read the file straight after it is exported
+THREADED = not is_jupyterlite() and not is_streamlit()
+
+FileStats = Tuple[int, int]
+
+
+def get_export_fingerprint(
+        export_type: str,
+        export_locations: List[str],
+        dfs: List[pd.DataFrame],
+        df_formats: List[Dict[str, Any]]
+    ) -> Optional[str]:
+    """
+    Returns a fingerprint of everything that is written to the exported files, or
+    None if we cannot fingerprint the dataframes (e.g. if they contain lists).
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([export_type, export_locations]).encode('utf-8'))
+    for df, df_format in zip(dfs, df_formats):
+        try:
+            row_hashes = pd.util.hash_pandas_object(df, index=False).values
+        except (TypeError, ValueError):
+            return None
+        hasher.update(repr(list(df.columns)).encode('utf-8'))
+        hasher.update(repr(list(df.dtypes)).encode('utf-8'))
+        hasher.update(row_hashes.tobytes())
+        hasher.update(json.dumps(df_format, sort_keys=True, default=str).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _get_file_stats(file_paths: Tuple[str, ...]) -> Optional[List[FileStats]]:
+    try:
+        file_stats = [os.stat(file_path) for file_path in file_paths]
+    except OSError:
+        return None
+    return [(file_stat.st_size, file_stat.st_mtime_ns) for file_stat in file_stats]
+
+
+def _is_any_file_locked(file_paths: Tuple[str, ...]) -> bool:
+    """
+    Returns True if any of the files exists and cannot be opened for writing, for
+    example as it is open in Excel on Windows.
+    """
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+        try:
+            # NOTE: opening the file to append to it does not change it
+            with open(file_path, 'ab'):
+                pass
+        except OSError:
+            return True
+    return False
+
+
+class FileExportWriter:
+    """
+    Writes exported files one at a time, in the order they are exported, and
+    skips writing files that are already on disk.
+    """
+
+    def __init__(self, threaded: bool):
+        self.threaded = threaded
+        self.lock = Lock()
+        # The fingerprint and file stats of the files we last wrote for each export,
+        # keyed by the paths of the files
+        self.written_exports: Dict[Tuple[str, ...], Tuple[str, List[FileStats]]] = {}
+        # The fingerprint of the last write we queued for each export
+        self.queued_exports: Dict[Tuple[str, ...], Optional[str]] = {}
+        self.queue: 'Queue[Tuple[Tuple[str, ...], Optional[str], Callable[[], None]]]' = Queue()
+        self.thread: Optional[Thread] = None
+        self.error: Optional[Exception] = None
+        # The exports that last failed to be written in the background
+        self.failed_exports: Set[Tuple[str, ...]] = set()
+        # Whether the files exported on each thread are written straight away
+        self.synchronous = local()
+
+    def export(self, file_paths: List[str], fingerprint: Optional[str], write: Callable[[], None]) -> bool:
+        """
+        Writes the files at file_paths by calling write, unless they are already on
+        disk with this fingerprint. Returns True if the files are written.
+        """
+        key = tuple(os.path.abspath(file_path) for file_path in file_paths)
+        with self.lock:
+            if fingerprint is not None:
+                if key in self.queued_exports:
+                    if self.queued_exports[key] == fingerprint:
+                        return False
+                elif key in self.written_exports:
+                    written_fingerprint, written_file_stats = self.written_exports[key]
+                    if written_fingerprint == fingerprint and written_file_stats == _get_file_stats(key):
+                        return False
+
+            self.queued_exports[key] = fingerprint
+
+        if self._should_write_synchronously(key):
+            # We wait for the files queued before these to be written, so they
+            # are written in the order they are exported
+            self.queue.join()
+            self._write(key, fingerprint, write)
+            return True
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self._run, daemon=True)
+                self.thread.start()
+        self.queue.put((key, fingerprint, write))
+        return True
+
+    @contextmanager
+    def writing_synchronously(self) -> Iterator[None]:
+        """
+        Within this context, the files exported on this thread are written before
+        the export returns, and any error writing them is raised from the export.
+        """
+        previous_synchronous = getattr(self.synchronous, 'value', False)
+        self.synchronous.value = True
+        try:
+            yield
+        finally:
+            self.synchronous.value = previous_synchronous
+
+    def wait(self) -> None:
+        """
+        Waits until all of the exported files are written, and raises the first
+        error that happened while writing them.
+        """
+        self.queue.join()
+        with self.lock:
+            error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def clear(self) -> None:
+        self.wait()
+        with self.lock:
+            self.written_exports.clear()
+            self.failed_exports.clear()
+
+    def _should_write_synchronously(self, key: Tuple[str, ...]) -> bool:
+        if not self.threaded or getattr(self.synchronous, 'value', False):
+            return True
+        with self.lock:
+            if key in self.failed_exports:
+                return True
+        return _is_any_file_locked(key)
+
+    def _run(self) -> None:
+        while True:
+            key, fingerprint, write = self.queue.get()
+            try:
+                self._write(key, fingerprint, write)
+            except Exception as e:
+                with self.lock:
+                    self.failed_exports.add(key)
+                    if self.error is None:
+                        self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _write(self, key: Tuple[str, ...], fingerprint: Optional[str], write: Callable[[], None]) -> None:
+        written = False
+        try:
+            write()
+            written = True
+        finally:
+            with self.lock:
+                if written:
+                    self.failed_exports.discard(key)
+                # If the export was queued again while we were writing, the later write
+                # records the files instead
+                if self.queued_exports.get(key, fingerprint) == fingerprint:
+                    self.queued_exports.pop(key, None)
+                    file_stats = _get_file_stats(key)
+                    if written and fingerprint is not None and file_stats is not None:
+                        self.written_exports[key] = (fingerprint, file_stats)
+                    else:
+                        self.written_exports.pop(key, None)
+
+
+file_export_writer = FileExportWriter(THREADED)
+
+
+def wait_for_file_exports() -> None:
+    """
+    Waits until all of the files that have been exported are written.
+    """
+    file_export_writer.wait()
+
+
+def clear_file_export_fingerprints() -> None:
+    """
+    Forgets which files we have written, so that they are written again the
+    next time they are exported.
+    """
+    file_export_writer.clear()
@@ -15,7 +15,7 @@ from mitosheet.errors import raise_error_if_column_ids_do_not_exist
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import ColumnHeader, ColumnID, Filter, FilterGroup, OperatorType
+from mitosheet.types import ColumnHeader, ColumnID, ColumnLocation, Filter, FilterGroup, OperatorType
 
 # The constants used in the filter step itself as filter conditions
 # NOTE: these must be unique (e.g. no repeating names for different types)
@@ -115,8 +115,9 @@ class FilterStepPerformer(StepPerformer):
             sheet_index, column_id
         )
 
-        # If no errors we create a new step for this filter
-        post_state = prev_state.copy(deep_sheet_indexes=[sheet_index])
+        # If no errors we create a new step for this filter. As filtering creates
+        # a new dataframe, there is no need to copy the dataframe itself
+        post_state = prev_state.copy(copy_on_write_sheet_indexes=[sheet_index])
 
         # Execute the filter
         final_df, pandas_processing_time = _execute_filter(
@@ -125,8 +126,7 @@ class FilterStepPerformer(StepPerformer):
         post_state.dfs[sheet_index] = final_df
 
         # Keep track of which columns are filtered
-        post_state.column_filters[sheet_index][column_id]["operator"] = operator
-        post_state.column_filters[sheet_index][column_id]["filters"] = filters
+        post_state.column_filters[sheet_index][column_id] = {"operator": operator, "filters": filters}
 
         return post_state, {
             'pandas_processing_time': pandas_processing_time
@@ -161,6 +161,11 @@ class FilterStepPerformer(StepPerformer):
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
 
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        return {(sheet_index, None)}, {(sheet_index, None)}
+
 
 def get_applied_filter(
     df: pd.DataFrame, column_header: ColumnHeader, filter_: Filter
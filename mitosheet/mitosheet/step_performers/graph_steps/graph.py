@@ -4,18 +4,21 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
-from copy import deepcopy
 from time import perf_counter
 from typing import Any, Dict, List, Optional, Set, Tuple
 import pandas as pd
+import plotly.graph_objects as go
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.empty_code_chunk import EmptyCodeChunk
 
 from mitosheet.state import State
-from mitosheet.step_performers.graph_steps.graph_utils import GRAPH_TITLE_LABELS, get_column_header_from_optional_column_id_graph_param, get_html_and_script_from_figure, get_new_graph_tab_name
+from mitosheet.step_performers.graph_steps.graph_figure_cache import graph_figure_cache
+from mitosheet.step_performers.graph_steps.graph_utils import get_column_header_from_optional_column_id_graph_param, get_new_graph_tab_name, get_plotly_js
 from mitosheet.step_performers.graph_steps.plotly_express_graphs import (
-    get_plotly_express_graph,
     get_plotly_express_graph_code,
+    get_plotly_express_graph_traces,
+    graph_styling as graph_styling_layout,
+    safety_filter_applied,
 )
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
@@ -124,8 +127,8 @@ class GraphStepPerformer(StepPerformer):
         histfunc = graph_creation.get('histfunc', None)
         nbins = graph_creation.get('nbins', None)
 
-        # Create a copy of the dataframe, just for safety.
-        df: pd.DataFrame = prev_state.dfs[sheet_index].copy()
+        # We don't copy the dataframe, as graphing it never modifies it
+        df: pd.DataFrame = prev_state.dfs[sheet_index]
         df_name: str = prev_state.df_names[sheet_index]
 
         # If the graph tab already exists, use its name. Otherwise, create a new graph tab name.
@@ -147,38 +150,54 @@ class GraphStepPerformer(StepPerformer):
             pandas_processing_time = 0.0 # no processing time
         else: 
             pandas_start_time = perf_counter()
-            fig = get_plotly_express_graph(
-                graph_type,
-                df,
-                safety_filter_turned_on_by_user,
-                x_axis_column_headers,
-                y_axis_column_headers,
-                color_column_header,
-                facet_col_column_header,
-                facet_row_column_header,
-                facet_col_wrap,
-                facet_col_spacing,
-                facet_row_spacing,
-                points,
-                line_shape,
-                histnorm,
-                histfunc,
-                nbins,
-                graph_styling
-            )
-            pandas_processing_time = perf_counter() - pandas_start_time
+            graphed_column_headers = []
+            for column_header in x_axis_column_headers + y_axis_column_headers + [color_column_header, facet_col_column_header, facet_row_column_header]:
+                if column_header is not None and column_header not in graphed_column_headers:
+                    graphed_column_headers.append(column_header)
 
-            # Get rid of some of the default white space
-            fig.update_layout(
-                margin=dict(
-                    l=0,
-                    r=0,
-                    t=30,
-                    b=35, # This gives enough space so that the x axis label is not cutoff
+            # We only make the traces of the graph again if the data or params they are made 
+            # from changed, and so restyling or resizing the graph does not graph the data again
+            cached_figure = graph_figure_cache.get(
+                df, 
+                graphed_column_headers, 
+                [graph_preprocessing, graph_creation, graph_styling.get('barmode')],
+                lambda: get_plotly_express_graph_traces(
+                    graph_type,
+                    df,
+                    safety_filter_turned_on_by_user,
+                    x_axis_column_headers,
+                    y_axis_column_headers,
+                    color_column_header,
+                    facet_col_column_header,
+                    facet_row_column_header,
+                    facet_col_wrap,
+                    facet_col_spacing,
+                    facet_row_spacing,
+                    points,
+                    line_shape,
+                    histnorm,
+                    histfunc,
+                    nbins,
+                    graph_styling
                 )
             )
 
-            html_and_script = get_html_and_script_from_figure(fig, height, width, include_plotlyjs)
+            def style_figure(fig: go.Figure) -> go.Figure:
+                is_safety_filter_applied = safety_filter_applied(df, safety_filter_turned_on_by_user)
+                fig = graph_styling_layout(fig, graph_type, x_axis_column_headers + y_axis_column_headers, is_safety_filter_applied, graph_styling)
+                # Get rid of some of the default white space
+                fig.update_layout(
+                    margin=dict(
+                        l=0,
+                        r=0,
+                        t=30,
+                        b=35, # This gives enough space so that the x axis label is not cutoff
+                    )
+                )
+                return fig
+
+            graph_figure = cached_figure.get_figure_json(graph_styling, style_figure)
+            pandas_processing_time = perf_counter() - pandas_start_time
 
             graph_generation_code = get_plotly_express_graph_code(
                 graph_type,
@@ -210,8 +229,11 @@ class GraphStepPerformer(StepPerformer):
                 },
                 "graphOutput": {
                     "graphGeneratedCode": graph_generation_code,
-                    "graphHTML": html_and_script["html"],
-                    "graphScript": html_and_script["script"],
+                    "graphFigure": graph_figure,
+                    # If plotly.js is not loaded on the page, the frontend runs this before drawing the graph
+                    "graphPlotlyJS": get_plotly_js() if include_plotlyjs else None,
+                    "graphHeight": height,
+                    "graphWidth": width,
                 },
                 "graphTabName": graph_tab_name
             }
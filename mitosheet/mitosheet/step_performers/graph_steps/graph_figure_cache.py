@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Caches the figures of the graphs in the graph taskpane, so that we only make
+the traces of a graph again when the data or the parameters they depend on change.
+
+The graph step is executed again every time the graph is restyled, every time
+the graph taskpane is resized, and whenever the steps are replayed (e.g. on an
+undo). Making the traces is the slow part of this for a large dataframe, as they
+are made from all of its rows - while styling a graph only changes its layout.
+
+So we cache the traces of each graph by the parameters they are made from and
+the data in the columns they graph, and then style the layout of the cached
+figure for the styling params. The size of the graph is not part of the figure
+at all, as the frontend sizes the div that it draws the figure in.
+
+Like the ColumnStatisticsCache, we identify the data in each column by where it
+is stored, and keep the columns in the cache, so their memory is not reused while
+their figure is cached.
+"""
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from mitosheet.step_performers.graph_steps.graph_utils import get_figure_json
+from mitosheet.types import ColumnHeader
+
+# The number of figures we keep the traces of. This is enough for a few graphs,
+# and a few versions of each of them to undo to
+MAX_CACHED_GRAPH_FIGURES = 10
+
+# The number of styles we keep the layout of for each figure
+MAX_CACHED_GRAPH_FIGURE_STYLES = 5
+
+GraphFigureKey = Tuple[Any, ...]
+
+
+def _get_index_version(index: pd.Index) -> Tuple[Any, ...]:
+    if isinstance(index, pd.RangeIndex):
+        return ('range', index.start, index.stop, index.step)
+    # An index is immutable, so the same index object always has the same values
+    return ('index', id(index), len(index))
+
+
+def get_graph_figure_key(
+        df: pd.DataFrame,
+        column_headers: Sequence[ColumnHeader],
+        graph_params: List[Any]
+    ) -> GraphFigureKey:
+    """
+    Returns the key that identifies the traces of a graph of the column_headers in
+    the df, which are made from the graph_params.
+    """
+    # NOTE: we import this here, as the column statistics import the steps, which import this
+    from mitosheet.column_statistics import get_column_version
+
+    return (
+        json.dumps(graph_params, sort_keys=True, default=str),
+        tuple(repr(column_header) for column_header in column_headers),
+        tuple(get_column_version(df[column_header]) for column_header in column_headers),
+        _get_index_version(df.index),
+    )
+
+
+class CachedGraphFigure():
+    """
+    The figure of a graph without its styling, along with the json of its traces,
+    and the json of its layout for the styles it has been drawn with.
+    """
+
+    def __init__(self, fig: go.Figure, columns: List[Any]):
+        self.fig = fig
+        # We keep the columns so their memory is not reused for other data
+        self.columns = columns
+        self.data = get_figure_json(fig)['data']
+        self._layouts: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+    def get_figure_json(self, graph_styling_params: Dict[str, Any], style_figure: Callable[[go.Figure], go.Figure]) -> Dict[str, Any]:
+        """
+        Returns the json of the figure styled with the graph_styling_params, where
+        style_figure styles a figure with just the layout of this one.
+        """
+        key = json.dumps(graph_styling_params, sort_keys=True, default=str)
+        layout = self._layouts.get(key)
+        if layout is None:
+            # Styling only changes the layout, so we don't copy the traces to style it
+            styled_fig = style_figure(go.Figure(layout=self.fig.layout))
+            layout = get_figure_json(styled_fig)['layout']
+            self._layouts[key] = layout
+            if len(self._layouts) > MAX_CACHED_GRAPH_FIGURE_STYLES:
+                self._layouts.popitem(last=False)
+        else:
+            self._layouts.move_to_end(key)
+        return {'data': self.data, 'layout': layout}
+
+
+class GraphFigureCache():
+    """
+    A least recently used cache of the figures of graphs, keyed by the parameters
+    they are made from and the data they graph (see get_graph_figure_key).
+    """
+
+    def __init__(self, max_cached_figures: int=MAX_CACHED_GRAPH_FIGURES):
+        self.max_cached_figures = max_cached_figures
+        self._cache: 'OrderedDict[GraphFigureKey, CachedGraphFigure]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(
+            self,
+            df: pd.DataFrame,
+            column_headers: Sequence[ColumnHeader],
+            graph_params: List[Any],
+            get_figure: Callable[[], go.Figure]
+        ) -> CachedGraphFigure:
+        """
+        Returns the figure of a graph of the column_headers in the df, which are made
+        from the graph_params, only calling get_figure if they have changed.
+        """
+        key = get_graph_figure_key(df, column_headers, graph_params)
+        with self._lock:
+            cached_figure = self._cache.get(key)
+            if cached_figure is not None:
+                self._cache.move_to_end(key)
+                return cached_figure
+
+        cached_figure = CachedGraphFigure(
+            get_figure(),
+            [df[column_header].array for column_header in column_headers] + [df.index]
+        )
+        with self._lock:
+            self._cache[key] = cached_figure
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached_figures:
+                self._cache.popitem(last=False)
+        return cached_figure
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+graph_figure_cache = GraphFigureCache()
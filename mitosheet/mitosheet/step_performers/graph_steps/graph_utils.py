@@ -4,13 +4,14 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
+import json
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from mitosheet.state import State
-import io
-from xmlrpc.client import boolean
 
 from mitosheet.types import ColumnHeader
 import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
 
 # Graph types should be kept consistent with the GraphType in GraphSidebar.tsx
 SCATTER = "scatter"
@@ -48,8 +49,8 @@ def get_graph_title(
     """
     Helper function for determing the title of the graph
     """
-    # Get the label to let the user know that their graph had a filter applied.
-    graph_filter_label: Optional[str] = "(first 1000 rows)" if filtered else None
+    # Get the label to let the user know that their graph was downsampled.
+    graph_filter_label: Optional[str] = "(downsampled)" if filtered else None
 
     # Compile all of the column headers into one comma separated string
     all_column_headers = (", ").join(
@@ -88,56 +89,23 @@ def get_new_graph_tab_name(graph_data_dict: Dict[str, Dict[str, Any]]) -> str:
     return new_graph_name
 
 
-def get_html_and_script_from_figure(
-    fig: go.Figure, height: int, width: int,
-    include_plotlyjs: boolean,
-) -> Dict[str, str]:
+def get_figure_json(fig: go.Figure) -> Dict[str, Any]:
     """
-    Given a plotly figure, generates HTML from it, and returns
-    a dictonary with the div and script for the frontend.
-
-    The plotly HTML generated by the write_html function call is a div with two children:
-    1. a div that contains the id for the graph itself
-    2. a script that actually builds the graph
-
-    Because we have to dynamically execute the script, we split these into two
-    strings, to make them easier to do what we need on the frontend
+    Returns the data and layout of the figure as json, which the frontend draws
+    with plotly.js. With plotly 6 or later, the arrays in the traces are sent as
+    base64 encoded binary, rather than as lists of numbers.
     """
-    # Send the graph back to the frontend
-    buffer = io.StringIO()
-    fig.write_html(
-        buffer,
-        full_html=False,
-        include_plotlyjs=include_plotlyjs,
-        default_height=height,
-        default_width=width,
-    )
-
-    original_html = buffer.getvalue()
-
-    # Everything in a script tag we want to treat as one big script
+    return json.loads(fig.to_json())
 
-    # The get the graph div, which looks like: <div id="9c21d143-3fcd-4958-9295-ac7ada668186" class="plotly-graph-div" style="height:425px; width:970px;"></div>
-    # This is the only div we need to put on the frontend.
-    div = original_html[original_html.find('<div id='):original_html.find('</div>', original_html.find('<div id='))]
 
-    # Get all the scripts that are between the <script> tags, and join them together. If include_plotlyjs is true, this includes
-    # the plotly js script, and otherwise, it's just the data and the script that uses Plotly to build the graph on the div above
-    script = ''
-    index = 0
-    while index < len(original_html):
-        script_start = original_html.find('<script type="text/javascript">', index)
-        script_end = original_html.find('</script>', script_start)
-
-        if script_start == -1 or script_end == -1:
-            break
-
-        # Get rid of the initial script
-        script_start += len('<script type="text/javascript">')
-        script = script + original_html[script_start:script_end] + ';\n'
-        index = script_end + 9
+@lru_cache(maxsize=1)
+def get_plotly_js() -> str:
+    """
+    Returns the plotly.js script, which the frontend runs before drawing a 
+    figure if plotly.js is not already loaded on the page.
+    """
+    return "window.PlotlyConfig = {MathJaxConfig: 'local'};\n" + get_plotlyjs()
 
-    return {"html": div, "script": script}
 
 def get_column_header_from_optional_column_id_graph_param(
     state: State, 
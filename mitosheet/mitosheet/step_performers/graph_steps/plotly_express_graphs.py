@@ -9,6 +9,12 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from mitosheet.public.v3.graphs import (
+    downsample_graph_data,
+    get_binned_histogram_histfunc,
+    get_histogram_bin_axes,
+    get_histogram_bins,
+)
 from mitosheet.step_performers.graph_steps.graph_utils import (
     BAR,
     BOX,
@@ -22,16 +28,17 @@ from mitosheet.step_performers.graph_steps.graph_utils import (
     VIOLIN,
     get_graph_title,
 )
-from mitosheet.transpiler.transpile_utils import param_dict_to_code
+from mitosheet.transpiler.transpile_utils import (column_header_to_transpiled_code,
+                                                  param_dict_to_code)
 from mitosheet.types import ColumnHeader
 
 DO_NOT_CHANGE_PAPER_BGCOLOR_DEFAULT = '#FFFFFF'
 DO_NOT_CHANGE_PLOT_BGCOLOR_DEFAULT = '#E6EBF5'
 DO_NOT_CHANGE_TITLE_FONT_COLOR_DEFAULT = '#2F3E5D'
 
-# The number of rows that we filter the graph to
+# The number of rows above which we downsample the graph, and about the number of points we graph
 # This must be kept in sync with GRAPH_SAFETY_FILTER_CUTOFF in GraphSidebar.tsx
-GRAPH_SAFETY_FILTER_CUTOFF = 1000
+GRAPH_SAFETY_FILTER_CUTOFF = 10_000
 
 # Not all of Ploty's graphs support the color parameter. Those are listed here
 GRAPHS_THAT_DONT_SUPPORT_COLOR = [DENSITY_HEATMAP]
@@ -49,46 +56,217 @@ def safety_filter_applied(
 ) -> bool:
     """
     Helper function for determing whether the graphed dataframe
-    should be filtered. It is applied if the safety_filter param is true and the
-    dataframe has more than FILTERED_NUMBER_OF_ROWS rows
+    should be downsampled. It is applied if the safety_filter param is true and the
+    dataframe has more than GRAPH_SAFETY_FILTER_CUTOFF rows
     """
     return (
         safety_filter_turned_on_by_user and len(df.index) > GRAPH_SAFETY_FILTER_CUTOFF
     )
 
 
+def get_graph_filtering_param_dict(
+    graph_type: str,
+    x_axis_column_headers: List[ColumnHeader],
+    y_axis_column_headers: List[ColumnHeader],
+    color_column_header: Optional[ColumnHeader],
+    facet_col_column_header: Optional[ColumnHeader],
+    facet_row_column_header: Optional[ColumnHeader],
+    histfunc: Optional[str],
+    nbins: Optional[int],
+    graph_styling_params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Returns the params to downsample_graph_data, or to get_histogram_bins
+    for histograms, for the graph
+    """
+    param_dict = get_graph_creation_param_dict(
+        graph_type, x_axis_column_headers, y_axis_column_headers, color_column_header, facet_col_column_header, facet_row_column_header,
+        None, None, None, None, None, None, histfunc if graph_type == HISTOGRAM else None, nbins if graph_type == HISTOGRAM else None
+    )
+    if graph_type == BAR and 'barmode' in graph_styling_params:
+        param_dict['barmode'] = graph_styling_params['barmode']
+    return param_dict
+
+
+def get_histogram_binning(
+    df: pd.DataFrame, 
+    graph_type: str,
+    safety_filter_turned_on_by_user: bool, 
+    filtering_param_dict: Dict[str, Any]
+) -> Optional[Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader]]:
+    """
+    If the graph is a histogram that is binned before it is graphed, returns the column 
+    that is binned, the column that is aggregated, and the column that is graphed.
+    """
+    if graph_type != HISTOGRAM or not safety_filter_applied(df, safety_filter_turned_on_by_user):
+        return None
+    return get_histogram_bin_axes(
+        df, 
+        filtering_param_dict.get('x'), 
+        filtering_param_dict.get('y'), 
+        filtering_param_dict.get('color'), 
+        filtering_param_dict.get('facet_col'), 
+        filtering_param_dict.get('facet_row')
+    )
+
+
+def get_binned_histogram_param_dict(
+    param_dict: Dict[str, Any], 
+    histogram_binning: Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader],
+    histfunc: Optional[str],
+) -> Dict[str, Any]:
+    """
+    Returns the params to graph the histogram of the binned dataframe, which has one row for each bar
+    """
+    binned_column_header, aggregated_column_header, graphed_column_header = histogram_binning
+    if 'x' in param_dict:
+        axes_param_dict: Dict[str, Any] = {'x': binned_column_header, 'y': graphed_column_header}
+    else:
+        # A histogram of just a column on the y axis is horizontal
+        axes_param_dict = {'x': graphed_column_header, 'y': binned_column_header, 'orientation': 'h'}
+
+    other_param_dict = {key: value for key, value in param_dict.items() if key not in ['x', 'y', 'histfunc', 'nbins']}
+    return {
+        **axes_param_dict,
+        **other_param_dict,
+        'histfunc': get_binned_histogram_histfunc(histfunc, aggregated_column_header)
+    }
+
+
+def get_histogram_count_label(
+    histogram_binning: Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader],
+    histfunc: Optional[str],
+    histnorm: Optional[str],
+) -> Optional[str]:
+    """
+    The binned histogram sums the number of rows in each bin, and so plotly labels it as a sum. 
+    Returns the label that plotly gives the histogram of all the rows, if it is different.
+    """
+    _, aggregated_column_header, _ = histogram_binning
+    if aggregated_column_header is None or histfunc == 'count':
+        return histnorm if histnorm is not None else 'count'
+    return None
+
+
+def get_binned_histogram_count_label(
+    histogram_binning: Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader],
+    histnorm: Optional[str],
+) -> str:
+    """
+    Returns the label that plotly gives the sum of the rows in each bin of the binned
+    histogram, which it uses in the hover text of its bars.
+    """
+    _, _, graphed_column_header = histogram_binning
+    label = f'sum of {graphed_column_header}'
+    if histnorm == 'probability':
+        return f'fraction of {label}'
+    elif histnorm == 'percent':
+        return f'percent of {label}'
+    elif histnorm is not None:
+        return f'{histnorm} weighted by {graphed_column_header}'
+    return label
+
+
+def get_downsampling_param_dict(filtering_param_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the params to downsample_graph_data, for histograms that cannot be binned
+    """
+    return {key: value for key, value in filtering_param_dict.items() if key not in ['histfunc', 'nbins']}
+
+
 def graph_filtering(
-    df: pd.DataFrame, safety_filter_turned_on_by_user: bool
+    df: pd.DataFrame, graph_type: str, safety_filter_turned_on_by_user: bool, filtering_param_dict: Dict[str, Any]
 ) -> pd.DataFrame:
     """
-    Filters the dataframe to the first FILTERED_NUMBER_OF_ROWS rows, to ensure we don't crash the browser tab
+    Downsamples the dataframe so that it has about GRAPH_SAFETY_FILTER_CUTOFF points, and we don't crash the browser tab
     """
     if safety_filter_applied(df, safety_filter_turned_on_by_user):
-        return df.head(GRAPH_SAFETY_FILTER_CUTOFF)
+        return downsample_graph_data(df, graph_type, **get_downsampling_param_dict(filtering_param_dict), max_points=GRAPH_SAFETY_FILTER_CUTOFF)
     else:
         return df
 
 
 def graph_filtering_code(
-    df_name: str, df: pd.DataFrame, safety_filter_turned_on_by_user: bool
+    df_name: str, df: pd.DataFrame, graph_type: str, safety_filter_turned_on_by_user: bool, filtering_param_dict: Dict[str, Any]
 ) -> str:
     """
-    Returns the code for filtering the dataframe so we don't crash the browser
+    Returns the code for downsampling the dataframe so we don't crash the browser
     """
 
     if safety_filter_applied(df, safety_filter_turned_on_by_user):
-        # If we do filter the graph, then return the code needed to filter the graph
-        return """
-# Filter the dataframe so that it does not crash the browser
-{df_name}_filtered = {df_name}.head({num_rows})
-""".format(
-            df_name=df_name, num_rows=GRAPH_SAFETY_FILTER_CUTOFF
-        )
+        # If we do downsample the graph, then return the code needed to downsample the graph
+        param_code = param_dict_to_code(get_downsampling_param_dict(filtering_param_dict), as_single_line=True)
+        return f"""from mitosheet.public.v3 import downsample_graph_data
+
+# Downsample the dataframe so that it does not crash the browser, but still looks the same when graphed
+{df_name}_downsampled = downsample_graph_data({df_name}, {column_header_to_transpiled_code(graph_type)}, {param_code}, max_points={GRAPH_SAFETY_FILTER_CUTOFF})
+"""
 
     else:
         # If we don't filter the graph, then return an empty string
         return ""
 
+
+def binned_histogram_axes(
+    fig: go.Figure, 
+    histogram_binning: Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader],
+    histogram_bins: Optional[Dict[str, Any]],
+    filtering_param_dict: Dict[str, Any],
+    histnorm: Optional[str],
+) -> go.Figure:
+    """
+    Sets the bins of the binned histogram to the bins its rows are in, and labels 
+    the axis with its bars as plotly does for a histogram of all of the rows
+    """
+    is_vertical = 'x' in filtering_param_dict
+    if histogram_bins is not None:
+        fig.update_traces(**{'xbins' if is_vertical else 'ybins': histogram_bins})
+
+    label = get_histogram_count_label(histogram_binning, filtering_param_dict.get('histfunc'), histnorm)
+    if label is not None:
+        for_each_axis = fig.for_each_yaxis if is_vertical else fig.for_each_xaxis
+        for_each_axis(lambda axis: axis.update(title_text=label) if axis.title.text else None)
+        # The hover text of the bars uses the same label as the axis
+        binned_label = get_binned_histogram_count_label(histogram_binning, histnorm)
+        fig.for_each_trace(lambda trace: trace.update(hovertemplate=trace.hovertemplate.replace(f'{binned_label}=', f'{label}=')))
+    return fig
+
+
+def binned_histogram_axes_code(
+    df: pd.DataFrame,
+    histogram_binning: Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader],
+    filtering_param_dict: Dict[str, Any],
+    histnorm: Optional[str],
+) -> str:
+    """
+    Returns the code for setting the bins and label of the binned histogram
+    """
+    is_vertical = 'x' in filtering_param_dict
+    code = []
+    # Only numbers are binned, otherwise there is a bar for each value
+    binned_series = df[histogram_binning[0]]
+    if pd.api.types.is_numeric_dtype(binned_series) and not pd.api.types.is_bool_dtype(binned_series):
+        code.append(f"fig.update_traces({'xbins' if is_vertical else 'ybins'}=bins)")
+
+    label = get_histogram_count_label(histogram_binning, filtering_param_dict.get('histfunc'), histnorm)
+    if label is not None:
+        code.append(f"fig.{'for_each_yaxis' if is_vertical else 'for_each_xaxis'}(lambda axis: axis.update(title_text={column_header_to_transpiled_code(label)}) if axis.title.text else None)")
+        binned_label = get_binned_histogram_count_label(histogram_binning, histnorm)
+        code.append(f"fig.for_each_trace(lambda trace: trace.update(hovertemplate=trace.hovertemplate.replace({column_header_to_transpiled_code(binned_label + '=')}, {column_header_to_transpiled_code(label + '=')})))")
+    return "\n".join(code)
+
+
+def histogram_binning_code(df_name: str, filtering_param_dict: Dict[str, Any]) -> str:
+    """
+    Returns the code for binning the histogram, so we don't crash the browser
+    """
+    param_code = param_dict_to_code(filtering_param_dict, as_single_line=True)
+    return f"""from mitosheet.public.v3 import get_histogram_bins
+
+# Bin the dataframe so that the histogram only graphs its bars, and does not crash the browser
+{df_name}_binned, bins = get_histogram_bins({df_name}, {param_code})
+"""
+
 def get_graph_creation_param_dict(
         graph_type: str,
         x_axis_column_headers: List[ColumnHeader],
@@ -175,7 +353,7 @@ def graph_creation(
     histnorm: Optional[str],
     histfunc: Optional[str],
     nbins: Optional[int],
-
+    histogram_binning: Optional[Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader]]=None,
 ) -> go.Figure:
     """
     Creates and returns the Plotly express graph figure
@@ -198,6 +376,8 @@ def graph_creation(
         nbins,
 
     )
+    if histogram_binning is not None:
+        param_dict = get_binned_histogram_param_dict(param_dict, histogram_binning, histfunc)
 
     if graph_type == BAR:
         return px.bar(df, **param_dict)
@@ -237,7 +417,7 @@ def graph_creation_code(
     histnorm: Optional[str],
     histfunc: Optional[str],
     nbins: Optional[int],
-
+    histogram_binning: Optional[Tuple[ColumnHeader, Optional[ColumnHeader], ColumnHeader]]=None,
 ) -> str:
     """
     Returns the code for creating the Plotly express graph
@@ -259,6 +439,8 @@ def graph_creation_code(
         histfunc,
         nbins,
     )
+    if histogram_binning is not None:
+        param_dict = get_binned_histogram_param_dict(param_dict, histogram_binning, histfunc)
     param_code = param_dict_to_code(param_dict, as_single_line=True)
 
     if graph_type == BAR:
@@ -424,7 +606,7 @@ def graph_styling_code(
     return f"fig.update_layout({params_code})"
 
 
-def get_plotly_express_graph(
+def get_plotly_express_graph_traces(
     graph_type: str,
     df: pd.DataFrame,
     safety_filter_turned_on_by_user: bool,
@@ -444,18 +626,24 @@ def get_plotly_express_graph(
     graph_styling_params: Dict[str, Any],
 ) -> go.Figure:
     """
-    Generates and returns a Plotly express graph in 3 steps
-    1) filtering -- make sure that dataframe is a safe size to graph
+    Generates and returns a Plotly express graph before it is styled, in 2 steps
+    1) filtering -- make sure that dataframe is a safe size to graph, by downsampling it or binning it
     2) graph creation -- actually construct the graph
-    3) graph styling -- style the graph
-    """
-    all_column_headers = x_axis_column_headers + y_axis_column_headers
 
+    The graph_styling_params are only used for the params that change the traces of
+    the graph (e.g. the barmode). The graph is then styled with graph_styling.
+    """
     # Step 1: Filtering
-    is_safety_filter_applied = safety_filter_applied(
-        df, safety_filter_turned_on_by_user
+    filtering_param_dict = get_graph_filtering_param_dict(
+        graph_type, x_axis_column_headers, y_axis_column_headers, color_column_header, facet_col_column_header, facet_row_column_header,
+        histfunc, nbins, graph_styling_params
     )
-    df = graph_filtering(df, safety_filter_turned_on_by_user)
+    histogram_binning = get_histogram_binning(df, graph_type, safety_filter_turned_on_by_user, filtering_param_dict)
+    histogram_bins = None
+    if histogram_binning is not None:
+        df, histogram_bins = get_histogram_bins(df, **filtering_param_dict)
+    else:
+        df = graph_filtering(df, graph_type, safety_filter_turned_on_by_user, filtering_param_dict)
 
     # Step 2: Graph Creation
     fig = graph_creation(
@@ -474,14 +662,65 @@ def get_plotly_express_graph(
         histnorm,
         histfunc,
         nbins,
+        histogram_binning,
     )
-
-    # Step 3: Graph Styling
-    fig = graph_styling(fig, graph_type, all_column_headers, is_safety_filter_applied, graph_styling_params)
+    if histogram_binning is not None:
+        fig = binned_histogram_axes(fig, histogram_binning, histogram_bins, filtering_param_dict, histnorm)
 
     return fig
 
 
+def get_plotly_express_graph(
+    graph_type: str,
+    df: pd.DataFrame,
+    safety_filter_turned_on_by_user: bool,
+    x_axis_column_headers: List[ColumnHeader],
+    y_axis_column_headers: List[ColumnHeader],
+    color_column_header: Optional[ColumnHeader],
+    facet_col_column_header: Optional[ColumnHeader],
+    facet_row_column_header: Optional[ColumnHeader],
+    facet_col_wrap: Optional[int],
+    facet_col_spacing: Optional[float],
+    facet_row_spacing: Optional[float],
+    points: Optional[Union[str, bool]],
+    line_shape: Optional[str],
+    histnorm: Optional[str],
+    histfunc: Optional[str],
+    nbins: Optional[int],
+    graph_styling_params: Dict[str, Any],
+) -> go.Figure:
+    """
+    Generates and returns a Plotly express graph in 3 steps
+    1) filtering -- make sure that dataframe is a safe size to graph, by downsampling it or binning it
+    2) graph creation -- actually construct the graph
+    3) graph styling -- style the graph
+    """
+    fig = get_plotly_express_graph_traces(
+        graph_type,
+        df,
+        safety_filter_turned_on_by_user,
+        x_axis_column_headers,
+        y_axis_column_headers,
+        color_column_header,
+        facet_col_column_header,
+        facet_row_column_header,
+        facet_col_wrap,
+        facet_col_spacing,
+        facet_row_spacing,
+        points,
+        line_shape,
+        histnorm,
+        histfunc,
+        nbins,
+        graph_styling_params,
+    )
+
+    # Step 3: Graph Styling
+    is_safety_filter_applied = safety_filter_applied(df, safety_filter_turned_on_by_user)
+    all_column_headers = x_axis_column_headers + y_axis_column_headers
+    return graph_styling(fig, graph_type, all_column_headers, is_safety_filter_applied, graph_styling_params)
+
+
 def get_plotly_express_graph_code(
     graph_type: str,
     df: pd.DataFrame,
@@ -504,7 +743,7 @@ def get_plotly_express_graph_code(
 ) -> str:
     """
     Generates the code for a Plotly express graph in 3 steps
-    1) filtering -- make sure that dataframe is a safe size to graph
+    1) filtering -- make sure that dataframe is a safe size to graph, by downsampling it or binning it
     2) graph creation -- actually construct the graph
     3) graph styling -- style the graph
     """
@@ -516,9 +755,17 @@ def get_plotly_express_graph_code(
     is_safety_filter_applied = safety_filter_applied(
         df, safety_filter_turned_on_by_user
     )
-    if is_safety_filter_applied:
-        code.append(graph_filtering_code(df_name, df, safety_filter_turned_on_by_user))
-        df_name = f"{df_name}_filtered"
+    filtering_param_dict = get_graph_filtering_param_dict(
+        graph_type, x_axis_column_headers, y_axis_column_headers, color_column_header, facet_col_column_header, facet_row_column_header,
+        histfunc, nbins, graph_styling_params
+    )
+    histogram_binning = get_histogram_binning(df, graph_type, safety_filter_turned_on_by_user, filtering_param_dict)
+    if histogram_binning is not None:
+        code.append(histogram_binning_code(df_name, filtering_param_dict))
+        df_name = f"{df_name}_binned"
+    elif is_safety_filter_applied:
+        code.append(graph_filtering_code(df_name, df, graph_type, safety_filter_turned_on_by_user, filtering_param_dict))
+        df_name = f"{df_name}_downsampled"
 
     # Step 2: Graph Creation
     code.append(
@@ -544,8 +791,13 @@ def get_plotly_express_graph_code(
             histnorm,
             histfunc,
             nbins,
+            histogram_binning,
         )
     )
+    if histogram_binning is not None:
+        binned_histogram_code = binned_histogram_axes_code(df, histogram_binning, filtering_param_dict, histnorm)
+        if binned_histogram_code != '':
+            code.append(binned_histogram_code)
 
     # Step 3: Graph Styling
     all_column_headers = x_axis_column_headers + y_axis_column_headers
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+"""
+Guesses the delimeter and encoding of CSV files, and reads them.
+
+We used to guess the delimeter and encoding of a file by reading all of it
+with pd.read_csv, and trying other encodings if this failed. On large files,
+this meant a file was parsed several times before the user even saw the
+import dialog, and then parsed again when they imported it.
+
+Instead, we guess the delimeter and encoding from a sample at the start of
+the file. As users often look at the same file in the import dialog and then
+import it, we keep these guesses for each file until it changes.
+"""
+import codecs
+import csv
+import io
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import chardet
+import pandas as pd
+
+from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk import DEFAULT_DELIMETER, DEFAULT_ENCODING
+from mitosheet.utils import is_pyarrow_installed
+
+# The number of bytes at the start of a file we guess the delimeter and encoding from
+SNIFF_SAMPLE_BYTES = 1024 * 1024
+
+# The number of files we keep the guessed delimeter and encoding of
+MAX_CACHED_CSV_SNIFF_RESULTS = 100
+
+# How confident chardet must be in the encoding it guesses for us to use it
+MIN_CHARDET_CONFIDENCE = 0.5
+
+# The encoding we use when a file cannot be read with the encoding we guessed,
+# as every sequence of bytes is valid latin-1
+FALLBACK_ENCODING = 'latin-1'
+
+# Users can set the engine pandas uses to read CSV files with MitoConfig. The pyarrow 
+# engine reads files in parallel, but does not infer the same dtypes as the default C 
+# engine in all cases (e.g. for dates), and so we only use it if asked to, and then 
+# also use it in the generated code
+CSV_IMPORT_ENGINE_PYARROW = 'pyarrow'
+
+# The pyarrow engine does not support all of the params of pd.read_csv, so we
+# use the C engine if we are passed any others
+PYARROW_READ_CSV_PARAMS = {'sep', 'encoding', 'skiprows'}
+
+CSVSniffKey = Tuple[str, int, int]
+
+_csv_sniff_results: 'OrderedDict[CSVSniffKey, Tuple[str, str]]' = OrderedDict()
+_csv_sniff_results_lock = Lock()
+
+
+def get_csv_sniff_key(file_name: str) -> CSVSniffKey:
+    """
+    Returns a key that changes when the file at file_name is changed.
+    """
+    stat_result = os.stat(file_name)
+    return (os.path.abspath(file_name), stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def guess_delimeter_and_encoding(file_name: str) -> Tuple[str, str]:
+    """
+    Given a path to a file that is assumed to exist and be a CSV, guesses the
+    delimeter and encoding of the file from a sample at the start of the file.
+
+    Raises a csv.Error if the delimeter cannot be guessed.
+    """
+    key = get_csv_sniff_key(file_name)
+    with _csv_sniff_results_lock:
+        sniff_result = _csv_sniff_results.get(key)
+        if sniff_result is not None:
+            _csv_sniff_results.move_to_end(key)
+            return sniff_result
+
+    with open(file_name, 'rb') as f:
+        sample = f.read(SNIFF_SAMPLE_BYTES)
+    is_whole_file = len(sample) == key[1]
+
+    encoding = guess_sample_encoding(sample, is_whole_file)
+    delimeter = guess_sample_delimeter(sample, encoding, is_whole_file)
+    if delimeter is None:
+        # The first line is longer than the sample, so we read all of it
+        delimeter = _guess_first_line_delimeter(file_name, encoding)
+
+    sniff_result = (delimeter, encoding)
+    with _csv_sniff_results_lock:
+        _csv_sniff_results[key] = sniff_result
+        if len(_csv_sniff_results) > MAX_CACHED_CSV_SNIFF_RESULTS:
+            _csv_sniff_results.popitem(last=False)
+
+    return sniff_result
+
+
+def guess_sample_encoding(sample: bytes, is_whole_file: bool) -> str:
+    """
+    Returns the encoding of the sample of a file, which is the default encoding if
+    the sample is valid in it, and otherwise what chardet guesses if it is confident.
+    """
+    if _can_decode_sample(sample, DEFAULT_ENCODING, is_whole_file):
+        return DEFAULT_ENCODING
+
+    result = chardet.detect(sample)
+    encoding = result['encoding']
+    confidence = result['confidence'] if result['confidence'] is not None else 0
+    if encoding is not None and confidence >= MIN_CHARDET_CONFIDENCE and _can_decode_sample(sample, encoding, is_whole_file):
+        return encoding
+
+    # Sometimes chardet guesses 'ascii' when we want 'latin-1'
+    return FALLBACK_ENCODING
+
+
+def guess_sample_delimeter(sample: bytes, encoding: str, is_whole_file: bool) -> Optional[str]:
+    """
+    Returns the delimeter of the first line in the sample of a file, or None if
+    the first line does not end in the sample.
+    """
+    text = codecs.getincrementaldecoder(encoding)().decode(sample, final=is_whole_file)
+    # Like reading the file in text mode, we translate all newlines to \n
+    first_line = io.StringIO(text, newline=None).readline()
+    if not first_line.endswith('\n') and not is_whole_file:
+        return None
+    return _sniff_delimeter(first_line)
+
+
+def _guess_first_line_delimeter(file_name: str, encoding: str) -> str:
+    with open(file_name, 'r', encoding=encoding) as f:
+        return _sniff_delimeter(f.readline())
+
+
+def _sniff_delimeter(first_line: str) -> str:
+    delimeter = csv.Sniffer().sniff(first_line).delimiter
+    # When a file has a single column, the sniffer guesses a character
+    # in its header is the delimeter, so we use the default instead
+    if delimeter.isalnum():
+        return DEFAULT_DELIMETER
+    return delimeter
+
+
+def _can_decode_sample(sample: bytes, encoding: str, is_whole_file: bool) -> bool:
+    # The sample can end part way through a character, so unless it is the
+    # whole file, we let the decoder keep these bytes for later
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=is_whole_file)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def clear_csv_sniff_results() -> None:
+    with _csv_sniff_results_lock:
+        _csv_sniff_results.clear()
+
+
+def get_csv_import_engine(read_csv_params: Dict[str, Any], csv_import_engine: Optional[str]) -> Optional[str]:
+    """
+    Returns the engine we read a CSV file with these params with, given the engine
+    the user configured, or None if we use the default engine.
+    """
+    if csv_import_engine == CSV_IMPORT_ENGINE_PYARROW and is_pyarrow_installed() and set(read_csv_params.keys()).issubset(PYARROW_READ_CSV_PARAMS):
+        return CSV_IMPORT_ENGINE_PYARROW
+    return None
+
+
+def read_csv(file_name: str, csv_import_engine: Optional[str]=None, **read_csv_params: Any) -> pd.DataFrame:
+    """
+    Reads the CSV file at file_name with pd.read_csv and these params, using the
+    engine that the user configured if it supports these params.
+    """
+    engine = get_csv_import_engine(read_csv_params, csv_import_engine)
+    if engine is not None:
+        return pd.read_csv(file_name, engine=engine, **read_csv_params)
+    return pd.read_csv(file_name, **read_csv_params)
+
+
+def read_csv_get_delimiter_and_encoding(file_name: str, csv_import_engine: Optional[str]=None) -> Tuple[pd.DataFrame, str, str]:
+    """
+    Given a file_name, will read in the file as a CSV, and
+    return the df, delimeter, and encoding of the file
+    """
+    delimeter, encoding = guess_delimeter_and_encoding(file_name)
+    try:
+        df = read_csv(file_name, csv_import_engine, sep=delimeter, encoding=encoding)
+    except UnicodeDecodeError:
+        # The sample at the start of the file might be valid in an encoding
+        # that the rest of the file is not, so we fall back to latin-1
+        encoding = FALLBACK_ENCODING
+        df = read_csv(file_name, csv_import_engine, sep=delimeter, encoding=encoding)
+
+    return df, delimeter, encoding
+
+
+def get_bytes_per_second(file_name: str, seconds: float) -> Optional[float]:
+    """
+    Returns how many bytes of the file at file_name we read each second, if we
+    read all of it in the given seconds.
+    """
+    if seconds <= 0:
+        return None
+    return os.path.getsize(file_name) / seconds
@@ -9,8 +9,6 @@ import os
 from time import perf_counter
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-import pandas as pd
-
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.step_performers.import_steps.excel_range_import_code_chunk import (
     EXCEL_RANGE_IMPORT_TYPE_RANGE,
@@ -19,6 +17,7 @@ from mitosheet.code_chunks.step_performers.import_steps.excel_range_import_code_
 from mitosheet.errors import make_range_not_found_error
 from mitosheet.excel_utils import (get_col_and_row_indexes_from_range,
                                    get_column_from_column_index)
+from mitosheet.excel_workbook_cache import read_excel_range
 from mitosheet.public.v2 import get_table_range
 from mitosheet.public.v2.excel_utils import convert_csv_file_to_xlsx_file
 from mitosheet.state import DATAFRAME_SOURCE_IMPORTED, State
@@ -75,7 +74,8 @@ class ExcelRangeImportStepPerformer(StepPerformer):
             nrows = end_row_index - start_row_index
             usecols = get_column_from_column_index(start_col_index) + ':' + get_column_from_column_index(end_col_index)
 
-            df = pd.read_excel(file_path, sheet_name=sheet['value'], skiprows=start_row_index, nrows=nrows, usecols=usecols)
+            # We stream the sheet once, and read all of the ranges from it
+            df = read_excel_range(file_path, sheet['value'], skiprows=start_row_index, nrows=nrows, usecols=usecols)
             final_df_name = get_valid_dataframe_name(post_state.df_names, range_import['df_name'])
             post_state.add_df_to_state(
                 df,
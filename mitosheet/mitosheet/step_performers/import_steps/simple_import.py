@@ -3,17 +3,15 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
-import csv
-import json
 from os.path import normpath, basename
 import os
 from copy import copy
 from time import perf_counter
 from typing import Any, Dict, List, Optional, Set, Tuple
-import chardet
 import pandas as pd
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.code_chunks.step_performers.import_steps.simple_import_code_chunk import DEFAULT_DECIMAL, DEFAULT_DELIMETER, DEFAULT_ENCODING, DEFAULT_ERROR_BAD_LINES, DEFAULT_SKIPROWS, SimpleImportCodeChunk, get_read_csv_params
+from mitosheet.step_performers.import_steps.csv_utils import get_bytes_per_second, get_csv_import_engine, read_csv, read_csv_get_delimiter_and_encoding
 from mitosheet.step_performers.utils import get_param
 
 from mitosheet.utils import get_valid_dataframe_names
@@ -61,6 +59,8 @@ class SimpleImportStepPerformer(StepPerformer):
         file_decimals = []
         file_skiprows = []
         file_error_bad_lines = []
+        file_engines: List[Optional[str]] = []
+        file_bytes_per_second: List[Optional[float]] = []
 
         just_final_file_names = [basename(normpath(file_name)) for file_name in file_names]
 
@@ -87,27 +87,31 @@ class SimpleImportStepPerformer(StepPerformer):
                     decimal = decimals[index] if decimals is not None else DEFAULT_DECIMAL
                     _skiprows = skiprows[index] if skiprows is not None else DEFAULT_SKIPROWS
                     _error_bad_lines = error_bad_lines[index] if error_bad_lines is not None else DEFAULT_ERROR_BAD_LINES
-                    df = pd.read_csv(file_name, **get_read_csv_params(delimeter, encoding, decimal, _skiprows, _error_bad_lines))
-                    pandas_processing_time += (perf_counter() - partial_pandas_start_time)
+                    df = read_csv(file_name, prev_state.csv_import_engine, **get_read_csv_params(delimeter, encoding, decimal, _skiprows, _error_bad_lines))
                 else:
                     # If the user does not specify the delimiter and encoding, then we guess them and use default values for everything else.
-                    df, delimeter, encoding = read_csv_get_delimiter_and_encoding(file_name)
+                    df, delimeter, encoding = read_csv_get_delimiter_and_encoding(file_name, prev_state.csv_import_engine)
                     decimal = DEFAULT_DECIMAL
                     _skiprows = DEFAULT_SKIPROWS
                     _error_bad_lines = DEFAULT_ERROR_BAD_LINES
-                    pandas_processing_time += (perf_counter() - partial_pandas_start_time)
             except:
                 if os.path.exists(file_name):
                     raise make_invalid_simple_import_error()
                 else:
                     raise make_file_not_found_error(file_name)
 
+            partial_pandas_processing_time = perf_counter() - partial_pandas_start_time
+            pandas_processing_time += partial_pandas_processing_time
+            file_bytes_per_second.append(get_bytes_per_second(file_name, partial_pandas_processing_time))
+
             # Save the delimeter and encodings for transpiling
             file_delimeters.append(delimeter)
             file_encodings.append(encoding)
             file_decimals.append(decimal)
             file_skiprows.append(_skiprows)
             file_error_bad_lines.append(_error_bad_lines)
+            # We save the engine we read the file with, so the generated code reads it with the same one
+            file_engines.append(get_csv_import_engine(get_read_csv_params(delimeter, encoding, decimal, _skiprows, _error_bad_lines), prev_state.csv_import_engine))
             
             post_state.add_df_to_state(
                 df, 
@@ -124,7 +128,9 @@ class SimpleImportStepPerformer(StepPerformer):
             'file_decimals': file_decimals,
             'file_skiprows': file_skiprows,
             'file_error_bad_lines': file_error_bad_lines,
-            'pandas_processing_time': pandas_processing_time
+            'file_engines': file_engines,
+            'pandas_processing_time': pandas_processing_time,
+            'file_bytes_per_second': file_bytes_per_second
         }
 
     @classmethod
@@ -144,60 +150,11 @@ class SimpleImportStepPerformer(StepPerformer):
                 get_param(execution_data if execution_data is not None else {}, 'file_encodings'), 
                 get_param(execution_data if execution_data is not None else {}, 'file_decimals'), 
                 get_param(execution_data if execution_data is not None else {}, 'file_skiprows'), 
-                get_param(execution_data if execution_data is not None else {}, 'file_error_bad_lines')
+                get_param(execution_data if execution_data is not None else {}, 'file_error_bad_lines'),
+                get_param(execution_data if execution_data is not None else {}, 'file_engines')
             )
         ]
     
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {-1}
-
-
-
-
-def read_csv_get_delimiter_and_encoding(file_name: str) -> Tuple[pd.DataFrame, str, str]:
-    """
-    Given a file_name, will read in the file as a CSV, and
-    return the df, delimeter, decimal separator, and encoding of the file
-    """
-    encoding = DEFAULT_ENCODING
-    delimeter = DEFAULT_DELIMETER
-    try:
-        # First attempt to read csv without specifying an encoding, just with a delimeter
-        delimeter = guess_delimeter(file_name)
-        df = pd.read_csv(file_name, sep=delimeter)
-    except UnicodeDecodeError:
-        # If we have an encoding error, try and get the encoding
-        try: 
-            encoding = guess_encoding(file_name)
-            delimeter = guess_delimeter(file_name, encoding=encoding)
-
-            # Read the file as dataframe 
-            df = pd.read_csv(file_name, sep=delimeter, encoding=encoding)
-        except: 
-            # Sometimes guess_encoding, guesses 'ascii' when we want 'latin-1', 
-            # so if guess_encoding fails, we try latin-1
-            encoding = 'latin-1'
-            df = pd.read_csv(file_name, sep=delimeter, encoding=encoding)
-        
-    return df, delimeter, encoding
-
-
-def guess_delimeter(file_name: str, encoding: Optional[str]=None) -> str:
-    """
-    Given a path to a file that is assumed to exist and be a CSV, this
-    function guesses the delimeter that is used by that file
-    """
-    s = csv.Sniffer()
-    with open(file_name, 'r', encoding=encoding) as f:
-        return s.sniff(f.readline()).delimiter
-
-def guess_encoding(file_name: str) -> str:
-    """
-    Uses chardet to guess the encoding of the the file
-    at the given file_name
-    """
-    # Attempt to determine the encoding and try again. 
-    with open(file_name, 'rb') as f:
-        result = chardet.detect(f.readline())
-        return result['encoding']
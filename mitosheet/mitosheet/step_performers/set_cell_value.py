@@ -20,7 +20,7 @@ from mitosheet.is_type_utils import (is_int_dtype, is_none_type,
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import ColumnID
+from mitosheet.types import ColumnID, ColumnLocation
 
 
 class SetCellValueStepPerformer(StepPerformer):
@@ -69,9 +69,11 @@ class SetCellValueStepPerformer(StepPerformer):
         if old_value == new_value:
             return prev_state, None
 
-        post_state = prev_state.copy(deep_sheet_indexes=[sheet_index])
+        # We only copy the column that the cell is in, rather than the entire dataframe
+        post_state = prev_state.copy(copy_on_write_sheet_indexes=[sheet_index])
 
         column_header = post_state.column_ids.get_column_header_by_id(sheet_index, column_id)
+        post_state.materialize_column(sheet_index, column_header)
 
         # Update the value of the cell, we handle it differently depending on the type of the column
         column_dtype = str(post_state.dfs[sheet_index][column_header].dtype)
@@ -118,6 +120,12 @@ class SetCellValueStepPerformer(StepPerformer):
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
 
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        column_id: ColumnID = get_param(params, 'column_id')
+        return {(sheet_index, column_id)}, {(sheet_index, column_id)}
+
 
 def cast_value_to_type(value: Union[str, None], column_dtype: str) -> Optional[Any]:
     """
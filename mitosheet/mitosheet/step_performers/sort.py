@@ -14,7 +14,7 @@ from mitosheet.errors import (make_invalid_sort_error,
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils import get_param
-from mitosheet.types import ColumnID
+from mitosheet.types import ColumnID, ColumnLocation
 
 # CONSTANTS USED IN THE SORT STEP ITSELF
 SORT_DIRECTION_ASCENDING = 'ascending'
@@ -96,3 +96,8 @@ class SortStepPerformer(StepPerformer):
     @classmethod
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
+
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        sheet_index: int = get_param(params, 'sheet_index')
+        return {(sheet_index, None)}, {(sheet_index, None)}
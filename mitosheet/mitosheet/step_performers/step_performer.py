@@ -6,6 +6,7 @@
 from abc import ABC, abstractmethod
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.state import State
+from mitosheet.types import ColumnLocation
 from typing import Any, Dict, List, Optional, Set, Tuple
  
 class StepPerformer(ABC, object):
@@ -95,4 +96,22 @@ class StepPerformer(ABC, object):
         If it returned -1, then it modified all new dataframes (on
         the left side of the dfs array).
         """
-        pass
\ No newline at end of file
+        pass
+
+    @classmethod
+    def get_read_and_written_locations(cls, prev_state: State, params: Dict[str, Any]) -> Optional[Tuple[Set[ColumnLocation], Set[ColumnLocation]]]:
+        """
+        Returns the (sheet_index, column_id) locations that this step reads from
+        and writes to, given the saturated params. A column_id of None refers to
+        the entire sheet. Reading a column always also reads the index of its sheet.
+
+        When a step earlier in the analysis is changed, this lets us reuse the 
+        post_state of this step rather than reexecuting it, if it does not read 
+        anything that changed. As such, these must include every location that 
+        the step reads or writes, and a step must not change anything in the 
+        state outside of the locations it writes (e.g. add sheets or graphs).
+
+        If it returns None, then this step might read or write anything, and
+        so it is always reexecuted.
+        """
+        return None
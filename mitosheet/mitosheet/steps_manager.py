@@ -12,8 +12,16 @@ from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple,
 
 import pandas as pd
 from mitosheet.api.get_path_contents import get_path_parts
+from mitosheet.column_buffers import SHEET_DATA_BUFFER_KEY
+from mitosheet.code_chunks.code_chunk_utils import CodeChunkCache
+from mitosheet.column_statistics import ColumnStatisticsCache
 
 from mitosheet.data_in_mito import DataTypeInMito, get_data_type_in_mito
+from mitosheet.dependency_graph import (ChangedLocations, add_changed_locations,
+                                        get_read_and_written_locations,
+                                        get_written_locations,
+                                        get_reused_post_state,
+                                        is_step_affected_by_changed_locations)
 from mitosheet.enterprise.mito_config import MitoConfig
 from mitosheet.experiments.experiment_utils import get_current_experiment
 from mitosheet.step_performers.import_steps.dataframe_import import DataframeImportStepPerformer
@@ -23,8 +31,10 @@ from mitosheet.telemetry.telemetry_utils import log
 from mitosheet.preprocessing import PREPROCESS_STEP_PERFORMERS
 from mitosheet.saved_analyses.save_utils import get_analysis_exists
 from mitosheet.state import State
+from mitosheet.state_history import StateHistory
 from mitosheet.step import Step
-from mitosheet.step_performers import EVENT_TYPE_TO_STEP_PERFORMER
+from mitosheet.step_performers.all_step_performers import EVENT_TYPE_TO_STEP_PERFORMER
+from mitosheet.step_performers.file_export_writer import file_export_writer
 from mitosheet.step_performers.import_steps.excel_import import \
     ExcelImportStepPerformer
 from mitosheet.step_performers.import_steps.simple_import import \
@@ -37,7 +47,7 @@ from mitosheet.types import CodeOptions
 from mitosheet.updates import UPDATES
 from mitosheet.user.utils import is_pro, is_running_test
 from mitosheet.utils import (NpEncoder, dfs_to_array_for_json, get_new_id,
-                             is_default_df_names)
+                             get_sheet_data_json, is_default_df_names)
 
 def get_step_indexes_to_skip(step_list: List[Step]) -> Set[int]:
     """
@@ -80,22 +90,72 @@ def execute_step_list_from_index(
     new_step_list = step_list[: start_index + 1]
     last_valid_step = step_list[start_index]
 
+    # For every state that a step we still have to run was previously executed on, we 
+    # track the locations where it differs from the current state. If a step does not 
+    # read any of these locations, we can reuse its post state. See dependency_graph.py
+    remaining_prev_state_ids = {id(step.prev_state) for step in step_list[start_index + 1 :]}
+    changed_locations_by_state_id: Dict[int, Tuple[State, ChangedLocations]] = {}
+    
+    def track_old_state(old_state: State, changed_locations: ChangedLocations) -> None:
+        if changed_locations is None:
+            changed_locations_by_state_id.pop(id(old_state), None)
+        elif id(old_state) in remaining_prev_state_ids:
+            changed_locations_by_state_id[id(old_state)] = (old_state, changed_locations)
+
+    track_old_state(last_valid_step.final_defined_state, set())
+
     for partial_index, step in enumerate(step_list[start_index + 1 :]):
         step_index = partial_index + start_index + 1
+
+        # If this step was executed on a state we are tracking, get where that state differs
+        _, changed_locations = changed_locations_by_state_id.get(id(step.prev_state), (None, None))
+        was_executed_on_tracked_state = changed_locations is not None and step.post_state is not None
+
         # If we're skipping a step, add it to the new step list (since we don't
         # want to lose it), but don't reexecute it
         if step_index in step_indexes_to_skip:
             new_step_list.append(step)
+
+            # The steps that were executed after this skipped step might be reused, but the 
+            # state they were executed on now differs in the locations this step wrote
+            if was_executed_on_tracked_state:
+                track_old_state(step.final_defined_state, add_changed_locations(changed_locations, get_written_locations(step, step.initial_defined_state)))
             continue
-            
-        # Create a new step with the same params
-        new_step = Step(step.step_type, step.step_id, step.params)
 
-        # Set the previous state of the new step, and then update
-        # what the last valid step is
-        new_step.set_prev_state_and_execute(last_valid_step.final_defined_state)
-        last_valid_step = new_step
+        new_prev_state = last_valid_step.final_defined_state
+        written_locations: ChangedLocations
+        read_and_written_locations = get_read_and_written_locations(step, new_prev_state) if was_executed_on_tracked_state else None
+
+        if read_and_written_locations is not None and not is_step_affected_by_changed_locations(*read_and_written_locations, changed_locations):
+            # If the step does not read anything that changed, we reuse its post state, which
+            # then differs from the new post state in the same locations its prev state did
+            written_locations = read_and_written_locations[1]
+            old_post_state_changed_locations = changed_locations
+            new_step = Step(
+                step.step_type, 
+                step.step_id, 
+                step.params, 
+                new_prev_state, 
+                get_reused_post_state(step, new_prev_state, written_locations),
+                step.execution_data
+            )
+        else:
+            # Create a new step with the same params
+            new_step = Step(step.step_type, step.step_id, step.params)
+
+            # Set the previous state of the new step, and then update
+            # what the last valid step is
+            new_step.set_prev_state_and_execute(new_prev_state)
+            written_locations = get_written_locations(new_step, new_prev_state)
+            old_post_state_changed_locations = add_changed_locations(changed_locations, written_locations)
 
+        # Every old state we're tracking now also differs in the locations this step wrote
+        for old_state, old_changed_locations in list(changed_locations_by_state_id.values()):
+            track_old_state(old_state, add_changed_locations(old_changed_locations, written_locations))
+        if was_executed_on_tracked_state:
+            track_old_state(step.final_defined_state, old_post_state_changed_locations)
+
+        last_valid_step = new_step
         new_step_list.append(new_step)
 
     return new_step_list
@@ -179,6 +239,7 @@ class StepsManager:
             import_folder: Optional[str]=None,
             user_defined_functions: Optional[List[Callable]]=None,
             user_defined_importers: Optional[List[Callable]]=None,
+            send_column_buffers: bool=False,
         ):
         """
         When initalizing the StepsManager, we also do preprocessing
@@ -235,7 +296,8 @@ class StepsManager:
                     args, 
                     df_names=df_names,
                     user_defined_functions=user_defined_functions, 
-                    user_defined_importers=user_defined_importers
+                    user_defined_importers=user_defined_importers,
+                    csv_import_engine=mito_config.get_csv_import_engine()
                 ), 
                 {}
             )
@@ -263,6 +325,14 @@ class StepsManager:
         # which means you can never see before the initalize step
         self.curr_step_idx = 0
 
+        # To bound the memory that the states of all these steps use, we spill the 
+        # states that are far from the current step to disk, if the user sets a budget
+        self.state_history = StateHistory(mito_config.get_state_history_max_memory_mb())
+
+        # If the numeric columns of the sheet data are sent to the frontend as binary
+        # buffers, rather than in the json. See column_buffers.py
+        self.send_column_buffers = send_column_buffers
+
         # We also cache some of the sheet data in a form suitable to turn
         # into json, so that we can package it and send it to the front-end
         # faster and with less work. Make sure to cache the starting values
@@ -278,15 +348,30 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            send_column_buffers=self.send_column_buffers
         )
+        # We also cache the json of each sheet, so we only dump the sheets that changed
+        self.saved_sheet_data_json: List[str] = []
         self.last_step_index_we_wrote_sheet_json_on = 0
 
+        # We cache the statistics of the columns the user looks at in the column menus,
+        # and remove them when a step changes the column. See column_statistics.py
+        self.column_statistics_cache = ColumnStatisticsCache()
+
+        # We cache the optimized code chunks and the code of each code chunk, so that
+        # we only transpile the steps that changed. See code_chunk_utils.py
+        self.code_chunk_cache = CodeChunkCache()
+
         # We store the number of update events that have been processed successfully,
         # which allows us to have some awareness about undos and redos in the front-end
         self.update_event_count = 0
         self.redo_count = 0
         self.undo_count = 0
 
+        # This is incremented every time an edit or update event is handled, so that the
+        # json we send to the frontend can be cached until the state of the analysis changes
+        self.state_version = 0
+
         # This stores the number of times that the sheet renders, and we use it to detect
         # when we are on the first render of a sheet. This is very useful for making
         # sure we only update the state of the backend on the first render of a sheet
@@ -347,12 +432,29 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            send_column_buffers=self.send_column_buffers
         )
 
+        self.saved_sheet_data_json = [
+            get_sheet_data_json(sheet_data) 
+            if sheet_index in modified_sheet_indexes or sheet_index >= len(self.saved_sheet_data_json) 
+            else self.saved_sheet_data_json[sheet_index]
+            for sheet_index, sheet_data in enumerate(array)
+        ]
         self.saved_sheet_data = array
         self.last_step_index_we_wrote_sheet_json_on = self.curr_step_idx
 
-        return json.dumps(array, cls=NpEncoder)
+        # NOTE: this is the same as json.dumps(array, cls=NpEncoder)
+        return '[' + ', '.join(self.saved_sheet_data_json) + ']'
+
+    @property
+    def sheet_data_buffers(self) -> List[bytes]:
+        """
+        The buffer of each sheet in the sheet data that was last returned by 
+        sheet_data_json, which has the numeric columns of the sheet if 
+        send_column_buffers is True, and is empty otherwise.
+        """
+        return [sheet_data.get(SHEET_DATA_BUFFER_KEY, b'') for sheet_data in self.saved_sheet_data]
 
     @property
     def analysis_data_json(self):
@@ -414,12 +516,7 @@ class StepsManager:
             
             # NOTE: we cannot and should not optimize the code chunks here, as
             # rely on getting data out of them is to label the steps correctly
-            code_chunks = step.step_performer.transpile(
-                step.prev_state, # type: ignore
-                step.post_state, # type: ignore
-                step.params,
-                step.execution_data,
-            )
+            code_chunks = step.get_code_chunks()
 
             step_summary_list.append(
                 {
@@ -446,6 +543,7 @@ class StepsManager:
         If there is an error in the creation of the new step, this
         function will not create the new invalid step.
         """
+        self.state_version += 1
 
         # NOTE: We ignore any edit if we are in a historical state, for now. This is a result
         # of the fact that we don't allow previous editing currently
@@ -464,7 +562,11 @@ class StepsManager:
 
         new_steps = self.steps_including_skipped + [new_step]
 
-        self.execute_and_update_steps(new_steps)
+        old_curr_step = self.curr_step
+        # We write the files the user exports straight away, so that if writing them
+        # fails, the new step fails
+        with file_export_writer.writing_synchronously():
+            self.execute_and_update_steps(new_steps)
 
         # If we add a new step, then we clear the last_undone_list_store, as
         # you cannot redo something after you make a new edit
@@ -480,26 +582,60 @@ class StepsManager:
         if len(self.steps_including_skipped) == 2 and is_default_df_names(self.curr_step.df_names): # NOTE: two means we have done at least one edit.
             log('args_update_remains_failed')
 
+        self.enforce_state_history_max_memory()
+        self.update_column_statistics_cache(old_curr_step)
+
     def handle_update_event(self, update_event: Dict[str, Any]) -> None:
         """
         Handles any event that isn't caused by an edit, but instead
         other types of new data coming from the frontend (e.g. the df names
         or some existing steps).
         """
+        self.state_version += 1
 
         for update in UPDATES:
             if update_event["type"] == update["event_type"]:
                 # Get the params for this event
                 params = {key: value for key, value in update_event['params'].items() if key in update['params']}  # type: ignore
                 # Actually execute this event
+                old_curr_step = self.curr_step
                 update["execute"](self, **params)  # type: ignore
                 # Update the number of update events we record occuring
                 self.update_event_count += 1
+                # Make sure the states we keep in memory are up to date with any new current step
+                self.enforce_state_history_max_memory()
+                # And forget the statistics of any columns that are different in the new current step
+                self.update_column_statistics_cache(old_curr_step)
                 # And then return
                 return
 
         raise Exception(f"{update_event} is not an update event!")
 
+    def enforce_state_history_max_memory(self) -> None:
+        """
+        Spills the states that are furthest from the current step to disk, until the 
+        states in memory fit in the state history budget. See state_history.py.
+        """
+        undone_steps = [step for _, step_list in self.undone_step_list_store for step in step_list]
+        self.state_history.enforce_max_memory(self.steps_including_skipped, self.curr_step_idx, undone_steps)
+
+    def update_column_statistics_cache(self, old_curr_step: Step) -> None:
+        """
+        Removes the cached statistics of the columns that are not in the current step, 
+        or that might differ from the old current step. 
+        
+        If a single step was added onto the old current step, then only the columns it 
+        wrote might differ. Otherwise (e.g. after an undo), we only keep the statistics 
+        of the columns whose data is still stored in the same memory.
+        """
+        changed_locations: ChangedLocations = None
+        if self.curr_step is old_curr_step:
+            changed_locations = set()
+        elif self.curr_step.prev_state is not None and self.curr_step.prev_state is old_curr_step.final_defined_state:
+            changed_locations = get_written_locations(self.curr_step, self.curr_step.prev_state)
+
+        self.column_statistics_cache.update_column_statistics(self.curr_step.final_defined_state, changed_locations)
+
     def find_last_valid_index(self, new_steps: List[Step]) -> int:
         """
         Given the new_steps, this function performs some logic to figure
@@ -1,15 +1,16 @@
+import base64
 import hashlib
 import json
 import os
 import pickle
-from typing import Any, Dict, List, Callable, Optional, Tuple, Union
+from typing import Any, Dict, List, Callable, Optional, Set, Tuple, Union
 
 import pandas as pd
 
 from mitosheet.mito_backend import MitoBackend
 from mitosheet.utils import get_new_id
 
-def _get_dataframe_hash(df: pd.DataFrame) -> bytes:
+def get_dataframe_hash(df: pd.DataFrame) -> bytes:
     """
     Returns a hash for a pandas dataframe that is consistent across runs, notably including:
     1. The column names
@@ -20,25 +21,119 @@ def _get_dataframe_hash(df: pd.DataFrame) -> bytes:
     This is necessary due to the issues described here: https://github.com/streamlit/streamlit/issues/7086
     where streamlit default hashing is not ideal for pandas dataframes, as it misses some column header and
     reordering changes. 
+
+    We hash all of the values in each column, rather than a sample of them, so that
+    changing any value changes the hash.
     """
     try:
-        return hashlib.md5(
-            bytes(str(pd.util.hash_pandas_object(df.columns)), 'utf-8') +
-            bytes(str(pd.util.hash_pandas_object(df)), 'utf-8')
-        ).digest()
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(repr([(column_header, str(dtype)) for column_header, dtype in df.dtypes.items()]).encode('utf-8'))
+        hasher.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+        for column_index in range(df.shape[1]):
+            hasher.update(pd.util.hash_pandas_object(df.iloc[:, column_index], index=False).to_numpy().tobytes())
+        return hasher.digest()
     except TypeError as e:        
         # Use pickle if pandas cannot hash the object for example if
         # it contains unhashable objects.
         return b"%s" % pickle.dumps(df, pickle.HIGHEST_PROTOCOL)
 
-def get_dataframe_hash(df: pd.DataFrame) -> bytes:
-    _PANDAS_ROWS_LARGE = 100000
-    _PANDAS_SAMPLE_SIZE = 10000
-    
-    if len(df) >= _PANDAS_ROWS_LARGE:
-        df = df.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
+
+def _get_buffers_base64(buffers: List[bytes]) -> List[str]:
+    return [base64.b64encode(buffer).decode('ascii') for buffer in buffers]
+
+
+class MitoStreamlitSession():
+    """
+    A Mito backend in a streamlit app, along with the responses it has sent to the
+    frontend. 
     
-    return _get_dataframe_hash(df)
+    Streamlit reruns the app whenever anything in it changes, and we send the
+    sheet, analysis and code to the frontend on every rerun. So we cache them until 
+    the state of the analysis changes (see StepsManager.state_version), and only
+    send the responses the frontend has not told us it has read.
+    """
+
+    def __init__(self, mito_backend: MitoBackend):
+        self.mito_backend = mito_backend
+        self.responses: List[Dict[str, Any]] = []
+        # The messages we have received, as the message passer returns the last message
+        # it received on every rerun, until it receives a new one
+        self.received_message_ids: Set[str] = set()
+
+        # The json we last sent the frontend, along with the state version it is from
+        self._cached_json: Dict[str, Tuple[int, str]] = dict()
+        self._responses_json: Optional[str] = None
+
+        # Make a send function that stores the responses in a list
+        self.mito_backend.mito_send = self.send
+
+    def send(self, response: Dict[str, Any], buffers: Optional[List[bytes]]=None) -> None:
+        # The responses are sent to the frontend as json, so we send the buffers of 
+        # the sheets in the sheet data as base64
+        shared_variables = response.get('shared_variables')
+        if shared_variables is not None and buffers is not None:
+            shared_variables['sheet_data_buffers_base64'] = _get_buffers_base64(buffers)
+
+        self.responses.append(response)
+        self._responses_json = None
+
+        # The responses to events contain the sheet and analysis after the event,
+        # so we don't make them again on the next rerun
+        if shared_variables is not None:
+            state_version = self.mito_backend.steps_manager.state_version
+            self._cached_json['sheet_data_json'] = (state_version, shared_variables['sheet_data_json'])
+            self._cached_json['analysis_data_json'] = (state_version, shared_variables['analysis_data_json'])
+            if buffers is not None:
+                self._cached_json['sheet_data_buffers_base64_json'] = (state_version, json.dumps(shared_variables['sheet_data_buffers_base64']))
+
+    def receive_message(self, message: Dict[str, Any]) -> None:
+        """
+        Forgets the responses the frontend has read, and then handles the message if 
+        we have not already received it.
+        """
+        read_response_ids = set(message.get('read_response_ids', []))
+        if any(response['id'] in read_response_ids for response in self.responses):
+            self.responses = [response for response in self.responses if response['id'] not in read_response_ids]
+            self._responses_json = None
+
+        if message['id'] in self.received_message_ids:
+            return
+        self.received_message_ids.add(message['id'])
+        self.mito_backend.receive_message(message)
+
+    def _get_json(self, name: str, get_json: Callable[[], str]) -> str:
+        state_version = self.mito_backend.steps_manager.state_version
+        cached = self._cached_json.get(name)
+        if cached is not None and cached[0] == state_version:
+            return cached[1]
+        json_string = get_json()
+        self._cached_json[name] = (state_version, json_string)
+        return json_string
+
+    @property
+    def sheet_data_json(self) -> str:
+        return self._get_json('sheet_data_json', lambda: self.mito_backend.steps_manager.sheet_data_json)
+
+    @property
+    def sheet_data_buffers_base64_json(self) -> str:
+        # NOTE: the buffers are those of the sheet data json the steps manager made last, 
+        # so we make sure it is the sheet data json of the current state first
+        self.sheet_data_json
+        return self._get_json('sheet_data_buffers_base64_json', lambda: json.dumps(_get_buffers_base64(self.mito_backend.steps_manager.sheet_data_buffers)))
+
+    @property
+    def analysis_data_json(self) -> str:
+        return self._get_json('analysis_data_json', lambda: self.mito_backend.steps_manager.analysis_data_json)
+
+    @property
+    def code(self) -> str:
+        return self._get_json('code', lambda: "\n".join(self.mito_backend.steps_manager.code()))
+
+    @property
+    def responses_json(self) -> str:
+        if self._responses_json is None:
+            self._responses_json = json.dumps(self.responses)
+        return self._responses_json
 
 try:
     import streamlit.components.v1 as components
@@ -54,28 +149,22 @@ try:
     _message_passer_component_func = components.declare_component("message-passer", path=message_passer_build_dr)
 
     @st.cache_resource(hash_funcs={pd.DataFrame: get_dataframe_hash})
-    def _get_mito_backend(
+    def _get_mito_session(
             *args: Union[pd.DataFrame, str, None], 
             _importers: Optional[List[Callable]]=None, 
             _sheet_functions: Optional[List[Callable]]=None, 
             _import_folder: Optional[str]=None,
             df_names: Optional[List[str]]=None,
             key: Optional[str]=None # So it caches on key
-        ) -> Tuple[MitoBackend, List[Any]]: 
+        ) -> MitoStreamlitSession: 
 
         mito_backend = MitoBackend(
             *args, 
             import_folder=_import_folder,
-            user_defined_importers=_importers, user_defined_functions=_sheet_functions
+            user_defined_importers=_importers, user_defined_functions=_sheet_functions,
+            send_column_buffers=True
         )
 
-        # Make a send function that stores the responses in a list
-        responses = []
-        def send(response):
-            responses.append(response)
-        
-        mito_backend.mito_send = send
-
         if df_names is not None and len(df_names) > 0:
             mito_backend.receive_message(
                 {
@@ -88,7 +177,8 @@ try:
                 }
             )
 
-        return mito_backend, responses
+        # NOTE: we make the session after the args update, as the frontend does not read its response
+        return MitoStreamlitSession(mito_backend)
 
     def message_passer_component(key: Optional[str]=None) -> Any:
         """
@@ -145,7 +235,7 @@ try:
             if not os.path.exists(import_folder):
                 raise ValueError(f"Import folder {import_folder} does not exist. Please change the file path or create the folder.")
 
-        mito_backend, responses = _get_mito_backend(
+        mito_session = _get_mito_session(
             *args, 
             _sheet_functions=sheet_functions,
             _importers=importers, 
@@ -153,6 +243,7 @@ try:
             df_names=df_names, 
             key=key
         )
+        mito_backend = mito_session.mito_backend
 
         # Mito widgets need new ids every time a new one is displayed. As such, if
         # the key is None, we generate a new one. Notably, we do this after getting the
@@ -160,41 +251,32 @@ try:
         if key is None:
             key = mito_backend.analysis_name
 
-        sheet_data_json = mito_backend.steps_manager.sheet_data_json,
-        analysis_data_json = mito_backend.steps_manager.analysis_data_json,
-        user_profile_json = mito_backend.get_user_profile_json()
-
         msg = message_passer_component(key=str(key) + 'message_passer')
-        if (
-            msg is not None \
-            and msg['id'] not in [response['id'] for response in responses] \
-            and msg['analysis_name'] == mito_backend.analysis_name
-        ):
+        if msg is not None and msg['analysis_name'] == mito_backend.analysis_name:
             # We receive a message if:
             # 1. It is not None
-            # 2. We have not already received it on this backend
-            # 3. It is for this analysis. 
-            # Note that the final two conditions are to prevent messages that have been sent
-            # by the message passer component from being received again. This happens because
-            # when a component value is set, it is always returned by the message_passer_component
+            # 2. It is for this analysis. 
+            # The session then only handles the message if it has not already received it,
+            # as when a component value is set, it is always returned by the message_passer_component
             # until a new component value is set            
-            mito_backend.receive_message(msg)
-            
-        responses_json = json.dumps(responses)
+            mito_session.receive_message(msg)
 
         _mito_component_func(
             key=key, 
-            sheet_data_json=sheet_data_json, analysis_data_json=analysis_data_json, user_profile_json=user_profile_json, 
-            responses_json=responses_json, id=id(mito_backend)
+            sheet_data_json=mito_session.sheet_data_json, 
+            sheet_data_buffers_base64_json=mito_session.sheet_data_buffers_base64_json, 
+            analysis_data_json=mito_session.analysis_data_json, 
+            user_profile_json=mito_backend.get_user_profile_json(), 
+            responses_json=mito_session.responses_json, 
+            id=id(mito_backend)
         )
 
         # We return a mapping from dataframe names to dataframes
         final_state = mito_backend.steps_manager.curr_step.final_defined_state
-        code = mito_backend.steps_manager.code()
         return {
             df_name: df for df_name, df in 
             zip(final_state.df_names, final_state.dfs)
-        }, "\n".join(code)
+        }, mito_session.code
     
 except ImportError:
     def spreadsheet(*args, key=None): # type: ignore
@@ -9,10 +9,12 @@ This file contains utilities for anonyimizing data. See the README.md in
 this folder for more details on our approach to private telemetry.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
 from mitosheet.parser import parse_formula
 from mitosheet.telemetry.private_params_map import LOG_PARAMS_FORMULAS, LOG_PARAMS_MAP_KEYS_TO_MAKE_PRIVATE, LOG_PARAMS_TO_LINEARIZE, LOG_PARAMS_PUBLIC
-from mitosheet.types import StepsManagerType
 from mitosheet.user.db import get_user_field
 from mitosheet.user.schemas import UJ_USER_SALT
 
@@ -49,12 +51,12 @@ def anonymize_as_string(word: Any) -> str:
     return valid_words[index_one] + valid_words[index_two] + valid_words[index_three]
 
 
-def anonymize_formula(formula: str, sheet_index: int, steps_manager: Optional[StepsManagerType]=None) -> str:
+def anonymize_formula(formula: str, sheet_index: int, dfs: Optional[List[pd.DataFrame]]=None) -> str:
     """
     Helper function that anonymizes formula to 
     make sure that no private data is included in it.
     """
-    if steps_manager is None:
+    if dfs is None:
         return anonymize_as_string(formula)
 
     # We just input a random address, as we don't use it
@@ -63,7 +65,7 @@ def anonymize_formula(formula: str, sheet_index: int, steps_manager: Optional[St
         'A', 
         '0',
         {'type': 'entire_column'},
-        steps_manager.dfs[sheet_index],
+        dfs[sheet_index],
         throw_errors=False
     )
     
@@ -92,7 +94,7 @@ def anonymize_object(obj: Any, anonymize_key: bool=False) -> Any:
     
     return anonymize_as_string(obj)
 
-def get_final_private_params_for_single_kv(key: str, value: Any, params: Dict[str, Any], steps_manager: Optional[StepsManagerType]=None) -> Dict[str, Any]:
+def get_final_private_params_for_single_kv(key: str, value: Any, params: Dict[str, Any], dfs: Optional[List[pd.DataFrame]]=None) -> Dict[str, Any]:
     """
     Given a single key, value pair for a set of params, this function will 
     turn them into a totally anonyimized version of the parameter. 
@@ -103,7 +105,7 @@ def get_final_private_params_for_single_kv(key: str, value: Any, params: Dict[st
     # nested parameters. Note we only do this if it's actually possible to recurse
     if key in LOG_PARAMS_TO_LINEARIZE and isinstance(value, dict):
         for nested_key, nested_value in value.items():
-            nested_params = get_final_private_params_for_single_kv(nested_key, nested_value, params, steps_manager)
+            nested_params = get_final_private_params_for_single_kv(nested_key, nested_value, params, dfs)
             private_params = {
                 **private_params, 
                 # NOTE: we linearize the nested keys with {higher_key}_{lower_key} as the new key
@@ -115,7 +117,7 @@ def get_final_private_params_for_single_kv(key: str, value: Any, params: Dict[st
     if key in LOG_PARAMS_PUBLIC:
         private_params[key] = value
     elif key in LOG_PARAMS_FORMULAS:
-        private_params[key] = anonymize_formula(value, params['sheet_index'], steps_manager)
+        private_params[key] = anonymize_formula(value, params['sheet_index'], dfs)
     else:
         private_params[key] = anonymize_object(value, anonymize_key=key in LOG_PARAMS_MAP_KEYS_TO_MAKE_PRIVATE)
 
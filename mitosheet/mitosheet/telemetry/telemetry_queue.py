@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Sends telemetry logs on a background thread, so that logging does not slow down
+editing the sheet.
+
+Logs are put in a bounded queue, and a worker thread takes them off the queue in
+batches, makes their final params, and sends them to a sink. If the worker falls
+behind and the queue fills up, we drop new logs rather than wait for it, so that
+the edit path never waits on telemetry. Where we can't use threads, we send the
+logs straight away.
+"""
+import atexit
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+from mitosheet.user.location import is_jupyterlite
+
+# JupyterLite does not support multiple threads
+THREADED = not is_jupyterlite()
+
+# The most logs that wait to be sent at once. Each log keeps a reference to the
+# dataframes at the step it was made in, so we keep this small
+MAX_QUEUED_LOGS = 1000
+
+# The most logs the worker sends to the sink at once
+MAX_LOGS_PER_BATCH = 100
+
+# How long we wait for the queued logs to be sent when Python exits
+EXIT_TIMEOUT_SECONDS = 1
+
+T = TypeVar('T')
+
+
+class TelemetryLog():
+    """
+    A log that is ready to be sent, with its final, anonymized params.
+    """
+
+    def __init__(self, log_event: str, params: Dict[str, Any], analytics_url: Optional[str]=None):
+        self.log_event = log_event
+        self.params = params
+        # The url of the enterprise analytics server to also send the log to, if there is one
+        self.analytics_url = analytics_url
+
+
+class TelemetrySink():
+    """
+    Where the telemetry worker sends the logs to.
+    """
+
+    def send_batch(self, logs: List[TelemetryLog]) -> None:
+        raise NotImplementedError()
+
+
+class FakeTelemetrySink(TelemetrySink):
+    """
+    Keeps the logs it is sent in memory, rather than sending them over the
+    network, so we can test telemetry. It keeps all logs, even if telemetry
+    is turned off.
+    """
+
+    def __init__(self) -> None:
+        self.batches: List[List[TelemetryLog]] = []
+
+    def send_batch(self, logs: List[TelemetryLog]) -> None:
+        self.batches.append(logs)
+
+    @property
+    def logs(self) -> List[TelemetryLog]:
+        return [log for batch in self.batches for log in batch]
+
+
+class TelemetryQueue(Generic[T]):
+    """
+    A bounded queue of logs, which a worker thread passes to send_batch in the order
+    they are put in the queue, in batches of up to max_logs_per_batch logs.
+    """
+
+    def __init__(
+            self,
+            send_batch: Callable[[List[T]], None],
+            threaded: bool,
+            max_queued_logs: int=MAX_QUEUED_LOGS,
+            max_logs_per_batch: int=MAX_LOGS_PER_BATCH
+        ):
+        self.send_batch = send_batch
+        self.threaded = threaded
+        self.max_logs_per_batch = max_logs_per_batch
+        self.lock = Lock()
+        self.queue: 'Queue[T]' = Queue(maxsize=max_queued_logs)
+        self.thread: Optional[Thread] = None
+        # The number of logs we dropped because the queue was full
+        self.num_dropped_logs = 0
+
+    def put(self, log: T) -> bool:
+        """
+        Queues the log to be sent, without waiting for space in the queue. Returns
+        False if the queue is full, and so the log is dropped.
+        """
+        if not self.threaded:
+            self._send_batch([log])
+            return True
+
+        with self.lock:
+            # We also start the thread again if we are in a process forked from
+            # the one that started it, as the thread is not copied into it
+            if self.thread is None or not self.thread.is_alive():
+                if self.thread is None:
+                    atexit.register(self.wait, EXIT_TIMEOUT_SECONDS)
+                self.thread = Thread(target=self._run, name='mito-telemetry', daemon=True)
+                self.thread.start()
+
+        try:
+            self.queue.put_nowait(log)
+            return True
+        except Full:
+            with self.lock:
+                self.num_dropped_logs += 1
+            return False
+
+    def wait(self, timeout: Optional[float]=None) -> bool:
+        """
+        Waits until all of the queued logs are sent, or until timeout seconds
+        pass. Returns True if all of the queued logs are sent.
+        """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: self.queue.unfinished_tasks == 0, timeout)
+
+    def _run(self) -> None:
+        while True:
+            logs = [self.queue.get()]
+            while len(logs) < self.max_logs_per_batch:
+                try:
+                    logs.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            try:
+                self._send_batch(logs)
+            finally:
+                for _ in logs:
+                    self.queue.task_done()
+
+    def _send_batch(self, logs: List[T]) -> None:
+        try:
+            self.send_batch(logs)
+        except:
+            # Telemetry should never break Mito, so we drop logs we fail to send
+            pass
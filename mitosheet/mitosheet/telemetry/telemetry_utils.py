@@ -16,14 +16,16 @@ import platform
 import sys
 import time
 from copy import copy
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 
 from unittest.mock import patch
+from mitosheet.data_in_mito import get_data_type_in_mito
 from mitosheet.errors import MitoError, get_recent_traceback_as_list
 from mitosheet.telemetry.anonymization_utils import anonymize_object, get_final_private_params_for_single_kv
 from mitosheet.telemetry.private_params_map import LOG_EXECUTION_DATA_PUBLIC
+from mitosheet.telemetry.telemetry_queue import THREADED, TelemetryLog, TelemetryQueue, TelemetrySink
 from mitosheet.types import StepsManagerType
 from mitosheet.user.location import get_location, is_docker, is_jupyterlite
 from mitosheet.user.schemas import UJ_FEEDBACKS, UJ_FEEDBACKS_V2, UJ_INTENDED_BEHAVIOR, UJ_MITOSHEET_TELEMETRY, UJ_USER_EMAIL
@@ -91,7 +93,25 @@ def telemetry_turned_on() -> bool:
     telemetry = get_user_field(UJ_MITOSHEET_TELEMETRY) 
     return telemetry if telemetry is not None else False
 
-def _get_anonymized_log_params(params: Dict[str, Any], steps_manager: Optional[StepsManagerType]=None) -> Dict[str, Any]:
+class StepsManagerSnapshot():
+    """
+    The parts of the steps manager that a log uses, as they are when the log
+    is made. As we make the final params for a log on the telemetry thread,
+    this means the log is not changed by edits that happen before it is sent.
+
+    The dataframes and steps are never changed once they are made, so we just
+    keep references to them.
+    """
+
+    def __init__(self, steps_manager: StepsManagerType):
+        self.analysis_name = steps_manager.analysis_name
+        self.curr_step_idx = steps_manager.curr_step_idx
+        self.curr_step = steps_manager.curr_step
+        self.dfs = steps_manager.dfs
+        self.public_interface_version = steps_manager.public_interface_version
+
+
+def _get_anonymized_log_params(params: Dict[str, Any], steps_manager: Optional[StepsManagerSnapshot]=None) -> Dict[str, Any]:
     """
     Private params are where we _make sure_ that no private
     user data leaves the user's machine. We replace any potentially
@@ -102,7 +122,7 @@ def _get_anonymized_log_params(params: Dict[str, Any], steps_manager: Optional[S
     for key, value in params.items():
         private_params = {
             **private_params, 
-            **get_final_private_params_for_single_kv(key, value, params, steps_manager)
+            **get_final_private_params_for_single_kv(key, value, params, steps_manager.dfs if steps_manager is not None else None)
         }
 
     # Prefix all the params with params_ so we can easily find them
@@ -111,7 +131,7 @@ def _get_anonymized_log_params(params: Dict[str, Any], steps_manager: Optional[S
     return private_params
 
 
-def _get_execution_data_log_params(steps_manager: Optional[StepsManagerType]=None) -> Dict[str, Any]:
+def _get_execution_data_log_params(steps_manager: Optional[StepsManagerSnapshot]=None) -> Dict[str, Any]:
     """
     Get the execution params as well, again making sure
     to remove any private data.
@@ -130,7 +150,7 @@ def _get_execution_data_log_params(steps_manager: Optional[StepsManagerType]=Non
 
     return execution_data_params
 
-def _get_wsc_log_params(steps_manager: Optional[StepsManagerType]=None) -> Dict[str, Any]:
+def _get_wsc_log_params(steps_manager: Optional[StepsManagerSnapshot]=None) -> Dict[str, Any]:
     """
     Get data from the widget state container that is useful for any
     log event. Note that none of this is private data.
@@ -143,7 +163,7 @@ def _get_wsc_log_params(steps_manager: Optional[StepsManagerType]=None) -> Dict[
         return {
             'wsc_analysis_name': steps_manager.analysis_name,
             # NOTE: Change this when code fixing this logic is merged in
-            'wsc_data_type_in_mito': str(steps_manager.data_type_in_mito),
+            'wsc_data_type_in_mito': str(get_data_type_in_mito(steps_manager.dfs)),
             'wsc_local': is_local_deployment(),
             'wsc_curr_step_idx': steps_manager.curr_step_idx,
             'wsc_curr_step_type': steps_manager.curr_step.step_type,
@@ -170,7 +190,7 @@ def _get_error_log_params(failed: bool=False, mito_error: Optional[MitoError]=No
     else:
         return {}
 
-def _get_processing_time_log_params(steps_manager: Optional[StepsManagerType]=None, start_time: Optional[float]=None)-> Dict[str, Any]:
+def _get_processing_time_log_params(steps_manager: Optional[StepsManagerSnapshot]=None, processing_time: Optional[float]=None)-> Dict[str, Any]:
     """
     Get data relevant for measuring performance impact
     """
@@ -180,8 +200,7 @@ def _get_processing_time_log_params(steps_manager: Optional[StepsManagerType]=No
     # so that we can bucket these items easily. Note we include a variety of roundings of 
     # the time, so that we can make sure to aggregate in Mixpanel well (which will die if 
     # it is given to many values).
-    if start_time is not None:
-        processing_time = time.perf_counter() - start_time
+    if processing_time is not None:
         processing_time_params['processing_time'] = round(processing_time, 1)
         processing_time_params['processing_time_seconds'] = int(round(processing_time, 0))
         processing_time_params['processing_time_seconds_ten'] = int(round(processing_time, -1))
@@ -374,23 +393,88 @@ def identify() -> None:
             analytics.identify(static_user_id, params)
 
 
-def log(log_event: str, params: Optional[Dict[str, Any]]=None, steps_manager: Optional[StepsManagerType]=None, failed: bool=False, mito_error: Optional[MitoError]=None, start_time: Optional[float]=None) -> None:
+# Whether we have identified the user since mitosheet was imported
+_identified_since_import = False
+
+def identify_once() -> None:
+    """
+    Identifies the user, if they have not been identified since mitosheet was imported. 
+    
+    We call this when a sheet is made, rather than when mitosheet is imported, so that 
+    importing mitosheet does not have to import the telemetry.
+    """
+    global _identified_since_import
+    if _identified_since_import:
+        return
+    _identified_since_import = True
+    identify()
+
+
+class SegmentTelemetrySink(TelemetrySink):
+    """
+    Sends logs to segment if telemetry is turned on and we are not running tests,
+    and to the enterprise analytics url if there is one.
     """
-    This function is the entry point for all logging. It collects
-    all relevant parameters, exeuction data, and more info while
-    making sure to anonymize all data. 
 
-    Then, if telemetry is not turned off and we are not running tests,
-    we log this information.
+    def send_batch(self, logs: List[TelemetryLog]) -> None:
+        static_user_id = get_user_field(UJ_STATIC_USER_ID)
+
+        # We do not log anything when tests are running, or if telemetry is turned off
+        if not is_running_test() and telemetry_turned_on():
+            for telemetry_log in logs:
+                if is_jupyterlite():
+                    # We patch post function to use pyodide fetch
+                    # instead of requests
+                    with patch('requests.sessions.Session.post', post):
+                        analytics.track(static_user_id, telemetry_log.log_event, telemetry_log.params)
+                else:
+                    analytics.track(static_user_id, telemetry_log.log_event, telemetry_log.params)
+
+        for telemetry_log in logs:
+            if telemetry_log.analytics_url is not None:
+                requests.post(
+                    telemetry_log.analytics_url,
+                    json={
+                        'user_id': static_user_id,
+                        'log_event': telemetry_log.log_event
+                    }
+                )
+
+
+class QueuedLog():
+    """
+    What we need to make the final params for a log, which we take when the log is
+    made, so we can make the params on the telemetry thread.
     """
-    if params is None:
-        params = {}
 
+    def __init__(
+            self,
+            log_event: str,
+            params: Dict[str, Any],
+            steps_manager: Optional[StepsManagerSnapshot],
+            error_params: Dict[str, Any],
+            processing_time: Optional[float],
+            analytics_url: Optional[str]
+        ):
+        self.log_event = log_event
+        self.params = params
+        self.steps_manager = steps_manager
+        self.error_params = error_params
+        self.processing_time = processing_time
+        self.analytics_url = analytics_url
+
+
+def _get_telemetry_log(queued_log: QueuedLog) -> TelemetryLog:
+    """
+    Collects all relevant parameters, execution data, and more info for the
+    log, while making sure to anonymize all data.
+    """
+    steps_manager = queued_log.steps_manager
 
     final_params: Dict[str, Any] = {}
 
     # First, get the private params
-    final_params = {**final_params, **_get_anonymized_log_params(params, steps_manager=steps_manager)}
+    final_params = {**final_params, **_get_anonymized_log_params(queued_log.params, steps_manager=steps_manager)}
 
     # Then, get the execution data from the steps
     final_params = {**final_params, **_get_execution_data_log_params(steps_manager=steps_manager)}
@@ -399,10 +483,10 @@ def log(log_event: str, params: Optional[Dict[str, Any]]=None, steps_manager: Op
     final_params = {**final_params, **_get_wsc_log_params(steps_manager=steps_manager)}
 
     # Then, get the logs for the error (if there is one)
-    final_params = {**final_params, **_get_error_log_params(failed=failed, mito_error=mito_error)}
+    final_params = {**final_params, **queued_log.error_params}
 
     # Then, get the logs for the processing time of the operation
-    final_params = {**final_params, **_get_processing_time_log_params(steps_manager=steps_manager, start_time=start_time)}
+    final_params = {**final_params, **_get_processing_time_log_params(steps_manager=steps_manager, processing_time=queued_log.processing_time)}
 
     # Then, get the params for the environment 
     final_params = {**final_params, **_get_environment_params()}
@@ -413,40 +497,74 @@ def log(log_event: str, params: Optional[Dict[str, Any]]=None, steps_manager: Op
     # Then, make sure to add the user email
     final_params['email'] = get_user_field(UJ_USER_EMAIL)
 
-    # Finially, do the acutal logging. We do not log anything when tests are
-    # running, or if telemetry is turned off
-    if not is_running_test() and telemetry_turned_on():
-
-        if is_jupyterlite():
-            # We patch post function to use pyodide fetch
-            # instead of requests
-            with patch('requests.sessions.Session.post', post):
-                analytics.track(
-                    get_user_field(UJ_STATIC_USER_ID), 
-                    log_event, 
-                    final_params
-                )
-        else:
-            analytics.track(
-                get_user_field(UJ_STATIC_USER_ID), 
-                log_event, 
-                final_params
-            )
-        
-
     # If we want to print the logs for debugging reasons, then we print them as well
     if PRINT_LOGS:
         print(
-            log_event, 
+            queued_log.log_event, 
             final_params
         )
 
-    analytics_url = steps_manager.mito_config.get_analytics_url() if steps_manager is not None else None
-    if analytics_url is not None:
-        requests.post(
-            analytics_url,
-            json={
-                'user_id': get_user_field(UJ_STATIC_USER_ID),
-                'log_event': log_event
-            }
-        )
\ No newline at end of file
+    return TelemetryLog(queued_log.log_event, final_params, queued_log.analytics_url)
+
+
+def _send_queued_logs(queued_logs: List[QueuedLog]) -> None:
+    telemetry_logs = []
+    for queued_log in queued_logs:
+        try:
+            telemetry_logs.append(_get_telemetry_log(queued_log))
+        except:
+            # If we fail to make one log, we still send the rest of the batch
+            pass
+    
+    if len(telemetry_logs) > 0:
+        telemetry_sink.send_batch(telemetry_logs)
+
+
+telemetry_sink: TelemetrySink = SegmentTelemetrySink()
+telemetry_queue: TelemetryQueue[QueuedLog] = TelemetryQueue(_send_queued_logs, THREADED)
+
+
+def set_telemetry_sink(sink: TelemetrySink) -> TelemetrySink:
+    """
+    Sends all logs that are sent after this to the sink, and returns the 
+    sink they were sent to before. Used to test telemetry without a network.
+    """
+    global telemetry_sink
+    previous_sink, telemetry_sink = telemetry_sink, sink
+    return previous_sink
+
+
+def wait_for_telemetry(timeout: Optional[float]=None) -> bool:
+    """
+    Waits until all of the logs that have been made are sent, or until timeout
+    seconds pass. Returns True if all of the logs are sent.
+    """
+    return telemetry_queue.wait(timeout)
+
+
+def log(log_event: str, params: Optional[Dict[str, Any]]=None, steps_manager: Optional[StepsManagerType]=None, failed: bool=False, mito_error: Optional[MitoError]=None, start_time: Optional[float]=None) -> None:
+    """
+    This function is the entry point for all logging. 
+    
+    As logging happens on the edit path, we just take what we need to make the
+    log here, and queue it. The telemetry thread then collects all relevant 
+    parameters, exeuction data, and more info while making sure to anonymize 
+    all data, and if telemetry is not turned off and we are not running tests,
+    logs this information. 
+    
+    If too many logs are waiting to be sent, we drop this log.
+    """
+    # NOTE: we take the processing time and the error here, as the error is only 
+    # available on the thread that handled it
+    processing_time = time.perf_counter() - start_time if start_time is not None else None
+    error_params = _get_error_log_params(failed=failed, mito_error=mito_error)
+
+    telemetry_queue.put(QueuedLog(
+        log_event,
+        # NOTE: We make a copy here, as the params may be changed after we queue the log
+        copy(params) if params is not None else {},
+        StepsManagerSnapshot(steps_manager) if steps_manager is not None else None,
+        error_params,
+        processing_time,
+        steps_manager.mito_config.get_analytics_url() if steps_manager is not None else None
+    ))
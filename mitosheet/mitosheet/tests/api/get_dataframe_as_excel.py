@@ -11,6 +11,7 @@ import pytest
 
 from mitosheet.tests.test_utils import create_mito_wrapper_with_data
 from mitosheet.api.get_dataframe_as_excel import get_dataframe_as_excel
+from mitosheet.types import API_RESULT_BUFFER_KEY
 
 # TODO: add test for multiple sheets having formatting
 # This tests adding formatting to a single sheet and exporting as excel
@@ -27,11 +28,11 @@ def test_add_formatting_to_excel_sheet():
         "conditional_formats": []
     })
 
-    # Get the excel string
-    excel_string = get_dataframe_as_excel({'sheet_indexes': [0] }, test_wrapper.mito_backend.steps_manager)
+    # Get the excel file
+    excel_download = get_dataframe_as_excel({'sheet_indexes': [0] }, test_wrapper.mito_backend.steps_manager)
     
-    # Check that the excel string is not empty
-    assert excel_string != ''
+    # Check that the excel file is not empty
+    assert excel_download[API_RESULT_BUFFER_KEY] != b''
 
 # This tests exporting as excel without formatting
 def test_export_to_excel_sheet_no_formatting():
@@ -40,11 +41,11 @@ def test_export_to_excel_sheet_no_formatting():
     test_wrapper.add_column(0, 'B')
     test_wrapper.add_column(0, 'C')
 
-    # Get the excel string
-    excel_string = get_dataframe_as_excel({'sheet_indexes': [0] }, test_wrapper.mito_backend.steps_manager)
+    # Get the excel file
+    excel_download = get_dataframe_as_excel({'sheet_indexes': [0] }, test_wrapper.mito_backend.steps_manager)
     
-    # Check that the excel string is not empty
-    assert excel_string != ''
+    # Check that the excel file is not empty
+    assert excel_download[API_RESULT_BUFFER_KEY] != b''
 
 # Test for adding an invalid color, expect this to throw an error
 def test_add_invalid_formatting_to_excel_sheet_fails():
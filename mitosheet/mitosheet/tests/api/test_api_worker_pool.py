@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for handling API calls in a pool of worker threads.
+"""
+from threading import Event
+from time import sleep
+
+import pandas as pd
+
+import mitosheet.api.api as api
+from mitosheet.api.api import API
+from mitosheet.api.api_worker_pool import APICallCancelled, APIWorkerPool, raise_if_api_call_cancelled
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+TIMEOUT = 10
+
+
+def make_event(id, type, **params):
+    return {'event': 'api_call', 'id': id, 'type': type, 'params': params}
+
+
+def wait_until(condition):
+    for _ in range(TIMEOUT * 100):
+        if condition():
+            return
+        sleep(0.01)
+    raise AssertionError('Timed out')
+
+
+def test_calls_handled_in_order_of_priority():
+    started = Event()
+    unblock = Event()
+    handled = []
+
+    def handle_event(event):
+        handled.append(event['id'])
+        if event['id'] == 'blocking':
+            started.set()
+            unblock.wait(TIMEOUT)
+
+    pool = APIWorkerPool(handle_event, lambda event: None, num_workers=1)
+    pool.submit(make_event('blocking', 'get_path_contents'))
+    started.wait(TIMEOUT)
+
+    pool.submit(make_event('excel', 'get_dataframe_as_excel'))
+    pool.submit(make_event('graph', 'get_column_summary_graph', sheet_index=0, column_id='A'))
+    pool.submit(make_event('path', 'get_path_contents'))
+    unblock.set()
+
+    wait_until(lambda: len(handled) == 4)
+    assert handled == ['blocking', 'path', 'graph', 'excel']
+
+
+def test_slow_exports_do_not_block_interactive_calls():
+    unblock = Event()
+    handled = []
+
+    def handle_event(event):
+        if event['type'] in ['get_dataframe_as_excel', 'get_dataframe_as_csv']:
+            unblock.wait(TIMEOUT)
+        handled.append(event['id'])
+
+    pool = APIWorkerPool(handle_event, lambda event: None, num_workers=2)
+    pool.submit(make_event('excel 1', 'get_dataframe_as_excel'))
+    pool.submit(make_event('csv', 'get_dataframe_as_csv'))
+    pool.submit(make_event('path', 'get_path_contents'))
+
+    wait_until(lambda: handled == ['path'])
+    unblock.set()
+    wait_until(lambda: len(handled) == 3)
+
+
+def test_superseded_queued_call_is_dropped():
+    started = Event()
+    unblock = Event()
+    handled = []
+    dropped = []
+
+    def handle_event(event):
+        handled.append(event['id'])
+        if event['id'] == 'blocking':
+            started.set()
+            unblock.wait(TIMEOUT)
+
+    pool = APIWorkerPool(handle_event, lambda event: dropped.append(event['id']), num_workers=1)
+    pool.submit(make_event('blocking', 'get_path_contents'))
+    started.wait(TIMEOUT)
+
+    pool.submit(make_event('search a', 'get_unique_value_counts', sheet_index=0, column_id='A', search_string='a'))
+    pool.submit(make_event('search b', 'get_unique_value_counts', sheet_index=0, column_id='B', search_string='a'))
+    pool.submit(make_event('search ab', 'get_unique_value_counts', sheet_index=0, column_id='A', search_string='ab'))
+    assert dropped == ['search a']
+    unblock.set()
+
+    wait_until(lambda: len(handled) == 3)
+    assert handled == ['blocking', 'search b', 'search ab']
+    assert pool.metrics.get_metrics()['get_unique_value_counts']['num_cancelled'] == 1
+
+
+def test_superseded_running_call_is_cancelled():
+    started = Event()
+    results = []
+
+    def handle_event(event):
+        try:
+            if event['id'] == 'search a':
+                started.set()
+                for _ in range(TIMEOUT * 100):
+                    raise_if_api_call_cancelled()
+                    sleep(0.01)
+            results.append((event['id'], 'finished'))
+        except APICallCancelled:
+            results.append((event['id'], 'cancelled'))
+
+    pool = APIWorkerPool(handle_event, lambda event: None, num_workers=2)
+    pool.submit(make_event('search a', 'get_unique_value_counts', sheet_index=0, column_id='A', search_string='a'))
+    started.wait(TIMEOUT)
+    pool.submit(make_event('search ab', 'get_unique_value_counts', sheet_index=0, column_id='A', search_string='ab'))
+
+    # The cancelled call always finishes before the call that superseded it starts
+    wait_until(lambda: len(results) == 2)
+    assert results == [('search a', 'cancelled'), ('search ab', 'finished')]
+
+
+def test_drops_lowest_priority_call_when_queue_is_full():
+    started = Event()
+    unblock = Event()
+    dropped = []
+
+    def handle_event(event):
+        if event['id'] == 'blocking':
+            started.set()
+            unblock.wait(TIMEOUT)
+
+    pool = APIWorkerPool(handle_event, lambda event: dropped.append(event['id']), num_workers=1, max_queued_calls=2)
+    pool.submit(make_event('blocking', 'get_path_contents'))
+    started.wait(TIMEOUT)
+
+    pool.submit(make_event('excel', 'get_dataframe_as_excel'))
+    pool.submit(make_event('path 1', 'get_path_contents'))
+    pool.submit(make_event('path 2', 'get_path_contents'))
+    assert dropped == ['excel']
+    unblock.set()
+
+
+def test_records_metrics_for_each_call_type():
+    pool = APIWorkerPool(lambda event: sleep(0.01), lambda event: None)
+    pool.submit(make_event('1', 'get_path_contents'))
+    pool.submit(make_event('2', 'get_path_contents'))
+
+    wait_until(lambda: pool.metrics.get_metrics().get('get_path_contents', {}).get('num_calls') == 2)
+    metrics = pool.metrics.get_metrics()['get_path_contents']
+    assert metrics['max_execution_time'] >= 0.01
+    assert metrics['mean_execution_time'] >= 0.01
+    assert metrics['num_cancelled'] == 0
+
+
+class FakeBackend():
+    def __init__(self):
+        self.messages = []
+
+    def mito_send(self, message, buffers=None):
+        self.messages.append(message)
+
+
+def test_api_answers_calls():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    backend = FakeBackend()
+    mito_api = API(mito.mito_backend.steps_manager, backend)
+
+    mito_api.process_new_api_call(make_event('describe', 'get_column_describe', sheet_index=0, column_id='A'))
+
+    wait_until(lambda: len(backend.messages) == 1)
+    assert backend.messages[0]['id'] == 'describe'
+    assert backend.messages[0]['data']['max'] == '3.0'
+    assert mito_api.api_call_metrics.get_metrics()['get_column_describe']['num_calls'] == 1
+
+
+def test_api_answers_calls_in_main_thread_when_not_threaded(monkeypatch):
+    monkeypatch.setattr(api, 'THREADED', False)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    backend = FakeBackend()
+    mito_api = API(mito.mito_backend.steps_manager, backend)
+
+    mito_api.process_new_api_call(make_event('describe', 'get_column_describe', sheet_index=0, column_id='A'))
+
+    assert mito_api.worker_pool is None
+    assert backend.messages[0]['data']['max'] == '3.0'
+    assert mito_api.api_call_metrics.get_metrics()['get_column_describe']['num_calls'] == 1
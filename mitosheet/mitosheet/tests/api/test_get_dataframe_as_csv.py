@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for downloading dataframes as CSV and Excel files in chunks.
+"""
+import io
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import mitosheet.export_downloads as export_downloads_module
+from mitosheet.api.api import handle_api_event
+from mitosheet.api.get_dataframe_as_csv import get_dataframe_as_csv
+from mitosheet.api.get_dataframe_as_excel import get_dataframe_as_excel
+from mitosheet.export_downloads import export_downloads
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.types import API_RESULT_BUFFER_KEY
+
+
+def download(api_function, params, steps_manager):
+    chunk = api_function(params, steps_manager)
+    chunks = [chunk[API_RESULT_BUFFER_KEY]]
+    for chunk_index in range(1, chunk['num_chunks']):
+        chunks.append(api_function({**params, 'download_id': chunk['download_id'], 'chunk_index': chunk_index}, steps_manager)[API_RESULT_BUFFER_KEY])
+    return chunk, b''.join(chunks)
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b,c', None]}),
+    pd.DataFrame({'A': np.arange(1000), 'B': ['value'] * 1000, 'C': pd.date_range('2020-01-01', periods=1000)}),
+    pd.DataFrame({'A': []}),
+])
+def test_get_dataframe_as_csv_in_chunks(monkeypatch, df):
+    monkeypatch.setattr(export_downloads_module, 'DOWNLOAD_CHUNK_NUM_BYTES', 100)
+    monkeypatch.setattr(export_downloads_module, 'CSV_CHUNK_NUM_ROWS', 7)
+    mito = create_mito_wrapper(df)
+
+    first_chunk, csv_bytes = download(get_dataframe_as_csv, {'sheet_index': 0}, mito.mito_backend.steps_manager)
+
+    assert csv_bytes.decode('utf-8') == df.to_csv(index=False)
+    assert first_chunk['num_bytes'] == len(csv_bytes)
+    assert first_chunk['num_chunks'] == max(1, -(-len(csv_bytes) // 100))
+
+
+def test_get_dataframes_as_excel_in_chunks(monkeypatch):
+    monkeypatch.setattr(export_downloads_module, 'DOWNLOAD_CHUNK_NUM_BYTES', 1000)
+    df = pd.DataFrame({'A': np.arange(100), 'B': ['value'] * 100})
+    mito = create_mito_wrapper(df, df)
+
+    first_chunk, excel_bytes = download(get_dataframe_as_excel, {'sheet_indexes': [0, 1]}, mito.mito_backend.steps_manager)
+
+    assert first_chunk['num_chunks'] > 1
+    sheets = pd.read_excel(io.BytesIO(excel_bytes), sheet_name=None)
+    assert list(sheets.keys()) == ['df1', 'df2']
+    assert sheets['df1'].equals(df)
+
+
+def test_download_file_removed_after_last_chunk(monkeypatch):
+    monkeypatch.setattr(export_downloads_module, 'DOWNLOAD_CHUNK_NUM_BYTES', 5)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    steps_manager = mito.mito_backend.steps_manager
+
+    first_chunk = get_dataframe_as_csv({'sheet_index': 0}, steps_manager)
+    file_name = os.path.join(export_downloads.get_download_folder(), f"{first_chunk['download_id']}.csv")
+    assert os.path.exists(file_name)
+
+    download_params = {'sheet_index': 0, 'download_id': first_chunk['download_id']}
+    for chunk_index in range(1, first_chunk['num_chunks']):
+        get_dataframe_as_csv({**download_params, 'chunk_index': chunk_index}, steps_manager)
+    assert not os.path.exists(file_name)
+
+    with pytest.raises(ValueError):
+        get_dataframe_as_csv({**download_params, 'chunk_index': 0}, steps_manager)
+
+
+def test_oldest_unfinished_downloads_are_removed(monkeypatch):
+    monkeypatch.setattr(export_downloads_module, 'DOWNLOAD_CHUNK_NUM_BYTES', 1)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    steps_manager = mito.mito_backend.steps_manager
+    export_downloads.clear()
+
+    download_ids = [
+        get_dataframe_as_csv({'sheet_index': 0}, steps_manager)['download_id']
+        for _ in range(export_downloads_module.MAX_CACHED_DOWNLOADS + 1)
+    ]
+
+    assert len(os.listdir(export_downloads.get_download_folder())) == export_downloads_module.MAX_CACHED_DOWNLOADS
+    with pytest.raises(ValueError):
+        get_dataframe_as_csv({'sheet_index': 0, 'download_id': download_ids[0], 'chunk_index': 1}, steps_manager)
+    assert get_dataframe_as_csv({'sheet_index': 0, 'download_id': download_ids[-1], 'chunk_index': 1}, steps_manager)[API_RESULT_BUFFER_KEY] == b'\n'
+    export_downloads.clear()
+
+
+def test_download_removed_while_chunk_is_read_is_removed_after_it(monkeypatch):
+    monkeypatch.setattr(export_downloads_module, 'DOWNLOAD_CHUNK_NUM_BYTES', 2)
+    downloads = export_downloads_module.ExportDownloads()
+    def write(file_name):
+        with open(file_name, 'w') as f:
+            f.write('A\n1\n')
+    download = downloads.create_download(write, 'csv')
+
+    # Another thread removes the download while this chunk is being read
+    def open_while_removing_download(file_name, *args, **kwargs):
+        for _ in range(export_downloads_module.MAX_CACHED_DOWNLOADS):
+            downloads.create_download(write, 'csv')
+        assert os.path.exists(download.file_name)
+        return open(file_name, *args, **kwargs)
+    monkeypatch.setattr(export_downloads_module, 'open', open_while_removing_download, raising=False)
+
+    assert downloads.read_chunk(download.download_id, 0)[API_RESULT_BUFFER_KEY] == b'A\n'
+    assert not os.path.exists(download.file_name)
+    downloads.clear()
+
+
+def test_download_chunk_sent_as_comm_buffer():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    sent = []
+    def send(response, buffers=None):
+        sent.append((response, buffers))
+
+    handle_api_event(send, {
+        'event': 'api_call',
+        'id': '1234',
+        'type': 'get_dataframe_as_csv',
+        'params': {'sheet_index': 0}
+    }, mito.mito_backend.steps_manager)
+
+    (response, buffers), = sent
+    assert response['data']['num_chunks'] == 1
+    assert API_RESULT_BUFFER_KEY not in response['data']
+    assert buffers[0] == b'A\n1\n2\n3\n'
+
+
+def test_get_dataframe_as_csv_memory_does_not_grow_with_rows():
+    def get_peak_memory(num_rows):
+        mito = create_mito_wrapper(pd.DataFrame({'A': np.arange(num_rows), 'B': np.random.rand(num_rows), 'C': ['value'] * num_rows}))
+        tracemalloc.start()
+        get_dataframe_as_csv({'sheet_index': 0}, mito.mito_backend.steps_manager)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        export_downloads.clear()
+        return peak
+
+    assert get_peak_memory(200_000) < get_peak_memory(50_000) * 2
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for getting a window of the data in a sheet.
+"""
+import json
+
+import pandas as pd
+
+from mitosheet.api.get_sheet_window import get_sheet_window
+from mitosheet.pro.conditional_formatting_utils import get_conditonal_formatting_result
+from mitosheet.state import State
+from mitosheet.step_performers.filter import FC_NUMBER_GREATER
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.utils import MAX_ROWS
+
+
+def get_window(mito, row_start, row_end, column_start, column_end, sheet_index=0):
+    return get_sheet_window({
+        'sheet_index': sheet_index,
+        'row_start': row_start,
+        'row_end': row_end,
+        'column_start': column_start,
+        'column_end': column_end
+    }, mito.mito_backend.steps_manager)
+
+
+def test_get_sheet_window_beyond_max_rows():
+    num_rows = MAX_ROWS * 2
+    mito = create_mito_wrapper(pd.DataFrame({'A': list(range(num_rows)), 'B': ['b'] * num_rows}))
+
+    window = get_window(mito, 2000, 2010, 0, 2)
+
+    assert window['numRows'] == num_rows
+    assert window['numColumns'] == 2
+    assert (window['rowStart'], window['rowEnd']) == (2000, 2010)
+    assert window['index'] == list(range(2000, 2010))
+    assert window['data'][0]['columnID'] == 'A'
+    assert window['data'][0]['columnHeader'] == 'A'
+    assert window['data'][0]['columnDtype'] == 'int64'
+    assert window['data'][0]['columnData'] == list(range(2000, 2010))
+    assert window['data'][1]['columnData'] == ['b'] * 10
+    # The result is sent to the frontend as json
+    json.dumps(window)
+
+
+def test_get_sheet_window_of_columns():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6], 'C': [7, 8, 9]}))
+
+    window = get_window(mito, 1, 3, 1, 2)
+
+    assert (window['columnStart'], window['columnEnd']) == (1, 2)
+    assert window['index'] == [1, 2]
+    assert [column['columnHeader'] for column in window['data']] == ['B']
+    assert window['data'][0]['columnData'] == [5, 6]
+
+
+def test_get_sheet_window_clamped_to_sheet():
+    mito = create_mito_wrapper(pd.DataFrame({'A': list(range(MAX_ROWS * 3))}))
+
+    window = get_window(mito, -10, MAX_ROWS * 2, 0, 100)
+    assert (window['rowStart'], window['rowEnd']) == (0, MAX_ROWS)
+    assert (window['columnStart'], window['columnEnd']) == (0, 1)
+
+    window = get_window(mito, MAX_ROWS * 5, MAX_ROWS * 6, 0, 1)
+    assert (window['rowStart'], window['rowEnd']) == (MAX_ROWS * 3, MAX_ROWS * 3)
+    assert window['index'] == []
+    assert window['data'][0]['columnData'] == []
+
+
+def test_conditional_formatting_result_for_window():
+    df = pd.DataFrame({'A': list(range(MAX_ROWS * 2))})
+    state = State([df])
+    conditional_formats = [{
+        'format_uuid': '1234',
+        'columnIDs': ['A'],
+        'filters': [{'condition': FC_NUMBER_GREATER, 'value': 1995}],
+        'color': 'red',
+        'backgroundColor': 'blue',
+    }]
+
+    result = get_conditonal_formatting_result(state, 0, df, conditional_formats, max_rows=10, row_start=1990)
+
+    assert result['invalid_conditional_formats'] == {}
+    assert list(result['results']['A'].keys()) == ['1996', '1997', '1998', '1999']
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Marks all of the benchmarks, so that they only run when they are asked for, with
+`pytest mitosheet/tests/benchmarks -m benchmark`, as they take a while.
+
+Each benchmark reports its numbers with the benchmark_report fixture, and they are
+shown in the summary at the end of the run.
+"""
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, List, Optional
+
+import pytest
+
+BENCHMARKS_FOLDER = Path(__file__).parent
+
+# The numbers reported by the benchmarks that have run
+BENCHMARK_REPORTS: List[str] = []
+
+
+def pytest_collection_modifyitems(items):
+    # NOTE: this is passed all of the tests, not just the ones in this folder
+    for item in items:
+        if BENCHMARKS_FOLDER in Path(item.fspath).parents:
+            item.add_marker(pytest.mark.benchmark)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if len(BENCHMARK_REPORTS) == 0:
+        return
+
+    terminalreporter.section('benchmarks')
+    for report in BENCHMARK_REPORTS:
+        terminalreporter.write_line(report)
+
+
+@pytest.fixture
+def benchmark_report() -> Callable[[str], None]:
+    """
+    Returns a function that reports the numbers of a benchmark, so they are shown 
+    at the end of the run.
+    """
+    return BENCHMARK_REPORTS.append
+
+
+def get_time(func: Callable[[], Any], before_each: Optional[Callable[[], Any]]=None, num_repeats: int=1) -> float:
+    """
+    Returns the time the fastest of num_repeats calls of func takes, in seconds. If 
+    before_each is passed, it is called before each call of func, and is not timed.
+    """
+    times: List[float] = []
+    for _ in range(num_repeats):
+        if before_each is not None:
+            before_each()
+        start_time = perf_counter()
+        func()
+        times.append(perf_counter() - start_time)
+    return min(times)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks guessing the delimeter and encoding of a large CSV file for the
+import dialog, and then importing it.
+
+We compare against reading the whole file with pd.read_csv, which is how the
+delimeter and encoding used to be guessed. As times vary from machine to
+machine, we check that the guess only reads a sample at the start of the file,
+and is cached, rather than how long it takes. The import is timed as a simple
+import step, as it is run when the user imports the file.
+
+The file is generated locally, and is 16MB unless MITO_BENCHMARK_CSV_SIZE_MB is
+set to its size in MB.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import builtins
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.api.get_csv_files_metadata import get_csv_files_metadata
+from mitosheet.step_performers.import_steps import csv_utils
+from mitosheet.step_performers.import_steps.csv_utils import (
+    SNIFF_SAMPLE_BYTES, clear_csv_sniff_results, get_bytes_per_second)
+from mitosheet.tests.benchmarks.conftest import get_time
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+CSV_SIZE_MB = int(os.environ.get('MITO_BENCHMARK_CSV_SIZE_MB', 16))
+NUM_ROWS_PER_BLOCK = 100_000
+
+
+@pytest.fixture(scope='module')
+def large_csv_file_name(tmp_path_factory):
+    file_name = str(tmp_path_factory.mktemp('benchmark') / 'large.csv')
+
+    # We write the same block of rows until the file is large enough, as
+    # generating each of the rows with pandas takes minutes
+    block_df = pd.DataFrame({
+        'id': np.arange(NUM_ROWS_PER_BLOCK),
+        'price': np.random.rand(NUM_ROWS_PER_BLOCK) * 100,
+        'quantity': np.random.randint(0, 1000, NUM_ROWS_PER_BLOCK),
+        'category': np.random.choice(['red', 'green', 'blue'], NUM_ROWS_PER_BLOCK),
+    })
+    header, rows = block_df.to_csv(index=False).split('\n', 1)
+    rows_bytes = rows.encode('utf-8')
+
+    with open(file_name, 'wb') as f:
+        f.write((header + '\n').encode('utf-8'))
+        for _ in range(max(CSV_SIZE_MB * 1024 * 1024 // len(rows_bytes), 1)):
+            f.write(rows_bytes)
+
+    yield file_name
+    os.remove(file_name)
+
+
+def test_benchmark_csv_files_metadata(large_csv_file_name, monkeypatch, benchmark_report):
+    clear_csv_sniff_results()
+    size_mb = os.path.getsize(large_csv_file_name) / 1024 / 1024
+    read_whole_file_time = get_time(lambda: pd.read_csv(large_csv_file_name))
+
+    # We record how much of the file is read, and fail if the whole file is read with pandas
+    read_sizes = []
+    def recording_open(*args: Any, **kwargs: Any) -> Any:
+        f = builtins.open(*args, **kwargs)
+        read = f.read
+        def recording_read(size: int=-1) -> Any:
+            read_sizes.append(size)
+            return read(size)
+        f.read = recording_read
+        return f
+    def failing_read_csv(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError('Guessing the delimeter and encoding should not read the whole file')
+    monkeypatch.setattr(csv_utils, 'open', recording_open, raising=False)
+    monkeypatch.setattr(csv_utils.pd, 'read_csv', failing_read_csv)
+
+    sample_time = get_time(lambda: get_csv_files_metadata({'file_names': [large_csv_file_name]}, None))
+    sample_read_sizes, read_sizes[:] = read_sizes[:], []
+    cached_time = get_time(lambda: get_csv_files_metadata({'file_names': [large_csv_file_name]}, None))
+    metadata = get_csv_files_metadata({'file_names': [large_csv_file_name]}, None)
+    monkeypatch.undo()
+
+    benchmark_report(f'{size_mb:,.0f}MB csv metadata: read whole file {read_whole_file_time:.3f}s, sample {sample_time:.4f}s, cached {cached_time:.5f}s')
+    assert sample_read_sizes == [SNIFF_SAMPLE_BYTES]
+    assert read_sizes == []
+    assert metadata['delimeters'] == [',']
+    assert metadata['encodings'] == ['utf-8']
+
+
+def test_benchmark_csv_import(large_csv_file_name, benchmark_report):
+    clear_csv_sniff_results()
+    size_mb = os.path.getsize(large_csv_file_name) / 1024 / 1024
+    mito = create_mito_wrapper()
+
+    import_time = get_time(lambda: mito.simple_import([large_csv_file_name]))
+    bytes_per_second = get_bytes_per_second(large_csv_file_name, import_time)
+    assert bytes_per_second is not None
+
+    benchmark_report(f'{size_mb:,.0f}MB csv import: {import_time:.3f}s, {bytes_per_second / 1024 / 1024:,.1f}MB/s')
+    assert len(mito.dfs) == 1
+    assert mito.dfs[0].equals(pd.read_csv(large_csv_file_name))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks exporting a formatted dataframe with 50 columns to Excel.
+
+We compare against how formatted sheets used to be exported: writing the
+dataframe with pandas and openpyxl, and then styling the header and each of
+the other cells one at a time. As this keeps the entire workbook in memory,
+we compare on a smaller dataframe, and then time exporting a large one. We check
+that the export has the same data, and that only the header and the cells in
+columns with a number format are styled, rather than how long this takes.
+
+The large dataframe has 20,000 rows, unless MITO_BENCHMARK_EXCEL_EXPORT_NUM_ROWS
+is set to the number of rows (e.g. to 1000000).
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Font, NamedStyle, PatternFill
+
+from mitosheet.excel_export import (ExcelConditionalFormat, ExcelSheetFormat,
+                                    write_dataframes_to_excel)
+from mitosheet.tests.benchmarks.conftest import get_time
+
+NUM_COLUMNS = 50
+NUM_ROWS_TO_COMPARE = 1_000
+NUM_ROWS = int(os.environ.get('MITO_BENCHMARK_EXCEL_EXPORT_NUM_ROWS', 20_000))
+
+SHEET_FORMAT = ExcelSheetFormat(
+    header_background_color='#000000',
+    header_font_color='#ffffff',
+    even_background_color='#eeeeee',
+    even_font_color='#000000',
+    odd_background_color='#ffffff',
+    odd_font_color='#000000',
+    column_number_formats={column_index: '"$"0.00' for column_index in range(0, NUM_COLUMNS, 5)},
+    conditional_formats=[ExcelConditionalFormat(1, 'AND(ISNUMBER(B2),B2>0.5)', None, '#ff0000')],
+)
+
+
+def get_df(num_rows: int) -> pd.DataFrame:
+    columns = {}
+    for column_index in range(NUM_COLUMNS):
+        if column_index % 5 == 4:
+            columns[f'column {column_index}'] = np.random.choice(['red', 'green', 'blue'], num_rows)
+        elif column_index % 5 == 3:
+            columns[f'column {column_index}'] = np.arange(num_rows)
+        else:
+            columns[f'column {column_index}'] = np.random.rand(num_rows)
+    return pd.DataFrame(columns)
+
+
+def export_styling_each_cell(df: pd.DataFrame, file_name: str) -> None:
+    with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='df', index=False)
+        sheet = writer.book['df']
+
+        header_format = NamedStyle(name='df_Header')
+        header_format.font = Font(color='ffffff')
+        header_format.fill = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
+        even_format = NamedStyle(name='df_Even')
+        even_format.font = Font(color='000000')
+        even_format.fill = PatternFill(start_color='eeeeee', end_color='eeeeee', fill_type='solid')
+        odd_format = NamedStyle(name='df_Odd')
+        odd_format.font = Font(color='000000')
+        odd_format.fill = PatternFill(start_color='ffffff', end_color='ffffff', fill_type='solid')
+        for named_style in [header_format, even_format, odd_format]:
+            writer.book.add_named_style(named_style)
+
+        for col in range(1, sheet.max_column + 1):
+            sheet.cell(row=1, column=col).style = 'df_Header'
+        for row in range(2, sheet.max_row + 1):
+            for col in range(1, sheet.max_column + 1):
+                sheet.cell(row=row, column=col).style = 'df_Even' if row % 2 == 0 else 'df_Odd'
+
+
+def test_benchmark_excel_export_compared_to_styling_each_cell(tmp_path, benchmark_report):
+    df = get_df(NUM_ROWS_TO_COMPARE)
+
+    old_time = get_time(lambda: export_styling_each_cell(df, str(tmp_path / 'old.xlsx')))
+    new_time = get_time(lambda: write_dataframes_to_excel(str(tmp_path / 'new.xlsx'), [(df, 'df', SHEET_FORMAT)]))
+
+    benchmark_report(f'{NUM_ROWS_TO_COMPARE:,}x{NUM_COLUMNS} formatted export: style each cell {old_time:.3f}s, stream rows {new_time:.3f}s')
+
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / 'new.xlsx'), df)
+    sheet = load_workbook(tmp_path / 'new.xlsx')['df']
+    num_styled_cells = sum(cell.has_style for row in sheet.iter_rows() for cell in row)
+    assert num_styled_cells == NUM_COLUMNS + len(SHEET_FORMAT.column_number_formats) * NUM_ROWS_TO_COMPARE
+    assert len(sheet.conditional_formatting) > 0
+
+
+def test_benchmark_excel_export_large_dataframe(tmp_path, benchmark_report):
+    df = get_df(NUM_ROWS)
+    file_name = str(tmp_path / 'large.xlsx')
+
+    export_time = get_time(lambda: write_dataframes_to_excel(file_name, [(df, 'df', SHEET_FORMAT)]))
+    size_mb = os.path.getsize(file_name) / 1024 / 1024
+
+    benchmark_report(f'{NUM_ROWS:,}x{NUM_COLUMNS} formatted export: {export_time:.3f}s, {size_mb:,.1f}MB, {NUM_ROWS * NUM_COLUMNS / export_time:,.0f} cells/s')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks importing many ranges from the same Excel workbook.
+
+We compare against loading the workbook for each range, which is how each range
+used to be found and read: finding a range loaded the entire workbook, and then
+reading it loaded the workbook again with pd.read_excel. We time loading the
+workbook to find each range and pd.read_excel to read it. We check that the ranges
+are the same, and that the workbook is loaded once to find the ranges and once to
+read them, rather than how long this takes.
+
+The workbook has 20 tables with 2,000 rows each, unless MITO_BENCHMARK_EXCEL_NUM_ROWS
+is set to the number of rows in each table.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import os
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import mitosheet.excel_workbook_cache
+from mitosheet.excel_workbook_cache import (clear_excel_workbook_cache,
+                                            read_excel_range)
+from mitosheet.public.v2.excel_utils import get_read_excel_params_from_range, get_table_range
+from mitosheet.tests.benchmarks.conftest import get_time
+
+NUM_TABLES = 20
+NUM_ROWS_PER_TABLE = int(os.environ.get('MITO_BENCHMARK_EXCEL_NUM_ROWS', 2_000))
+
+
+@pytest.fixture(scope='module')
+def workbook_file_path(tmp_path_factory):
+    file_path = str(tmp_path_factory.mktemp('benchmark') / 'tables.xlsx')
+
+    with pd.ExcelWriter(file_path) as writer:
+        for index in range(NUM_TABLES):
+            pd.DataFrame({
+                f'table {index}': np.arange(NUM_ROWS_PER_TABLE),
+                'price': np.random.rand(NUM_ROWS_PER_TABLE),
+                'category': np.random.choice(['red', 'green', 'blue'], NUM_ROWS_PER_TABLE),
+            }).to_excel(writer, sheet_name='tables', startrow=index * (NUM_ROWS_PER_TABLE + 2), index=False)
+
+    return file_path
+
+
+def import_ranges_loading_workbook_each_time(file_path: str) -> List[pd.DataFrame]:
+    dfs = []
+    for index in range(NUM_TABLES):
+        load_workbook(file_path)
+        start_row = index * (NUM_ROWS_PER_TABLE + 2)
+        skiprows, nrows, usecols = get_read_excel_params_from_range(f'A{start_row + 1}:C{start_row + NUM_ROWS_PER_TABLE + 1}')
+        dfs.append(pd.read_excel(file_path, sheet_name='tables', skiprows=skiprows, nrows=nrows, usecols=usecols))
+    return dfs
+
+
+def import_ranges(file_path: str) -> List[pd.DataFrame]:
+    dfs = []
+    for index in range(NUM_TABLES):
+        table_range = get_table_range(file_path, sheet_name='tables', upper_left_value=f'table {index}')
+        assert table_range is not None
+        skiprows, nrows, usecols = get_read_excel_params_from_range(table_range)
+        dfs.append(read_excel_range(file_path, 'tables', skiprows=skiprows, nrows=nrows, usecols=usecols))
+    return dfs
+
+
+def test_benchmark_excel_range_import(workbook_file_path, monkeypatch, benchmark_report):
+    size_mb = os.path.getsize(workbook_file_path) / 1024 / 1024
+
+    num_workbook_loads = 0
+    def counted_load_workbook(*args: Any, **kwargs: Any) -> Any:
+        nonlocal num_workbook_loads
+        num_workbook_loads += 1
+        return load_workbook(*args, **kwargs)
+    monkeypatch.setattr(mitosheet.excel_workbook_cache, 'load_workbook', counted_load_workbook)
+
+    old_dfs: List[pd.DataFrame] = []
+    new_dfs: List[pd.DataFrame] = []
+    clear_excel_workbook_cache()
+    old_time = get_time(lambda: old_dfs.extend(import_ranges_loading_workbook_each_time(workbook_file_path)))
+    clear_excel_workbook_cache()
+    new_time = get_time(lambda: new_dfs.extend(import_ranges(workbook_file_path)))
+    cached_time = get_time(lambda: get_table_range(workbook_file_path, sheet_name='tables', upper_left_value=f'table {NUM_TABLES - 1}'))
+
+    benchmark_report(f'{NUM_TABLES} ranges from a {size_mb:.1f}MB workbook: load workbook each time {old_time:.3f}s, stream each sheet once {new_time:.3f}s, find a range again {cached_time:.4f}s')
+
+    assert num_workbook_loads == 2
+    assert len(new_dfs) == NUM_TABLES
+    for new_df, old_df in zip(new_dfs, old_dfs):
+        pd.testing.assert_frame_equal(new_df, old_df)
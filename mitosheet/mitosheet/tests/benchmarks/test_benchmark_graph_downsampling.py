@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks graphing a large dataframe with the safety filter turned on, which
+downsamples or bins the data before graphing it.
+
+For each graph, we time creating the figure, and converting it to the json
+that is sent to the browser, and report the size of that json.
+
+The dataframe has 1,000,000 rows, unless MITO_BENCHMARK_GRAPH_NUM_ROWS is
+set to the number of rows (e.g. to 10000000).
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.step_performers.graph_steps.graph_utils import (BAR,
+                                                               HISTOGRAM,
+                                                               LINE, SCATTER)
+from mitosheet.step_performers.graph_steps.plotly_express_graphs import \
+    get_plotly_express_graph
+from mitosheet.tests.benchmarks.conftest import get_time
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+NUM_ROWS = int(os.environ.get('MITO_BENCHMARK_GRAPH_NUM_ROWS', 1_000_000))
+
+# The json of a graph is sent to the browser, so it should stay small
+MAX_GRAPH_JSON_NUM_BYTES = 2 * 1024 * 1024
+
+
+@pytest.fixture(scope='module')
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        'time': pd.date_range('2000-01-01', periods=NUM_ROWS, freq='s'),
+        'value': np.cumsum(np.random.normal(size=NUM_ROWS)),
+        'other value': np.random.normal(size=NUM_ROWS),
+        'category': np.random.choice(['red', 'green', 'blue'], NUM_ROWS),
+    })
+
+
+@pytest.mark.parametrize("graph_type, x, y, color", [
+    (LINE, ['time'], ['value'], None),
+    (LINE, ['time'], ['value'], 'category'),
+    (SCATTER, ['value'], ['other value'], None),
+    (HISTOGRAM, ['other value'], [], 'category'),
+    (BAR, ['category'], ['other value'], None),
+])
+def test_benchmark_graph_large_dataframe(df, graph_type, x, y, color, benchmark_report):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1]}))
+    mito.generate_graph('123', graph_type, 0, True, [], [], 400, 400)
+    graph_styling_params = mito.curr_step.params['graph_styling']
+
+    figures = []
+    graph_time = get_time(lambda: figures.append(get_plotly_express_graph(
+        graph_type, df, True, x, y, color, None, None, None, None, None, None, None, None, None, None, graph_styling_params
+    )))
+    json_strings = []
+    json_time = get_time(lambda: json_strings.append(figures[0].to_json()))
+    json_num_bytes = len(json_strings[0])
+
+    benchmark_report(f'{graph_type} of {NUM_ROWS:,} rows (color {color}): graph {graph_time:.3f}s, to json {json_time:.3f}s, {json_num_bytes / 1024:,.0f}KB')
+    assert json_num_bytes < MAX_GRAPH_JSON_NUM_BYTES
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the range formulas, e.g. =SUM(B0:B30), for each of the aggregations
+that rolling ranges compute for all windows at once.
+
+We compare against calling the aggregation with each window, which is how every
+range formula used to be computed. As this takes minutes on large dataframes, we
+compare on a smaller dataframe, and then time the aggregations on 1M rows. We
+check that the aggregations give the same result as calling them with each
+window, and that they do not call them with each window, rather than how long
+they take.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.rolling_range import ROLLING_RANGE_AGGREGATIONS, RollingRange
+from mitosheet.tests.benchmarks.conftest import get_time
+
+NUM_ROWS_PER_WINDOW = 2_000
+NUM_ROWS = 1_000_000
+
+AGGREGATION_FUNCTIONS = {
+    'sum': lambda df: df.sum().sum(),
+    'count': lambda df: df.count().sum(),
+    'min': lambda df: df.min().min(),
+    'max': lambda df: df.max().max(),
+    'std': lambda df: df.stack().std(),
+    'var': lambda df: df.stack().var(),
+}
+
+
+def get_benchmark_df(num_rows: int) -> pd.DataFrame:
+    values = np.random.rand(num_rows)
+    values[::7] = np.nan
+    return pd.DataFrame({'B': values, 'C': np.arange(num_rows)})
+
+
+@pytest.mark.parametrize("aggregation", ROLLING_RANGE_AGGREGATIONS)
+def test_benchmark_rolling_range_aggregation(aggregation, monkeypatch, benchmark_report):
+    # A10 = B0:C30
+    rolling_range = RollingRange(get_benchmark_df(NUM_ROWS_PER_WINDOW), 31, -10)
+    per_window_time = get_time(lambda: rolling_range.apply(AGGREGATION_FUNCTIONS[aggregation]))
+    aggregate_time = get_time(lambda: rolling_range.aggregate(aggregation))
+    pd.testing.assert_series_equal(
+        rolling_range.aggregate(aggregation),
+        rolling_range.apply(AGGREGATION_FUNCTIONS[aggregation]),
+        check_dtype=False
+    )
+
+    large_rolling_range = RollingRange(get_benchmark_df(NUM_ROWS), 31, -10)
+    monkeypatch.setattr(RollingRange, 'apply', lambda *args, **kwargs: pytest.fail('aggregated each window'))
+    large_aggregate_time = get_time(lambda: large_rolling_range.aggregate(aggregation))
+
+    benchmark_report(f'{aggregation}: {NUM_ROWS_PER_WINDOW:,} rows per window {per_window_time:.3f}s, aggregate {aggregate_time:.4f}s; {NUM_ROWS:,} rows aggregate {large_aggregate_time:.3f}s')
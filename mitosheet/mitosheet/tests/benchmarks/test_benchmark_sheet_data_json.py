@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks turning the sheet data into json, for wide and tall dataframes.
+
+We compare against the df.to_json -> json.loads -> json.dumps round trip that
+we used to do, both when every column needs to be encoded, and after a step
+that changed a single column, when the other columns are cached. We check that
+only the changed column is encoded again, rather than how long this takes. We
+also time sending the numeric columns as binary buffers, and check that the
+json and buffers together are smaller than the json of every column.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import mitosheet.json_utils
+from mitosheet.column_buffers import SHEET_DATA_BUFFER_KEY
+from mitosheet.json_utils import column_json_values_cache
+from mitosheet.state import State
+from mitosheet.tests.benchmarks.conftest import get_time
+from mitosheet.utils import (MAX_COLUMNS, MAX_ROWS, NpEncoder, dfs_to_array_for_json,
+                             get_sheet_data_json)
+
+NUM_REPEATS = 3
+
+
+def get_benchmark_df(num_rows: int, num_column_groups: int) -> pd.DataFrame:
+    columns: Dict[str, Any] = {}
+    for i in range(num_column_groups):
+        # NOTE: each column has different values, so we can count the columns that are encoded
+        columns[f'Int {i}'] = np.arange(num_rows) + i
+        columns[f'Float {i}'] = np.random.rand(num_rows)
+        columns[f'String {i}'] = [f'value {i} {j % 100}' for j in range(num_rows)]
+        columns[f'Datetime {i}'] = pd.date_range('2000-01-01', periods=num_rows, freq='min') + pd.Timedelta(days=i)
+    return pd.DataFrame(columns)
+
+
+def get_round_trip_sheet_data_json(df: pd.DataFrame) -> str:
+    # This is how we used to turn the data in a sheet into json
+    df = df.head(MAX_ROWS).iloc[:, :MAX_COLUMNS].copy(deep=True)
+    for column_header in df.columns:
+        if 'datetime' in str(df[column_header].dtype):
+            df[column_header] = df[column_header].dt.strftime('%Y-%m-%d %X')
+
+    json_obj = json.loads(df.to_json(orient="split"))
+    for row in json_obj['data']:
+        for index, value in enumerate(row):
+            if value is None:
+                row[index] = 'NaN'
+
+    data = [[row[column_index] for row in json_obj['data']] for column_index in range(len(df.columns))]
+    return json.dumps({'data': data, 'index': json_obj['index']}, cls=NpEncoder)
+
+
+def get_state_sheet_data(state: State, send_column_buffers: bool=False) -> Dict[str, Any]:
+    # This is how the steps manager gets the data in a sheet
+    return dfs_to_array_for_json(
+        state,
+        {0},
+        [],
+        state.dfs,
+        state.df_names,
+        state.df_sources,
+        state.column_formulas,
+        state.column_filters,
+        state.column_ids,
+        state.df_formats,
+        send_column_buffers=send_column_buffers
+    )[0]
+
+
+def get_state_sheet_data_json(state: State) -> str:
+    return get_sheet_data_json(get_state_sheet_data(state))
+
+
+def get_state_sheet_data_json_and_buffer(state: State) -> Tuple[str, bytes]:
+    sheet_data = get_state_sheet_data(state, send_column_buffers=True)
+    return get_sheet_data_json(sheet_data), sheet_data[SHEET_DATA_BUFFER_KEY]
+
+
+def run_benchmark(name: str, df: pd.DataFrame, monkeypatch: Any, benchmark_report: Callable[[str], None]) -> None:
+    state = State([df])
+    changed_state = state.copy(copy_on_write_sheet_indexes=[0])
+    changed_state.set_column(0, 'Float 0', df['Float 0'] + 1)
+
+    round_trip_time = get_time(lambda: get_round_trip_sheet_data_json(df), num_repeats=NUM_REPEATS)
+    uncached_time = get_time(lambda: get_state_sheet_data_json(state), before_each=column_json_values_cache.clear, num_repeats=NUM_REPEATS)
+
+    def cache_state() -> None:
+        column_json_values_cache.clear()
+        get_state_sheet_data_json(state)
+    changed_column_time = get_time(lambda: get_state_sheet_data_json(changed_state), before_each=cache_state, num_repeats=NUM_REPEATS)
+
+    column_buffers_time = get_time(lambda: get_state_sheet_data_json_and_buffer(state), before_each=column_json_values_cache.clear, num_repeats=NUM_REPEATS)
+    sheet_data_json = get_state_sheet_data_json(state)
+    buffered_sheet_data_json, buffer = get_state_sheet_data_json_and_buffer(state)
+    size_mb = len(sheet_data_json) / 1024 / 1024
+    buffered_size_mb = (len(buffered_sheet_data_json) + len(buffer)) / 1024 / 1024
+
+    benchmark_report(
+        f'{name}: round trip {round_trip_time:.3f}s, uncached {uncached_time:.3f}s, after changing a column {changed_column_time:.3f}s, ' +
+        f'with column buffers {column_buffers_time:.3f}s ({size_mb:.1f}MB of json, {buffered_size_mb:.1f}MB with column buffers)'
+    )
+    assert buffered_size_mb < size_mb
+
+    encoded_column_names: List[Any] = []
+    get_column_json_values = mitosheet.json_utils._get_column_json_values
+    def counted_get_column_json_values(column: pd.Series, null_value: Any) -> List[Any]:
+        encoded_column_names.append(column.name)
+        return get_column_json_values(column, null_value)
+    monkeypatch.setattr(mitosheet.json_utils, '_get_column_json_values', counted_get_column_json_values)
+
+    column_json_values_cache.clear()
+    get_state_sheet_data_json(state)
+    assert encoded_column_names == list(df.columns[:MAX_COLUMNS])
+
+    encoded_column_names.clear()
+    get_state_sheet_data_json(changed_state)
+    assert encoded_column_names == ['Float 0']
+
+
+def test_benchmark_wide_sheet_data_json(monkeypatch, benchmark_report):
+    run_benchmark('Wide (1,500 rows x 1,000 columns)', get_benchmark_df(MAX_ROWS, 250), monkeypatch, benchmark_report)
+
+
+def test_benchmark_tall_sheet_data_json(monkeypatch, benchmark_report):
+    run_benchmark('Tall (1,000,000 rows x 8 columns)', get_benchmark_df(1_000_000, 2), monkeypatch, benchmark_report)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the overhead that the type casting and error handling decorators add to
+each call of a sheet function, which matters as nested sheet functions are called 
+once for each window of a rolling range.
+
+We compare against decorators that inspect the signature of the sheet function and
+work out how to cast each arg on every call, which is how they used to work. We
+check that the decorators give the same results, without inspecting the signature
+on each call, rather than how long they take.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import inspect
+from functools import wraps
+from typing import Any, Callable, Union
+
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.errors import get_type_args, handle_sheet_function_errors, make_invalid_arg_error
+from mitosheet.public.v3.types.decorators import cast_values_in_all_args_to_type, cast_values_in_arg_to_type
+from mitosheet.public.v3.types.utils import get_series_conversion_function, get_element_conversion_function
+from mitosheet.tests.benchmarks.conftest import get_time
+
+NUM_CALLS = 10_000
+
+
+def cast_each_call(target_primitive_type_name: Any, arg: Any) -> Any:
+    if isinstance(arg, pd.Series):
+        return get_series_conversion_function(target_primitive_type_name, arg.dtype, ())(arg)
+    return get_element_conversion_function(target_primitive_type_name, ())(arg)
+
+
+def cast_values_in_arg_to_type_each_call(arg_name: str, target_primitive_type_name: Any) -> Callable:
+    def wrap(sheet_function: Callable) -> Callable:
+        @wraps(sheet_function)
+        def wrapped_sheet_function(*args: Any) -> Any:
+            arg_index = list(inspect.signature(sheet_function).parameters.keys()).index(arg_name)
+            return sheet_function(*[
+                cast_each_call(target_primitive_type_name, arg) if index == arg_index else arg
+                for index, arg in enumerate(args)
+            ])
+        return wrapped_sheet_function
+    return wrap
+
+
+def cast_values_in_all_args_to_type_each_call(target_primitive_type_name: Any) -> Callable:
+    def wrap(sheet_function: Callable) -> Callable:
+        @wraps(sheet_function)
+        def wrapped_sheet_function(*args: Any) -> Any:
+            return sheet_function(*[cast_each_call(target_primitive_type_name, arg) for arg in args])
+        return wrapped_sheet_function
+    return wrap
+
+
+def handle_sheet_function_errors_each_call(sheet_function: Callable) -> Callable:
+    @wraps(sheet_function)
+    def wrapped_sheet_function(*args: Any) -> Any:
+        parameters = inspect.signature(sheet_function).parameters
+        for index, (parameter, arg) in enumerate(zip(parameters.values(), args)):
+            if parameter.annotation == inspect.Parameter.empty:
+                continue
+            if not any(isinstance(arg, t) for t in get_type_args(parameter.annotation)):
+                raise make_invalid_arg_error(sheet_function.__name__, parameter.name, index, type(arg).__name__)
+        return sheet_function(*args)
+    return wrapped_sheet_function
+
+
+def ROUND(arg: Union[int, float, pd.Series], decimals: Union[int, None]=None) -> Any:
+    return arg
+
+def SUM(*argv: Union[int, float, pd.Series]) -> Any:
+    return argv
+
+
+SHEET_FUNCTIONS = {
+    'ROUND': (
+        cast_values_in_arg_to_type('arg', 'number')(handle_sheet_function_errors(ROUND)),
+        cast_values_in_arg_to_type_each_call('arg', 'number')(handle_sheet_function_errors_each_call(ROUND)),
+    ),
+    'SUM': (
+        cast_values_in_all_args_to_type('number')(handle_sheet_function_errors(SUM)),
+        cast_values_in_all_args_to_type_each_call('number')(handle_sheet_function_errors_each_call(SUM)),
+    ),
+}
+
+ARGS = {
+    'number': (1.5, 2),
+    'float series': (pd.Series([1.5, 2.5, 3.5]), 2),
+    'string series': (pd.Series(['1', '2', '3']), 2),
+}
+
+def assert_same_result(result: Any, expected_result: Any) -> None:
+    if isinstance(expected_result, pd.Series):
+        pd.testing.assert_series_equal(result, expected_result)
+    elif isinstance(expected_result, tuple):
+        assert len(result) == len(expected_result)
+        for value, expected_value in zip(result, expected_result):
+            assert_same_result(value, expected_value)
+    else:
+        assert result == expected_result
+
+
+def get_time_per_call(func: Callable[[], Any]) -> float:
+    def call_func_many_times() -> None:
+        for _ in range(NUM_CALLS):
+            func()
+    return get_time(call_func_many_times) / NUM_CALLS
+
+
+@pytest.mark.parametrize("sheet_function_name", SHEET_FUNCTIONS.keys())
+@pytest.mark.parametrize("args_name", ARGS.keys())
+def test_benchmark_sheet_function_decorators(sheet_function_name, args_name, monkeypatch, benchmark_report):
+    sheet_function, sheet_function_each_call = SHEET_FUNCTIONS[sheet_function_name]
+    args = ARGS[args_name]
+
+    each_call_time = get_time_per_call(lambda: sheet_function_each_call(*args))
+    expected_result = sheet_function_each_call(*args)
+
+    monkeypatch.setattr(inspect, 'signature', lambda *args, **kwargs: pytest.fail('inspected the signature on a call'))
+    time = get_time_per_call(lambda: sheet_function(*args))
+    result = sheet_function(*args)
+
+    benchmark_report(f'{sheet_function_name} with {args_name}: {each_call_time * 1e6:.1f}us per call before, {time * 1e6:.1f}us per call after')
+
+    assert_same_result(result, expected_result)
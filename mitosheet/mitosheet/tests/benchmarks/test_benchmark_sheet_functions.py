@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks sheet functions that combine columns with constants, e.g. =SUM(A, 1) 
+or =CONCAT(A, "x"), which cast and combine whole series at once.
+
+We compare against casting each value in the column, and then combining each 
+value with the constant, which is how these functions used to be computed. We
+check that the sheet functions give the same results, without casting or combining
+each value on its own, rather than how long they take.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import sys
+from typing import Any, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.bool_functions import AND
+from mitosheet.public.v3.sheet_functions.number_functions import MAX, MULTIPLY, SUM
+from mitosheet.public.v3.sheet_functions.string_functions import CONCAT
+from mitosheet.public.v3.types.utils import ELEMENT_CONVERSION_FUNCTIONS
+from mitosheet.tests.benchmarks.conftest import get_time
+
+NUM_ROWS = 1_000_000
+
+def get_result_casting_and_combining_each_value(
+        target_primitive_type_name: str,
+        default_value: Any,
+        get_new_result_from_primitive_values: Callable[[Any, Any], Any],
+        argv: Tuple[Any, ...]
+    ) -> Any:
+    def fill(value: Any) -> Any:
+        return default_value if value is None or (isinstance(value, float) and np.isnan(value)) else value
+
+    cast = ELEMENT_CONVERSION_FUNCTIONS[target_primitive_type_name] # type: ignore
+    result = default_value
+    for arg in argv:
+        if isinstance(arg, pd.Series):
+            arg = arg.apply(cast)
+            result = arg.apply(lambda v: get_new_result_from_primitive_values(fill(result), fill(v)))
+        else:
+            arg = cast(arg)
+            result = result.apply(lambda v: get_new_result_from_primitive_values(fill(v), fill(arg)))
+    return result
+
+
+rng = np.random.default_rng(0)
+floats = pd.Series(rng.random(NUM_ROWS))
+floats[::7] = np.nan
+ints = pd.Series(rng.integers(0, 1000, NUM_ROWS))
+strings = pd.Series(rng.choice(['a', 'bc', 'def'], NUM_ROWS))
+number_strings = ints.astype(str)
+bools = pd.Series(rng.random(NUM_ROWS) > 0.5)
+
+SHEET_FUNCTIONS = {
+    'SUM(floats, 1)': (SUM, (floats, 1), 'number', 0, lambda a, b: a + b),
+    'SUM(ints, 1)': (SUM, (ints, 1), 'number', 0, lambda a, b: a + b),
+    'SUM(number strings, 1)': (SUM, (number_strings, 1), 'number', 0, lambda a, b: a + b),
+    'MULTIPLY(floats, 2)': (MULTIPLY, (floats, 2), 'number', 1, lambda a, b: a * b),
+    'MAX(ints, 500)': (MAX, (ints, 500), 'number', -sys.maxsize - 1, max),
+    'CONCAT(strings, "x")': (CONCAT, (strings, 'x'), 'str', '', lambda a, b: a + b),
+    'CONCAT(ints, "x")': (CONCAT, (ints, 'x'), 'str', '', lambda a, b: a + b),
+    'AND(bools, True)': (AND, (bools, True), 'bool', True, lambda a, b: a and b),
+}
+
+@pytest.mark.parametrize("name", SHEET_FUNCTIONS.keys())
+def test_benchmark_sheet_function(name, monkeypatch, benchmark_report):
+    sheet_function, argv, target_primitive_type_name, default_value, get_new_result_from_primitive_values = SHEET_FUNCTIONS[name]
+
+    each_value_time = get_time(lambda: get_result_casting_and_combining_each_value(target_primitive_type_name, default_value, get_new_result_from_primitive_values, argv))
+    each_value_result = get_result_casting_and_combining_each_value(target_primitive_type_name, default_value, get_new_result_from_primitive_values, argv)
+
+    monkeypatch.setattr(pd.Series, 'apply', lambda *args, **kwargs: pytest.fail('cast or combined each value'))
+    sheet_function_time = get_time(lambda: sheet_function(*argv))
+    sheet_function_result = sheet_function(*argv)
+
+    benchmark_report(f'{name}: {NUM_ROWS:,} rows casting and combining each value {each_value_time:.3f}s, sheet function {sheet_function_time:.3f}s')
+
+    pd.testing.assert_series_equal(sheet_function_result, each_value_result, check_dtype=False, check_names=False)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the memory that a single step adds to an analysis.
+
+Every step keeps its post state around, so the memory a step costs is the
+memory that its post state does not share with its prev state. We compare
+this against the cost of a deep copy of the dataframe, which is what every
+step that modified a dataframe used to cost.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import gc
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mitosheet.state import State
+from mitosheet.step_performers.column_steps.set_column_formula import SetColumnFormulaStepPerformer
+from mitosheet.step_performers.filter import FC_NUMBER_GREATER, FilterStepPerformer
+from mitosheet.step_performers.set_cell_value import SetCellValueStepPerformer
+from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE
+
+NUM_ROWS = 100_000
+
+
+def get_benchmark_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Int': np.arange(NUM_ROWS),
+        'Float': np.random.rand(NUM_ROWS),
+        'Float Two': np.random.rand(NUM_ROWS),
+        'String': [f'value {i % 100}' for i in range(NUM_ROWS)],
+        'Bool': np.arange(NUM_ROWS) % 2 == 0,
+        'Datetime': pd.date_range('2000-01-01', periods=NUM_ROWS, freq='min'),
+    })
+
+
+def get_retained_memory(func: Callable[[], Any]) -> Tuple[Any, int]:
+    """
+    Returns the result of the func, as well as the number of bytes that
+    are still allocated after the func runs, while the result is alive
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def get_step_memory(prev_state: State, step_performer: Any, params: Any) -> int:
+    def take_step() -> Any:
+        saturated_params = step_performer.saturate(prev_state, params)
+        return step_performer.execute(prev_state, saturated_params)
+
+    # Take the step once first, so that we don't count any caches pandas 
+    # fills in the prev state (e.g. the values of a RangeIndex)
+    take_step()
+
+    _, retained_memory = get_retained_memory(take_step)
+    return retained_memory
+
+
+def report_benchmark(benchmark_report: Callable[[str], None], name: str, step_memory: int, deep_copy_memory: int) -> None:
+    benchmark_report(f'{name}: {step_memory / 1_000_000:.2f}MB per step, a deep copy costs {deep_copy_memory / 1_000_000:.2f}MB')
+
+
+def test_benchmark_set_cell_value_memory(benchmark_report):
+    prev_state = State([get_benchmark_df()])
+    _, deep_copy_memory = get_retained_memory(lambda: prev_state.dfs[0].copy(deep=True))
+
+    step_memory = get_step_memory(prev_state, SetCellValueStepPerformer, {
+        'sheet_index': 0,
+        'column_id': 'Float',
+        'row_index': 10,
+        'new_value': '10.5'
+    })
+
+    report_benchmark(benchmark_report, 'Set cell value', step_memory, deep_copy_memory)
+    assert step_memory < deep_copy_memory / 2
+
+
+def test_benchmark_filter_memory(benchmark_report):
+    prev_state = State([get_benchmark_df()])
+    _, deep_copy_memory = get_retained_memory(lambda: prev_state.dfs[0].copy(deep=True))
+
+    step_memory = get_step_memory(prev_state, FilterStepPerformer, {
+        'sheet_index': 0,
+        'column_id': 'Int',
+        'operator': 'And',
+        'filters': [{'condition': FC_NUMBER_GREATER, 'value': NUM_ROWS - 100}]
+    })
+
+    report_benchmark(benchmark_report, 'Filter', step_memory, deep_copy_memory)
+    assert step_memory < deep_copy_memory / 10
+
+
+def test_benchmark_set_column_formula_memory(benchmark_report):
+    prev_state = State([get_benchmark_df()])
+    _, deep_copy_memory = get_retained_memory(lambda: prev_state.dfs[0].copy(deep=True))
+    # The formula stores the index it is applied to, which is not copied data
+    _, index_memory = get_retained_memory(lambda: prev_state.dfs[0].index.to_list())
+
+    step_memory = get_step_memory(prev_state, SetColumnFormulaStepPerformer, {
+        'sheet_index': 0,
+        'column_id': 'Float',
+        'formula_label': 0,
+        'index_labels_formula_is_applied_to': {'type': FORMULA_ENTIRE_COLUMN_TYPE},
+        'new_formula': '=Int + 1',
+        'public_interface_version': 3
+    })
+
+    report_benchmark(benchmark_report, 'Set column formula', step_memory - index_memory, deep_copy_memory)
+    assert step_memory - index_memory < deep_copy_memory / 2
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks rerunning a streamlit app that displays a large dataframe in the Mito
+spreadsheet, when nothing in the app has changed.
+
+On each rerun, the spreadsheet hashes the dataframes passed to it to find its
+backend, and then sends the sheet, analysis, code and responses to the frontend.
+We time this work for the first run, and for reruns after it. We check that reruns
+do not handle the message, or make the sheet, analysis or code again, rather than
+how long they take. The dataframe is hashed on every rerun, as it may have been 
+changed in place.
+
+The dataframe has 1,000,000 rows, unless MITO_BENCHMARK_STREAMLIT_NUM_ROWS is
+set to the number of rows.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.steps_manager import StepsManager
+from mitosheet.streamlit.v1.spreadsheet import (MitoStreamlitSession,
+                                                get_dataframe_hash)
+from mitosheet.tests.benchmarks.conftest import get_time
+from mitosheet.utils import get_new_id
+
+NUM_ROWS = int(os.environ.get('MITO_BENCHMARK_STREAMLIT_NUM_ROWS', 1_000_000))
+
+NUM_RERUNS = 10
+
+
+def fail_on_rerun(*args: Any, **kwargs: Any) -> Any:
+    pytest.fail('redid work on a rerun of an app that has not changed')
+
+
+def test_benchmark_streamlit_rerun(monkeypatch, benchmark_report):
+    df = pd.DataFrame({
+        'Int': np.arange(NUM_ROWS),
+        'Float': np.random.rand(NUM_ROWS),
+        'String': [f'value {i % 100}' for i in range(NUM_ROWS)],
+        'Datetime': pd.date_range('2000-01-01', periods=NUM_ROWS, freq='s'),
+    })
+    mito_session = MitoStreamlitSession(MitoBackend(df))
+    message = {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {'sheet_index': 0, 'column_header': 'New Column', 'column_header_index': -1},
+    }
+
+    def rerun() -> None:
+        get_dataframe_hash(df)
+        # The message passer returns the last message on every rerun
+        mito_session.receive_message(message)
+        mito_session.sheet_data_json
+        mito_session.analysis_data_json
+        mito_session.code
+        mito_session.mito_backend.get_user_profile_json()
+        mito_session.responses_json
+
+    first_run_time = get_time(rerun)
+
+    monkeypatch.setattr(mito_session.mito_backend, 'receive_message', fail_on_rerun)
+    monkeypatch.setattr(StepsManager, 'sheet_data_json', property(fail_on_rerun))
+    monkeypatch.setattr(StepsManager, 'analysis_data_json', property(fail_on_rerun))
+    monkeypatch.setattr(StepsManager, 'code', fail_on_rerun)
+    rerun_time = get_time(rerun, num_repeats=NUM_RERUNS)
+
+    benchmark_report(f'Streamlit app with {NUM_ROWS:,} rows: first run {first_run_time:.3f}s, rerun {rerun_time * 1000:.1f}ms')
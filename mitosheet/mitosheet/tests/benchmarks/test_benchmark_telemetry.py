@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks how long edits take with telemetry on and off.
+
+Each edit is logged, and making the params for the logs (e.g. anonymizing the
+formulas) takes time. We time edits when:
+1. Telemetry is off, and nothing is logged.
+2. Telemetry is on, and the logs are sent on the telemetry thread.
+3. Telemetry is on, and the logs are sent before the edit returns, as they were
+   before we sent them on the telemetry thread.
+
+The logs are sent to a fake sink, so this does not use the network. We wait a
+little between edits, as a user does, which gives the telemetry thread time to
+send the logs. As the time an edit takes varies more than the time it takes to
+log it, we also time just the logging that happens before the edit returns. We
+check that the logs are sent on the telemetry thread, and not before the edit
+returns, rather than how long the edits take.
+
+The dataframe has 50 columns, unless MITO_BENCHMARK_TELEMETRY_NUM_COLUMNS is set
+to the number of columns.
+
+Run with `pytest mitosheet/tests/benchmarks -m benchmark` to see the numbers.
+"""
+import os
+from statistics import median
+from threading import current_thread
+from time import sleep
+from typing import Any, List
+
+import pandas as pd
+
+import mitosheet.mito_backend
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.telemetry import telemetry_utils
+from mitosheet.telemetry.telemetry_queue import FakeTelemetrySink, TelemetryLog
+from mitosheet.telemetry.telemetry_utils import set_telemetry_sink, wait_for_telemetry
+from mitosheet.tests.benchmarks.conftest import get_time
+from mitosheet.utils import get_new_id
+
+NUM_COLUMNS = int(os.environ.get('MITO_BENCHMARK_TELEMETRY_NUM_COLUMNS', 50))
+
+NUM_EDITS = 30
+
+SECONDS_BETWEEN_EDITS = 0.005
+
+
+class ThreadRecordingTelemetrySink(FakeTelemetrySink):
+    """
+    Keeps the logs it is sent, along with the name of the thread each batch is sent on
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.thread_names: List[str] = []
+
+    def send_batch(self, logs: List[TelemetryLog]) -> None:
+        super().send_batch(logs)
+        self.thread_names.append(current_thread().name)
+
+
+def get_edit_time() -> float:
+    """
+    Returns the median time it takes to set a formula that uses every column
+    """
+    df = pd.DataFrame({f'C{i}': range(10) for i in range(NUM_COLUMNS)})
+    mito_backend = MitoBackend(df)
+    mito_backend.receive_message({
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {'sheet_index': 0, 'column_header': 'Total', 'column_header_index': -1},
+    })
+    column_id = mito_backend.steps_manager.curr_step.column_ids.get_column_id_by_header(0, 'Total')
+
+    def set_formula() -> None:
+        mito_backend.receive_message({
+            'event': 'edit_event',
+            'id': get_new_id(),
+            'type': 'set_column_formula_edit',
+            'step_id': get_new_id(),
+            'params': {
+                'sheet_index': 0,
+                'column_id': column_id,
+                'formula_label': 0,
+                'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+                'new_formula': '=' + ' + '.join(f'C{i}' for i in range(NUM_COLUMNS)),
+                'public_interface_version': 3
+            },
+        })
+
+    edit_times = []
+    for _ in range(NUM_EDITS):
+        edit_times.append(get_time(set_formula))
+        sleep(SECONDS_BETWEEN_EDITS)
+    return median(edit_times)
+
+
+def test_benchmark_telemetry(monkeypatch, benchmark_report):
+    log_times = []
+    log_event_processed = mitosheet.mito_backend.log_event_processed
+    def timed_log_event_processed(*args: Any, **kwargs: Any) -> None:
+        log_times.append(get_time(lambda: log_event_processed(*args, **kwargs)))
+
+    sink = ThreadRecordingTelemetrySink()
+    previous_sink = set_telemetry_sink(sink)
+    try:
+        monkeypatch.setattr(mitosheet.mito_backend, 'log_event_processed', lambda *args, **kwargs: None)
+        telemetry_off_time = get_edit_time()
+
+        monkeypatch.setattr(mitosheet.mito_backend, 'log_event_processed', timed_log_event_processed)
+        telemetry_on_time = get_edit_time()
+        wait_for_telemetry()
+        log_time, log_times[:] = median(log_times), []
+        thread_names, sink.thread_names = sink.thread_names, []
+
+        monkeypatch.setattr(telemetry_utils.telemetry_queue, 'threaded', False)
+        telemetry_on_synchronous_time = get_edit_time()
+        log_synchronous_time = median(log_times)
+        synchronous_thread_names = sink.thread_names
+        monkeypatch.undo()
+    finally:
+        set_telemetry_sink(previous_sink)
+
+    benchmark_report(
+        f'Edit with {NUM_COLUMNS} columns: telemetry off {telemetry_off_time * 1000:.2f}ms, ' +
+        f'telemetry on {telemetry_on_time * 1000:.2f}ms (logging {log_time * 1000:.2f}ms), ' +
+        f'telemetry on and sent before the edit returns {telemetry_on_synchronous_time * 1000:.2f}ms (logging {log_synchronous_time * 1000:.2f}ms)'
+    )
+    assert len(thread_names) > 0 and set(thread_names) == {'mito-telemetry'}
+    assert len(synchronous_thread_names) > 0 and set(synchronous_thread_names) == {current_thread().name}
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for downsampling and binning the data in graphs.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.graphs import (downsample_graph_data,
+                                        get_evenly_spaced_positions,
+                                        get_histogram_bins,
+                                        get_lttb_positions)
+
+
+def test_small_data_is_not_downsampled():
+    df = pd.DataFrame({'A': np.arange(100), 'B': np.arange(100)})
+    assert downsample_graph_data(df, 'line', x='A', y='B', max_points=100) is df
+
+
+def test_evenly_spaced_positions():
+    assert get_evenly_spaced_positions(5, 10).tolist() == [0, 1, 2, 3, 4]
+    assert get_evenly_spaced_positions(101, 3).tolist() == [0, 50, 100]
+
+
+def test_lttb_keeps_the_peaks_of_the_line():
+    x = np.arange(10_000, dtype='float64')
+    y = np.zeros(10_000)
+    y[1234] = 100
+    y[7777] = -100
+
+    positions = get_lttb_positions(x, y, 100)
+
+    assert len(positions) == 100
+    assert positions[0] == 0 and positions[-1] == 9999
+    assert 1234 in positions and 7777 in positions
+
+
+def test_line_is_downsampled_for_each_color():
+    df = pd.DataFrame({
+        'A': np.tile(np.arange(5000), 2),
+        'B': np.concatenate([np.sin(np.arange(5000)), np.cos(np.arange(5000))]),
+        'C': ['a'] * 5000 + ['b'] * 5000
+    })
+    df.loc[123, 'B'] = 10
+
+    downsampled_df = downsample_graph_data(df, 'line', x='A', y='B', color='C', max_points=1000)
+
+    assert len(downsampled_df) <= 1000
+    assert sorted(downsampled_df['C'].unique()) == ['a', 'b']
+    assert downsampled_df['B'].max() == 10
+    assert downsampled_df['A'].min() == 0 and downsampled_df['A'].max() == 4999
+
+
+def test_scatter_keeps_outliers():
+    np.random.seed(0)
+    df = pd.DataFrame({'A': np.random.normal(size=100_000), 'B': np.random.normal(size=100_000)})
+    df.loc[500, ['A', 'B']] = [100, 100]
+
+    downsampled_df = downsample_graph_data(df, 'scatter', x='A', y='B', max_points=1000)
+
+    assert len(downsampled_df) <= 1000
+    assert 500 in downsampled_df.index
+
+
+def test_stacked_bars_are_summed():
+    df = pd.DataFrame({
+        'A': ['x', 'y', 'z'] * 1000,
+        'B': [1, -2, 3] * 1000,
+        'C': ['c', 'c', 'c', 'd', 'd', 'd'] * 500
+    })
+
+    downsampled_df = downsample_graph_data(df, 'bar', x='A', y='B', color='C', max_points=100)
+
+    assert len(downsampled_df) == 6
+    assert downsampled_df.groupby('A')['B'].sum().to_dict() == df.groupby('A')['B'].sum().to_dict()
+
+
+def test_stacked_bars_with_null_colors_are_summed():
+    df = pd.DataFrame({
+        'A': ['x', 'y'] * 1000,
+        'B': [1, 2] * 1000,
+        'C': ['c', None, None, 'd'] * 500
+    })
+
+    downsampled_df = downsample_graph_data(df, 'bar', x='A', y='B', color='C', max_points=100)
+
+    assert len(downsampled_df) == 4
+    assert downsampled_df['B'].sum() == df['B'].sum()
+    assert downsampled_df['C'].isna().sum() == 2
+
+
+def test_grouped_bars_are_evenly_spaced():
+    df = pd.DataFrame({'A': np.arange(1000) % 10, 'B': np.arange(1000)})
+    downsampled_df = downsample_graph_data(df, 'bar', x='A', y='B', barmode='group', max_points=100)
+    assert len(downsampled_df) == 100
+
+
+@pytest.mark.parametrize("nbins", [None, 7])
+def test_histogram_bins_have_the_same_counts_as_numpy(nbins):
+    np.random.seed(0)
+    df = pd.DataFrame({'A': np.random.normal(size=50_000)})
+    df.loc[10, 'A'] = np.nan
+
+    binned_df, bins = get_histogram_bins(df, x='A', nbins=nbins)
+
+    bin_edges = np.histogram_bin_edges(df['A'].dropna(), bins=nbins if nbins is not None else 'auto')
+    assert bins == {'start': bin_edges[0], 'end': bin_edges[-1], 'size': bin_edges[1] - bin_edges[0]}
+    bin_indexes = np.round((binned_df['A'] - bins['start']) / bins['size'] - 0.5).astype(int)
+    counts = np.zeros(len(bin_edges) - 1, dtype=int)
+    counts[bin_indexes] = binned_df['count']
+    assert counts.tolist() == np.histogram(df['A'].dropna(), bins=bin_edges)[0].tolist()
+
+
+def test_histogram_bins_are_capped():
+    df = pd.DataFrame({'A': np.concatenate([np.arange(100_000), [10**9]])})
+    binned_df, bins = get_histogram_bins(df, x='A', max_bins=50)
+    assert len(binned_df) <= 50
+    assert binned_df['count'].sum() == len(df)
+
+
+def test_histogram_bins_aggregate_with_histfunc():
+    df = pd.DataFrame({'A': [1.0, 1.0, 2.0, 2.0], 'B': [1, 3, 5, 7], 'C': ['a', 'b', 'a', 'a']})
+
+    binned_df, _ = get_histogram_bins(df, x='A', y='B', color='C', histfunc='avg', nbins=2)
+
+    assert sorted(binned_df.itertuples(index=False, name=None)) == [(1.25, 'a', 1.0), (1.25, 'b', 3.0), (1.75, 'a', 6.0)]
+
+
+def test_categorical_histogram_bins_count_each_value():
+    df = pd.DataFrame({'A': ['a', 'b', 'a', None], 'count': [1, 2, 3, 4]})
+
+    binned_df, bins = get_histogram_bins(df, x='A')
+
+    assert bins is None
+    assert binned_df.fillna('missing').set_index('A')['count_'].to_dict() == {'a': 2, 'b': 1, 'missing': 1}
+
+
+@pytest.mark.parametrize("x, y, color", [
+    (['A', 'B'], None, None),
+    ('D', None, None),
+    ('A', 'C', None),
+    ('A', None, 'A'),
+])
+def test_histograms_that_cannot_be_binned(x, y, color):
+    df = pd.DataFrame({'A': [1, 2], 'B': [3, 4], 'C': ['a', 'b'], 'D': pd.to_datetime(['2020-01-01', '2020-01-02'])})
+    with pytest.raises(ValueError):
+        get_histogram_bins(df, x=x, y=y, color=color)
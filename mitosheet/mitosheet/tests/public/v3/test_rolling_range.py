@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for computing aggregations over rolling ranges.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.rolling_range import ROLLING_RANGE_AGGREGATIONS, RollingRange
+
+AGGREGATION_FUNCTIONS = {
+    'sum': lambda df: df.sum().sum(),
+    'count': lambda df: df.count().sum(),
+    'min': lambda df: df.min().min(),
+    'max': lambda df: df.max().max(),
+    'std': lambda df: df.stack().std(),
+    'var': lambda df: df.stack().var(),
+}
+
+DATAFRAMES = [
+    pd.DataFrame({'A': [1, 2, 3, 4, 5, 6]}),
+    pd.DataFrame({'A': [1, -2, 3, 4, 5, 6], 'B': [6, 5, 4, 3, 2, -1]}),
+    pd.DataFrame({'A': [1.5, np.nan, 3.25, np.nan, np.nan, 6.0], 'B': [1, 2, 3, 4, 5, 6]}),
+    pd.DataFrame({'A': [np.nan, np.nan, np.nan, 1.0, 2.0, np.nan]}),
+]
+
+WINDOWS_AND_OFFSETS = [
+    (1, 0),
+    (2, 0),
+    (2, -1),
+    (3, 1),
+    (4, -2),
+    (10, 0),
+    (2, 10),
+    (2, -10),
+    (6, -5),
+]
+
+@pytest.mark.parametrize("aggregation", ROLLING_RANGE_AGGREGATIONS)
+@pytest.mark.parametrize("df", DATAFRAMES)
+@pytest.mark.parametrize("window, offset", WINDOWS_AND_OFFSETS)
+def test_aggregate_same_as_apply(aggregation, df, window, offset):
+    rolling_range = RollingRange(df, window, offset)
+
+    result = rolling_range.aggregate(aggregation)
+    expected = rolling_range.apply(AGGREGATION_FUNCTIONS[aggregation])
+
+    assert result.dtype == expected.dtype
+    assert np.allclose(result.astype(float), expected.astype(float), equal_nan=True)
+
+
+def test_aggregate_falls_back_to_apply_for_datetimes():
+    df = pd.DataFrame({'A': pd.to_datetime(['2001-01-01', '1997-01-03', '2005-05-05'])})
+
+    result = RollingRange(df, 2, 0).aggregate('min', default_value=pd.Timestamp.max)
+
+    assert result.tolist() == [pd.Timestamp('1997-01-03'), pd.Timestamp('1997-01-03'), pd.Timestamp('2005-05-05')]
+
+
+def test_apply_window_before_start_is_default_value():
+    rolling_range = RollingRange(pd.DataFrame({'A': [1, 2, 3, 4, 5]}), 2, -4)
+
+    assert rolling_range.apply(lambda df: df.sum().sum()).tolist() == [0, 0, 0, 1, 3]
+    assert rolling_range.aggregate('sum').tolist() == [0, 0, 0, 1, 3]
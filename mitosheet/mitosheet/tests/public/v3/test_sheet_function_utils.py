@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for combining series and primitive values in sheet functions.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.utils import get_final_result_series_or_primitive
+
+SHEET_FUNCTIONS = {
+    'AND': (True, lambda df: df.all().all(), lambda a, b: a and b, lambda a, b: a & b),
+    'MAX': (-sys.maxsize - 1, lambda df: df.max().max(), max, lambda a, b: pd.concat([a, b], axis=1).max(axis=1)),
+    'SUM': (0, lambda df: df.sum().sum(), lambda a, b: a + b, lambda a, b: a + b),
+    'CONCAT': ('', lambda df: df.sum().sum(), lambda a, b: a + b, lambda a, b: a + b),
+}
+
+ARGS = [
+    pd.Series([1, 2, 3], index=[2, 0, 1], name='A'),
+    pd.Series([1.5, np.nan, -2.0], index=[2, 0, 1], name='B'),
+    pd.Series([True, False, True], index=[2, 0, 1], name='C'),
+    pd.Series(['a', None, 'c'], index=[2, 0, 1], name='D'),
+    1, 2.5, True, 'x', None, np.nan, 2 ** 70,
+]
+
+def get_final_result_with_apply(default_value, argv, get_new_result_from_primitive_values):
+    # This is how we used to combine series with primitive values
+    def fill(value):
+        return default_value if value is None or (isinstance(value, float) and np.isnan(value)) else value
+
+    result = default_value
+    for arg in argv:
+        if arg is None:
+            continue
+        elif isinstance(result, pd.Series):
+            result = result.apply(lambda v: get_new_result_from_primitive_values(fill(v), fill(arg)))
+        elif isinstance(arg, pd.Series):
+            result = arg.apply(lambda v: get_new_result_from_primitive_values(fill(result), fill(v)))
+        else:
+            result = get_new_result_from_primitive_values(fill(result), fill(arg))
+    return result
+
+
+@pytest.mark.parametrize("sheet_function", SHEET_FUNCTIONS.keys())
+@pytest.mark.parametrize("series_index", range(4))
+@pytest.mark.parametrize("primitive_index", range(4, len(ARGS)))
+def test_combining_series_and_primitive_same_as_apply(sheet_function, series_index, primitive_index):
+    default_value, get_primitive_value_from_dataframe, get_new_result_from_primitive_values, get_new_result_from_series = SHEET_FUNCTIONS[sheet_function]
+
+    for argv in [(ARGS[series_index], ARGS[primitive_index]), (ARGS[primitive_index], ARGS[series_index])]:
+        try:
+            expected = get_final_result_with_apply(default_value, argv, get_new_result_from_primitive_values)
+        except Exception as e:
+            with pytest.raises(type(e)):
+                get_final_result_series_or_primitive(default_value, argv, get_primitive_value_from_dataframe, get_new_result_from_primitive_values, get_new_result_from_series)
+            continue
+
+        result = get_final_result_series_or_primitive(default_value, argv, get_primitive_value_from_dataframe, get_new_result_from_primitive_values, get_new_result_from_series)
+        pd.testing.assert_series_equal(result, expected)
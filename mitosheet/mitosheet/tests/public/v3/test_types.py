@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for casting series to types all at once, which should give the 
+same result as casting each value in the series.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.types.utils import ELEMENT_CONVERSION_FUNCTIONS, SERIES_CONVERSION_FUNCTIONS, get_arg_cast_to_type
+
+SERIES = [
+    pd.Series([1, -2, 3], name='A', index=[2, 0, 1]),
+    pd.Series([1, 2], dtype='int32'),
+    pd.Series([1, 2], dtype='uint8'),
+    pd.Series([1.5, -2.0, np.nan, 0.0, -0.0]),
+    pd.Series([1.0, 2.5], dtype='float32'),
+    pd.Series([True, False]),
+    pd.Series(['1', ' 2.5 ', '1e3', 'nan', '-4']),
+    pd.Series(['$1,000', '(5)', '2M']),
+    pd.Series(['True', 'no', 'Y', '0', '1.0', 'None']),
+    pd.Series(['abc', 'True', '1']),
+    pd.Series(['1 days', '2 hours', '00:01:00']),
+    pd.Series(['a', None, 'b']),
+    pd.Series(pd.to_timedelta(['1 days', '2 days'])),
+    pd.Series(pd.to_datetime(['2020-01-01', None])),
+]
+
+@pytest.mark.parametrize("target_primitive_type_name", [
+    'str', 'int', 'float', 'number', 'bool', 'timedelta'
+])
+@pytest.mark.parametrize("series", SERIES)
+def test_series_conversion_same_as_element_conversion(target_primitive_type_name, series):
+    try:
+        expected = series.apply(ELEMENT_CONVERSION_FUNCTIONS[target_primitive_type_name])
+    except Exception as e:
+        with pytest.raises(type(e)):
+            SERIES_CONVERSION_FUNCTIONS[target_primitive_type_name](series)
+        return
+
+    pd.testing.assert_series_equal(SERIES_CONVERSION_FUNCTIONS[target_primitive_type_name](series), expected)
+
+
+def test_cast_series_ignores_types_of_values():
+    datetimes = pd.Series(pd.to_datetime(['2020-01-01', '2021-01-01']))
+    assert get_arg_cast_to_type('number', datetimes, ['datetime']) is datetimes
+
+    mixed = pd.Series([pd.Timestamp('2020-01-01'), '1.5'])
+    pd.testing.assert_series_equal(
+        get_arg_cast_to_type('number', mixed, ['datetime']),
+        pd.Series([pd.Timestamp('2020-01-01'), 1.5])
+    )
+
+
+def test_cast_empty_series_keeps_dtype():
+    series = pd.Series([], dtype=object)
+    assert get_arg_cast_to_type('float', series).dtype == object
+
+
+def test_cast_dataframe_casts_each_column():
+    df = pd.DataFrame({'A': [1, 2], 'B': ['3', '4.5']})
+    pd.testing.assert_frame_equal(
+        get_arg_cast_to_type('float', df),
+        pd.DataFrame({'A': [1.0, 2.0], 'B': [3.0, 4.5]})
+    )
+
+
+@pytest.mark.parametrize("target_primitive_type_name, series", [
+    ('float', pd.Series([1.5, 2.5])),
+    ('int', pd.Series([1, 2])),
+    ('number', pd.Series([1, 2])),
+    ('number', pd.Series([1.5, 2.5])),
+    ('bool', pd.Series([True, False])),
+    ('datetime', pd.Series(pd.to_datetime(['2020-01-01', '2021-01-01']))),
+])
+def test_cast_series_already_of_type_is_not_copied(target_primitive_type_name, series):
+    assert get_arg_cast_to_type(target_primitive_type_name, series) is series
@@ -4,7 +4,9 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
+import numpy as np
 import pandas as pd
+import plotly.express as px
 import pytest
 from mitosheet.step_performers.graph_steps.graph_utils import (BAR, BOX,
                                                                DENSITY_CONTOUR,
@@ -12,6 +14,9 @@ from mitosheet.step_performers.graph_steps.graph_utils import (BAR, BOX,
                                                                ECDF, HISTOGRAM,
                                                                LINE, SCATTER,
                                                                STRIP, VIOLIN)
+from mitosheet.step_performers.graph_steps.plotly_express_graphs import (
+    GRAPH_SAFETY_FILTER_CUTOFF, get_plotly_express_graph,
+    get_plotly_express_graph_code)
 from mitosheet.tests.test_utils import create_mito_wrapper
 
 
@@ -221,4 +226,78 @@ def test_box_configuration():
     assert mito.get_graph_sheet_index(graph_id) == 0
     assert mito.get_graph_axis_column_ids(graph_id, 'x') == ['A']
     assert mito.get_graph_axis_column_ids(graph_id, 'y') == ['B', 'C']
-    assert not mito.get_is_graph_output_none(graph_id)
\ No newline at end of file
+    assert not mito.get_is_graph_output_none(graph_id)
+
+def get_graph_figures(df, graph_type, x, y, color=None, histnorm=None, histfunc=None):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1]}))
+    mito.generate_graph('123', graph_type, 0, True, [], [], 400, 400)
+    graph_styling_params = mito.curr_step.params['graph_styling']
+    params = (
+        graph_type, df, True, x, y, color, None, None, None, None, None, None, None, histnorm, histfunc, None, graph_styling_params
+    )
+    code = get_plotly_express_graph_code(*params, 'df1')
+    code_globals = {'df1': df}
+    exec(code, code_globals)
+    return get_plotly_express_graph(*params), code_globals['fig']
+
+
+LARGE_GRAPH_DF = pd.DataFrame({
+    'A': np.arange(50_000),
+    'B': np.sin(np.arange(50_000) / 100),
+    'C': np.random.RandomState(0).normal(size=50_000),
+    'D': np.tile(['a', 'b', 'c', 'd', 'e'], 10_000),
+})
+
+@pytest.mark.parametrize("graph_type, x, y, color, histnorm, histfunc", [
+    (LINE, ['A'], ['B', 'C'], 'D', None, None),
+    (SCATTER, ['B'], ['C'], None, None, None),
+    (BAR, ['D'], ['C'], None, None, None),
+    (HISTOGRAM, ['C'], [], 'D', None, None),
+    (HISTOGRAM, [], ['C'], None, 'percent', None),
+    (HISTOGRAM, ['C'], ['B'], None, None, 'avg'),
+    (HISTOGRAM, ['D'], [], None, None, None),
+    (BOX, ['D'], ['C'], None, None, None),
+])
+def test_large_graphs_are_downsampled_and_code_makes_same_graph(graph_type, x, y, color, histnorm, histfunc):
+    fig, code_fig = get_graph_figures(LARGE_GRAPH_DF, graph_type, x, y, color=color, histnorm=histnorm, histfunc=histfunc)
+
+    assert fig.to_json() == code_fig.to_json()
+    num_points = sum(len(trace.x if trace.x is not None else trace.y) for trace in fig.data)
+    assert num_points <= 2 * GRAPH_SAFETY_FILTER_CUTOFF
+
+
+def test_binned_histogram_has_same_bars_as_all_data():
+    df = LARGE_GRAPH_DF[['C']]
+    fig, _ = get_graph_figures(df, HISTOGRAM, ['C'], [])
+
+    trace, = fig.data
+    num_bins = round((trace.xbins.end - trace.xbins.start) / trace.xbins.size)
+    bin_edges = np.histogram_bin_edges(df['C'], bins='auto')
+    assert len(bin_edges) == num_bins + 1 and bin_edges[0] == trace.xbins.start
+    bin_indexes = np.round((np.array(trace.x) - trace.xbins.start) / trace.xbins.size - 0.5).astype(int)
+    counts = np.zeros(len(bin_edges) - 1, dtype=int)
+    counts[bin_indexes] = trace.y
+    assert counts.tolist() == np.histogram(df['C'], bins=bin_edges)[0].tolist()
+
+
+def test_stacked_bar_has_same_bars_as_all_data():
+    fig, _ = get_graph_figures(LARGE_GRAPH_DF, BAR, ['D'], ['C'])
+
+    bar_sums = pd.DataFrame({'x': fig.data[0].x, 'y': fig.data[0].y}).groupby('x')['y'].sum()
+    assert np.allclose(bar_sums, LARGE_GRAPH_DF.groupby('D')['C'].sum())
+
+
+@pytest.mark.parametrize("x, y, color, histnorm, histfunc", [
+    (['C'], [], 'D', None, None),
+    ([], ['C'], None, 'percent', None),
+    (['C'], [], None, 'probability density', None),
+    (['C'], ['B'], None, None, 'count'),
+    (['C'], ['B'], None, 'percent', 'sum'),
+    (['C'], ['B'], None, None, 'avg'),
+])
+def test_binned_histogram_has_same_hover_text_as_all_data(x, y, color, histnorm, histfunc):
+    fig, code_fig = get_graph_figures(LARGE_GRAPH_DF, HISTOGRAM, x, y, color=color, histnorm=histnorm, histfunc=histfunc)
+    all_data_fig = px.histogram(LARGE_GRAPH_DF, x=x[0] if x else None, y=y[0] if y else None, color=color, histnorm=histnorm, histfunc=histfunc)
+
+    assert [trace.hovertemplate for trace in fig.data] == [trace.hovertemplate for trace in all_data_fig.data]
+    assert [trace.hovertemplate for trace in code_fig.data] == [trace.hovertemplate for trace in all_data_fig.data]
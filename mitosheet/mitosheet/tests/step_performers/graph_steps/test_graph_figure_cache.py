@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for caching the figures of graphs, and sending them to the frontend as json.
+"""
+import json
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import mitosheet.step_performers.graph_steps.graph as graph_module
+from mitosheet.step_performers.graph_steps.graph_figure_cache import (
+    GraphFigureCache, graph_figure_cache)
+from mitosheet.step_performers.graph_steps.graph_utils import (BAR, LINE,
+                                                               get_figure_json)
+from mitosheet.step_performers.graph_steps.plotly_express_graphs import \
+    get_plotly_express_graph
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+@pytest.fixture
+def num_traces_made(monkeypatch):
+    graph_figure_cache.clear()
+    num_traces_made = [0]
+    get_plotly_express_graph_traces = graph_module.get_plotly_express_graph_traces
+    def counted_get_plotly_express_graph_traces(*args, **kwargs):
+        num_traces_made[0] += 1
+        return get_plotly_express_graph_traces(*args, **kwargs)
+    monkeypatch.setattr(graph_module, 'get_plotly_express_graph_traces', counted_get_plotly_express_graph_traces)
+    yield num_traces_made
+    graph_figure_cache.clear()
+
+
+def get_graph_output(mito, graph_id):
+    return mito.get_graph_data(graph_id)['graphOutput']
+
+
+def test_graph_figure_is_sent_as_plotly_json(num_traces_made):
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4.5, 5.5, 6.5]})
+    mito = create_mito_wrapper(df)
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '400px', '800px', title_title='My graph')
+
+    graph_output = get_graph_output(mito, '123')
+    expected_fig = get_plotly_express_graph(
+        LINE, df, True, ['A'], ['B'], None, None, None, None, None, None, None, None, None, None, None, mito.curr_step.params['graph_styling']
+    )
+    expected_fig.update_layout(margin=dict(l=0, r=0, t=30, b=35))
+
+    assert graph_output['graphFigure'] == get_figure_json(expected_fig)
+    assert graph_output['graphFigure']['layout']['title']['text'] == 'My graph'
+    assert (graph_output['graphHeight'], graph_output['graphWidth']) == ('400px', '800px')
+    # The figure is sent in the analysis data as json, rather than as html
+    assert json.loads(mito.mito_backend.steps_manager.analysis_data_json)['graphDataDict']['123']['graphOutput']['graphFigure'] == graph_output['graphFigure']
+
+
+def test_restyling_and_resizing_graph_does_not_make_traces_again(num_traces_made):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}))
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '400px', '800px', step_id='step')
+    data = get_graph_output(mito, '123')['graphFigure']['data']
+
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '500px', '900px', step_id='step')
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '500px', '900px', title_title='New title', plot_bgcolor='#000000', step_id='step')
+
+    assert num_traces_made[0] == 1
+    graph_output = get_graph_output(mito, '123')
+    assert graph_output['graphFigure']['data'] == data
+    assert graph_output['graphFigure']['layout']['title']['text'] == 'New title'
+    assert graph_output['graphFigure']['layout']['plot_bgcolor'] == '#000000'
+    assert graph_output['graphHeight'] == '500px'
+
+
+def test_undo_does_not_make_traces_again(num_traces_made):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6], 'C': [7, 8, 9]}))
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '400px', '800px', step_id='step')
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['B'], '400px', '800px', title_title='New title', step_id='step')
+    mito.generate_graph('123', LINE, 0, True, ['A'], ['C'], '400px', '800px')
+    assert num_traces_made[0] == 2
+
+    mito.undo()
+
+    assert num_traces_made[0] == 2
+    assert get_graph_output(mito, '123')['graphFigure']['layout']['title']['text'] == 'New title'
+
+
+def test_changing_graphed_data_makes_traces_again(num_traces_made):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6], 'C': [7, 8, 9]}))
+    mito.generate_graph('123', BAR, 0, True, ['A'], ['B'], '400px', '800px')
+    assert num_traces_made[0] == 1
+
+    mito.set_formula('=A * 10', 0, 'B', add_column=False)
+    mito.generate_graph('123', BAR, 0, True, ['A'], ['B'], '400px', '800px')
+    assert num_traces_made[0] == 2
+
+    # Renaming a graphed column changes the labels of the traces
+    mito.rename_column(0, 'A', 'D')
+    mito.generate_graph('123', BAR, 0, True, ['A'], ['B'], '400px', '800px')
+    assert num_traces_made[0] == 3
+
+    # Changing a param that changes the traces makes them again
+    mito.generate_graph('123', BAR, 0, True, ['A'], ['B'], '400px', '800px', barmode='group')
+    assert num_traces_made[0] == 4
+
+
+def test_graph_figure_cache_removes_least_recently_used_figures():
+    cache = GraphFigureCache(max_cached_figures=2)
+    df = pd.DataFrame({'A': [1, 2, 3]})
+    num_figures_made = [0]
+    def get_figure():
+        num_figures_made[0] += 1
+        return go.Figure()
+
+    for graph_params in [[1], [2], [1], [3], [1], [2]]:
+        cache.get(df, ['A'], graph_params, get_figure)
+
+    assert len(cache) == 2
+    assert num_figures_made[0] == 4
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for guessing the delimeter and encoding of CSV files from a sample.
+"""
+import pandas as pd
+import pytest
+
+import mitosheet.step_performers.import_steps.csv_utils as csv_utils
+from mitosheet.api.get_csv_files_metadata import get_csv_files_metadata
+from mitosheet.enterprise.mito_config import MITO_CONFIG_CSV_IMPORT_ENGINE, MITO_CONFIG_VERSION
+from mitosheet.step_performers.import_steps.csv_utils import (
+    clear_csv_sniff_results, get_csv_import_engine, guess_delimeter_and_encoding,
+    read_csv_get_delimiter_and_encoding)
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+@pytest.fixture(autouse=True)
+def clear_sniff_results():
+    clear_csv_sniff_results()
+    yield
+    clear_csv_sniff_results()
+
+
+def write_file(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return str(path)
+
+
+@pytest.mark.parametrize("delimeter", [',', ';', '|', '\t'])
+def test_guesses_delimeter_from_sample(tmp_path, monkeypatch, delimeter):
+    monkeypatch.setattr(csv_utils, 'SNIFF_SAMPLE_BYTES', 64)
+    file_name = write_file(tmp_path / 'test.csv', f'A{delimeter}B\n'.encode() + f'1{delimeter}2\n'.encode() * 100)
+
+    assert guess_delimeter_and_encoding(file_name) == (delimeter, 'utf-8')
+
+
+def test_guesses_default_delimeter_for_single_column(tmp_path):
+    file_name = write_file(tmp_path / 'test.csv', b'A\n1\n2\n')
+
+    df, delimeter, encoding = read_csv_get_delimiter_and_encoding(file_name)
+    assert delimeter == ','
+    assert encoding == 'utf-8'
+    assert df.equals(pd.DataFrame({'A': [1, 2]}))
+
+
+def test_guesses_delimeter_when_first_line_longer_than_sample(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_utils, 'SNIFF_SAMPLE_BYTES', 8)
+    file_name = write_file(tmp_path / 'test.csv', b'Column A;Column B\n1;2\n')
+
+    assert guess_delimeter_and_encoding(file_name) == (';', 'utf-8')
+
+
+def test_sample_ending_part_way_through_character_is_utf_8(tmp_path, monkeypatch):
+    # The sample ends between the two bytes of é
+    monkeypatch.setattr(csv_utils, 'SNIFF_SAMPLE_BYTES', 13)
+    file_name = write_file(tmp_path / 'test.csv', 'A,B\n1,2\n1234é,2\n'.encode('utf-8'))
+
+    assert guess_delimeter_and_encoding(file_name) == (',', 'utf-8')
+
+
+def test_guesses_utf_16_from_sample(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_utils, 'SNIFF_SAMPLE_BYTES', 64)
+    df = pd.DataFrame({'A': list(range(100)), 'B': list(range(100))})
+    file_name = str(tmp_path / 'test.csv')
+    df.to_csv(file_name, index=False, encoding='utf-16')
+
+    assert guess_delimeter_and_encoding(file_name) == (',', 'UTF-16')
+    assert read_csv_get_delimiter_and_encoding(file_name)[0].equals(df)
+
+
+def test_falls_back_to_latin_1_after_sample(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_utils, 'SNIFF_SAMPLE_BYTES', 64)
+    file_name = write_file(tmp_path / 'test.csv', b'A,B\n' + b'1,2\n' * 100 + b'\xd1,2\n')
+
+    assert guess_delimeter_and_encoding(file_name) == (',', 'utf-8')
+    df, delimeter, encoding = read_csv_get_delimiter_and_encoding(file_name)
+    assert delimeter == ','
+    assert encoding == 'latin-1'
+    assert df['A'].iloc[-1] == 'Ñ'
+
+
+def test_sniff_results_cached_until_file_changes(tmp_path, monkeypatch):
+    file_name = write_file(tmp_path / 'test.csv', b'A;B\n1;2\n')
+    assert guess_delimeter_and_encoding(file_name) == (';', 'utf-8')
+
+    # A cached result does not read the file again
+    def fail_to_open(*args, **kwargs):
+        raise AssertionError('File opened')
+    with monkeypatch.context() as m:
+        m.setattr(csv_utils, 'open', fail_to_open, raising=False)
+        assert guess_delimeter_and_encoding(file_name) == (';', 'utf-8')
+
+    write_file(tmp_path / 'test.csv', b'A|B\n1|2\n3|4\n')
+    assert guess_delimeter_and_encoding(file_name) == ('|', 'utf-8')
+
+
+def test_get_csv_files_metadata_does_not_read_file(tmp_path, monkeypatch):
+    file_name = write_file(tmp_path / 'test.csv', b'A;B\n1;2\n')
+
+    def fail_to_read_csv(*args, **kwargs):
+        raise AssertionError('File read')
+    monkeypatch.setattr(pd, 'read_csv', fail_to_read_csv)
+
+    metadata = get_csv_files_metadata({'file_names': [file_name]}, None)
+    assert metadata['delimeters'] == [';']
+    assert metadata['encodings'] == ['utf-8']
+
+
+def test_simple_import_reports_bytes_per_second(tmp_path):
+    file_name = write_file(tmp_path / 'test.csv', b'A,B\n' + b'1,2\n' * 1000)
+
+    mito = create_mito_wrapper()
+    mito.simple_import([file_name])
+
+    file_bytes_per_second = mito.mito_backend.steps_manager.curr_step.execution_data['file_bytes_per_second']
+    assert len(file_bytes_per_second) == 1
+    assert file_bytes_per_second[0] > 0
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1] * 1000, 'B': [2] * 1000}))
+
+
+@pytest.mark.parametrize("read_csv_params, csv_import_engine, engine", [
+    ({'sep': ';'}, None, None),
+    ({'sep': ';'}, 'c', None),
+    ({'sep': ';', 'encoding': 'latin-1'}, 'pyarrow', 'pyarrow'),
+    ({'sep': ';', 'decimal': ','}, 'pyarrow', None),
+])
+def test_get_csv_import_engine(monkeypatch, read_csv_params, csv_import_engine, engine):
+    monkeypatch.setattr(csv_utils, 'is_pyarrow_installed', lambda: True)
+    assert get_csv_import_engine(read_csv_params, csv_import_engine) == engine
+
+
+def test_simple_import_with_pyarrow_engine_generates_code_with_pyarrow_engine(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setenv(MITO_CONFIG_VERSION, '2')
+    monkeypatch.setenv(MITO_CONFIG_CSV_IMPORT_ENGINE, 'pyarrow')
+    file_name = write_file(tmp_path / 'test.csv', b'A;B\n1;2\n')
+
+    mito = create_mito_wrapper()
+    mito.simple_import([file_name])
+
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1], 'B': [2]}))
+    assert f"test = pd.read_csv(r'{file_name}', sep=';', engine='pyarrow')" in mito.transpiled_code
+
+
+def test_simple_import_without_configured_engine_generates_code_without_engine(tmp_path):
+    file_name = write_file(tmp_path / 'test.csv', b'A;B\n1;2\n')
+
+    mito = create_mito_wrapper()
+    mito.simple_import([file_name])
+
+    assert f"test = pd.read_csv(r'{file_name}', sep=';')" in mito.transpiled_code
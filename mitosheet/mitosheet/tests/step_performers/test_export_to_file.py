@@ -11,6 +11,9 @@ import glob
 import os
 import pandas as pd
 import pytest
+from mitosheet.saved_analyses import write_analysis
+from mitosheet.step_performers import file_export_writer as file_export_writer_module
+from mitosheet.step_performers.file_export_writer import FileExportWriter, file_export_writer, wait_for_file_exports
 from mitosheet.tests.test_utils import check_dataframes_equal, create_mito_wrapper
 from mitosheet.tests.decorators import pandas_post_1_2_only, python_post_3_6_only
 
@@ -335,3 +338,124 @@ df_1_styler = df_1.style\\
 ])
 """
 
+
+def get_file_write_counter(monkeypatch):
+    num_writes = []
+    write = file_export_writer._write
+    def counting_write(*args, **kwargs):
+        num_writes.append(1)
+        return write(*args, **kwargs)
+    monkeypatch.setattr(file_export_writer, '_write', counting_write)
+    return num_writes
+
+
+@pytest.mark.parametrize("type, file_name", [('csv', 'out.csv'), ('excel', 'out.xlsx')])
+def test_replay_analysis_with_export_does_not_write_files_again(tmp_path, monkeypatch, type, file_name):
+    file_name = str(tmp_path / file_name)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file(type, [0], file_name)
+    analysis_name = mito.mito_backend.analysis_name
+    write_analysis(mito.mito_backend.steps_manager)
+
+    num_writes = get_file_write_counter(monkeypatch)
+    new_mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    new_mito.replay_analysis(analysis_name)
+    wait_for_file_exports()
+
+    assert len(num_writes) == 0
+    assert new_mito.mito_backend.steps_manager.curr_step.execution_data['file_written'] == False
+
+
+def test_undo_and_redo_export_does_not_write_files_again(tmp_path, monkeypatch):
+    file_name = str(tmp_path / 'out.csv')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], file_name)
+
+    num_writes = get_file_write_counter(monkeypatch)
+    mito.undo()
+    mito.redo()
+    wait_for_file_exports()
+
+    assert len(num_writes) == 0
+    assert pd.read_csv(file_name).equals(pd.DataFrame({'A': [1, 2, 3]}))
+
+
+def test_replay_analysis_with_export_writes_files_when_data_changes(tmp_path, monkeypatch):
+    file_name = str(tmp_path / 'out.csv')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], file_name)
+    analysis_name = mito.mito_backend.analysis_name
+    write_analysis(mito.mito_backend.steps_manager)
+
+    num_writes = get_file_write_counter(monkeypatch)
+    new_mito = create_mito_wrapper(pd.DataFrame({'A': [4, 5, 6]}))
+    new_mito.replay_analysis(analysis_name)
+    wait_for_file_exports()
+
+    assert len(num_writes) == 1
+    assert new_mito.mito_backend.steps_manager.curr_step.execution_data['file_written'] == True
+
+
+def test_undo_and_redo_export_writes_files_when_deleted(tmp_path, monkeypatch):
+    file_name = str(tmp_path / 'out.csv')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], file_name)
+    os.remove(file_name)
+
+    num_writes = get_file_write_counter(monkeypatch)
+    mito.undo()
+    mito.redo()
+    wait_for_file_exports()
+
+    assert len(num_writes) == 1
+    assert pd.read_csv(file_name).equals(pd.DataFrame({'A': [1, 2, 3]}))
+
+
+def test_export_to_non_existent_directory_errors(tmp_path):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], str(tmp_path / 'missing' / 'out.csv'))
+
+    assert len(mito.mito_backend.steps_manager.steps_including_skipped) == 1
+
+
+def test_export_that_fails_to_write_errors(tmp_path):
+    # The file is a directory, so writing to it fails
+    os.mkdir(tmp_path / 'out.csv')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], str(tmp_path / 'out.csv'))
+
+    assert len(mito.mito_backend.steps_manager.steps_including_skipped) == 1
+
+
+def test_replay_analysis_with_export_to_locked_file_errors(tmp_path, monkeypatch):
+    file_name = str(tmp_path / 'out.csv')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.export_to_file('csv', [0], file_name)
+    analysis_name = mito.mito_backend.analysis_name
+    write_analysis(mito.mito_backend.steps_manager)
+
+    def locked_open(*args, **kwargs):
+        raise PermissionError('The file is locked')
+    monkeypatch.setattr(file_export_writer_module, 'open', locked_open, raising=False)
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', locked_open)
+    new_mito = create_mito_wrapper(pd.DataFrame({'A': [4, 5, 6]}))
+    new_mito.replay_analysis(analysis_name)
+
+    assert len(new_mito.mito_backend.steps_manager.steps_including_skipped) == 1
+
+
+def test_export_after_failed_background_write_writes_synchronously(tmp_path):
+    writer = FileExportWriter(True)
+    file_name = str(tmp_path / 'out.csv')
+    def failing_write():
+        raise OSError('Cannot write the file')
+
+    assert writer.export([file_name], 'fingerprint', failing_write)
+    with pytest.raises(OSError):
+        writer.wait()
+    with pytest.raises(OSError):
+        writer.export([file_name], 'new_fingerprint', failing_write)
+
+    assert writer.export([file_name], 'new_fingerprint', lambda: pd.DataFrame({'A': [1]}).to_csv(file_name))
+    writer.wait()
+    assert len(writer.failed_exports) == 0
@@ -64,4 +64,14 @@ TEST_HASHES = [
 def test_hash_pandas_dataframe(df1, df2, expected):
     assert len(get_dataframe_hash(df1)) < 100
     assert (get_dataframe_hash(df1) == get_dataframe_hash(df2)) == expected
-    
\ No newline at end of file
+    
+
+def test_hash_changes_when_any_value_changes():
+    df = pd.DataFrame({'A': range(200_000), 'B': ['a'] * 200_000})
+    changed_df = df.copy()
+    changed_df.loc[123_456, 'B'] = 'b'
+    assert get_dataframe_hash(df) != get_dataframe_hash(changed_df)
+
+
+def test_hash_dataframes_with_same_values_and_different_dtypes():
+    assert get_dataframe_hash(pd.DataFrame({'A': [1, 2, 3]})) != get_dataframe_hash(pd.DataFrame({'A': [1.0, 2.0, 3.0]}))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the Mito spreadsheet in a streamlit app, making sure that
+reruns of the app that do not change the sheet do not recompute anything.
+"""
+import base64
+import json
+
+import pandas as pd
+
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.streamlit.v1.spreadsheet import (MitoStreamlitSession,
+                                                get_dataframe_hash)
+from mitosheet.utils import get_new_id
+
+
+def get_add_column_message(column_header, read_response_ids=None):
+    return {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {
+            'sheet_index': 0,
+            'column_header': column_header,
+            'column_header_index': -1
+        },
+        'read_response_ids': read_response_ids if read_response_ids is not None else []
+    }
+
+
+def test_dataframe_hash_changes_when_a_value_is_set_in_place():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+    dataframe_hash = get_dataframe_hash(df)
+
+    df.loc[0, 'A'] = 100
+
+    assert get_dataframe_hash(df) != dataframe_hash
+
+
+def test_session_caches_json_until_the_state_changes(monkeypatch):
+    mito_session = MitoStreamlitSession(MitoBackend(pd.DataFrame({'A': [1, 2, 3]})))
+    num_code_calls = [0]
+    code = mito_session.mito_backend.steps_manager.code
+    def counted_code():
+        num_code_calls[0] += 1
+        return code()
+    monkeypatch.setattr(mito_session.mito_backend.steps_manager, 'code', counted_code)
+
+    # Many reruns without any changes
+    payloads = [(mito_session.sheet_data_json, mito_session.analysis_data_json, mito_session.code) for _ in range(10)]
+    assert all(payload is payloads[0][index] for payload, index in zip(payloads[-1], range(3)))
+    # Once for the code, and once for the analysis data
+    assert num_code_calls[0] == 2
+
+    # The response to the edit contains the new sheet and analysis, which we reuse
+    mito_session.receive_message(get_add_column_message('B'))
+    assert num_code_calls[0] == 3
+    assert json.loads(mito_session.sheet_data_json)[0]['numColumns'] == 2
+    assert json.loads(mito_session.analysis_data_json)['code'] == mito_session.mito_backend.steps_manager.code()
+    assert "df1.insert(1, 'B', 0)" in mito_session.code
+    assert num_code_calls[0] == 5
+
+
+def test_session_does_not_receive_the_same_message_twice():
+    mito_session = MitoStreamlitSession(MitoBackend(pd.DataFrame({'A': [1, 2, 3]})))
+    message = get_add_column_message('B')
+
+    # The message passer returns the same message on every rerun
+    for _ in range(3):
+        mito_session.receive_message(message)
+
+    assert len(mito_session.mito_backend.steps_manager.steps_including_skipped) == 2
+    assert len(mito_session.responses) == 1
+
+
+def test_session_forgets_responses_the_frontend_has_read():
+    mito_session = MitoStreamlitSession(MitoBackend(pd.DataFrame({'A': [1, 2, 3]})))
+    first_message = get_add_column_message('B')
+    mito_session.receive_message(first_message)
+    assert [response['id'] for response in json.loads(mito_session.responses_json)] == [first_message['id']]
+
+    second_message = get_add_column_message('C', read_response_ids=[first_message['id']])
+    mito_session.receive_message(second_message)
+
+    assert [response['id'] for response in json.loads(mito_session.responses_json)] == [second_message['id']]
+
+
+def test_session_sends_buffers_of_sheet_data_as_base64():
+    mito_session = MitoStreamlitSession(MitoBackend(pd.DataFrame({'A': [1, 2, 3]}), send_column_buffers=True))
+    steps_manager = mito_session.mito_backend.steps_manager
+
+    assert [base64.b64decode(buffer) for buffer in json.loads(mito_session.sheet_data_buffers_base64_json)] == steps_manager.sheet_data_buffers
+    assert 'columnBuffer' in json.loads(mito_session.sheet_data_json)[0]['data'][0]
+
+    # The response to the edit contains the buffers of the new sheet, which we reuse
+    mito_session.receive_message(get_add_column_message('B'))
+    sheet_data_buffers_base64 = json.loads(mito_session.responses_json)[0]['shared_variables']['sheet_data_buffers_base64']
+    assert json.loads(mito_session.sheet_data_buffers_base64_json) == sheet_data_buffers_base64
+    assert [base64.b64decode(buffer) for buffer in sheet_data_buffers_base64] == steps_manager.sheet_data_buffers
+    assert len(steps_manager.sheet_data_buffers[0]) == 2 * 3 * 8
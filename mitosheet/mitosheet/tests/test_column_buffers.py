@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for sending columns as binary buffers.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.column_buffers import MAX_SAFE_INTEGER, get_column_buffer, get_columns_buffer
+from mitosheet.json_utils import get_column_json_values
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.tests.test_utils import get_sheet_data_array, read_column_buffer
+from mitosheet.utils import get_new_id
+
+@pytest.mark.parametrize("column, typed_array_type", [
+    (pd.Series([1, 2, -3]), 'Float64Array'),
+    (pd.Series([1, 2, 3], dtype='int8'), 'Int8Array'),
+    (pd.Series([1, 2, 3], dtype='uint16'), 'Uint16Array'),
+    (pd.Series([1, 2, 3], dtype='int32'), 'Int32Array'),
+    (pd.Series([1.5, np.nan, np.inf]), 'Float64Array'),
+    (pd.Series([1.5, 2.5], dtype='float32'), 'Float64Array'),
+    (pd.Series([True, False]), 'Uint8Array'),
+    (pd.Series([1.5, 2.5], dtype='>f8'), 'Float64Array'),
+])
+def test_columns_buffer_round_trip(column, typed_array_type):
+    column_buffers, buffer = get_columns_buffer([pd.Series([1.0]), column])
+
+    assert column_buffers[1]['type'] == typed_array_type
+    assert column_buffers[1]['offset'] == 8
+    assert read_column_buffer(buffer, column_buffers[1]).tolist() == pytest.approx(column.astype(float).tolist(), nan_ok=True)
+
+
+def test_float_column_buffer_has_same_values_as_json():
+    column = pd.Series([0.1 + 0.2, 1 / 3, 1e20 + 0.5, 1e-20, -2.675, 0.1], dtype='float32').astype(float)
+    column_buffers, buffer = get_columns_buffer([column])
+
+    assert read_column_buffer(buffer, column_buffers[0]).tolist() == get_column_json_values(column)
+
+
+def test_int64_column_outside_safe_integers_not_in_buffer():
+    assert get_column_buffer(pd.Series([MAX_SAFE_INTEGER])) is not None
+    assert get_column_buffer(pd.Series([MAX_SAFE_INTEGER + 1])) is None
+    assert get_column_buffer(pd.Series([-MAX_SAFE_INTEGER - 1])) is None
+    assert get_column_buffer(pd.Series([], dtype='int64')) is not None
+
+
+def test_non_numeric_columns_not_in_buffer():
+    columns = [
+        pd.Series(['a', 'b']),
+        pd.Series(pd.to_datetime(['2005-10-25', '2002-10-02'])),
+        pd.Series(pd.to_timedelta(['1 days', '2 days'])),
+        pd.Series([1, None], dtype='Int64'),
+        pd.Series(pd.Categorical(['a', 'b'])),
+        pd.Series([1, 2]),
+    ]
+    column_buffers, buffer = get_columns_buffer(columns)
+
+    assert column_buffers[:-1] == [None] * 5
+    assert column_buffers[-1] == {'type': 'Float64Array', 'offset': 0, 'length': 2}
+    assert len(buffer) == 16
+
+
+def test_sheet_data_sent_with_column_buffers():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [1.5, 2.5, np.nan], 'C': ['a', 'b', 'c']})
+    mito_backend = MitoBackend(df, send_column_buffers=True)
+    sent = []
+    mito_backend.mito_send = lambda response, buffers=None: sent.append((response, buffers))
+
+    mito_backend.receive_message({
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {'sheet_index': 0, 'column_header': 'D', 'column_header_index': -1},
+    })
+
+    response, buffers = sent[-1]
+    columns = json.loads(response['shared_variables']['sheet_data_json'])[0]['data']
+    assert [column['columnData'] for column in columns] == [[], [], ['a', 'b', 'c'], []]
+    assert [column.get('columnBuffer', {}).get('type') for column in columns] == ['Float64Array', 'Float64Array', None, 'Float64Array']
+    assert buffers == mito_backend.steps_manager.sheet_data_buffers and len(buffers) == 1
+
+    sheet_data_array = get_sheet_data_array(response['shared_variables']['sheet_data_json'], buffers)
+    assert [column['columnData'] for column in sheet_data_array[0]['data']] == [
+        [1, 2, 3], [1.5, 2.5, 'NaN'], ['a', 'b', 'c'], [0, 0, 0]
+    ]
+
+
+def test_sheet_data_sent_without_column_buffers_by_default():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    mito_backend = MitoBackend(df)
+
+    columns = json.loads(mito_backend.steps_manager.sheet_data_json)[0]['data']
+    assert [column['columnData'] for column in columns] == [[1, 2, 3], ['a', 'b', 'c']]
+    assert all('columnBuffer' not in column for column in columns)
+    assert mito_backend.steps_manager.sheet_data_buffers == [b'']
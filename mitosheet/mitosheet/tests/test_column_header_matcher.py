@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for finding column headers in formulas.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+import pytest
+
+from mitosheet.column_header_matcher import ColumnHeaderMatcher, get_column_header_matcher
+from mitosheet.column_headers import get_column_header_display
+
+COLUMN_HEADER_MATCHER_TESTS = [
+    (['A', 'B'], '=A + B', [('A', [(1, 2)]), ('B', [(5, 6)])]),
+    (['A', 'AA', 'AAA'], 'AAAA + AA', [('AAA', [(0, 3)]), ('AA', [(0, 2), (2, 4), (7, 9)]), ('A', [(0, 1), (1, 2), (2, 3), (3, 4), (7, 8), (8, 9)])]),
+    (['he', 'she', 'his', 'hers'], 'ushers', [('hers', [(2, 6)]), ('she', [(1, 4)]), ('he', [(2, 4)])]),
+    ([True, 1, 1.5, ('A', 'B')], 'true + 1.5 + A, B', [(('A', 'B'), [(13, 17)]), (True, [(0, 4)]), (1.5, [(7, 10)]), (1, [(7, 8)])]),
+    (['A'], '', []),
+    (['C'], 'AB', []),
+]
+
+@pytest.mark.parametrize("column_headers, formula, matches", COLUMN_HEADER_MATCHER_TESTS)
+def test_column_header_matcher(column_headers, formula, matches):
+    assert ColumnHeaderMatcher(column_headers).get_matches(formula) == matches
+
+
+@pytest.mark.parametrize("column_headers, formula, matches", COLUMN_HEADER_MATCHER_TESTS)
+def test_column_header_matcher_same_as_regex(column_headers, formula, matches):
+    for column_header, match_ranges in ColumnHeaderMatcher(column_headers).get_matches(formula):
+        regex_match_ranges = [(match.start(), match.end()) for match in re.finditer(re.escape(get_column_header_display(column_header)), formula)]
+        assert match_ranges == regex_match_ranges
+
+
+def test_empty_column_header_matches_everywhere():
+    assert ColumnHeaderMatcher(['', 'A']).get_matches('AB') == [('A', [(0, 1)]), ('', [(0, 0), (1, 1), (2, 2)])]
+
+
+def test_get_column_header_matcher_only_rebuilds_when_headers_change():
+    column_header_matcher = get_column_header_matcher(['A', 'B'])
+    assert get_column_header_matcher(['A', 'B']) is column_header_matcher
+    assert get_column_header_matcher(['A', 'C']) is not column_header_matcher
+    assert get_column_header_matcher([1, 'B']) is not get_column_header_matcher([1.0, 'B'])
+
+
+def test_get_column_header_matcher_from_many_threads_at_once(monkeypatch):
+    import mitosheet.column_header_matcher as column_header_matcher
+    monkeypatch.setattr(column_header_matcher, 'MAX_CACHED_COLUMN_HEADER_MATCHERS', 3)
+    column_header_matcher._column_header_matchers.clear()
+
+    def get_matches(thread: int) -> List[Any]:
+        return [get_column_header_matcher(['A', f'B{(thread + i) % 10}']).get_matches('=A') for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(get_matches, range(8)))
+
+    assert all(matches == [('A', [(1, 2)])] for thread_matches in results for matches in thread_matches)
+    assert len(column_header_matcher._column_header_matchers) <= 3
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for caching the statistics of columns.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.api.get_column_describe import get_column_describe
+from mitosheet.api.get_unique_value_counts import MAX_UNIQUE_VALUES, get_unique_value_counts
+from mitosheet.column_statistics import ColumnStatisticsCache
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.utils import get_row_data_array
+
+
+def get_unique_value_counts_without_cache(series, search_string, sort):
+    # This is how we used to get the unique value counts of a column
+    unique_value_counts_percents_series = series.value_counts(normalize=True, dropna=False)
+    unique_value_counts_series = series.value_counts(dropna=False)
+    unique_value_counts_df = pd.DataFrame({
+        'values': unique_value_counts_percents_series.index,
+        'percents': unique_value_counts_percents_series,
+        'counts': unique_value_counts_series
+    })
+
+    is_all_data = True
+    if len(unique_value_counts_df) > MAX_UNIQUE_VALUES:
+        new_unique_value_counts_df = unique_value_counts_df.copy(deep=True)
+        new_unique_value_counts_df['values_strings'] = new_unique_value_counts_df['values'].astype('str')
+        try:
+            if sort == 'Ascending Value':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=True, na_position='first')
+            elif sort == 'Descending Value':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=False, na_position='first')
+            elif sort == 'Ascending Occurence':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=True, na_position='first')
+            elif sort == 'Descending Occurence':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=False, na_position='first')
+        except:
+            if sort == 'Ascending Value':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=True, na_position='first')
+            elif sort == 'Descending Value':
+                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=False, na_position='first')
+        new_unique_value_counts_df = new_unique_value_counts_df[new_unique_value_counts_df['values_strings'].str.contains(search_string, na=False, case=False)]
+        if len(new_unique_value_counts_df) > MAX_UNIQUE_VALUES:
+            new_unique_value_counts_df = new_unique_value_counts_df.head(MAX_UNIQUE_VALUES)
+            is_all_data = False
+        unique_value_counts_df = unique_value_counts_df.loc[new_unique_value_counts_df.index]
+
+    return {
+        'uniqueValueRowDataArray': get_row_data_array(unique_value_counts_df),
+        'isAllData': is_all_data
+    }
+
+
+def get_unique_value_counts_of_column(mito, column_header, search_string='', sort='Descending Occurence'):
+    return get_unique_value_counts({
+        'sheet_index': 0,
+        'column_id': mito.mito_backend.steps_manager.curr_step.column_ids.get_column_id_by_header(0, column_header),
+        'search_string': search_string,
+        'sort': sort,
+    }, mito.mito_backend.steps_manager)
+
+
+def get_describe_of_column(mito, column_header):
+    return get_column_describe({
+        'sheet_index': 0,
+        'column_id': mito.mito_backend.steps_manager.curr_step.column_ids.get_column_id_by_header(0, column_header),
+    }, mito.mito_backend.steps_manager)
+
+
+UNIQUE_VALUES_COLUMNS = [
+    pd.Series([1, 2, 2, 3, 3, 3, None]),
+    pd.Series([i % 1500 for i in range(3000)] + [None]),
+    pd.Series([f'value {i % 2000}' for i in range(5000)] + [None]),
+    pd.Series([i if i % 2 == 0 else str(i) for i in range(2000)]),
+]
+
+@pytest.mark.parametrize("series", UNIQUE_VALUES_COLUMNS)
+@pytest.mark.parametrize("search_string", ['', '1', 'VALUE 12', 'not a value'])
+@pytest.mark.parametrize("sort", ['Ascending Value', 'Descending Value', 'Ascending Occurence', 'Descending Occurence'])
+def test_unique_value_counts_same_as_without_cache(series, search_string, sort):
+    mito = create_mito_wrapper(pd.DataFrame({'A': series}))
+
+    # Ask twice, so the second is answered from the cache
+    for _ in range(2):
+        assert get_unique_value_counts_of_column(mito, 'A', search_string, sort) == get_unique_value_counts_without_cache(mito.get_column(0, 'A', as_list=False), search_string, sort)
+
+
+def test_statistics_reused_until_column_changes():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}))
+    column_statistics_cache = mito.mito_backend.steps_manager.column_statistics_cache
+
+    get_describe_of_column(mito, 'A')
+    get_describe_of_column(mito, 'B')
+    describe_a = get_describe_of_column(mito, 'A')
+    describe_b = get_describe_of_column(mito, 'B')
+    assert len(column_statistics_cache) == 2
+
+    # Changing B does not change the statistics of A
+    mito.set_formula('=A + 10', 0, 'B')
+    assert len(column_statistics_cache) == 1
+    assert get_describe_of_column(mito, 'A') is describe_a
+    assert get_describe_of_column(mito, 'B') is not describe_b
+    assert get_describe_of_column(mito, 'B')['max'] == '13.0'
+
+    # Undoing changes B back
+    mito.undo()
+    assert get_describe_of_column(mito, 'B')['max'] == '6.0'
+
+    mito.set_cell_value(0, 'A', 0, 100)
+    assert get_describe_of_column(mito, 'A')['max'] == '100.0'
+    assert get_unique_value_counts_of_column(mito, 'A')['uniqueValueRowDataArray'][0][0] == 100
+
+    # The statistics of deleted columns are removed
+    mito.delete_columns(0, ['A', 'B'])
+    assert len(column_statistics_cache) == 0
+
+
+def test_column_statistics_cache_evicts_least_recently_used_columns():
+    column_statistics_cache = ColumnStatisticsCache(2)
+    columns = [pd.Series(np.full(4, float(i))) for i in range(3)]
+    column_statistics = [column_statistics_cache.get(0, str(i), column) for i, column in enumerate(columns)]
+
+    assert len(column_statistics_cache) == 2
+    assert column_statistics_cache.get(0, '2', columns[2]) is column_statistics[2]
+    assert column_statistics_cache.get(0, '0', columns[0]) is not column_statistics[0]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for writing dataframes and their formatting to Excel.
+"""
+import datetime
+import io
+import tracemalloc
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+import mitosheet.excel_export as excel_export
+from mitosheet.excel_export import (ExcelConditionalFormat, ExcelSheetFormat,
+                                    get_excel_conditional_format_formula,
+                                    get_excel_sheet_format,
+                                    write_dataframes_to_excel)
+from mitosheet.public.v3 import add_formatting_to_excel_sheet
+from mitosheet.step_performers.filter import (FC_MOST_FREQUENT,
+                                              FC_NUMBER_GREATER,
+                                              FC_NUMBER_LOWEST,
+                                              FC_STRING_CONTAINS,
+                                              FC_STRING_CONTAINS_CASE_INSENSITIVE)
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def get_written_workbook(sheets):
+    buffer = io.BytesIO()
+    write_dataframes_to_excel(buffer, sheets)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("chunk_num_rows", [2, 10_000])
+def test_write_dataframes_to_excel_same_as_pandas(monkeypatch, chunk_num_rows):
+    monkeypatch.setattr(excel_export, 'EXPORT_CHUNK_NUM_ROWS', chunk_num_rows)
+    df = pd.DataFrame({
+        'int': [1, -2, 3, 2**40],
+        'float': [1.5, np.nan, np.inf, -np.inf],
+        'bool': [True, False, True, True],
+        'str': ['a', '', None, '=1+1'],
+        'datetime': pd.to_datetime(['2020-01-01 10:11:12.123456', None, '1899-12-31', '1900-02-28']),
+        'timedelta': pd.to_timedelta(['1 days', '2 hours', None, '3 min']),
+        'object': [1, 'x', datetime.date(2020, 1, 2), pd.Timestamp('2021-01-01 00:00:01')],
+        'category': pd.Categorical(['a', 'b', 'a', None]),
+        'nullable int': pd.array([1, None, 3, 4], dtype='Int64'),
+        5: [1, 2, 3, 4],
+    })
+    pandas_buffer = io.BytesIO()
+    df.to_excel(pandas_buffer, index=False, engine='openpyxl')
+    pandas_buffer.seek(0)
+    buffer = get_written_workbook([(df, 'Sheet1', None)])
+
+    assert pd.read_excel(buffer).equals(pd.read_excel(pandas_buffer))
+
+    # The cells have the same values and formats as when pandas writes them
+    buffer.seek(0)
+    pandas_buffer.seek(0)
+    sheet = openpyxl.load_workbook(buffer).active
+    pandas_sheet = openpyxl.load_workbook(pandas_buffer).active
+    for row, pandas_row in zip(sheet.iter_rows(), pandas_sheet.iter_rows()):
+        for cell, pandas_cell in zip(row, pandas_row):
+            assert (cell.value, cell.number_format) == (pandas_cell.value, pandas_cell.number_format)
+
+
+def test_formats_are_written_to_columns_and_rules():
+    df = pd.DataFrame({'A': [1.0, 2.0, 3.0], 'B': ['a', 'b', 'c']})
+    sheet_format = ExcelSheetFormat(
+        header_background_color='#000000',
+        header_font_color='#ffffff',
+        even_background_color='#eeeeee',
+        odd_font_color='#111111',
+        column_number_formats={0: '"$"0.00'},
+        conditional_formats=[
+            ExcelConditionalFormat(0, 'AND(ISNUMBER(A2),A2>1)', None, '#ff0000'),
+            ExcelConditionalFormat(1, 'AND(ISTEXT(B2),EXACT(B2,"c"))', '#00ff00', None),
+        ]
+    )
+    buffer = get_written_workbook([(df, 'df', sheet_format)])
+    sheet = openpyxl.load_workbook(buffer)['df']
+
+    assert sheet['A1'].fill.fgColor.rgb == 'FF000000'
+    assert sheet['A1'].font.color.rgb == 'FFFFFFFF'
+    assert sheet.column_dimensions['A'].number_format == '"$"0.00'
+    assert sheet['A2'].number_format == '"$"0.00'
+    assert sheet['B2'].style_id == 0
+
+    rules = [
+        (str(conditional_format.sqref), rule.formula[0], rule.priority)
+        for conditional_format in sheet.conditional_formatting
+        for rule in conditional_format.rules
+    ]
+    assert sorted(rules, key=lambda rule: rule[2]) == [
+        ('B2:B4', 'AND(ISTEXT(B2),EXACT(B2,"c"))', 1),
+        ('A2:A4', 'AND(ISNUMBER(A2),A2>1)', 2),
+        ('A2:B4', 'MOD(ROW(),2)=0', 3),
+        ('A2:B4', 'MOD(ROW(),2)=1', 4),
+    ]
+
+
+def test_invalid_color_errors_before_writing(tmp_path):
+    file_name = str(tmp_path / 'out.xlsx')
+    with pytest.raises(ValueError):
+        write_dataframes_to_excel(file_name, [(pd.DataFrame({'A': [1]}), 'df', ExcelSheetFormat(header_background_color='invalid color'))])
+
+
+@pytest.mark.parametrize("filters, formula", [
+    ([], 'TRUE'),
+    ([{'condition': FC_NUMBER_GREATER, 'value': 2}], 'AND(ISNUMBER(B2),B2>2)'),
+    ([{'condition': FC_STRING_CONTAINS, 'value': 'a"b'}], 'AND(ISTEXT(B2),ISNUMBER(FIND("a""b",B2)))'),
+    ([{'condition': FC_STRING_CONTAINS_CASE_INSENSITIVE, 'value': 'a*'}], 'AND(ISTEXT(B2),ISNUMBER(SEARCH("a~*",B2)))'),
+    ([{'condition': FC_NUMBER_LOWEST, 'value': 2}], 'AND(ISNUMBER(B2),B2<=SMALL($B$2:$B$6,MIN(2,COUNT($B$2:$B$6))))'),
+    ([{'condition': FC_MOST_FREQUENT, 'value': 1}], 'OR(AND(ISNUMBER(B2),B2=1))'),
+    (
+        [{'condition': FC_NUMBER_GREATER, 'value': 2}, {'operator': 'Or', 'filters': [{'condition': FC_NUMBER_LOWEST, 'value': 'not a number'}]}],
+        None
+    ),
+])
+def test_conditional_format_formulas(filters, formula):
+    df = pd.DataFrame({'A': [1, 2, 3, 4, 5], 'B': [1, 1, 2, 3, 4]})
+    assert get_excel_conditional_format_formula(df, 'B', 1, 'And', filters) == formula
+
+
+def test_get_excel_sheet_format_from_state():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1.5, 2.5], 'B': ['a', 'b']}))
+    state = mito.mito_backend.steps_manager.curr_step.final_defined_state
+    state.df_formats[0] = {
+        'columns': {'A': {'type': 'currency', 'precision': 1}, 'B': {'type': 'currency'}},
+        'headers': {'color': '#ffffff'},
+        'rows': {'even': {'backgroundColor': '#000000'}, 'odd': {}},
+        'border': {},
+        'conditional_formats': [
+            {'format_uuid': '1', 'columnIDs': ['A'], 'filters': [{'condition': FC_NUMBER_GREATER, 'value': 2}], 'invalidFilterColumnIDs': [], 'color': '#ff0000'},
+            {'format_uuid': '2', 'columnIDs': ['B'], 'filters': [{'condition': FC_NUMBER_GREATER, 'value': 2}], 'invalidFilterColumnIDs': [], 'color': '#ff0000'},
+        ]
+    }
+
+    sheet_format = get_excel_sheet_format(state, 0)
+    assert sheet_format.header_font_color == '#ffffff'
+    assert sheet_format.even_background_color == '#000000'
+    # We don't give number formats to columns that aren't numbers
+    assert sheet_format.column_number_formats == {0: '"$"0.0'}
+    # We skip the conditional formats that are invalid, like the sheet does
+    assert [(conditional_format.column_index, conditional_format.formula) for conditional_format in sheet_format.conditional_formats] == [(0, 'AND(ISNUMBER(A2),A2>2)')]
+
+
+def test_write_dataframes_to_excel_memory_does_not_grow_with_rows(tmp_path):
+    def get_peak_memory(num_rows):
+        df = pd.DataFrame({'A': np.arange(num_rows), 'B': np.random.rand(num_rows), 'C': ['value'] * num_rows})
+        tracemalloc.start()
+        write_dataframes_to_excel(str(tmp_path / 'out.xlsx'), [(df, 'df', ExcelSheetFormat(even_background_color='#000000'))])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    assert get_peak_memory(40_000) < get_peak_memory(10_000) * 2
+
+
+def test_add_formatting_to_excel_sheet_adds_row_rules(tmp_path):
+    file_name = str(tmp_path / 'out.xlsx')
+    with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
+        pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_excel(writer, sheet_name='df', index=False)
+        add_formatting_to_excel_sheet(writer, 'df', header_background_color='#000000', even_background_color='#ffffff', odd_font_color='#000000')
+
+    sheet = openpyxl.load_workbook(file_name)['df']
+    assert sheet['B1'].fill.fgColor.rgb == '00000000'
+    assert sheet['A2'].style_id == 0
+    assert [
+        (str(conditional_format.sqref), rule.formula[0])
+        for conditional_format in sheet.conditional_formatting
+        for rule in conditional_format.rules
+    ] == [('A2:B4', 'MOD(ROW(),2)=0'), ('A2:B4', 'MOD(ROW(),2)=1')]
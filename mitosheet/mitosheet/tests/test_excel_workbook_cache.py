@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for reading Excel workbooks without loading them every time.
+"""
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.chart import BarChart, Reference
+from openpyxl.styles import Font
+
+import mitosheet.excel_workbook_cache as excel_workbook_cache
+from mitosheet.api.get_excel_file_metadata import get_excel_file_metadata
+from mitosheet.excel_workbook_cache import (clear_excel_workbook_cache,
+                                            get_excel_sheet_cells,
+                                            get_excel_sheet_names)
+from mitosheet.public.v2 import get_table_range
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    clear_excel_workbook_cache()
+    yield
+    clear_excel_workbook_cache()
+
+
+def test_sheet_names_same_as_pandas(tmp_path):
+    file_path = str(tmp_path / 'test.xlsx')
+    workbook = openpyxl.Workbook()
+    workbook.active.title = 'first & <sheet>'
+    workbook.active.append([1, 2])
+    workbook.create_sheet('second')
+    chartsheet = workbook.create_chartsheet('chart')
+    chart = BarChart()
+    chart.add_data(Reference(workbook.active, min_col=1, max_col=2, min_row=1))
+    chartsheet.add_chart(chart)
+    workbook.create_sheet('third')
+    workbook.save(file_path)
+
+    assert get_excel_sheet_names(file_path) == ['first & <sheet>', 'second', 'third']
+    assert get_excel_sheet_names(file_path) == pd.ExcelFile(file_path, engine='openpyxl').sheet_names
+    assert get_excel_file_metadata({'file_path': file_path}, None)['sheet_names'] == ['first & <sheet>', 'second', 'third']
+
+
+def test_sheet_cells_include_styled_and_merged_cells(tmp_path):
+    file_path = str(tmp_path / 'test.xlsx')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet['B2'] = 'A'
+    sheet['C2'] = 'B'
+    sheet['B3'] = 1
+    sheet['C3'] = 'not in the merged cell'
+    sheet.merge_cells('B3:C4')
+    sheet['E7'].font = Font(bold=True)
+    workbook.save(file_path)
+
+    sheet_cells = get_excel_sheet_cells(file_path, sheet_index=0)
+    assert (sheet_cells.min_row, sheet_cells.min_column, sheet_cells.max_row, sheet_cells.max_column) == (2, 2, 7, 5)
+    assert sheet_cells.get_value(3, 2) == 1
+    assert sheet_cells.get_value(3, 3) is None
+    assert sheet_cells.get_value(100, 100) is None
+
+    assert get_table_range(file_path, sheet_index=0, upper_left_value='A') == 'B2:C3'
+    assert get_table_range(file_path, sheet_index=0, upper_left_value='A', cumulative_number_of_empty_rows=10) == 'B2:C7'
+
+
+def test_excel_range_import_streams_sheet_once(tmp_path, monkeypatch):
+    file_path = str(tmp_path / 'test.xlsx')
+    with pd.ExcelWriter(file_path) as writer:
+        for index in range(5):
+            pd.DataFrame({f'header {index}': [index, index + 1], 'B': [1, 2]}).to_excel(writer, sheet_name='sheet1', startrow=index * 4, index=False)
+
+    num_workbook_loads = []
+    load_workbook = excel_workbook_cache.load_workbook
+    def counting_load_workbook(*args, **kwargs):
+        num_workbook_loads.append(1)
+        return load_workbook(*args, **kwargs)
+    monkeypatch.setattr(excel_workbook_cache, 'load_workbook', counting_load_workbook)
+
+    mito = create_mito_wrapper()
+    mito.excel_range_import(
+        file_path,
+        {'type': 'sheet name', 'value': 'sheet1'},
+        [
+            {'type': 'dynamic', 'start_condition': {'type': 'upper left corner value', 'value': f'header {index}'}, 'end_condition': {'type': 'first empty cell'}, 'column_end_condition': {'type': 'first empty cell'}, 'df_name': f'dataframe_{index}'}
+            for index in range(5)
+        ],
+        False
+    )
+
+    assert len(mito.dfs) == 5
+    for index in range(5):
+        assert mito.dfs[index].equals(pd.DataFrame({f'header {index}': [index, index + 1], 'B': [1, 2]}))
+    # Once to find the ranges, and once to read their values
+    assert len(num_workbook_loads) == 2
+
+
+def test_cache_updates_when_file_changes(tmp_path):
+    file_path = str(tmp_path / 'test.xlsx')
+    pd.DataFrame({'A': [1, 2]}).to_excel(file_path, sheet_name='sheet1', index=False)
+    assert get_excel_sheet_names(file_path) == ['sheet1']
+    assert get_table_range(file_path, sheet_name='sheet1', upper_left_value='A') == 'A1:A3'
+
+    with pd.ExcelWriter(file_path) as writer:
+        pd.DataFrame({'A': [1, 2, 3, 4]}).to_excel(writer, sheet_name='sheet1', index=False)
+        pd.DataFrame({'A': [1]}).to_excel(writer, sheet_name='sheet2', index=False)
+    assert get_excel_sheet_names(file_path) == ['sheet1', 'sheet2']
+    assert get_table_range(file_path, sheet_name='sheet1', upper_left_value='A') == 'A1:A5'
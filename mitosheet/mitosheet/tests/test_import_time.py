@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests that importing mitosheet stays fast, as it is imported in every
+notebook that uses Mito, and by the code that Mito generates.
+"""
+import json
+import subprocess
+import sys
+
+from mitosheet.tests.decorators import python_post_3_6_only
+
+# Importing mitosheet imports about 30 modules, so this leaves room for new ones, while
+# failing if it starts importing pandas (which imports about 500 modules on its own),
+# plotly or the steps. We count modules rather than time the import, as the time
+# depends on how busy the machine is
+MAX_IMPORTED_MODULES = 100
+
+# These take most of the time it takes to use Mito, so we only import them when they are used
+LAZILY_IMPORTED_MODULES = [
+    'pandas',
+    'plotly',
+    'IPython',
+    'requests',
+    'analytics',
+    'mitosheet.mito_backend',
+    'mitosheet.steps_manager',
+    'mitosheet.telemetry.telemetry_utils',
+]
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+
+# Python 3.6 imports the public interface with mitosheet, as it cannot import it lazily
+@python_post_3_6_only
+def test_import_mitosheet_imports_few_modules():
+    stdout = run_python('import sys, json; modules = set(sys.modules); import mitosheet; print(json.dumps(list(set(sys.modules) - modules)))').stdout
+    assert len(json.loads(stdout)) < MAX_IMPORTED_MODULES
+
+
+@python_post_3_6_only
+def test_import_mitosheet_does_not_import_heavy_modules():
+    stdout = run_python('import sys, json, mitosheet; print(json.dumps(list(sys.modules)))').stdout
+    imported_modules = json.loads(stdout)
+    for module_name in LAZILY_IMPORTED_MODULES:
+        assert module_name not in imported_modules
+
+
+def test_import_star_from_mitosheet_exports_public_interface():
+    stdout = run_python('import json; from mitosheet import *; print(json.dumps([SUM.__name__, sheet.__name__, pd.__name__, flatten_column_header.__name__, to_int_series.__name__]))').stdout
+    assert json.loads(stdout) == ['SUM', 'sheet', 'pandas', 'flatten_column_header', 'to_int_series']
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests that each module of mitosheet can be imported on its own, without
+any other mitosheet module being imported first, so there are no circular imports
+that only work when modules are imported in a certain order.
+"""
+import pkgutil
+import subprocess
+import sys
+
+import pytest
+
+import mitosheet
+
+# We don't import __main__, as it runs mitosheet
+TOP_LEVEL_SUBMODULES = [
+    f'mitosheet.{module_info.name}' for module_info in pkgutil.iter_modules(mitosheet.__path__)
+    if module_info.name not in ['__main__', 'tests']
+]
+
+# Modules that depend on each other through a package that imports all of its modules
+NESTED_SUBMODULES = [
+    'mitosheet.code_chunks.code_chunk_utils',
+    'mitosheet.code_chunks.step_performers.filter_code_chunk',
+    'mitosheet.step_performers.filter',
+    'mitosheet.step_performers.all_step_performers',
+    'mitosheet.enterprise.step_performers.one_hot_encoding',
+    'mitosheet.pro.step_performers.set_dataframe_format',
+    'mitosheet.ai.recon',
+    'mitosheet.transpiler.transpile',
+    'mitosheet.updates.undo',
+]
+
+
+@pytest.mark.parametrize("module_name", TOP_LEVEL_SUBMODULES + NESTED_SUBMODULES)
+def test_import_module_in_fresh_interpreter(module_name):
+    result = subprocess.run([sys.executable, '-c', f'import {module_name}'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
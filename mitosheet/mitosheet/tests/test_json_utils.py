@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for turning columns into json values.
+"""
+import json
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.json_utils import (ColumnJsonValuesCache, dumps_column_json_values,
+                                  get_column_json_values, get_index_json_values)
+from mitosheet.state import State
+
+
+def get_round_trip_json_values(column: pd.Series) -> List[Any]:
+    # This is how we used to turn columns into json values
+    return ['NaN' if value is None else value for value in json.loads(column.to_json(orient='values'))]
+
+
+COLUMNS = [
+    pd.Series([1, 2, 3]),
+    pd.Series([True, False, True]),
+    pd.Series([1.0, 2.5, None, np.inf, -np.inf]),
+    pd.Series([0.1 + 0.2, 1 / 3, -2 / 3, 0.99999999999, 1.5e-10, 4.99999e-11, -0.0]),
+    pd.Series([123456789.123456789, 1234567.99999999997, 9999999999999998.0, 1e16, 1.23456789012e17, 9.99e-16, -8.88e-20]),
+    pd.Series(np.random.default_rng(0).normal(size=1000) * 1e6),
+    pd.Series(np.arange(10, dtype='float32') / 3),
+    pd.Series(['a', None, np.nan, 'b']),
+    pd.Series([1, 'a', None, 2.5]),
+    pd.Series(pd.Categorical(['a', 'b', None])),
+    pd.Series([1, None], dtype='Int64'),
+    pd.Series([None, None]),
+    pd.Series([], dtype=object),
+]
+
+@pytest.mark.parametrize("column", COLUMNS)
+def test_column_json_values_same_as_round_trip(column):
+    assert get_column_json_values(column) == get_round_trip_json_values(column)
+
+
+def test_column_json_values_formats_dates_and_timedeltas():
+    dates = pd.Series(pd.to_datetime(['2005-10-25', '2002-10-02 05:12:00', None]))
+    assert get_column_json_values(dates) == ['2005-10-25 00:00:00', '2002-10-02 05:12:00', 'NaN']
+    assert get_column_json_values(dates.dt.tz_localize('UTC')) == ['2005-10-25 00:00:00', '2002-10-02 05:12:00', 'NaN']
+
+    timedeltas = pd.Series(pd.to_timedelta(['31 days', '-61 days +05:12:00', None]))
+    assert get_column_json_values(timedeltas) == ['31 days 00:00:00', '-61 days +05:12:00', 'NaT']
+
+
+def test_index_json_values_leave_nulls():
+    assert get_index_json_values(pd.RangeIndex(3)) == [0, 1, 2]
+    assert get_index_json_values(pd.Index([1.5, np.nan])) == [1.5, None]
+    assert get_index_json_values(pd.Index(['a', 'b'])) == ['a', 'b']
+    assert get_index_json_values(pd.DatetimeIndex(['2005-10-25', None])) == ['2005-10-25 00:00:00', None]
+    assert get_index_json_values(pd.MultiIndex.from_tuples([('a', 1), ('b', 2)])) == [['a', 1], ['b', 2]]
+
+
+def test_cache_reuses_unchanged_columns():
+    cache = ColumnJsonValuesCache(100)
+    calls = []
+    def get_json_values(column, null_value):
+        calls.append(column.name)
+        return column.tolist()
+
+    state = State([pd.DataFrame({'A': [1.0, 2.0], 'B': [3.0, 4.0]})])
+    cache.get(state.dfs[0]['A'], 'NaN', get_json_values)
+    cache.get(state.dfs[0]['B'], 'NaN', get_json_values)
+
+    # Setting a column on a copy of the state does not encode the other column again
+    new_state = state.copy(copy_on_write_sheet_indexes=[0])
+    new_state.set_column(0, 'A', pd.Series([5.0, 6.0]))
+    assert cache.get(new_state.dfs[0]['A'], 'NaN', get_json_values) == [5.0, 6.0]
+    assert cache.get(new_state.dfs[0]['B'], 'NaN', get_json_values) == [3.0, 4.0]
+    assert calls == ['A', 'B', 'A']
+
+
+def test_cache_keeps_objects_alive():
+    cache = ColumnJsonValuesCache(100)
+    for i in range(10):
+        column = pd.Series([f'value {i}'] * 5)
+        assert cache.get(column, 'NaN', lambda column, null_value: column.tolist()) == [f'value {i}'] * 5
+        del column
+
+
+def test_cache_evicts_least_recently_used_columns():
+    cache = ColumnJsonValuesCache(10)
+    columns = [pd.Series(np.full(4, float(i))) for i in range(3)]
+    for column in columns:
+        cache.get(column, 'NaN', lambda column, null_value: column.tolist())
+
+    assert cache.num_cached_values == 8
+
+
+def test_dumps_column_json_values_reuses_dumped_json():
+    column = pd.Series([1.5, None, 3.0])
+    json_values = get_column_json_values(column)
+
+    dumped_json = dumps_column_json_values(json_values)
+    assert dumped_json == json.dumps(json_values)
+    assert dumps_column_json_values(get_column_json_values(column.copy())) is dumped_json
+    assert dumps_column_json_values([1.5, 'NaN', 3.0]) == dumped_json
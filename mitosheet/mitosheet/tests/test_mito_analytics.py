@@ -7,9 +7,120 @@
 Contains tests to make sure that the mito analytics test is
 performing correctly
 """
+from threading import Event
+from typing import List, Optional
 
-from mitosheet.telemetry.telemetry_utils import PRINT_LOGS
+import pandas as pd
+import pytest
+
+from mitosheet.telemetry.telemetry_queue import FakeTelemetrySink, TelemetryQueue
+from mitosheet.telemetry.telemetry_utils import PRINT_LOGS, set_telemetry_sink, wait_for_telemetry
+from mitosheet.tests.test_utils import create_mito_wrapper
 
 
 def test_not_printing_logs():
-    assert PRINT_LOGS is False
\ No newline at end of file
+    assert PRINT_LOGS is False
+
+
+@pytest.fixture
+def fake_telemetry_sink():
+    """
+    Sends the logs made in the test to a FakeTelemetrySink
+    """
+    wait_for_telemetry()
+    sink = FakeTelemetrySink()
+    previous_sink = set_telemetry_sink(sink)
+    yield sink
+    wait_for_telemetry()
+    set_telemetry_sink(previous_sink)
+
+
+def test_edits_are_logged_with_anonymized_params(fake_telemetry_sink):
+    mito = create_mito_wrapper(pd.DataFrame({'PrivateColumn': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    mito.set_formula('=PrivateColumn + 1', 0, 'B')
+    assert wait_for_telemetry()
+
+    log_events = [log.log_event for log in fake_telemetry_sink.logs]
+    assert log_events[-4:] == ['add_column_edit', 'edit_event', 'set_column_formula_edit', 'edit_event']
+    formula_log = fake_telemetry_sink.logs[-2]
+    assert formula_log.params['params_sheet_index'] == 0
+    assert 'PrivateColumn' not in formula_log.params['params_new_formula']
+    assert 'processing_time' in formula_log.params
+
+
+def test_logs_use_the_step_they_are_made_in(fake_telemetry_sink):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    mito.add_column(0, 'C')
+    mito.undo()
+    assert wait_for_telemetry()
+
+    curr_step_idxs = [log.params['wsc_curr_step_idx'] for log in fake_telemetry_sink.logs if log.log_event in ['add_column_edit', 'undo']]
+    assert curr_step_idxs == [1, 2, 1]
+
+
+def test_failed_edits_are_logged_with_their_error(fake_telemetry_sink):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    mito.set_formula('=NOTAFUNCTION(A)', 0, 'B')
+    assert wait_for_telemetry()
+
+    error_log = fake_telemetry_sink.logs[-1]
+    assert error_log.log_event == 'error'
+    assert 'NOTAFUNCTION' in error_log.params['error_traceback_last_line']
+
+
+def test_telemetry_queue_sends_logs_in_batches():
+    sent_batches: List[List[int]] = []
+    sending = Event()
+    def send_batch(logs: List[int]) -> None:
+        sending.wait()
+        sent_batches.append(logs)
+
+    telemetry_queue = TelemetryQueue(send_batch, True, max_logs_per_batch=3)
+    for log in range(7):
+        assert telemetry_queue.put(log)
+    sending.set()
+    assert telemetry_queue.wait(5)
+
+    assert [log for batch in sent_batches for log in batch] == list(range(7))
+    assert all(len(batch) <= 3 for batch in sent_batches)
+    assert len(sent_batches) < 7
+
+
+def test_telemetry_queue_drops_logs_when_full_without_waiting(monkeypatch):
+    sending = Event()
+    sent_logs: List[int] = []
+    def send_batch(logs: List[int]) -> None:
+        sending.wait()
+        sent_logs.extend(logs)
+
+    telemetry_queue = TelemetryQueue(send_batch, True, max_queued_logs=2, max_logs_per_batch=1)
+    # Putting a log in the queue should never wait for space in it
+    put = telemetry_queue.queue.put
+    def put_without_waiting(log: int, block: bool=True, timeout: Optional[float]=None) -> None:
+        if block:
+            pytest.fail('waited to put a log in the queue')
+        put(log, block, timeout)
+    monkeypatch.setattr(telemetry_queue.queue, 'put', put_without_waiting)
+    results = [telemetry_queue.put(log) for log in range(10)]
+
+    assert results.count(False) == telemetry_queue.num_dropped_logs > 0
+    sending.set()
+    assert telemetry_queue.wait(5)
+    assert sent_logs == [log for log, queued in zip(range(10), results) if queued]
+
+
+def test_telemetry_queue_keeps_sending_after_send_batch_fails():
+    sent_logs: List[int] = []
+    def send_batch(logs: List[int]) -> None:
+        if 0 in logs:
+            raise Exception('Failed to send')
+        sent_logs.extend(logs)
+
+    telemetry_queue = TelemetryQueue(send_batch, True, max_logs_per_batch=1)
+    for log in range(3):
+        telemetry_queue.put(log)
+    assert telemetry_queue.wait(5)
+    assert sent_logs == [1, 2]
@@ -5,6 +5,7 @@
 # Distributed under the terms of the Modified BSD License.
 
 import os
+import pytest
 from mitosheet.enterprise.mito_config import (
     DEFAULT_MITO_CONFIG_SUPPORT_EMAIL, 
     MEC_VERSION_KEYS,
@@ -25,6 +26,8 @@ from mitosheet.enterprise.mito_config import (
     MITO_CONFIG_FEATURE_DISPLAY_AI_TRANSFORMATION,
     MITO_CONFIG_FEATURE_TELEMETRY,
     MITO_CONFIG_PRO,
+    MITO_CONFIG_CSV_IMPORT_ENGINE,
+    MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB,
     MitoConfig
 )
 
@@ -71,7 +74,9 @@ def test_none_works():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }
 
 def test_none_config_version_is_string():
@@ -108,7 +113,9 @@ def test_version_2_works():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }
 
     # Delete the environmnet variables for the next test
@@ -132,7 +139,9 @@ def test_mito_config_update_version_1_to_2():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }    
 
     # Delete the environmnet variables for the next test
@@ -156,7 +165,9 @@ def test_mito_config_enable_snowflake_import():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }    
 
     delete_all_mito_config_environment_variables()
@@ -180,7 +191,9 @@ def test_mito_config_dont_display_snowflake_import():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }    
 
     delete_all_mito_config_environment_variables()
@@ -202,7 +215,9 @@ def test_mito_config_dont_display_ai_transform():
         MITO_CONFIG_LLM_URL: None,
         MITO_CONFIG_ANALYTICS_URL: None,
         MITO_CONFIG_FEATURE_TELEMETRY: True,
-        MITO_CONFIG_PRO: False
+        MITO_CONFIG_PRO: False,
+        MITO_CONFIG_CSV_IMPORT_ENGINE: None,
+        MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB: None
     }    
 
     delete_all_mito_config_environment_variables()
@@ -224,3 +239,27 @@ def test_mit_config_enable_pro_telemetry():
     from mitosheet.user import is_pro
     assert is_pro()
 
+def test_mito_config_csv_import_engine():
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_CSV_IMPORT_ENGINE] = "PyArrow"
+
+    mito_config = MitoConfig()
+    assert mito_config.get_csv_import_engine() == 'pyarrow'
+    assert mito_config.get_mito_config()[MITO_CONFIG_CSV_IMPORT_ENGINE] == 'pyarrow'
+
+    delete_all_mito_config_environment_variables()
+
+@pytest.mark.parametrize("max_memory_mb, expected", [
+    ('100', 100.0),
+    ('0.5', 0.5),
+    ('not a number', None),
+])
+def test_mito_config_state_history_max_memory_mb(max_memory_mb, expected):
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB] = max_memory_mb
+
+    mito_config = MitoConfig()
+    assert mito_config.get_state_history_max_memory_mb() == expected
+    assert mito_config.get_mito_config()[MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB] == expected
+
+    delete_all_mito_config_environment_variables()
@@ -1,10 +1,13 @@
+import base64
+import json
 import subprocess
 import os
 
 import pandas as pd
 import pytest
 
-from mitosheet.mito_backend import get_mito_frontend_code
+import mitosheet.mito_backend
+from mitosheet.mito_backend import MitoBackend, get_mito_frontend_code
 from mitosheet.steps_manager import StepsManager
 from mitosheet.tests.test_utils import create_mito_wrapper
 
@@ -48,4 +51,20 @@ def test_mito_frontend_is_valid_code(tmp_path, string):
     # we want to make sure that there are no failures in parsing, that it runs up to the 
     # ReferenceError: document is not defined 
     assert 'SyntaxError' not in err.decode('utf-8') 
-    assert 'ReferenceError' in err.decode('utf-8') 
\ No newline at end of file
+    assert 'ReferenceError' in err.decode('utf-8') 
+
+def test_mito_frontend_code_has_sheet_data_and_buffers_as_base64(monkeypatch):
+    # This is how the bundler writes the lines of jupyterRender.tsx that we replace
+    monkeypatch.setattr(mitosheet.mito_backend, 'get_mito_frontend_bundle', lambda file_name: (
+        'const a="REPLACE_THIS_WITH_SHEET_DATA_BASE64",b=["REPLACE_THIS_WITH_SHEET_DATA_BUFFERS_BASE64"];'
+        if file_name == 'mito_frontend.js' else ''
+    ))
+    mito_backend = MitoBackend(pd.DataFrame({'A': [1, 2, 3], 'B': ['学', '\t', '"']}), send_column_buffers=True)
+    steps_manager = mito_backend.steps_manager
+
+    code = get_mito_frontend_code('a', 'a', 'a', mito_backend)
+    sheet_data_base64, sheet_data_buffers = code[len('const a="'):-len(';')].split('",b=')
+
+    assert base64.b64decode(sheet_data_base64).decode('utf-8') == steps_manager.sheet_data_json
+    assert [base64.b64decode(buffer) for buffer in json.loads(sheet_data_buffers)] == steps_manager.sheet_data_buffers
+    assert len(steps_manager.sheet_data_buffers[0]) == 3 * 8
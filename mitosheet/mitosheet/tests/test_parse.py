@@ -3,6 +3,7 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
+from concurrent.futures import ThreadPoolExecutor
 from distutils.version import LooseVersion
 from typing import Any, Dict, List
 import warnings
@@ -1136,4 +1137,52 @@ def test_safe_contains(formula, substring, contains):
 @pytest.mark.parametrize("formula,column_header,formula_label,df,python_code,functions,columns", INDEX_TEST_CASES + HEADER_HEADER_RANGE_TEST_CASES + HEADER_INDEX_HEADER_INDEX_MATCHES)
 def test_get_frontend_formula_reconstucts_properly(formula,column_header,formula_label,df,python_code,functions,columns):
     frontend_formula = get_frontend_formula(formula, formula_label, df)
-    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, df) == formula
\ No newline at end of file
+    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, df) == formula
+
+def test_parse_formula_caches_parsed_formula(monkeypatch):
+    import mitosheet.parser as parser
+    calls = []
+    def _parse_formula(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args[0])
+        return original_parse_formula(*args, **kwargs)
+    original_parse_formula = parser._parse_formula
+    monkeypatch.setattr(parser, '_parse_formula', _parse_formula)
+    parser._parsed_formula_cache.clear()
+
+    df = pd.DataFrame(get_number_data_for_df(['A', 'B'], 3), index=[5, 6, 7])
+    parsed_formula = parse_formula('=A6 + B', 'C', 7, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df)
+    assert parsed_formula == ('df[\'C\'] = df[\'A\'].shift(1, fill_value=0) + df[\'B\']', set(), set(['A', 'B']), set([6]))
+
+    # Parsing the same formula again, even on a copy of the df, uses the cached result
+    parsed_formula[2].add('D')
+    assert parse_formula('=A6 + B', 'C', 7, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df.copy()) == ('df[\'C\'] = df[\'A\'].shift(1, fill_value=0) + df[\'B\']', set(), set(['A', 'B']), set([6]))
+    assert calls == ['=A6 + B']
+
+    # But changing the index, column headers or dtypes parses it again
+    reordered_df = pd.DataFrame(get_number_data_for_df(['A', 'B'], 3), index=[6, 5, 7])
+    assert parse_formula('=A6 + B', 'C', 7, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, reordered_df)[0] == 'df[\'C\'] = df[\'A\'].shift(2, fill_value=0) + df[\'B\']'
+    parse_formula('=A6 + B', 'C', 7, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df.rename(columns={'B': 'D'}), throw_errors=False)
+    parse_formula('=A6 + B', 'C', 7, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df.astype({'A': 'float'}))
+    assert len(calls) == 4
+
+
+def test_parse_formula_does_not_cache_mixed_index():
+    df = pd.DataFrame(get_number_data_for_df(['A'], 2), index=[1, '1'])
+    assert parse_formula('=A', 'B', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df)[0] == 'df[\'B\'] = df[\'A\']'
+
+
+def test_parse_formula_from_many_threads_at_once(monkeypatch):
+    import mitosheet.parser as parser
+    monkeypatch.setattr(parser, 'MAX_CACHED_PARSED_FORMULAS', 5)
+    parser._parsed_formula_cache.clear()
+    df = pd.DataFrame(get_number_data_for_df(['A'], 3))
+
+    def parse_formulas(thread):
+        return [parse_formula(f'=A + {(thread + i) % 20}', 'B', 0, {'type': FORMULA_ENTIRE_COLUMN_TYPE}, df)[0] for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse_formulas, range(8)))
+
+    for thread, python_codes in enumerate(results):
+        assert python_codes == [f'df[\'B\'] = df[\'A\'] + {(thread + i) % 20}' for i in range(200)]
+    assert len(parser._parsed_formula_cache) <= 5
@@ -29,3 +29,51 @@ def test_state_can_add_df_to_middle():
     
     assert state.df_sources == [DATAFRAME_SOURCE_IMPORTED]
 
+
+def test_state_copy_shares_metadata_of_untouched_sheets():
+    df1 = pd.DataFrame({'A': [123]})
+    df2 = pd.DataFrame({'B': [456]})
+    state = State([df1, df2])
+    new_state = state.copy(deep_sheet_indexes=[0])
+
+    assert new_state.column_formulas[0] is not state.column_formulas[0]
+    assert new_state.column_filters[0] is not state.column_filters[0]
+    assert new_state.df_formats[0] is not state.df_formats[0]
+    assert new_state.column_ids.column_id_to_column_header[0] is not state.column_ids.column_id_to_column_header[0]
+
+    assert new_state.column_formulas[1] is state.column_formulas[1]
+    assert new_state.column_filters[1] is state.column_filters[1]
+    assert new_state.df_formats[1] is state.df_formats[1]
+    assert new_state.column_ids.column_id_to_column_header[1] is state.column_ids.column_id_to_column_header[1]
+
+def test_state_copy_can_add_and_remove_sheets_without_changing_original():
+    df = pd.DataFrame({'A': [123]})
+    state = State([df])
+    new_state = state.copy()
+    new_state.add_df_to_state(df, DATAFRAME_SOURCE_IMPORTED)
+    new_state.column_ids.remove_df(0)
+
+    assert len(state.dfs) == 1
+    assert len(state.column_formulas) == 1
+    assert state.column_ids.get_column_headers(0) == ['A']
+
+def test_state_copy_on_write_set_column_does_not_change_original():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4.0, 5.0, 6.0], 'C': [7.0, 8.0, 9.0]})
+    state = State([df])
+    new_state = state.copy(copy_on_write_sheet_indexes=[0])
+    new_state.set_column(0, 'B', pd.Series([0.0, 0.0, 0.0]))
+
+    assert list(new_state.dfs[0].columns) == ['A', 'B', 'C']
+    assert new_state.dfs[0]['B'].tolist() == [0.0, 0.0, 0.0]
+    assert state.dfs[0]['B'].tolist() == [4.0, 5.0, 6.0]
+
+def test_state_copy_on_write_materialize_column_does_not_change_original():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [4.0, 5.0, 6.0], 'C': [7.0, 8.0, 9.0]})
+    state = State([df])
+    new_state = state.copy(copy_on_write_sheet_indexes=[0])
+    new_state.materialize_column(0, 'B')
+    new_state.dfs[0].at[0, 'B'] = 100.0
+
+    assert new_state.dfs[0]['B'].tolist() == [100.0, 5.0, 6.0]
+    assert state.dfs[0]['B'].tolist() == [4.0, 5.0, 6.0]
+    assert df['B'].tolist() == [4.0, 5.0, 6.0]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for spilling the states of an analysis to disk.
+"""
+import os
+from threading import Barrier, Thread
+
+import pandas as pd
+
+from mitosheet.enterprise.mito_config import MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB, MITO_CONFIG_VERSION
+from mitosheet.state import State
+from mitosheet.state_history import StateHistory
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def get_spilled_step_indexes(mito):
+    # Transpiling the analysis after each edit reads back some of the spilled states
+    mito.mito_backend.steps_manager.enforce_state_history_max_memory()
+    return [
+        index for index, step in enumerate(mito.steps_including_skipped)
+        if not step.post_state.are_dfs_in_memory
+    ]
+
+
+def test_spilled_state_is_read_back_from_disk(tmp_path):
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    state = State([df])
+    read_states = []
+
+    path = str(tmp_path / 'state.pickle')
+    state.spill_dfs(path, read_states.append)
+
+    assert not state.are_dfs_in_memory
+    assert state.spilled_dfs_path == path
+    assert os.path.exists(path)
+    assert state.dfs[0].equals(df)
+    assert state.are_dfs_in_memory
+    assert state.spilled_dfs_path is None
+    assert not os.path.exists(path)
+    assert read_states == [state]
+
+
+def test_spilled_state_read_back_by_many_threads_is_read_once(tmp_path):
+    df = pd.DataFrame({'A': range(100_000)})
+    state = State([df])
+    read_states = []
+    state.spill_dfs(str(tmp_path / 'state.pickle'), read_states.append)
+
+    num_threads = 8
+    barrier = Barrier(num_threads)
+    read_dfs = []
+    def read_dfs_from_state():
+        barrier.wait()
+        read_dfs.append(state.dfs)
+
+    threads = [Thread(target=read_dfs_from_state) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(read_dfs) == num_threads
+    assert all(dfs is read_dfs[0] for dfs in read_dfs)
+    assert read_dfs[0][0].equals(df)
+    assert read_states == [state]
+
+
+def test_state_changed_after_read_back_is_written_when_spilled_again():
+    state = State([pd.DataFrame({'A': [1, 2, 3]})])
+    state_history = StateHistory(0)
+
+    state_history.spill_state(state)
+    state.dfs[0] = pd.DataFrame({'A': [4, 5, 6]})
+    state_history.spill_state(state)
+
+    assert not state.are_dfs_in_memory
+    assert state.dfs[0].equals(pd.DataFrame({'A': [4, 5, 6]}))
+
+
+def test_no_states_spilled_by_default(monkeypatch):
+    monkeypatch.setenv(MITO_CONFIG_VERSION, '2')
+    monkeypatch.delenv(MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB, raising=False)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    for i in range(5):
+        mito.set_formula(f'=A + {i}', 0, 'B', add_column=i == 0)
+
+    assert get_spilled_step_indexes(mito) == []
+
+
+def test_states_far_from_current_step_spilled(monkeypatch):
+    monkeypatch.setenv(MITO_CONFIG_VERSION, '2')
+    monkeypatch.setenv(MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB, '0')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    for i in range(5):
+        mito.set_cell_value(0, 'B', 0, i)
+
+    # Only the current step and the step before it are kept in memory
+    assert get_spilled_step_indexes(mito) == [0, 1, 2, 3, 4]
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 0, 0]}))
+
+    mito.checkout_step_by_idx(2)
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [0, 0, 0]}))
+    assert 2 not in get_spilled_step_indexes(mito)
+    assert 6 not in get_spilled_step_indexes(mito)
+
+    mito.checkout_step_by_idx(-1)
+    mito.undo()
+    mito.undo()
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [2, 0, 0]}))
+
+    mito.redo()
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [3, 0, 0]}))
+
+
+def test_states_within_budget_not_spilled(monkeypatch):
+    monkeypatch.setenv(MITO_CONFIG_VERSION, '2')
+    monkeypatch.setenv(MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB, '100')
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    for i in range(5):
+        mito.set_cell_value(0, 'B', 0, i)
+
+    assert get_spilled_step_indexes(mito) == []
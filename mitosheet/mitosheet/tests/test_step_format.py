@@ -9,7 +9,7 @@ Contains tests for edit events.
 import random
 from typing import Type
 
-from mitosheet.step_performers import (
+from mitosheet.step_performers.all_step_performers import (
     STEP_PERFORMERS,
     StepPerformer,
     PivotStepPerformer,
@@ -11,7 +11,7 @@ from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE
 from mitosheet.utils import get_new_id
 from mitosheet.errors import MitoError
 from mitosheet.steps_manager import StepsManager
-from mitosheet.tests.test_utils import create_mito_wrapper_with_data
+from mitosheet.tests.test_utils import create_mito_wrapper, create_mito_wrapper_with_data
 from mitosheet.column_headers import get_column_header_id
 
 
@@ -104,3 +104,73 @@ def test_failed_overwrite_rolls_back_to_previous_state():
     assert mito.dfs[0].equals(pd.DataFrame(data={'A': [1, 2, 3], 'B': [0, 0, 0]}))
 
 
+def overwrite_formula(mito, step_id, sheet_index, column_header, formula):
+    mito.mito_backend.receive_message({
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'set_column_formula_edit',
+        'step_id': step_id,
+        'params': {
+            'sheet_index': sheet_index,
+            'column_id': get_column_header_id(column_header),
+            'formula_label': 0,
+            'index_labels_formula_is_applied_to': {'type': FORMULA_ENTIRE_COLUMN_TYPE},
+            'new_formula': formula,
+        }
+    })
+
+
+def test_overwriting_formula_only_reexecutes_steps_that_read_it():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [0, 0, 0], 'C': [0, 0, 0], 'D': [0, 0, 0]}))
+    mito.set_formula('=A + 1', 0, 'B')
+    formula_step_id = mito.curr_step.step_id
+    mito.set_formula('=A * 2', 0, 'C')
+    mito.set_formula('=B + C', 0, 'D')
+    old_steps = mito.steps_including_skipped
+
+    overwrite_formula(mito, formula_step_id, 0, 'B', '=A + 10')
+
+    # The formula in C does not read B, so it is reused, while D is recalculated
+    assert mito.steps_including_skipped[2].execution_data is old_steps[2].execution_data
+    assert mito.steps_including_skipped[3].execution_data is not old_steps[3].execution_data
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [11, 12, 13], 'C': [2, 4, 6], 'D': [2, 4, 6]}))
+
+    mito.undo()
+
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [2, 3, 4], 'C': [2, 4, 6], 'D': [4, 7, 10]}))
+
+    mito.redo()
+
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [11, 12, 13], 'C': [2, 4, 6], 'D': [2, 4, 6]}))
+
+
+def test_reused_steps_do_not_share_written_columns_with_old_steps():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': [0, 0, 0], 'C': [0, 0, 0]}))
+    mito.set_formula('=A + 1', 0, 'B')
+    formula_step_id = mito.curr_step.step_id
+    mito.set_formula('=A * 2', 0, 'C')
+    mito.set_cell_value(0, 'C', 0, 100)
+    old_steps = mito.steps_including_skipped
+
+    overwrite_formula(mito, formula_step_id, 0, 'B', '=A + 10')
+    mito.set_cell_value(0, 'C', 1, 200)
+
+    assert mito.steps_including_skipped[3].execution_data is old_steps[3].execution_data
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [11, 12, 13], 'C': [100, 200, 6]}))
+    assert old_steps[3].dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [2, 3, 4], 'C': [100, 4, 6]}))
+
+
+def test_replacing_filter_reuses_steps_on_other_sheets():
+    mito = create_mito_wrapper_with_data([1, 2, 3], [1, 2, 3])
+    mito.filter(1, 'A', 'And', 'greater', 1)
+    mito.set_formula('=A + 1', 0, 'B', add_column=True)
+    mito.sort(0, 'B', 'descending')
+    old_steps = mito.steps_including_skipped
+
+    mito.filter(1, 'A', 'And', 'greater', 2)
+
+    assert mito.steps_including_skipped[3].execution_data is old_steps[3].execution_data
+    assert mito.steps_including_skipped[4].execution_data is old_steps[4].execution_data
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [3, 2, 1], 'B': [4, 3, 2]}, index=[2, 1, 0]))
+    assert mito.dfs[1].equals(pd.DataFrame({'A': [3]}, index=[2]))
+
@@ -9,9 +9,12 @@ import pytest
 import pandas as pd
 
 from mitosheet.api.get_parameterizable_params import get_parameterizable_params
+from mitosheet.code_chunks import code_chunk_utils
+from mitosheet.step_performers.column_steps.add_column import AddColumnStepPerformer
 from mitosheet.transpiler.transpile import transpile
 from mitosheet.tests.test_utils import create_mito_wrapper_with_data, create_mito_wrapper
 from mitosheet.tests.decorators import pandas_post_1_2_only, python_post_3_6_only
+from mitosheet.utils import get_new_id
 
 def test_transpile_single_column():
     mito = create_mito_wrapper_with_data(['abc'])
@@ -737,3 +740,110 @@ path_0 = r'test.xlsx'
 
 df1, df2 = function(df1, df2, path_0)"""
 
+
+def test_transpile_only_transpiles_changed_steps(monkeypatch):
+    transpiled_params = []
+    original_transpile = AddColumnStepPerformer.transpile
+    def transpile(prev_state, post_state, params, execution_data):
+        transpiled_params.append(params['column_header'])
+        return original_transpile(prev_state, post_state, params, execution_data)
+    monkeypatch.setattr(AddColumnStepPerformer, 'transpile', transpile)
+
+    mito = create_mito_wrapper_with_data(['abc'])
+    mito.add_column(0, 'B')
+    mito.add_column(0, 'C')
+    transpiled_params.clear()
+
+    mito.mito_backend.steps_manager.code()
+    mito.mito_backend.steps_manager.step_summary_list
+    mito.add_column(0, 'D')
+    mito.mito_backend.steps_manager.code()
+
+    assert transpiled_params == ['D']
+
+
+def test_transpile_incremental_optimization_same_as_optimizing_all_steps():
+    mito = create_mito_wrapper_with_data(['abc'])
+    mito.add_column(0, 'B')
+    mito.set_formula('=A', 0, 'B')
+    mito.add_column(0, 'C')
+    mito.duplicate_dataframe(0)
+    mito.rename_column(1, 'C', 'D')
+    mito.delete_columns(0, ['B'])
+    mito.delete_dataframe(1)
+    incrementally_optimized_code = mito.transpiled_code
+
+    mito.mito_backend.steps_manager.code_chunk_cache.clear()
+    assert mito.transpiled_code == incrementally_optimized_code
+    assert incrementally_optimized_code == [
+        'from mitosheet.public.v3 import *',
+        '',
+        "df1.insert(1, 'B', df1['A'])",
+        '',
+        "df1.insert(2, 'C', 0)",
+        '',
+        'df1_copy = df1.copy(deep=True)',
+        '',
+        "df1_copy.rename(columns={'C': 'D'}, inplace=True)",
+        '',
+        "df1.drop(['B'], axis=1, inplace=True)",
+        '',
+    ]
+
+
+def test_code_chunk_code_is_not_shared():
+    mito = create_mito_wrapper_with_data(['abc'])
+    mito.add_column(0, 'B')
+    code_chunk = mito.optimized_code_chunks[0]
+
+    code_chunk_cache = mito.mito_backend.steps_manager.code_chunk_cache
+    _, code, imports = code_chunk_cache.get_code_chunk_code(code_chunk)
+    code.append('# Changed')
+    imports.append('import os')
+    assert code_chunk_cache.get_code_chunk_code(code_chunk)[1:] == (["df1.insert(1, 'B', 0)"], [])
+
+
+def test_transpile_only_optimizes_last_optimized_code_chunk_with_new_code_chunks(monkeypatch):
+    optimized_code_chunks_lengths = []
+    optimize_code_chunks = code_chunk_utils.optimize_code_chunks
+    def recording_optimize_code_chunks(code_chunks):
+        optimized_code_chunks_lengths.append(len(code_chunks))
+        return optimize_code_chunks(code_chunks)
+    monkeypatch.setattr(code_chunk_utils, 'optimize_code_chunks', recording_optimize_code_chunks)
+
+    mito = create_mito_wrapper_with_data(['abc'])
+    for column_header in ['B', 'C', 'D', 'E']:
+        mito.add_column(0, column_header)
+        mito.set_formula('=A', 0, column_header)
+    optimized_code_chunks_lengths.clear()
+
+    # We add the column without the test wrapper, which optimizes all the code chunks to check them
+    mito.mito_backend.receive_message({
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {'sheet_index': 0, 'column_header': 'F', 'column_header_index': -1},
+    })
+
+    assert optimized_code_chunks_lengths == [2]
+    assert len(mito.optimized_code_chunks) == 5
+
+
+def test_transpile_optimizes_earlier_code_chunks_when_last_optimized_code_chunk_is_combined():
+    mito = create_mito_wrapper_with_data(['abc'])
+    mito.add_column(0, 'B')
+    mito.duplicate_dataframe(0)
+    mito.rename_column(1, 'A', 'X')
+    mito.delete_dataframe(1)
+    incrementally_optimized_code = mito.transpiled_code
+
+    mito.mito_backend.steps_manager.code_chunk_cache.clear()
+    assert mito.transpiled_code == incrementally_optimized_code
+    assert incrementally_optimized_code == [
+        'from mitosheet.public.v3 import *',
+        '',
+        "df1.insert(1, 'B', 0)",
+        '',
+    ]
+
@@ -21,7 +21,7 @@ from mitosheet.state import (
     NUMBER_FORMAT_PLAIN_TEXT,
     NUMBER_FORMAT_SCIENTIFIC_NOTATION,
 )
-from mitosheet.step_performers import (
+from mitosheet.step_performers.all_step_performers import (
     STEP_PERFORMERS,
 )
 from mitosheet.step_performers.graph_steps.plotly_express_graphs import GRAPH_SAFETY_FILTER_CUTOFF
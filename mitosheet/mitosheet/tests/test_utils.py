@@ -12,11 +12,14 @@ import json
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from numpy import number
 
+from mitosheet.column_buffers import SHEET_DATA_BUFFER_KEY
 from mitosheet.code_chunks.code_chunk_utils import get_code_chunks
 from mitosheet.mito_backend import MitoBackend, get_mito_backend
+from mitosheet.step_performers.file_export_writer import wait_for_file_exports
 from mitosheet.step_performers.graph_steps.plotly_express_graphs import (
     DO_NOT_CHANGE_PAPER_BGCOLOR_DEFAULT, DO_NOT_CHANGE_PLOT_BGCOLOR_DEFAULT,
     DO_NOT_CHANGE_TITLE_FONT_COLOR_DEFAULT)
@@ -94,7 +97,7 @@ def check_dataframes_equal(test_wrapper: "MitoWidgetTestWrapper") -> None:
         local_vars = v3.__dict__
     else:
         import mitosheet as original
-        local_vars = original.__dict__
+        local_vars = {name: getattr(original, name) for name in original.__all__}
 
     user_defined_functions = test_wrapper.mito_backend.steps_manager.curr_step.post_state.user_defined_functions if test_wrapper.mito_backend.steps_manager.curr_step.post_state is not None else []
     user_defined_importers = test_wrapper.mito_backend.steps_manager.curr_step.post_state.user_defined_importers if test_wrapper.mito_backend.steps_manager.curr_step.post_state is not None else []
@@ -128,19 +131,25 @@ def check_dataframes_equal(test_wrapper: "MitoWidgetTestWrapper") -> None:
 
     # We then check that the sheet data json that is saved by the widget, which 
     # notably uses caching, does not get incorrectly cached and is written correctly
+    steps_manager = test_wrapper.mito_backend.steps_manager
     sheet_data_json = test_wrapper.mito_backend.get_shared_state_variables()['sheet_data_json']
-    assert sheet_data_json == json.dumps(dfs_to_array_for_json(
-        test_wrapper.mito_backend.steps_manager.curr_step.final_defined_state, 
-        set(i for i in range(len(test_wrapper.mito_backend.steps_manager.curr_step.dfs))),
+    sheet_data_array = dfs_to_array_for_json(
+        steps_manager.curr_step.final_defined_state, 
+        set(i for i in range(len(steps_manager.curr_step.dfs))),
         [],
-        test_wrapper.mito_backend.steps_manager.curr_step.dfs,
-        test_wrapper.mito_backend.steps_manager.curr_step.df_names,
-        test_wrapper.mito_backend.steps_manager.curr_step.df_sources,
-        test_wrapper.mito_backend.steps_manager.curr_step.column_formulas,
-        test_wrapper.mito_backend.steps_manager.curr_step.column_filters,
-        test_wrapper.mito_backend.steps_manager.curr_step.column_ids,
-        test_wrapper.mito_backend.steps_manager.curr_step.df_formats
-    ), cls=NpEncoder)
+        steps_manager.curr_step.dfs,
+        steps_manager.curr_step.df_names,
+        steps_manager.curr_step.df_sources,
+        steps_manager.curr_step.column_formulas,
+        steps_manager.curr_step.column_filters,
+        steps_manager.curr_step.column_ids,
+        steps_manager.curr_step.df_formats,
+        send_column_buffers=steps_manager.send_column_buffers
+    )
+    # The buffers of the sheets are sent alongside the sheet data json, rather than in it
+    sheet_data_buffers = [sheet_data.pop(SHEET_DATA_BUFFER_KEY, b'') for sheet_data in sheet_data_array]
+    assert sheet_data_json == json.dumps(sheet_data_array, cls=NpEncoder)
+    assert steps_manager.sheet_data_buffers == sheet_data_buffers
 
 
 class MitoWidgetTestWrapper:
@@ -199,6 +208,10 @@ class MitoWidgetTestWrapper:
     def sheet_data_json(self):
         return self.mito_backend.steps_manager.sheet_data_json
 
+    @property
+    def sheet_data_array(self) -> List[Dict[str, Any]]:
+        return get_sheet_data_array(self.sheet_data_json, self.mito_backend.steps_manager.sheet_data_buffers)
+
     @property
     def analysis_data_json(self):
         return self.mito_backend.steps_manager.analysis_data_json
@@ -586,7 +599,7 @@ class MitoWidgetTestWrapper:
             file_name: str,
         ) -> bool:
 
-        return self.mito_backend.receive_message(
+        result = self.mito_backend.receive_message(
             {
                 'event': 'edit_event',
                 'id': get_new_id(),
@@ -599,6 +612,9 @@ class MitoWidgetTestWrapper:
                 }
             }
         )
+        # The files are written in the background, so we wait for them to be written
+        wait_for_file_exports()
+        return result
 
     @check_transpiled_code_after_call
     def reset_index(
@@ -1641,6 +1657,46 @@ def create_mito_wrapper(
 
     return test_wrapper
 
+NUMPY_DTYPES_FOR_TYPED_ARRAYS = {
+    'Int8Array': '<i1',
+    'Int16Array': '<i2',
+    'Int32Array': '<i4',
+    'Uint8Array': '<u1',
+    'Uint16Array': '<u2',
+    'Uint32Array': '<u4',
+    'Float64Array': '<f8',
+}
+
+
+def read_column_buffer(buffer: bytes, column_buffer: Dict[str, Any]) -> np.ndarray:
+    # This is how the frontend reads the values of a column out of the buffer
+    return np.frombuffer(
+        buffer, 
+        dtype=NUMPY_DTYPES_FOR_TYPED_ARRAYS[column_buffer['type']], 
+        count=column_buffer['length'], 
+        offset=column_buffer['offset']
+    )
+
+
+def get_sheet_data_array(sheet_data_json: str, sheet_data_buffers: List[bytes]) -> List[Dict[str, Any]]:
+    """
+    Returns the sheet data array as the frontend reads it, with the values of the columns 
+    that are sent in the buffer of their sheet read into their columnData.
+    """
+    sheet_data_array = json.loads(sheet_data_json)
+    for sheet_data, buffer in zip(sheet_data_array, sheet_data_buffers):
+        for column in sheet_data['data']:
+            if 'columnBuffer' not in column:
+                continue
+            values = read_column_buffer(buffer, column.pop('columnBuffer')).tolist()
+            if column['columnDtype'] == 'bool':
+                column['columnData'] = [value == 1 for value in values]
+            else:
+                # Nulls and infinities are sent as NaN in the rest of the sheet data
+                column['columnData'] = [value if np.isfinite(value) else 'NaN' for value in values]
+    return sheet_data_array
+
+
 def make_multi_index_header_df(data: Dict[Union[str, int], List[Any]], column_headers: List[ColumnHeader], index: Optional[List[Any]]=None) -> pd.DataFrame:
     """
     A helper function that allows you to easily create a multi-index
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for reading and writing the user.json file, making sure we
+only read it when it changes, and that writes from many kernels are safe.
+"""
+import builtins
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.tests.user.conftest import write_fake_user_json
+from mitosheet.user import initialize_user
+from mitosheet.user.db import (USER_JSON_PATH, get_user_field,
+                               get_user_json_object, set_user_field,
+                               set_user_fields)
+from mitosheet.user.schemas import (UJ_MITOSHEET_PRO, UJ_RECEIVED_TOURS,
+                                    UJ_USER_EMAIL, USER_JSON_DEFAULT)
+
+
+@pytest.fixture
+def user_json_opens(monkeypatch):
+    """
+    Creates a user.json, and counts the number of times it is opened
+    """
+    initialize_user(call_identify=False)
+    user_json_opens = [0]
+    original_open = builtins.open
+    def counted_open(file, *args, **kwargs):
+        if file == USER_JSON_PATH:
+            user_json_opens[0] += 1
+        return original_open(file, *args, **kwargs)
+    monkeypatch.setattr(builtins, 'open', counted_open)
+    yield user_json_opens
+    monkeypatch.undo()
+    os.remove(USER_JSON_PATH)
+
+
+def test_edits_do_not_open_user_json(user_json_opens):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    user_json_opens[0] = 0
+
+    mito.add_column(0, 'B')
+    mito.set_formula('=A + 1', 0, 'B')
+    mito.sort(0, 'B', 'descending')
+    mito.undo()
+    mito.mito_backend.get_shared_state_variables()
+    mito.mito_backend.get_user_profile_json()
+
+    assert user_json_opens[0] == 0
+
+
+def test_reading_user_field_many_times_opens_user_json_once(user_json_opens):
+    user_json_opens[0] = 0
+    for _ in range(100):
+        get_user_field(UJ_USER_EMAIL)
+        get_user_field(UJ_MITOSHEET_PRO)
+    assert user_json_opens[0] <= 1
+
+
+def test_reads_user_json_again_when_other_process_changes_it(user_json_opens):
+    assert get_user_field(UJ_USER_EMAIL) == 'github@action.com'
+    write_fake_user_json(get_user_json_object(), **{UJ_USER_EMAIL: 'other@kernel.com'})
+    assert get_user_field(UJ_USER_EMAIL) == 'other@kernel.com'
+
+
+def test_changing_returned_field_does_not_change_user_json(user_json_opens):
+    set_user_field(UJ_RECEIVED_TOURS, [])
+    received_tours = get_user_field(UJ_RECEIVED_TOURS)
+    received_tours.append('tour')
+    assert get_user_field(UJ_RECEIVED_TOURS) == []
+
+
+def test_setting_unchanged_fields_does_not_write_user_json(user_json_opens):
+    set_user_fields({UJ_USER_EMAIL: 'new@email.com', UJ_MITOSHEET_PRO: True})
+    modified_time = os.stat(USER_JSON_PATH).st_mtime_ns
+    inode = os.stat(USER_JSON_PATH).st_ino
+
+    set_user_fields({UJ_USER_EMAIL: 'new@email.com', UJ_MITOSHEET_PRO: True})
+
+    assert (os.stat(USER_JSON_PATH).st_mtime_ns, os.stat(USER_JSON_PATH).st_ino) == (modified_time, inode)
+    with open(USER_JSON_PATH) as f:
+        user_json = json.load(f)
+    assert user_json[UJ_USER_EMAIL] == 'new@email.com' and user_json[UJ_MITOSHEET_PRO] is True
+
+
+def test_set_user_field_raises_when_user_json_does_not_exist():
+    with pytest.raises(FileNotFoundError):
+        set_user_field(UJ_USER_EMAIL, 'new@email.com')
+    assert get_user_field(UJ_USER_EMAIL) is None
+
+
+def test_kernels_setting_different_fields_at_once_keep_all_changes():
+    write_fake_user_json(USER_JSON_DEFAULT)
+    num_kernels, num_writes = 4, 25
+    set_fields_code = 'from mitosheet.user.db import set_user_field\n' + \
+        f'for i in range({num_writes}): set_user_field("kernel_" + sys.argv[1], i)'
+
+    kernels = [
+        subprocess.Popen([sys.executable, '-c', 'import sys\n' + set_fields_code, str(kernel)])
+        for kernel in range(num_kernels)
+    ]
+    assert all(kernel.wait() == 0 for kernel in kernels)
+
+    user_json = get_user_json_object()
+    assert user_json is not None
+    assert all(user_json[f'kernel_{kernel}'] == num_writes - 1 for kernel in range(num_kernels))
+    assert not any(file_name.endswith('.tmp') for file_name in os.listdir(os.path.dirname(USER_JSON_PATH)))
+    os.remove(USER_JSON_PATH)
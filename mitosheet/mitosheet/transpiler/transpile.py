@@ -57,7 +57,7 @@ def transpile(
         imports_code.extend(preprocess_imports)
 
     # We only transpile up to the currently checked out step
-    all_code_chunks: List[CodeChunk] = get_code_chunks(steps_manager.steps_including_skipped[:steps_manager.curr_step_idx + 1], optimize=optimize)
+    all_code_chunks: List[CodeChunk] = get_code_chunks(steps_manager.steps_including_skipped[:steps_manager.curr_step_idx + 1], optimize=optimize, code_chunk_cache=steps_manager.code_chunk_cache)
 
     # We also make sure to include all the post_processing code chunks, which are those
     # code chunks that are always at the end of the dataframe
@@ -65,8 +65,8 @@ def transpile(
         all_code_chunks.append(postprocessing_code_chunk(steps_manager.curr_step.initial_defined_state, steps_manager.curr_step.final_defined_state))
 
     for code_chunk in all_code_chunks:
-        comment = '# ' + code_chunk.get_description_comment().strip().replace('\n', '\n# ')
-        (gotten_code, code_chunk_imports) = code_chunk.get_code()
+        (description_comment, gotten_code, code_chunk_imports) = steps_manager.code_chunk_cache.get_code_chunk_code(code_chunk)
+        comment = '# ' + description_comment.strip().replace('\n', '\n# ')
 
         # Make sure to not generate comments or code for steps with no code 
         if len(gotten_code) > 0:
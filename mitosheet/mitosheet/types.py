@@ -19,6 +19,10 @@ from typing import TYPE_CHECKING, Dict, List, Optional, Union, Tuple, Any
 GraphID = str
 ColumnID = str
 
+# A location in the state that a step reads from or writes to. A column_id of
+# None refers to the entire sheet, including its index and the columns it has
+ColumnLocation = Tuple[int, Optional[ColumnID]]
+
 # A column header is either a primative type
 PrimativeColumnHeader = Union[int, float, bool, str, Optional[str]]
 MultiLevelColumnHeader = Union[Tuple[PrimativeColumnHeader, ...], List[PrimativeColumnHeader]]
@@ -34,10 +38,13 @@ if TYPE_CHECKING:
     MitoWidgetType = MitoBackend
     from mitosheet.state import State
     StateType = State
+    from mitosheet.step import Step
+    StepType = Step
 else:
     StepsManagerType = Any
     MitoWidgetType = Any
     StateType = Any
+    StepType = Any
 
 IndexType = Union[str, int, bool, float]
 
@@ -91,6 +98,10 @@ MitoSafeSnowflakeConnection = Optional[SnowflakeConnection]
 FORMULA_ENTIRE_COLUMN_TYPE = 'entire_column'
 FORMULA_SPECIFIC_INDEX_LABELS_TYPE = 'specific_index_labels'
 
+# An API call can return bytes under this key in its result, which are sent to
+# the frontend as a binary buffer, rather than in the json of the response
+API_RESULT_BUFFER_KEY = 'buffer'
+
 
 ParamName = str
 ParamValue = str
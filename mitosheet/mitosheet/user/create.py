@@ -9,14 +9,14 @@ Utilities for creating and initializing the user.json
 file with the current schema
 """
 
-import json
 import os
 from datetime import datetime
 from typing import List, Optional
 
 from mitosheet._version import __version__
-from mitosheet.user.db import (MITO_FOLDER, USER_JSON_PATH, get_user_field,
-                               set_user_field)
+from mitosheet.user.db import (MITO_FOLDER, get_user_field,
+                               get_user_json_object, set_user_field,
+                               set_user_fields, set_user_json_object)
 from mitosheet.user.schemas import (GITHUB_ACTION_EMAIL, GITHUB_ACTION_ID,
                                     UJ_MITOSHEET_CURRENT_VERSION,
                                     UJ_MITOSHEET_LAST_FIFTY_USAGES,
@@ -32,15 +32,7 @@ def is_user_json_exists_and_valid_json() -> bool:
     Helper function that determines if the current user.json both
     exists and is valid json
     """
-    if not os.path.exists(USER_JSON_PATH):
-        return False
-
-    try:
-        with open(USER_JSON_PATH, 'r') as f:
-            json.loads(f.read())
-        return True
-    except:
-        return False
+    return get_user_json_object() is not None
 
 
 def try_create_user_json_file() -> None:
@@ -52,15 +44,16 @@ def try_create_user_json_file() -> None:
     # is invalid (e.g. it is not parseable JSON).
     if not is_user_json_exists_and_valid_json():
         # First, we write an empty default object
-        with open(USER_JSON_PATH, 'w+') as f:
-            f.write(json.dumps(USER_JSON_DEFAULT))
+        set_user_json_object(USER_JSON_DEFAULT)
 
         # Then, we take special care to put all the testing/CI environments 
         # (e.g. Github actions) under one ID and email
         from mitosheet.user.utils import is_running_test
         if is_running_test():
-            set_user_field(UJ_STATIC_USER_ID, GITHUB_ACTION_ID)
-            set_user_field(UJ_USER_EMAIL, GITHUB_ACTION_EMAIL)
+            set_user_fields({
+                UJ_STATIC_USER_ID: GITHUB_ACTION_ID,
+                UJ_USER_EMAIL: GITHUB_ACTION_EMAIL
+            })
 
 
 def initialize_user(call_identify: bool=True) -> None:
@@ -89,8 +82,10 @@ def initialize_user(call_identify: bool=True) -> None:
     mitosheet_current_version = get_user_field(UJ_MITOSHEET_CURRENT_VERSION)
     if mitosheet_current_version != __version__ and is_local_deployment():
         from mitosheet.telemetry.telemetry_utils import log
-        set_user_field(UJ_MITOSHEET_CURRENT_VERSION, __version__)
-        set_user_field(UJ_MITOSHEET_LAST_UPGRADED_DATE, datetime.today().strftime('%Y-%m-%d'))
+        set_user_fields({
+            UJ_MITOSHEET_CURRENT_VERSION: __version__,
+            UJ_MITOSHEET_LAST_UPGRADED_DATE: datetime.today().strftime('%Y-%m-%d')
+        })
         # Log the upgrade. Note that this runs when the user _actually_ changes
         # the version of mitosheet that they are using, not just when they 
         # click the upgrade button in the app (although clicking this upgrade
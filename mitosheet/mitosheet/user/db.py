@@ -5,50 +5,180 @@
 # Distributed under the terms of the GPL License.
 
 """
-Helpers for accessing the user.json file
+Helpers for accessing the user.json file.
+
+The user.json is read many times for every edit (e.g. to check if the user is
+pro, or if telemetry is on), so we keep its contents in memory in the
+UserJSONStore, and only read it again when the file has changed, which we
+check with a cheap os.stat.
+
+The user.json is shared by all the kernels that the user runs, so to change
+it, we lock it against other processes, read it again if it has changed, and
+then write it to a temporary file that we move over the user.json. This means
+the user.json is never partially written, and that two kernels writing
+different fields at once both keep their changes.
 """
 import os
 import json
-from typing import Any, Dict, Optional
+import tempfile
+from contextlib import contextmanager
+from copy import deepcopy
+from threading import RLock
+from typing import Any, Dict, Iterator, Optional, Tuple
 from mitosheet.save_paths import MITO_FOLDER
 
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    # On Windows, we just rely on the user.json being replaced atomically
+    fcntl = None # type: ignore
+
 # The path of the user.json file
 USER_JSON_PATH = os.path.join(MITO_FOLDER, 'user.json')
 
+# The file we lock to change the user.json. We don't lock the user.json itself,
+# as we replace it when we write it
+USER_JSON_LOCK_PATH = os.path.join(MITO_FOLDER, 'user.json.lock')
+
+# The inode, size and modification time of a file, which change when it is written
+FileVersion = Tuple[int, int, int]
+
+
+def _get_file_version(path: str) -> Optional[FileVersion]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+@contextmanager
+def _lock_file(lock_path: str) -> Iterator[None]:
+    """
+    Locks the lock_path against other processes, where this is possible
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class UserJSONStore():
+    """
+    The contents of the user.json file at path, which we read the first time they
+    are used, and then only read again when the file changes.
+    """
+
+    def __init__(self, path: str, lock_path: str):
+        self.path = path
+        self.lock_path = lock_path
+        self._user_json: Optional[Dict[str, Any]] = None
+        self._file_version: Optional[FileVersion] = None
+        self._lock = RLock()
+
+    def _read(self) -> Dict[str, Any]:
+        """
+        Returns the user.json, reading it only if it has changed since we last
+        read it. Raises an error if it does not exist, or is not valid json.
+        """
+        file_version = _get_file_version(self.path)
+        if self._user_json is not None and file_version is not None and file_version == self._file_version:
+            return self._user_json
+
+        self._user_json = None
+        with open(self.path) as f:
+            # We take the version of the file we actually read, in case it was just replaced
+            stat = os.fstat(f.fileno())
+            user_json: Dict[str, Any] = json.load(f)
+        self._user_json = user_json
+        self._file_version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return user_json
+
+    def _write(self, user_json_object: Dict[str, Any]) -> None:
+        """
+        Writes the user.json to a temporary file, and then moves it over
+        the user.json, so the user.json is never partially written
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.user.json.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(json.dumps(user_json_object))
+            os.replace(temp_path, self.path)
+        except:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._user_json = deepcopy(user_json_object)
+        self._file_version = _get_file_version(self.path)
+
+    def get_user_json_object(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            try:
+                # We return a copy, so changing it does not change the store
+                return deepcopy(self._read())
+            except:
+                return None
+
+    def get_user_field(self, field: str) -> Optional[Any]:
+        with self._lock:
+            try:
+                return deepcopy(self._read()[field])
+            except:
+                return None
+
+    def set_user_json_object(self, user_json_object: Dict[str, Any]) -> None:
+        with self._lock, _lock_file(self.lock_path):
+            self._write(user_json_object)
+
+    def set_user_fields(self, fields: Dict[str, Any]) -> None:
+        with self._lock, _lock_file(self.lock_path):
+            # We read the user.json again if another kernel has changed it, so
+            # we don't overwrite the fields it changed
+            user_json_object = self._read()
+            if all(field in user_json_object and user_json_object[field] == value for field, value in fields.items()):
+                return
+            self._write({**user_json_object, **fields})
+
+
+user_json_store = UserJSONStore(USER_JSON_PATH, USER_JSON_LOCK_PATH)
+
+
 def get_user_json_object() -> Optional[Dict[str, Any]]:
     """
     Gets the entire user json object
     """
-    try:
-        with open(USER_JSON_PATH) as f:
-            return json.load(f)
-    except: 
-        return None
+    return user_json_store.get_user_json_object()
 
 def get_user_field(field: str) -> Optional[Any]:
     """
     Returns the value stored at field in the user.json file,
-    but may read a different file if it passed
+    or None if it does not exist
     """
-    try:
-        with open(USER_JSON_PATH) as f:
-            return json.load(f)[field]
-    except: 
-        return None
+    return user_json_store.get_user_field(field)
 
 def set_user_json_object(user_json_object: Dict[str, Any]) -> None:
     """
-    Updates the value of a specific feild in user.json
+    Overwrites the entire user.json with the user_json_object
     """
-    with open(USER_JSON_PATH, 'w+') as f:
-        f.write(json.dumps(user_json_object))
+    user_json_store.set_user_json_object(user_json_object)
 
 def set_user_field(field: str, value: Any) -> None:
     """
     Updates the value of a specific feild in user.json
     """
-    with open(USER_JSON_PATH, 'r') as user_file_old:
-        old_user_json = json.load(user_file_old)
-        old_user_json[field] = value
-        with open(USER_JSON_PATH, 'w+') as f:
-            f.write(json.dumps(old_user_json))
+    user_json_store.set_user_fields({field: value})
+
+def set_user_fields(fields: Dict[str, Any]) -> None:
+    """
+    Updates the values of the fields in user.json with a single write,
+    and does not write it at all if they are unchanged
+    """
+    user_json_store.set_user_fields(fields)
@@ -13,9 +13,9 @@ NOTE: USER_JSON_DEFAULT is the default user.json object for the currrent
 version always.
 """
 
+import uuid
 from datetime import datetime
 from mitosheet.experiments.experiment_utils import get_new_experiment
-from mitosheet.utils import get_random_id
 from mitosheet._version import __version__
 
 # Some helpful constants
@@ -47,6 +47,12 @@ UJ_AI_PRIVACY_POLICY = 'ai_privacy_policy'
 UJ_AI_MITO_API_NUM_USAGES = 'ai_mito_api_num_usages'
 
 
+def get_random_id() -> str:
+    # NOTE: this is the same as mitosheet.utils.get_random_id, which we don't
+    # import here, as the user is initalized when mitosheet is imported 
+    return str(uuid.uuid1())
+
+
 # This was the final version of the user.json with user_json_version == 1
 # and since we added fields to it over time, we make sure that all users 
 # upgrading from version 1 actually get all the fields they need before 
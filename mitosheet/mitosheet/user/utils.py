@@ -12,25 +12,19 @@ import hashlib
 import os
 from datetime import datetime
 import sys
+from importlib.util import find_spec
 from typing import Optional
 
-import pandas as pd
 from mitosheet._version import __version__
 from mitosheet.user.db import get_user_field
 from mitosheet.user.schemas import (UJ_MITOSHEET_ENTERPRISE,
                                     UJ_MITOSHEET_PRO)
 
 
-try:
-    import mitosheet_helper_pro
-    MITOSHEET_HELPER_PRO = True
-except ImportError:
-    MITOSHEET_HELPER_PRO = False
-try:
-    import mitosheet_helper_enterprise
-    MITOSHEET_HELPER_ENTERPRISE = True
-except ImportError:
-    MITOSHEET_HELPER_ENTERPRISE = False
+# NOTE: we only check if the helper packages are installed, rather than importing
+# them, so that we don't import them every time mitosheet is imported
+MITOSHEET_HELPER_PRO = find_spec('mitosheet_helper_pro') is not None
+MITOSHEET_HELPER_ENTERPRISE = find_spec('mitosheet_helper_enterprise') is not None
 
 
 def is_running_test() -> bool:
@@ -122,6 +116,7 @@ def get_pandas_version() -> str:
     """
     Returns the pandas version
     """
+    import pandas as pd
     return pd.__version__
 
 
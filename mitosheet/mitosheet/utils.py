@@ -16,8 +16,10 @@ import os
 import numpy as np
 import pandas as pd
 
+from mitosheet.column_buffers import SHEET_DATA_BUFFER_KEY, get_columns_buffer
 from mitosheet.column_headers import ColumnIDMap, get_column_header_display
-from mitosheet.is_type_utils import get_float_dt_td_columns
+from mitosheet.json_utils import (dumps_column_json_values, get_column_json_values,
+                                  get_index_json_values)
 from mitosheet.types import (ColumnHeader, ColumnID, DataframeFormat, FrontendFormulaAndLocation, StateType, FrontendFormula)
 
 # We only send the first 1500 rows of a dataframe; note that this
@@ -113,7 +115,8 @@ def dfs_to_array_for_json(
         column_formulas_array: List[Dict[ColumnID, List[FrontendFormulaAndLocation]]],
         column_filters_array: List[Dict[ColumnID, Any]],
         column_ids: ColumnIDMap,
-        df_formats: List[DataframeFormat]
+        df_formats: List[DataframeFormat],
+        send_column_buffers: bool=False
     ) -> List:
 
     new_array = []
@@ -132,7 +135,8 @@ def dfs_to_array_for_json(
                     df_formats[sheet_index],
                     # We only send the first 1500 rows and 1500 columns
                     max_rows=MAX_ROWS,
-                    max_columns=MAX_COLUMNS
+                    max_columns=MAX_COLUMNS,
+                    send_column_buffers=send_column_buffers
                 ) 
             )
         else:
@@ -176,12 +180,18 @@ def df_to_json_dumpsable(
         column_headers_to_column_ids: Dict[ColumnHeader, ColumnID],
         df_format: DataframeFormat,
         max_rows: Optional[int]=MAX_ROWS, # How many items you want to display. None when using this function to get unique value counts
-        max_columns: int=MAX_COLUMNS # How many columns you want to display. Unlike max_rows, this is always defined
+        max_columns: int=MAX_COLUMNS, # How many columns you want to display. Unlike max_rows, this is always defined
+        send_column_buffers: bool=False # If the numeric columns should be sent as binary, see column_buffers.py
     ) -> Dict[str, Any]:
     """
     Returns a dataframe and other metadata represented in a way that can be turned into a 
     JSON object with json.dumps.
 
+    If send_column_buffers is True, the numeric columns have an empty columnData, and a 
+    columnBuffer that says where their values are in the bytes stored under the
+    SHEET_DATA_BUFFER_KEY. These bytes must be removed before the sheet data is dumped, 
+    as get_sheet_data_json does.
+
     Should follow the format:
     {
         dfName: string;
@@ -192,6 +202,7 @@ def df_to_json_dumpsable(
             columnID: string;
             columnHeader: (string | number);
             columnDtype: string;
+            columnBuffer?: ColumnBuffer;
             columnData: (string | number)[];
         }[];
         columnIDsMap: ColumnIDsMap;
@@ -206,31 +217,46 @@ def df_to_json_dumpsable(
 
     (num_rows, num_columns) = original_df.shape 
 
-    json_obj = convert_df_to_parsed_json(original_df, max_rows=max_rows, max_columns=max_columns)
+    # we only show the first max_rows rows!
+    df = original_df if max_rows is None else original_df.head(n=max_rows)
+
+    if send_column_buffers:
+        column_buffers, buffer = get_columns_buffer([column for _, column in df.iloc[:, :max_columns].items()])
+    else:
+        column_buffers, buffer = [], b''
 
     final_data = []
     column_dtype_map = {}
-    for column_index, column_header in enumerate(original_df.columns):
+    for column_index, (column_header, column) in enumerate(df.items()):
         column_id = _get_column_id_from_header_safe(column_header, column_headers_to_column_ids)
+        column_dtype = str(column.dtype)
+        column_buffer = column_buffers[column_index] if column_index < len(column_buffers) else None
+
+        if column_buffer is not None:
+            # The values of this column are sent in the buffer of the sheet
+            column_data = []
+        elif column_index < max_columns:
+            column_data = get_column_json_values(column)
+        else:
+            # If we're beyond the max columns, we don't send the data in this column
+            column_data = [None] * len(df)
 
-        column_final_data: Dict[str, Any] = {
+        column_json: Dict[str, Any] = {
             'columnID': column_id,
             'columnHeader': get_column_header_display(column_header),
-            'columnDtype': str(original_df[column_header].dtype),
-            'columnData': [],
+            'columnDtype': column_dtype,
         }
-        column_dtype_map[column_id] = str(original_df[column_header].dtype)
-        for row in json_obj['data']:
-            # If we're beyond the max columns, we might not have data, and we leave column data empty
-            # in this case and don't append anything
-            column_final_data['columnData'].append(row[column_index] if column_index < MAX_COLUMNS else None)
-        
-        final_data.append(column_final_data) 
+        if column_buffer is not None:
+            column_json['columnBuffer'] = column_buffer
+        # NOTE: the column data must be the last key, see get_sheet_data_json
+        column_json['columnData'] = column_data
+        final_data.append(column_json)
+        column_dtype_map[column_id] = column_dtype
 
     # Import just before we use it to avoid circular imports
     from mitosheet.pro.conditional_formatting_utils import get_conditonal_formatting_result
     
-    return {
+    sheet_data: Dict[str, Any] = {
         "dfName": df_name,
         "dfSource": df_source,
         'numRows': num_rows,
@@ -245,7 +271,7 @@ def df_to_json_dumpsable(
         'columnFormulasMap': column_formulas,
         'columnFiltersMap': column_filters,
         'columnDtypeMap': column_dtype_map,
-        'index': json_obj['index'],
+        'index': get_index_json_values(df.index),
         'dfFormat': df_format,
         'conditionalFormattingResult': get_conditonal_formatting_result(
             state,
@@ -256,6 +282,29 @@ def df_to_json_dumpsable(
         )
 
     }
+    if send_column_buffers:
+        sheet_data[SHEET_DATA_BUFFER_KEY] = buffer
+    return sheet_data
+
+
+def get_sheet_data_json(sheet_data: Dict[str, Any]) -> str:
+    """
+    Returns json.dumps(sheet_data, cls=NpEncoder) for sheet data returned from 
+    df_to_json_dumpsable, without dumping the data of columns that have already
+    been dumped for another step. The bytes of the buffer of the sheet, if there 
+    are any, are left out.
+    """
+    columns_json = [
+        # The column data is the last key in the column, so we add it before the closing brace
+        json.dumps({**column, 'columnData': []}, cls=NpEncoder)[:-len('[]}')] + dumps_column_json_values(column['columnData']) + '}'
+        for column in sheet_data['data']
+    ]
+    # NOTE: the data comes before any other strings that could include '"data": []', and so 
+    # we replace the data, and not something in a string. Any " in a string is escaped
+    sheet_data_without_buffer = {key: value for key, value in sheet_data.items() if key != SHEET_DATA_BUFFER_KEY}
+    return json.dumps({**sheet_data_without_buffer, 'data': []}, cls=NpEncoder).replace(
+        '"data": []', '"data": [' + ', '.join(columns_json) + ']', 1
+    )
 
 
 def get_row_data_array(df: pd.DataFrame) -> List[Any]:
@@ -267,45 +316,25 @@ def get_row_data_array(df: pd.DataFrame) -> List[Any]:
 
 def convert_df_to_parsed_json(original_df: pd.DataFrame, max_rows: Optional[int]=MAX_ROWS, max_columns: int=MAX_COLUMNS) -> Dict[str, Any]:
     """
-    Returns a dataframe as a json object with the correct formatting
+    Returns a dataframe as a json object with the correct formatting, in the 
+    same format as df.to_json(orient="split")
     """
     if max_rows is None:
-        df = original_df.copy(deep=True) 
+        df = original_df
     else:
         # we only show the first max_rows rows!
-        df = original_df.head(n=max_rows).copy(deep=True)
+        df = original_df.head(n=max_rows)
 
     # we only show the first max_columns columns!
     df = df.iloc[: , :max_columns]
 
-    float_columns, date_columns, timedelta_columns = get_float_dt_td_columns(df)
-    # We figure out which of the columns contain dates, and we
-    # convert them to string columns (for formatting reasons).
-    # NOTE: we don't use date_format='iso' in df.to_json call as it appends seconds to the object, 
-    # see here: https://stackoverflow.com/questions/52730953/pandas-to-json-output-date-format-in-specific-form
-    for column_header in date_columns:
-        df[column_header] = df[column_header].dt.strftime('%Y-%m-%d %X')
-
-    # Third, we figure out which of the columns contain timedeltas, and 
-    # we format the timedeltas as strings to make them readable
-    for column_header in timedelta_columns:
-        df[column_header] = df[column_header].apply(lambda x: str(x))
-
-    # Then, we check the index. If it is a datetime or a timedelta, we have to do
-    # the same conversions that we did above
-    # Then, if we have a datetime index, we update the index to be jsonified better
-    if isinstance(df.index, pd.DatetimeIndex):
-        df.index = df.index.strftime('%Y-%m-%d %X')
-    elif isinstance(df.index, pd.TimedeltaIndex):
-        df.index = df.index.to_series().apply(lambda x: str(x))
-
-    json_obj = json.loads(df.to_json(orient="split"))
-    # Then, we go through and find all the null values (which are infinities),
-    # and set them to 'NaN' for display in the frontend.
-    for d in json_obj['data']:
-        for idx, e in enumerate(d):
-            if e is None:
-                d[idx] = 'NaN'
+    # We let pandas write the column headers, so that headers that cannot 
+    # be turned into json error here, as they always have
+    json_obj = json.loads(df.head(0).to_json(orient="split"))
+
+    column_data = [get_column_json_values(df.iloc[:, column_index]) for column_index in range(df.shape[1])]
+    json_obj['index'] = get_index_json_values(df.index)
+    json_obj['data'] = [list(row) for row in zip(*column_data)] if len(column_data) > 0 else [[] for _ in range(len(df))]
 
     return json_obj
 
@@ -395,6 +424,14 @@ def is_snowflake_connector_python_installed() -> bool:
         return False
 
 
+def is_pyarrow_installed() -> bool:
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
 def is_snowflake_credentials_available() -> bool:
     PYTEST_SNOWFLAKE_USERNAME = os.getenv('PYTEST_SNOWFLAKE_USERNAME')
     PYTEST_SNOWFLAKE_PASSWORD = os.getenv('PYTEST_SNOWFLAKE_PASSWORD')
@@ -431,4 +468,11 @@ def check_valid_sheet_functions(
         # Check the name is all caps
         if not sheet_function.__name__.isupper():
             raise ValueError(f"sheet_functions must be a list of functions, but got {sheet_function} which has a name that is not all caps. Please use a named function instead.")
-    
\ No newline at end of file
+    
+
+
+def remove_file_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
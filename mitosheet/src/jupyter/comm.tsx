@@ -40,7 +40,8 @@ import {
     MitoResponse,
     MAX_WAIT_FOR_SEND_CREATION, SendFunction, SendFunctionError, SendFunctionReturnType,
     waitUntilConditionReturnsTrueOrTimeout,
-    isInJupyterLab, isInJupyterNotebook
+    isInJupyterLab, isInJupyterNotebook,
+    getBytes
 } from "../mito";
 import { getAnalysisDataFromString, getSheetDataArrayFromString, getUserProfileFromString } from "./jupyterUtils";
 
@@ -240,7 +241,18 @@ export async function getCommSend(kernelID: string, commTargetID: string): Promi
     const unconsumedResponses = getCommSend.unconsumedResponses || (getCommSend.unconsumedResponses = []);
 
     function receiveResponse(rawResponse: Record<string, unknown>): void {
-        unconsumedResponses.push((rawResponse as any).content.data as MitoResponse);
+        const response = (rawResponse as any).content.data as MitoResponse;
+
+        // Binary buffers are sent alongside the response rather than inside it, 
+        // so we put them back on the sheet data, or on the result of the API call
+        const buffers = (rawResponse as any).buffers as (ArrayBuffer | DataView)[] | undefined;
+        if (buffers !== undefined && buffers.length > 0 && response.event === 'response' && response.shared_variables !== undefined) {
+            response.shared_variables.sheet_data_buffers = buffers.map(getBytes);
+        } else if (buffers !== undefined && buffers.length > 0 && response.event !== 'error' && typeof response.data === 'object' && response.data !== null) {
+            (response.data as Record<string, unknown>)['buffer'] = buffers[0];
+        }
+
+        unconsumedResponses.push(response);
     }
 
     function getResponseData<ResultType> (id: string, maxRetries = MAX_RETRIES): Promise<SendFunctionReturnType<ResultType>> {
@@ -285,7 +297,7 @@ export async function getCommSend(kernelID: string, commTargetID: string): Promi
                     const sharedVariables = response.shared_variables;
                     
                     return resolve({
-                        sheetDataArray: sharedVariables ? getSheetDataArrayFromString(sharedVariables.sheet_data_json) : undefined,
+                        sheetDataArray: sharedVariables ? getSheetDataArrayFromString(sharedVariables.sheet_data_json, sharedVariables.sheet_data_buffers) : undefined,
                         analysisData: sharedVariables ? getAnalysisDataFromString(sharedVariables.analysis_data_json) : undefined,
                         userProfile: sharedVariables ? getUserProfileFromString(sharedVariables.user_profile_json) : undefined,
                         result: response['data'] as ResultType
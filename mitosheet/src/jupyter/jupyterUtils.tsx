@@ -20,7 +20,8 @@ import {
     convertBackendtoFrontendGraphParams,
     AnalysisData, GraphDataBackend, GraphDataDict, GraphParamsBackend, PublicInterfaceVersion, SheetData, UserProfile,
     MitoAPI,
-    isInJupyterLab, isInJupyterNotebook
+    isInJupyterLab, isInJupyterNotebook,
+    readColumnBuffers
 } from "../mito"
 import { notebookGetArgs, notebookOverwriteAnalysisToReplayToMitosheetCall, notebookWriteAnalysisToReplayToMitosheetCall, notebookWriteCodeSnippetCell, notebookWriteGeneratedCodeToCell } from "./notebook/extensionUtils"
 
@@ -101,11 +102,15 @@ export const getArgs = (analysisToReplayName: string | undefined): Promise<strin
 
 
 
-export const getSheetDataArrayFromString = (sheet_data_json: string): SheetData[] => {
+/**
+ * Parses the sheet data json, reading the values of any columns that were sent in
+ * the buffer of their sheet, rather than in the json, from sheetDataBuffers.
+ */
+export const getSheetDataArrayFromString = (sheet_data_json: string, sheetDataBuffers?: Uint8Array[]): SheetData[] => {
     if (sheet_data_json.length === 0) {
         return []
     }
-    return JSON.parse(sheet_data_json);
+    return readColumnBuffers(JSON.parse(sheet_data_json), sheetDataBuffers);
 }
 
 export const getUserProfileFromString = (user_profile_json: string): UserProfile => {
@@ -1,21 +1,24 @@
 import * as React from 'react'
 import ReactDOM from 'react-dom';
-import { Mito } from './mito';
+import { getBase64Bytes, Mito } from './mito';
 import { getAnalysisDataFromString, getArgs, getSheetDataArrayFromString, getUserProfileFromString, overwriteAnalysisToReplayToMitosheetCall, writeAnalysisToReplayToMitosheetCall, writeCodeSnippetCell, writeGeneratedCodeToCell } from './jupyter/jupyterUtils';
 import { getCommSend } from './jupyter/comm';
 
-// We replace the following byte arrays with the real byte arrays of the utf8 encoded
+// We replace the following strings with the base64 encoding of the utf8 encoded
 // JSON for the sheet data array, etc. We pass this encoded because the JSON parsing
-// when we don't gets really complicated trying to replace \t, etc.
+// when we don't gets really complicated trying to replace \t, etc. The numeric columns 
+// of the sheet data are not in the JSON, but in the buffer of each sheet, which we 
+// also pass as base64.
 // Do not edit the following lines without updating the get_mito_frontend_code which searches 
 // for this code exactly to replace it.
-const sheetDataBytes = new Uint8Array(['REPLACE_THIS_WITH_SHEET_DATA_BYTES' as unknown as number]);
-const analysisDataBytes = new Uint8Array(['REPLACE_THIS_WITH_ANALYSIS_DATA_BYTES' as unknown as number]);
-const userProfileBytes = new Uint8Array(['REPLACE_THIS_WITH_USER_PROFILE_BYTES' as unknown as number]);
+const sheetDataBase64 = 'REPLACE_THIS_WITH_SHEET_DATA_BASE64';
+const sheetDataBuffersBase64 = ['REPLACE_THIS_WITH_SHEET_DATA_BUFFERS_BASE64'];
+const analysisDataBase64 = 'REPLACE_THIS_WITH_ANALYSIS_DATA_BASE64';
+const userProfileBase64 = 'REPLACE_THIS_WITH_USER_PROFILE_BASE64';
 
-const sheetDataArray = getSheetDataArrayFromString(new TextDecoder().decode(sheetDataBytes));
-const analysisData = getAnalysisDataFromString(new TextDecoder().decode(analysisDataBytes));
-const userProfile = getUserProfileFromString(new TextDecoder().decode(userProfileBytes));
+const sheetDataArray = getSheetDataArrayFromString(new TextDecoder().decode(getBase64Bytes(sheetDataBase64)), sheetDataBuffersBase64.map(getBase64Bytes));
+const analysisData = getAnalysisDataFromString(new TextDecoder().decode(getBase64Bytes(analysisDataBase64)));
+const userProfile = getUserProfileFromString(new TextDecoder().decode(getBase64Bytes(userProfileBase64)));
 
 // We create a distinct comm channel for each Mito instance, so that they can 
 // each communicate with the backend seperately. We replace these values when
@@ -14,7 +14,8 @@ import { convertFrontendtoBackendGraphParams } from "../components/taskpanes/Gra
 import { AvailableSnowflakeOptionsAndDefaults, SnowflakeCredentials, SnowflakeTableLocationAndWarehouse } from "../components/taskpanes/SnowflakeImport/SnowflakeImportTaskpane";
 import { SplitTextToColumnsParams } from "../components/taskpanes/SplitTextToColumns/SplitTextToColumnsTaskpane";
 import { StepImportData } from "../components/taskpanes/UpdateImports/UpdateImportsTaskpane";
-import { AnalysisData, BackendPivotParams, CodeOptions, CodeSnippetAPIResult, ColumnID, DataframeFormat, FeedbackID, FilterGroupType, FilterType, FormulaLocation, GraphID, GraphParamsFrontend, ParameterizableParams, SheetData, UIState, UserProfile } from "../types";
+import { AnalysisData, BackendPivotParams, CodeOptions, CodeSnippetAPIResult, ColumnID, DataframeFormat, ExportDownloadChunk, FeedbackID, FilterGroupType, FilterType, FormulaLocation, GraphID, GraphParamsFrontend, ParameterizableParams, SheetData, SheetWindow, UIState, UserProfile } from "../types";
+import { getBufferBytes } from "../utils/columnBuffers";
 import { SendFunction, SendFunctionErrorReturnType, SendFunctionSuccessReturnType } from "./send";
 
 
@@ -66,7 +67,11 @@ interface MitoSuccessOrInplaceErrorResponse {
     'shared_variables'?: {
         'sheet_data_json': string,
         'analysis_data_json': string,
-        'user_profile_json': string
+        'user_profile_json': string,
+        // The buffers of the sheets in the sheet data json, as they are sent with the
+        // response in jupyter, or as base64 in streamlit
+        'sheet_data_buffers'?: Uint8Array[],
+        'sheet_data_buffers_base64'?: string[]
     }
     'data': unknown
 }
@@ -239,33 +244,71 @@ export class MitoAPI {
 
 
     /*
-        Returns a string encoding of the CSV file to download
+        Downloads a file that the backend writes, one chunk at a time, so that 
+        no single response is too large. Calls onProgress with the fraction of 
+        the file that has been downloaded after each chunk.
+
+        Returns undefined if a later download superseded this one.
     */
-    async getDataframeAsCSV(sheetIndex: number): Promise<MitoAPIResult<string>> {
-        return await this.send<string>({
-            'event': 'api_call',
-            'type': 'get_dataframe_as_csv',
-            'params': {
-                'sheet_index': sheetIndex
-            },
-        })
+    async _getExportDownload(
+        type: string,
+        params: Record<string, unknown>,
+        blobType: string,
+        onProgress?: (progress: number) => void
+    ): Promise<MitoAPIResult<Blob | undefined>> {
+        const chunks: Uint8Array[] = [];
+        let downloadID: string | undefined = undefined;
+        let numChunks = 1;
+
+        for (let chunkIndex = 0; chunkIndex < numChunks; chunkIndex++) {
+            const response: MitoAPIResult<ExportDownloadChunk | null> = await this.send<ExportDownloadChunk | null>({
+                'event': 'api_call',
+                'type': type,
+                'params': {
+                    ...params,
+                    'download_id': downloadID,
+                    'chunk_index': chunkIndex
+                },
+            })
+
+            if ('error' in response) {
+                return response;
+            }
+            if (response.result === null) {
+                return {result: undefined};
+            }
+
+            downloadID = response.result.download_id;
+            numChunks = response.result.num_chunks;
+            chunks.push(getBufferBytes(response.result) ?? new Uint8Array());
+            onProgress?.((chunkIndex + 1) / numChunks);
+        }
+
+        return {result: new Blob(chunks, {type: blobType})};
     }
 
     /*
-        Returns a string encoding of the excel file to download
+        Returns the CSV file to download
+    */
+    async getDataframeAsCSV(sheetIndex: number, onProgress?: (progress: number) => void): Promise<MitoAPIResult<Blob | undefined>> {
+        return await this._getExportDownload(
+            'get_dataframe_as_csv',
+            {'sheet_index': sheetIndex},
+            'text/csv',
+            onProgress
+        );
+    }
 
-        See the download taskpane to how to use this string, but it
-        must be decoded from base64, and then turned into bytes
-        before it can be downloaded
+    /*
+        Returns the excel file to download
     */
-    async getDataframesAsExcel(sheetIndexes: number[]): Promise<MitoAPIResult<string>> {
-        return await this.send<string>({
-            'event': 'api_call',
-            'type': 'get_dataframe_as_excel',
-            'params': {
-                'sheet_indexes': sheetIndexes
-            },
-        });
+    async getDataframesAsExcel(sheetIndexes: number[], onProgress?: (progress: number) => void): Promise<MitoAPIResult<Blob | undefined>> {
+        return await this._getExportDownload(
+            'get_dataframe_as_excel',
+            {'sheet_indexes': sheetIndexes},
+            'text/csv', // TODO: for some reason, text/csv works fine here
+            onProgress
+        );
     }
 
 
@@ -280,8 +323,9 @@ export class MitoAPI {
         column_id: ColumnID,
         height?: string,
         width?: string,
-    ): Promise<MitoAPIResult<GraphObject>> {
-        return await this.send<GraphObject>({
+    ): Promise<MitoAPIResult<GraphObject | null>> {
+        // NOTE: if a later call for this column supersedes this one, the result is null
+        return await this.send<GraphObject | null>({
             'event': 'api_call',
             'type': 'get_column_summary_graph',
             'params': {
@@ -299,8 +343,9 @@ export class MitoAPI {
         Returns a list of the key, values that is returned by .describing 
         this column
     */
-    async getColumnDescribe(sheetIndex: number, columnID: ColumnID): Promise<MitoAPIResult<Record<string, string>>> {
-        return await this.send<Record<string, string>>({
+    async getColumnDescribe(sheetIndex: number, columnID: ColumnID): Promise<MitoAPIResult<Record<string, string> | null>> {
+        // NOTE: if a later call for this column supersedes this one, the result is null
+        return await this.send<Record<string, string> | null>({
             'event': 'api_call',
             'type': 'get_column_describe',
             'params': {
@@ -385,8 +430,9 @@ export class MitoAPI {
         columnID: ColumnID,
         searchString: string,
         sort: UniqueValueSortType,
-    ): Promise<MitoAPIResult<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean }>> {
-        return await this.send<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean }>({
+    ): Promise<MitoAPIResult<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean } | null>> {
+        // NOTE: if a later search for this column supersedes this one, the result is null
+        return await this.send<{ uniqueValueRowDataArray: (string | number | boolean)[][], isAllData: boolean } | null>({
             'event': 'api_call',
             'type': 'get_unique_value_counts',
             'params': {
@@ -511,6 +557,26 @@ export class MitoAPI {
         })
     }
 
+    async getSheetWindow(
+        sheetIndex: number,
+        rowStart: number,
+        rowEnd: number,
+        columnStart: number,
+        columnEnd: number
+    ): Promise<MitoAPIResult<SheetWindow>> {
+        return await this.send<SheetWindow>({
+            'event': 'api_call',
+            'type': 'get_sheet_window',
+            'params': {
+                'sheet_index': sheetIndex,
+                'row_start': rowStart,
+                'row_end': rowEnd,
+                'column_start': columnStart,
+                'column_end': columnEnd
+            }
+        })
+    }
+
     // AUTOGENERATED LINE: API GET (DO NOT DELETE)
 
 
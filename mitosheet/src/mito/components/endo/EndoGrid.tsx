@@ -2,7 +2,7 @@ import React, { useCallback, useEffect, useMemo, useRef, useState } from "react"
 import '../../../../css/endo/EndoGrid.css';
 import '../../../../css/sitewide/colors.css';
 import { MitoAPI } from "../../api/api";
-import { EditorState, Dimension, GridState, RendererTranslate, SheetData, SheetView, UIState, MitoSelection, AnalysisData } from "../../types";
+import { EditorState, Dimension, GridState, RendererTranslate, SheetData, SheetView, UIState, MitoSelection, AnalysisData, SheetWindow } from "../../types";
 import FormulaBar from "./FormulaBar";
 import { TaskpaneType } from "../taskpanes/taskpanes";
 import { getCellEditorInputCurrentSelection, getStartingFormula } from "./celleditor/cellEditorUtils";
@@ -13,6 +13,7 @@ import GridData from "./GridData";
 import IndexHeaders from "./IndexHeaders";
 import { equalSelections, getColumnIndexesInSelections, getIndexesFromMouseEvent, getIsCellSelected, getIsHeader, getNewSelectionAfterKeyPress, getNewSelectionAfterMouseUp, getSelectedRowLabelsWithEntireSelectedRow, isNavigationKeyPressed, isSelectionsOnlyColumnHeaders, isSelectionsOnlyIndexHeaders, reconciliateSelections, removeColumnFromSelections } from "./selectionUtils";
 import { calculateCurrentSheetView, calculateNewScrollPosition, calculateTranslate} from "./sheetViewUtils";
+import { getRenderedRows, getSheetDataWithWindow, getSheetWindowRowsToFetch } from "./sheetWindowUtils";
 import { firstNonNullOrUndefined, getColumnIDsArrayFromSheetDataArray } from "./utils";
 import { ensureCellVisible } from "./visibilityUtils";
 import { reconciliateWidthDataArray } from "./widthUtils";
@@ -24,7 +25,8 @@ export const DEFAULT_WIDTH = 123;
 export const DEFAULT_HEIGHT = 25;
 export const MIN_WIDTH = 50;
 
-// The maximum number of rows sent in the sheet data by the backend
+// The maximum number of rows sent in the sheet data by the backend. Rows
+// after these are fetched in a sheet window when the user scrolls to them
 export const MAX_ROWS = 1500;
 
 
@@ -114,15 +116,62 @@ function EndoGrid(props: {
 
     const sheetData = sheetDataArray[sheetIndex];
 
+    // The rows after the first MAX_ROWS that the user has scrolled to, which are fetched
+    // from the backend. It is only used while it is for the current sheetData
+    const [sheetWindow, setSheetWindow] = useState<{sheetData: SheetData, sheetWindow: SheetWindow} | undefined>(undefined);
+    const currentSheetWindow = sheetWindow !== undefined && sheetWindow.sheetData === sheetData ? sheetWindow.sheetWindow : undefined;
+    // The window that is being fetched, so that we don't fetch the same window many times while scrolling
+    const fetchingSheetWindowRef = useRef<{sheetData: SheetData, rowStart: number, rowEnd: number} | undefined>(undefined);
+
+    const sheetDataWithWindow = useMemo(() => {
+        return getSheetDataWithWindow(sheetData, currentSheetWindow);
+    }, [sheetData, currentSheetWindow])
+
     const totalSize: Dimension = {
         width: gridState.widthDataArray[gridState.sheetIndex]?.totalWidth || 0,
-        height: DEFAULT_HEIGHT * Math.min(sheetData?.numRows || 0, MAX_ROWS)
+        height: DEFAULT_HEIGHT * (sheetData?.numRows || 0)
     }
     
     const currentSheetView: SheetView = useMemo(() => {
         return calculateCurrentSheetView(gridState)
     }, [gridState])
 
+    /* 
+        An effect that fetches the rows the user has scrolled to, when they are not in 
+        the sheet data or the current sheet window.
+    */
+    useEffect(() => {
+        const rowsToFetch = getSheetWindowRowsToFetch(sheetData, currentSheetView, currentSheetWindow);
+        if (sheetData === undefined || rowsToFetch === undefined) {
+            return;
+        }
+
+        // If the window that is being fetched has the rendered rows, we wait for it
+        const [rowStart, rowEnd] = rowsToFetch;
+        const [renderedRowStart, renderedRowEnd] = getRenderedRows(sheetData, currentSheetView);
+        const fetchingSheetWindow = fetchingSheetWindowRef.current;
+        if (fetchingSheetWindow !== undefined && fetchingSheetWindow.sheetData === sheetData && fetchingSheetWindow.rowStart <= renderedRowStart && renderedRowEnd <= fetchingSheetWindow.rowEnd) {
+            return;
+        }
+
+        const newFetchingSheetWindow = {sheetData: sheetData, rowStart: rowStart, rowEnd: rowEnd};
+        fetchingSheetWindowRef.current = newFetchingSheetWindow;
+
+        const loadSheetWindow = async () => {
+            const response = await mitoAPI.getSheetWindow(sheetIndex, rowStart, rowEnd, 0, sheetData.data.length);
+            // Only use the most recently requested window. It is not displayed if the sheet data has changed since
+            if (fetchingSheetWindowRef.current !== newFetchingSheetWindow) {
+                return;
+            }
+            fetchingSheetWindowRef.current = undefined;
+            if ('error' in response) {
+                return;
+            }
+            setSheetWindow({sheetData: sheetData, sheetWindow: response.result});
+        }
+        void loadSheetWindow();
+    }, [sheetData, sheetIndex, currentSheetView, currentSheetWindow, mitoAPI])
+
     const translate: RendererTranslate = useMemo(() => {
         return calculateTranslate(gridState);
     }, [gridState])
@@ -628,7 +677,7 @@ function EndoGrid(props: {
     return (
         <>
             <FormulaBar
-                sheetData={sheetData}
+                sheetData={sheetDataWithWindow}
                 selection={gridState.selections[gridState.selections.length - 1]}
                 sheetIndex={props.sheetIndex}
                 editorState={editorState}
@@ -669,7 +718,7 @@ function EndoGrid(props: {
                             closeOpenEditingPopups={props.closeOpenEditingPopups}
                         />
                         <IndexHeaders
-                            sheetData={sheetData}
+                            sheetData={sheetDataWithWindow}
                             gridState={gridState}
                             mitoAPI={mitoAPI}
                             closeOpenEditingPopups={props.closeOpenEditingPopups}
@@ -718,7 +767,7 @@ function EndoGrid(props: {
                         }}
                     >
                         <GridData
-                            sheetData={sheetData}
+                            sheetData={sheetDataWithWindow}
                             gridState={gridState}
                             uiState={uiState}
                             editorState={editorState}
@@ -728,7 +777,7 @@ function EndoGrid(props: {
                 </div>
                 {sheetData !== undefined && editorState !== undefined && editorState.editorLocation === 'cell' && editorState.rowIndex > -1 &&
                     <FloatingCellEditor
-                        sheetData={sheetData}
+                        sheetData={sheetDataWithWindow}
                         sheetIndex={sheetIndex}
                         gridState={gridState}
                         editorState={editorState}
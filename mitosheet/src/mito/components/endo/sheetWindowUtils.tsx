@@ -0,0 +1,95 @@
+import { SheetData, SheetView, SheetWindow } from "../../types";
+
+// The number of rows above and below the rendered rows that we fetch in a window,
+// so that scrolling a bit does not need a new window
+export const SHEET_WINDOW_ROW_PADDING = 500;
+
+
+/*
+    Returns the [rowStart, rowEnd) of the rows that are rendered in the current sheet view.
+*/
+export const getRenderedRows = (sheetData: SheetData, currentSheetView: SheetView): [number, number] => {
+    const renderedRowStart = Math.max(currentSheetView.startingRowIndex, 0);
+    const renderedRowEnd = Math.min(renderedRowStart + currentSheetView.numRowsRendered, sheetData.numRows);
+    return [renderedRowStart, renderedRowEnd];
+}
+
+
+/*
+    Returns the [rowStart, rowEnd) of the window that should be fetched so that
+    the rendered rows can be displayed, or undefined if all of these rows are
+    already in the sheet data or in the current window.
+*/
+export const getSheetWindowRowsToFetch = (
+    sheetData: SheetData | undefined,
+    currentSheetView: SheetView,
+    sheetWindow: SheetWindow | undefined,
+): [number, number] | undefined => {
+    if (sheetData === undefined || currentSheetView.numRowsRendered <= 0) {
+        return undefined;
+    }
+
+    const [renderedRowStart, renderedRowEnd] = getRenderedRows(sheetData, currentSheetView);
+
+    // The sheet data has the first MAX_ROWS rows of the sheet
+    if (renderedRowEnd <= sheetData.index.length) {
+        return undefined;
+    }
+
+    if (sheetWindow !== undefined && sheetWindow.rowStart <= renderedRowStart && renderedRowEnd <= sheetWindow.rowEnd) {
+        return undefined;
+    }
+
+    return [
+        Math.max(renderedRowStart - SHEET_WINDOW_ROW_PADDING, 0),
+        Math.min(renderedRowEnd + SHEET_WINDOW_ROW_PADDING, sheetData.numRows)
+    ];
+}
+
+
+/*
+    Returns the sheet data with the rows in the sheet window added to it at their
+    row indexes, so that the grid can read the cells in the window the same way it
+    reads the rest of the cells in the sheet data.
+*/
+export const getSheetDataWithWindow = (sheetData: SheetData, sheetWindow: SheetWindow | undefined): SheetData => {
+    if (sheetWindow === undefined) {
+        return sheetData;
+    }
+
+    const index = [...sheetData.index];
+    sheetWindow.index.forEach((indexLabel, windowRowIndex) => {
+        index[sheetWindow.rowStart + windowRowIndex] = indexLabel;
+    })
+
+    const data = sheetData.data.map((columnData, columnIndex) => {
+        const windowColumnData = sheetWindow.data[columnIndex - sheetWindow.columnStart];
+        if (windowColumnData === undefined || windowColumnData.columnID !== columnData.columnID) {
+            return columnData;
+        }
+
+        const newColumnData = [...columnData.columnData];
+        windowColumnData.columnData.forEach((cellData, windowRowIndex) => {
+            newColumnData[sheetWindow.rowStart + windowRowIndex] = cellData;
+        })
+        return {
+            ...columnData,
+            columnData: newColumnData
+        }
+    })
+
+    const results = {...sheetData.conditionalFormattingResult.results};
+    Object.entries(sheetWindow.conditionalFormattingResult.results).forEach(([columnID, windowResults]) => {
+        results[columnID] = {...results[columnID], ...windowResults};
+    })
+
+    return {
+        ...sheetData,
+        data: data,
+        index: index,
+        conditionalFormattingResult: {
+            ...sheetData.conditionalFormattingResult,
+            results: results
+        }
+    }
+}
@@ -2,7 +2,8 @@
 
 import React, { useState, useEffect } from 'react';
 import { MitoAPI } from '../../../../api/api';
-import { ColumnID } from '../../../../types';
+import { ColumnID, PlotlyFigureJSON } from '../../../../types';
+import PlotlyFigure from '../../Graph/PlotlyFigure';
 
 type ColumnSummaryGraphProps = {
     selectedSheetIndex: number;
@@ -12,9 +13,10 @@ type ColumnSummaryGraphProps = {
 
 // The response from the backend should include each of these components
 export interface GraphObject {
-    html: string;
-    script: string;
-    generation_code: string;
+    figure: PlotlyFigureJSON;
+    plotly_js: string | null; // plotly.js, if it was not loaded on the page
+    height: string;
+    width: string;
 }
 
 
@@ -31,36 +33,30 @@ function ColumnSummaryGraph(props: ColumnSummaryGraphProps): JSX.Element {
             '350px',
             '100%',
         );
-        const _graphHTMLAndScript = 'error' in response ? undefined : response.result
-        setGraphObj(_graphHTMLAndScript);
+        const _graphObj = 'error' in response ? undefined : response.result
+
+        // If a later call for this column superseded this one, the backend cancels it and 
+        // returns null, and we leave the graph to the later call
+        if (_graphObj === null) {
+            return;
+        }
+        setGraphObj(_graphObj);
     }
 
     useEffect(() => {
         void loadBase64PNGImage();
     }, [])
 
-    // When we get a new graph script, we execute it here. This is a workaround
-    // that is required because we need to make sure this code runs, which it does
-    // not when it is a script tag inside innerHtml (which react does not execute
-    // for safety reasons).
-    useEffect(() => {
-        if (graphObj === undefined) {
-            return;
-        }
-        try {
-            const executeScript = new Function(graphObj.script);
-            executeScript()
-        } catch (e) {
-            console.error("Failed to execute graph function", e)
-        }
-
-    }, [graphObj])
-
     return (
         <React.Fragment>
 
             {graphObj !== undefined &&
-                <div dangerouslySetInnerHTML={{ __html: graphObj.html }} />
+                <PlotlyFigure
+                    figure={graphObj.figure}
+                    plotlyJS={graphObj.plotly_js}
+                    height={graphObj.height}
+                    width={graphObj.width}
+                />
             }
             {graphObj === undefined &&
                 <div>
@@ -45,7 +45,12 @@ function ColumnSummaryStatistics(props: ColumnDescribeChartProps): JSX.Element {
                 props.selectedSheetIndex, 
                 props.columnID
             );
-            return 'error' in response ? undefined : response.result;
+            // If a later call for this column superseded this one, the backend cancels it and 
+            // returns null, and we leave the statistics to the later call
+            if ('error' in response || response.result === null) {
+                return undefined;
+            }
+            return response.result;
         },
         undefined,
         []
@@ -121,6 +121,12 @@ export function ValuesTab(
         );
         const uniqueValueCountsObj = 'error' in response ? undefined : response.result;
 
+        // If a later search superseded this one, the backend cancels it and returns null,
+        // and we leave the values to the later search
+        if (uniqueValueCountsObj === null) {
+            return undefined;
+        }
+
         if (uniqueValueCountsObj === undefined) {
             setUniqueValueCounts([])
             setLoading(false);
@@ -36,8 +36,8 @@ interface DownloadTaskpaneProps {
     A taskpane that allows a user to download their current sheet.
 
     It does this by:
-    1. Getting a string representation of the sheet through the api
-    2. Encoding that as a file
+    1. Getting the file from the api, one chunk at a time
+    2. Turning the chunks into a Blob
     3. Allowing the user to download that file
 
     To see more about this process, read documentation here: 
@@ -61,6 +61,8 @@ const DownloadTaskpane = (props: DownloadTaskpaneProps): JSX.Element => {
     
     // The string that stores the file that actually should be downloaded
     const [exportHRef, setExportHref] = useState<string>('');
+    // The fraction of the file that has been sent from the backend so far
+    const [exportProgress, setExportProgress] = useState<number>(0);
     
     const emptySheet = props.sheetDataArray.length === 0;
     const numRows = props.sheetDataArray[props.selectedSheetIndex]?.numRows;
@@ -71,30 +73,27 @@ const DownloadTaskpane = (props: DownloadTaskpaneProps): JSX.Element => {
             return;
         }
 
+        let response;
         if (props.uiState.exportConfiguration.exportType === 'csv') {
-            const response = await props.mitoAPI.getDataframeAsCSV(props.selectedSheetIndex);
-            const csvString = 'error' in response ? '' : response.result;
-            setExportHref(URL.createObjectURL(new Blob(
-                [ csvString ],
-                { type: 'text/csv' }
-            )));
+            response = await props.mitoAPI.getDataframeAsCSV(props.selectedSheetIndex, setExportProgress);
         } else if (props.uiState.exportConfiguration.exportType === 'excel') {
-            const response = await props.mitoAPI.getDataframesAsExcel((props.uiState.exportConfiguration as ExcelExportState).sheetIndexes);
-            const excelString = 'error' in response ? '' : response.result;
-            setExportHref(URL.createObjectURL(new Blob(
-                /* 
-                    First, we convert the export string out of base 64 encoding, 
-                    and the convert it back into bytes
-                */
-                [ Uint8Array.from(window.atob(excelString), c => c.charCodeAt(0)) ],
-                { type: 'text/csv' } // TODO: for some reason, text/csv works fine here
-            )));
+            response = await props.mitoAPI.getDataframesAsExcel((props.uiState.exportConfiguration as ExcelExportState).sheetIndexes, setExportProgress);
+        }
+
+        if (response === undefined) {
+            return;
+        } else if ('error' in response) {
+            setExportHref(URL.createObjectURL(new Blob([])));
+        } else if (response.result !== undefined) {
+            // The result is undefined if a later export superseded this one, and so that export sets the href
+            setExportHref(URL.createObjectURL(response.result));
         }
     }
 
     // Async load in the data from the mitoAPI
     useDebouncedEffect(() => {
         setExportHref('');
+        setExportProgress(0);
         void loadExport();
     }, [props.uiState.exportConfiguration, props.selectedSheetIndex, props.sheetDataArray], 500)
 
@@ -227,8 +226,8 @@ const DownloadTaskpane = (props: DownloadTaskpaneProps): JSX.Element => {
                     This is the fix for a bug where the user was able to click download before the dataframeCSV 
                     data was populated by the API call, resulting in an empty csv file. 
 
-                    Given the dataframe as a string, this encodes this string as a Blob (which
-                    is pretty much a file), then creates a ObjectURL for that Blob. I don't know 
+                    Given the file as a Blob (which
+                    is pretty much a file), this creates a ObjectURL for that Blob. I don't know 
                     why or how, but this makes it so clicking on this downloads the dataframe.
 
                     For more information, see the blog post linked at the top of this file.
@@ -241,7 +240,7 @@ const DownloadTaskpane = (props: DownloadTaskpaneProps): JSX.Element => {
                     download={exportName}
                     onClick={onDownload}
                 >
-                    {exportHRef === '' ? (<>Preparing data for download <LoadingDots /></>) : `Download ${props.uiState.exportConfiguration.exportType === 'csv' ? 'CSV file': 'Excel workbook'}`}
+                    {exportHRef === '' ? (<>Preparing data for download{exportProgress > 0 ? ` (${Math.round(exportProgress * 100)}%)` : ''} <LoadingDots /></>) : `Download ${props.uiState.exportConfiguration.exportType === 'csv' ? 'CSV file': 'Excel workbook'}`}
                 </TextButton>
             </DefaultTaskpaneFooter>
         </DefaultTaskpane>
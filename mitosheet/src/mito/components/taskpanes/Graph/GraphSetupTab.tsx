@@ -33,11 +33,11 @@ export enum GraphType {
 // Graphing a dataframe with more than this number of rows will
 // give the user the option to apply the safety filter
 // Note: This must be kept in sync with the graphing heuristic in the mitosheet/graph folder
-export const GRAPH_SAFETY_FILTER_CUTOFF = 1000;
+export const GRAPH_SAFETY_FILTER_CUTOFF = 10000;
 
 // Tooltips used to explain the Safety filter toggle
-const SAFETY_FILTER_DISABLED_MESSAGE = `Because you’re graphing less than ${GRAPH_SAFETY_FILTER_CUTOFF} rows of data, you can safely graph your data without applying a filter first.`
-const SAFETY_FILTER_ENABLED_MESSAGE = `Turning on Limit ${GRAPH_SAFETY_FILTER_CUTOFF} rows only graphs the first ${GRAPH_SAFETY_FILTER_CUTOFF} rows of your dataframe, ensuring that your browser tab won’t crash. Turning it off graphs the entire dataframe and may slow or crash your browser tab.`
+const SAFETY_FILTER_DISABLED_MESSAGE = `Because you’re graphing less than ${GRAPH_SAFETY_FILTER_CUTOFF} rows of data, you can safely graph all of your data without downsampling it first.`
+const SAFETY_FILTER_ENABLED_MESSAGE = `Turning on Downsample data graphs about ${GRAPH_SAFETY_FILTER_CUTOFF} points that keep the shape of your data, such as the peaks of lines and the outliers of scatter plots, and bins histograms before graphing them, ensuring that your browser tab won’t crash. Turning it off graphs the entire dataframe and may slow or crash your browser tab.`
 
 const GRAPHS_THAT_DONT_SUPPORT_COLOR = [GraphType.DENSITY_HEATMAP]
 
@@ -312,7 +312,7 @@ function GraphSetupTab(
                     title={getDefaultSafetyFilter(props.sheetDataArray, graphSheetIndex) ? SAFETY_FILTER_ENABLED_MESSAGE : SAFETY_FILTER_DISABLED_MESSAGE}>
                     <Col>
                         <LabelAndTooltip tooltip={getDefaultSafetyFilter(props.sheetDataArray, graphSheetIndex) ? SAFETY_FILTER_ENABLED_MESSAGE : SAFETY_FILTER_DISABLED_MESSAGE}>
-                            {`Limit ${GRAPH_SAFETY_FILTER_CUTOFF} rows`}
+                            Downsample data
                         </LabelAndTooltip>
                     </Col>
                     <Col>
@@ -18,6 +18,7 @@ import XIcon from '../../icons/XIcon';
 import GraphStyleTab from './GraphStyleTab';
 import GraphSetupTab from './GraphSetupTab';
 import GraphExportTab from './GraphExportTab';
+import PlotlyFigure from './PlotlyFigure';
 import { useEffectOnResizeElement } from '../../../hooks/useEffectOnElementResize';
 
 
@@ -126,23 +127,6 @@ const GraphSidebar = (props: {
     }, [graphUpdatedNumber], LOAD_GRAPH_TIMEOUT)
 
 
-    // When we get a new graph ouput, we execute the graph script here. This is a workaround
-    // that is required because we need to make sure this code runs, which it does
-    // not when it is a script tag inside innerHtml (which react does not execute
-    // for safety reasons).
-    useEffect(() => {
-        try {
-            if (graphOutput === undefined) {
-                return;
-            }
-            const executeScript = new Function(graphOutput.graphScript);
-            executeScript()
-        } catch (e) {
-            console.error("Failed to execute graph function", e)
-        }
-
-    }, [graphOutput])
-
     /* 
         This is the actual function responsible for loading the new
         graph from the backend, making sure this graph is the correct
@@ -207,7 +191,12 @@ const GraphSidebar = (props: {
                         <p className='graph-sidebar-welcome-text text-align-center-important' >To generate a graph, select an axis.</p>
                     }
                     {graphOutput !== undefined &&
-                        <div dangerouslySetInnerHTML={{ __html: graphOutput.graphHTML }} />
+                        <PlotlyFigure
+                            figure={graphOutput.graphFigure}
+                            plotlyJS={graphOutput.graphPlotlyJS}
+                            height={graphOutput.graphHeight}
+                            width={graphOutput.graphWidth}
+                        />
                     }
                 </div>
                 <div className='graph-sidebar-toolbar-container'>
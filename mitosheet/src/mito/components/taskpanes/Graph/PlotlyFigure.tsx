@@ -0,0 +1,70 @@
+// Copyright (c) Mito
+
+import React, { useEffect, useRef } from 'react';
+import { PlotlyFigureJSON } from '../../../types';
+
+/*
+    Draws a plotly figure that the backend sends as json.
+
+    If plotly.js is not loaded on the page, the backend sends it along with the
+    figure, and we run it before drawing the figure. We draw with Plotly.react,
+    which only redraws the parts of the figure that changed, so restyling a
+    graph does not draw its traces again.
+*/
+const PlotlyFigure = (props: {
+    figure: PlotlyFigureJSON,
+    plotlyJS: string | null | undefined,
+    height: string,
+    width: string,
+}): JSX.Element => {
+    const graphDivRef = useRef<HTMLDivElement>(null);
+    const graphSizeRef = useRef({height: props.height, width: props.width});
+
+    useEffect(() => {
+        const graphDiv = graphDivRef.current;
+        if (graphDiv === null) {
+            return;
+        }
+        try {
+            if ((window as any).Plotly === undefined && props.plotlyJS) {
+                const loadPlotlyJS = new Function(props.plotlyJS);
+                loadPlotlyJS()
+            }
+            void (window as any).Plotly.react(graphDiv, props.figure.data, props.figure.layout, {responsive: true});
+        } catch (e) {
+            console.error("Failed to draw graph", e)
+        }
+    }, [props.figure])
+
+    // The graph fills its div, so we lay it out again when the div is resized
+    useEffect(() => {
+        const graphDiv = graphDivRef.current;
+        if (graphSizeRef.current.height === props.height && graphSizeRef.current.width === props.width) {
+            return;
+        }
+        graphSizeRef.current = {height: props.height, width: props.width};
+        if (graphDiv !== null && (window as any).Plotly !== undefined) {
+            void (window as any).Plotly.Plots.resize(graphDiv);
+        }
+    }, [props.height, props.width])
+
+    // Free the memory plotly uses for the graph once it is no longer shown
+    useEffect(() => {
+        const graphDiv = graphDivRef.current;
+        return () => {
+            if (graphDiv !== null && (window as any).Plotly !== undefined) {
+                (window as any).Plotly.purge(graphDiv);
+            }
+        }
+    }, [])
+
+    return (
+        <div
+            ref={graphDivRef}
+            className='plotly-graph-div'
+            style={{height: props.height, width: props.width}}
+        />
+    )
+}
+
+export default PlotlyFigure;
@@ -12,4 +12,6 @@ export { waitUntilConditionReturnsTrueOrTimeout } from "../mito/utils/time";
 export { convertBackendtoFrontendGraphParams } from "../mito/components/taskpanes/Graph/graphUtils"
 
 
-export { isInJupyterLab, isInJupyterNotebook } from './utils/location';
\ No newline at end of file
+export { isInJupyterLab, isInJupyterNotebook } from './utils/location';
+
+export { getBase64Bytes, getBytes, readColumnBuffers } from './utils/columnBuffers';
\ No newline at end of file
@@ -289,7 +289,7 @@ export type FrontendFormulaAndLocation = {
  * @param dfSource - the source of the dataframe
  * @param numRows - the number of rows in the data. Should be equal to data[0].length
  * @param numColumns - the number of columns in the data. Should be equal to data.length
- * @param data - a list of the columns to display in the sheet, including their id and header, their dtype, as well as a list of columnData (which is the actual data in this column)
+ * @param data - a list of the columns to display in the sheet, including their id and header, their dtype, as well as a list of columnData (which is the actual data in this column). Numeric columns can instead be sent in the buffer of the sheet, in which case they have a columnBuffer until they are read into their columnData
  * @param columnIDsMap - for this dataframe, a map from column id -> column headers
  * @param columnFormulasMap - for this dataframe, a map from column id -> spreadsheet formula
  * @param columnFiltersMap - for this dataframe, a map from column id -> filter objects
@@ -305,6 +305,7 @@ export type SheetData = {
         columnID: ColumnID;
         columnHeader: ColumnHeader;
         columnDtype: string;
+        columnBuffer?: ColumnBuffer;
         columnData: (string | number | boolean)[];
     }[];
     columnIDsMap: ColumnIDsMap;
@@ -316,6 +317,63 @@ export type SheetData = {
     conditionalFormattingResult: ConditionalFormattingResult;
 };
 
+/**
+ * A window of the data in a sheet, for displaying rows and columns beyond those in the SheetData.
+ * 
+ * @param sheetIndex - the sheet this window is from
+ * @param numRows - the number of rows in the entire sheet
+ * @param numColumns - the number of columns in the entire sheet
+ * @param rowStart - the first row in this window
+ * @param rowEnd - the row after the last row in this window
+ * @param columnStart - the first column in this window
+ * @param columnEnd - the column after the last column in this window
+ * @param data - the columns in this window, in the same format as the SheetData
+ * @param index - the indexes of the rows in this window
+ */
+export type SheetWindow = {
+    sheetIndex: number;
+    numRows: number;
+    numColumns: number;
+    rowStart: number;
+    rowEnd: number;
+    columnStart: number;
+    columnEnd: number;
+    data: SheetData['data'];
+    index: IndexLabel[];
+    conditionalFormattingResult: ConditionalFormattingResult;
+};
+
+/**
+ * A chunk of a file that is downloaded from the backend in multiple API calls.
+ * 
+ * @param download_id - the id of the file on the backend, to pass when reading its other chunks
+ * @param chunk_index - the index of this chunk in the file
+ * @param num_chunks - the number of chunks in the file
+ * @param num_bytes - the size of the file
+ */
+export type ExportDownloadChunk = {
+    download_id: string;
+    chunk_index: number;
+    num_chunks: number;
+    num_bytes: number;
+    // The bytes of the chunk. In streamlit, they are sent as base64
+    buffer?: ArrayBuffer | DataView;
+    bufferBase64?: string;
+};
+
+/**
+ * Where the values of a column are in the buffer of its sheet, which is sent alongside the sheet data.
+ * 
+ * @param type - the typed array to read the values into (e.g. Float64Array)
+ * @param offset - the byte offset in the buffer that the values start at
+ * @param length - the number of values in the column
+ */
+export type ColumnBuffer = {
+    type: 'Int8Array' | 'Int16Array' | 'Int32Array' | 'Uint8Array' | 'Uint16Array' | 'Uint32Array' | 'Float64Array';
+    offset: number;
+    length: number;
+};
+
 
 export type GraphPreprocessingParams = {
     safety_filter_turned_on_by_user: boolean
@@ -395,10 +453,10 @@ type GraphParamsGeneric<T> = {
 
 /**
  * Data about all of the graphs. For each graph, it contains all of the parameters used to construct the graph,
- * the actual graph html & javascript, and the generated code.
+ * the graph figure as json, and the generated code.
  * 
  * @param graphParams - all of the parameters used to construct the graph
- * @param [graphOutput] - the python code, the graph html, and the graph script 
+ * @param [graphOutput] - the python code, the graph figure, and the size to draw it at
  */
 type GraphDataGeneric<T> = {
     graphParams: GraphParamsGeneric<T>,
@@ -415,10 +473,20 @@ export type GraphDataBackend = GraphDataGeneric<number>
 export type GraphParamsFrontend = GraphParamsGeneric<string>
 export type GraphParamsBackend = GraphParamsGeneric<number>
 
+/**
+ * A plotly figure, as the json that plotly.js draws.
+ */
+export type PlotlyFigureJSON = {
+    data: any[],
+    layout: Record<string, any>,
+}
+
 export type GraphOutput = {
     graphGeneratedCode: string,
-    graphHTML: string,
-    graphScript: string,
+    graphFigure: PlotlyFigureJSON,
+    graphPlotlyJS: string | null, // plotly.js, if it was not loaded on the page
+    graphHeight: string,
+    graphWidth: string,
 } | undefined;
 
 export type GraphID = string;
@@ -707,6 +775,8 @@ export enum MitoEnterpriseConfigKey {
     ANALYTICS_URL = 'MITO_CONFIG_ANALYTICS_URL',
     TELEMETRY = 'MITO_CONFIG_FEATURE_TELEMETRY',
     PRO = 'MITO_CONFIG_PRO',
+    CSV_IMPORT_ENGINE = 'MITO_CONFIG_CSV_IMPORT_ENGINE',
+    STATE_HISTORY_MAX_MEMORY_MB = 'MITO_CONFIG_STATE_HISTORY_MAX_MEMORY_MB',
 }
 
 export type PublicInterfaceVersion = 1 | 2 | 3;
@@ -0,0 +1,85 @@
+import { ColumnBuffer, SheetData } from "../types";
+
+const TYPED_ARRAYS = {
+    'Int8Array': Int8Array,
+    'Int16Array': Int16Array,
+    'Int32Array': Int32Array,
+    'Uint8Array': Uint8Array,
+    'Uint16Array': Uint16Array,
+    'Uint32Array': Uint32Array,
+    'Float64Array': Float64Array,
+}
+
+/**
+ * Returns the bytes of a string that was base64 encoded on the backend.
+ */
+export const getBase64Bytes = (base64: string): Uint8Array => {
+    return Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+}
+
+/**
+ * Returns the bytes of a binary buffer that was sent alongside a message from the backend.
+ */
+export const getBytes = (buffer: ArrayBuffer | DataView): Uint8Array => {
+    return buffer instanceof ArrayBuffer
+        ? new Uint8Array(buffer)
+        : new Uint8Array(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+}
+
+/**
+ * Returns the bytes of the binary buffer sent with an API result, whether it was
+ * sent as a buffer, or as base64 in streamlit.
+ */
+export const getBufferBytes = (result: {buffer?: ArrayBuffer | DataView, bufferBase64?: string}): Uint8Array | undefined => {
+    if (result.buffer !== undefined) {
+        return getBytes(result.buffer);
+    } else if (result.bufferBase64 !== undefined) {
+        return getBase64Bytes(result.bufferBase64);
+    }
+    return undefined;
+}
+
+const readColumnBuffer = (bytes: Uint8Array, columnBuffer: ColumnBuffer, columnDtype: string): (string | number | boolean)[] => {
+    const TypedArray = TYPED_ARRAYS[columnBuffer.type];
+    // We copy the values of the column, as the offset of the column may not be
+    // aligned to the size of the values in it
+    const start = bytes.byteOffset + columnBuffer.offset;
+    const columnBytes = bytes.buffer.slice(start, start + columnBuffer.length * TypedArray.BYTES_PER_ELEMENT);
+    const values = Array.from(new TypedArray(columnBytes));
+
+    if (columnDtype === 'bool') {
+        return values.map(value => value === 1);
+    }
+    // Nulls and infinities are sent as NaN in the rest of the sheet data
+    return values.map(value => isFinite(value) ? value : 'NaN');
+}
+
+/**
+ * Reads the values of the columns that are sent in the buffer of each sheet into
+ * the columnData of the column, so that the sheet data can be used in the same way
+ * as sheet data that was sent without buffers.
+ */
+export const readColumnBuffers = (sheetDataArray: SheetData[], sheetDataBuffers: Uint8Array[] | undefined): SheetData[] => {
+    if (sheetDataBuffers === undefined) {
+        return sheetDataArray;
+    }
+
+    return sheetDataArray.map((sheetData, sheetIndex) => {
+        const bytes = sheetDataBuffers[sheetIndex];
+        if (bytes === undefined || sheetData.data.every(column => column.columnBuffer === undefined)) {
+            return sheetData;
+        }
+
+        const data = sheetData.data.map(column => {
+            if (column.columnBuffer === undefined) {
+                return column;
+            }
+            const {columnBuffer, ...columnWithoutBuffer} = column;
+            return {
+                ...columnWithoutBuffer,
+                columnData: readColumnBuffer(bytes, columnBuffer, column.columnDtype)
+            };
+        })
+        return {...sheetData, data: data};
+    })
+}
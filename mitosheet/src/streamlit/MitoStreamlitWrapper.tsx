@@ -5,7 +5,7 @@ import {
 } from "streamlit-component-lib"
 import Mito from '../mito/Mito';
 import React, { ReactNode } from "react"
-import { MitoResponse, MitoTheme, SendFunctionReturnType } from "../mito";
+import { getBase64Bytes, MitoResponse, MitoTheme, SendFunctionReturnType } from "../mito";
 import { getAnalysisDataFromString, getSheetDataArrayFromString, getUserProfileFromString } from "../jupyter/jupyterUtils";
 
 
@@ -79,9 +79,14 @@ const getMitoThemeFromStreamlitTheme = (streamlitTheme: Theme | undefined): Mito
  */
 class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
 
+    // The ids of the responses we have read. We tell the backend about them with each 
+    // message we send, so it can stop sending them to us on every rerun
+    readResponseIDs: Set<string>;
+
     constructor(props: any) {
         super(props);
         this.state = { responses: [], analysisName: '' };
+        this.readResponseIDs = new Set();
     }
 
     public getResponseData<ResultType>(id: string, maxRetries = MAX_RETRIES): Promise<SendFunctionReturnType<ResultType>> {
@@ -113,6 +118,12 @@ class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
                     clearInterval(interval);
 
                     const response = unconsumedResponses[index];
+                    this.readResponseIDs.add(id);
+                    this.setState(prevState => {
+                        return {
+                            responses: prevState.responses.filter(response => response['id'] !== id)
+                        }
+                    });
 
                     if (response['event'] == 'error') {
                         return resolve({
@@ -126,7 +137,7 @@ class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
                     const sharedVariables = response.shared_variables;
                     
                     return resolve({
-                        sheetDataArray: sharedVariables ? getSheetDataArrayFromString(sharedVariables.sheet_data_json) : undefined,
+                        sheetDataArray: sharedVariables ? getSheetDataArrayFromString(sharedVariables.sheet_data_json, sharedVariables.sheet_data_buffers_base64?.map(getBase64Bytes)) : undefined,
                         analysisData: sharedVariables ? getAnalysisDataFromString(sharedVariables.analysis_data_json) : undefined,
                         userProfile: sharedVariables ? getUserProfileFromString(sharedVariables.user_profile_json) : undefined,
                         result: response['data'] as ResultType
@@ -144,6 +155,7 @@ class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
         // component "sends" messages even when a new backend is created - and 
         // we don't want to send old messages to the new backend!
         msg['analysis_name'] = this.state.analysisName;
+        msg['read_response_ids'] = Array.from(this.readResponseIDs);
 
         // First, get the iframe of the MitoMessagePasser component
         const parentWindow = window.parent;
@@ -164,27 +176,28 @@ class MitoStreamlitWrapper extends StreamlitComponentBase<State> {
     
     public render = (): ReactNode => {
 
-        const sheetDataArray = getSheetDataArrayFromString(this.props.args['sheet_data_json']);
+        // The buffers of the sheets are sent as base64, as the args are sent as json
+        const sheetDataBuffersBase64: string[] = JSON.parse(this.props.args['sheet_data_buffers_base64_json']);
+        const sheetDataArray = getSheetDataArrayFromString(this.props.args['sheet_data_json'], sheetDataBuffersBase64.map(getBase64Bytes));
         const analysisData = getAnalysisDataFromString(this.props.args['analysis_data_json']);
         const userProfile = getUserProfileFromString(this.props.args['user_profile_json']);
-        const responses = JSON.parse(this.props.args['responses_json']);
-
-        // If we have new responses, add them to the state. Note that this
-        // implies that responses are append-only for a given Mito instance.
-        if (responses.length > this.state.responses.length) {
-            const newResponses = responses.slice(this.state.responses.length);
-            
+        const responses: MitoResponse[] = JSON.parse(this.props.args['responses_json']);
+
+        // The backend sends the responses we have not told it we read, so we add the 
+        // ones we have not seen yet to the state.
+        const newResponses = responses.filter(response => {
+            return !this.readResponseIDs.has(response['id']) && this.state.responses.every(stateResponse => stateResponse['id'] !== response['id'])
+        });
+        if (newResponses.length > 0) {
             this.setState(prevState => {
                 return {
                     responses: [...prevState.responses, ...newResponses],
                 }
             });
         }
-        // If we have less responses, this means we have reset the Mito instance,
-        // so we update the responses. TODO: can the Mito widget handle this?
-        if (responses.length < this.state.responses.length) {
-            this.setState({responses: responses});
-        }
+        // Once the backend stops sending a response we read, we don't need to tell it 
+        // about it any more
+        this.readResponseIDs = new Set(Array.from(this.readResponseIDs).filter(id => responses.some(response => response['id'] === id)));
 
         this.setState({analysisName: analysisData.analysisName});
 